@@ -11,9 +11,11 @@ except ImportError:
 import os
 import sys
 import json
+import time
 from datetime import datetime
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
 
 # CORREÇÃO: Importar 'List' do módulo 'typing'
@@ -28,6 +30,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 from src.audit import get_audit_logger, LogEntry
 from src.coordinator import BotCoordinator, get_coordinator
 from src.ai_advisor.decision_service import AIDecisionService, AISuggestion, AIExecutionCommand
+from src.observability import MetricsCollector, get_metrics, load_metrics_snapshot
+from src.core.trade_journal import read_trades
 
 
 # --- Configuração de Caminhos ---
@@ -59,6 +63,35 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Tempo de resposta por rota (template, não a URL crua) para o /metrics"""
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        endpoint = f"{request.method} {route.path}" if route is not None else "unmatched"
+        get_metrics().record_api_request(endpoint, (time.perf_counter() - start) * 1000, status_code)
+
+
+# --- Métricas (Prometheus) ---
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics():
+    """
+    Métricas no formato texto do Prometheus: as deste processo (API,
+    restarts pelo coordenador) somadas às do engine (data/metrics.json).
+    """
+    combined = MetricsCollector()
+    combined.merge(get_metrics().snapshot())
+    combined.merge(load_metrics_snapshot("data/metrics.json"))
+    return PlainTextResponse(combined.to_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 # --- Rotas de Decisão de IA (AI ADVISOR) ---
 
 @app.post("/api/v1/ai/suggest", response_model=AISuggestion, summary="Obter Sugestão Otimizada da IA.")
@@ -241,13 +274,7 @@ async def get_dashboard_config():
 async def get_dashboard_history():
     """Retorna o histórico de trades"""
     try:
-        history_path = Path("data/multibot_history.json")
-        if history_path.exists():
-            with open(history_path, 'r') as f:
-                history = json.load(f)
-            return history
-        else:
-            return []
+        return read_trades()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
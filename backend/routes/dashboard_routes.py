@@ -14,6 +14,8 @@ from ..models import (
 )
 from ..dependencies import get_current_user, require_permission
 from ..config import UserRole
+from src.core.pnl_aggregates import load_pnl_aggregates
+from src.core.trade_journal import read_trades
 
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
@@ -133,21 +135,15 @@ async def get_trades(
     """
     Listar histórico de trades
     """
-    history = load_json_file("data/multibot_history.json", {})
-    trades = history.get("trades", [])
+    # Período filtrado pelo índice do journal (segmentos fora do período nem são lidos)
+    trades = read_trades(since=start_date, until=end_date)
     
     # Filtros
     if bot_name:
         trades = [t for t in trades if t.get("bot_name") == bot_name]
     
-    if start_date:
-        trades = [t for t in trades if t.get("closed_at", "") >= start_date]
-    
-    if end_date:
-        trades = [t for t in trades if t.get("closed_at", "") <= end_date]
-    
     # Ordenar por data (mais recente primeiro)
-    trades = sorted(trades, key=lambda x: x.get("closed_at", ""), reverse=True)
+    trades = sorted(trades, key=lambda x: x.get("timestamp", ""), reverse=True)
     
     # Paginação
     total = len(trades)
@@ -192,6 +188,69 @@ async def get_bots_status(
     return {"bots": result}
 
 
+@router.get("/engine")
+async def get_engine_status(
+    current_user: UserInDB = Depends(get_current_user)
+):
+    """
+    Saúde do loop principal: ritmo do ciclo, atrasos e corte de carga
+    """
+    coordinator = load_json_file("data/coordinator_stats.json", {})
+    balances = load_json_file("data/dashboard_balances.json", {})
+    
+    return {
+        "pacing": coordinator.get("pacing", {}),
+        "cycle_ms": balances.get("cycle_ms", 0),
+        "max_workers": balances.get("max_workers", 0),
+        "engine_mode": balances.get("engine_mode", "polling"),
+        "updated_at": coordinator.get("last_update")
+    }
+
+
+@router.get("/exchange-api")
+async def get_exchange_api_stats(
+    current_user: UserInDB = Depends(get_current_user)
+):
+    """
+    Chamadas REST à exchange na janela recente: latência, peso, erros por
+    endpoint e o backoff automático em vigor
+    """
+    balances = load_json_file("data/dashboard_balances.json", {})
+    
+    return {
+        "api_calls": balances.get("api_calls", {}),
+        "rate_limit": balances.get("rate_limit", {}),
+        "updated_at": balances.get("timestamp")
+    }
+
+
+@router.get("/latency")
+async def get_latency(
+    bot: Optional[str] = Query(None, description="Filtrar por bot"),
+    symbol: Optional[str] = Query(None, description="Filtrar por símbolo"),
+    current_user: UserInDB = Depends(get_current_user)
+):
+    """
+    Latência do ciclo por fase (p50/p95/p99 em ms), por bot e por símbolo
+    """
+    metrics = load_json_file("data/metrics.json", {})
+    latency = metrics.get("latency", {})
+    
+    if bot:
+        return {"bot": bot, "phases": latency.get("by_bot", {}).get(bot, {}),
+                "updated_at": metrics.get("timestamp")}
+    if symbol:
+        return {"symbol": symbol, "phases": latency.get("by_symbol", {}).get(symbol, {}),
+                "updated_at": metrics.get("timestamp")}
+    
+    return {
+        "phases": latency.get("by_phase", {}),
+        "bots": latency.get("by_bot", {}),
+        "symbols": latency.get("by_symbol", {}),
+        "updated_at": metrics.get("timestamp")
+    }
+
+
 @router.get("/chart/pnl")
 async def get_pnl_chart(
     period: str = Query("30d", regex="^(7d|30d|90d|1y|all)$"),
@@ -325,10 +384,8 @@ async def get_bot_comparison(
     """
     import yaml
     
-    # Carregar histórico de trades
-    history = load_json_file("data/multibot_history.json", [])
-    if isinstance(history, dict):
-        history = history.get("trades", [])
+    # Agregados de PnL mantidos pelo engine (sem reler o histórico)
+    aggregates = load_pnl_aggregates()
     
     # Carregar configurações
     bots_config_path = Path("config/bots_config.yaml")
@@ -356,44 +413,7 @@ async def get_bot_comparison(
     performances = []
     
     for bot_type, bot_name in bot_names.items():
-        # Filtrar trades deste bot
-        bot_trades = [t for t in history if t.get('bot_type') == bot_type]
-        
-        total_trades = len(bot_trades)
-        wins = sum(1 for t in bot_trades if t.get('pnl_usd', 0) > 0)
-        losses = sum(1 for t in bot_trades if t.get('pnl_usd', 0) <= 0)
-        win_rate = (wins / total_trades * 100) if total_trades > 0 else 0
-        
-        total_pnl = sum(t.get('pnl_usd', 0) for t in bot_trades)
-        
-        # PnL do dia
-        today = datetime.now().strftime('%Y-%m-%d')
-        today_trades = [t for t in bot_trades if t.get('exit_time', '')[:10] == today]
-        daily_pnl = sum(t.get('pnl_usd', 0) for t in today_trades)
-        
-        # Média por trade
-        avg_profit = total_pnl / total_trades if total_trades > 0 else 0
-        
-        # Duração média
-        durations = [t.get('duration_min', 0) for t in bot_trades if t.get('duration_min')]
-        avg_duration = sum(durations) / len(durations) if durations else 0
-        
-        # Melhor e pior trade
-        pnls = [t.get('pnl_usd', 0) for t in bot_trades]
-        best_trade = max(pnls) if pnls else 0
-        worst_trade = min(pnls) if pnls else 0
-        
-        # Streak atual (últimos trades consecutivos de win ou loss)
-        current_streak = 0
-        if bot_trades:
-            sorted_trades = sorted(bot_trades, key=lambda x: x.get('exit_time', ''), reverse=True)
-            last_was_win = sorted_trades[0].get('pnl_usd', 0) > 0 if sorted_trades else True
-            for trade in sorted_trades:
-                is_win = trade.get('pnl_usd', 0) > 0
-                if is_win == last_was_win:
-                    current_streak += 1 if is_win else -1
-                else:
-                    break
+        summary = aggregates.bot_summary(bot_type)
         
         # Verificar se está habilitado
         enabled = False
@@ -406,17 +426,17 @@ async def get_bot_comparison(
         performances.append({
             'bot_type': bot_type,
             'bot_name': bot_name,
-            'total_trades': total_trades,
-            'wins': wins,
-            'losses': losses,
-            'win_rate': win_rate,
-            'total_pnl': total_pnl,
-            'daily_pnl': daily_pnl,
-            'avg_profit_per_trade': avg_profit,
-            'avg_duration_min': avg_duration,
-            'best_trade': best_trade,
-            'worst_trade': worst_trade,
-            'current_streak': current_streak,
+            'total_trades': summary['total_trades'],
+            'wins': summary['wins'],
+            'losses': summary['losses'],
+            'win_rate': summary['win_rate'],
+            'total_pnl': summary['total_pnl'],
+            'daily_pnl': summary['daily_pnl'],
+            'avg_profit_per_trade': summary['avg_profit'],
+            'avg_duration_min': summary['avg_duration'],
+            'best_trade': summary['best_trade'],
+            'worst_trade': summary['worst_trade'],
+            'current_streak': summary['current_streak'],
             'enabled': enabled
         })
     
@@ -22,6 +22,9 @@ except:
     os.system('. /home/ubuntu/App_Leonardo/venv/bin/activate && pip install ccxt -q')
     import ccxt
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from src.core.ticker_snapshot import TickerSnapshot
+
 def fechar_posicoes():
     """Fecha todas as posições abertas"""
     
@@ -95,6 +98,13 @@ def fechar_posicoes():
     failed = 0
     total_realizado = 0
     
+    # Preços de todos os pares numa única requisição (falhou: ticker por posição)
+    try:
+        tickers = TickerSnapshot.from_ccxt(exchange.fetch_tickers())
+    except Exception as e:
+        print(f"⚠️  Erro ao buscar todos os preços ({e}) - usando ticker por posição")
+        tickers = TickerSnapshot({})
+    
     for symbol, data in positions.items():
         amount = float(data.get('amount', 0))
         entry_price = float(data.get('entry_price', 0))
@@ -107,9 +117,10 @@ def fechar_posicoes():
         sys.stdout.flush()
         
         try:
-            # Obter preço atual
-            ticker = exchange.fetch_ticker(symbol)
-            current_price = ticker['last']
+            # Obter preço atual (snapshot; fallback para o ticker individual)
+            current_price = tickers.price(symbol)
+            if current_price is None:
+                current_price = exchange.fetch_ticker(symbol)['last']
             
             # Formatar quantidade (remover zeros)
             amount_rounded = exchange.amount_to_precision(symbol, amount)
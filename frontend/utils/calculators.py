@@ -12,7 +12,12 @@ def get_pnl_by_bot(history):
             stats['losses'] += 1
     return pnl_by_bot
 
-def get_daily_pnl(history):
+def get_daily_pnl(history=None):
+    # Sem histórico: bucket do dia nos agregados de PnL do engine (sem varrer trades)
+    if history is None:
+        from src.core.pnl_aggregates import load_pnl_aggregates
+        return load_pnl_aggregates().daily_by_bot()
+
     from datetime import datetime, timedelta
     # Define o período diário: das 00:00:01 às 23:59:59 do dia atual
     today = datetime.now().date()
@@ -35,7 +40,12 @@ def get_daily_pnl(history):
                     daily_pnl[bot_type] = daily_pnl.get(bot_type, 0) + trade.get('pnl_usd', 0)
     return daily_pnl
 
-def get_monthly_pnl(history):
+def get_monthly_pnl(history=None):
+    # Sem histórico: bucket do mês nos agregados de PnL do engine (sem varrer trades)
+    if history is None:
+        from src.core.pnl_aggregates import load_pnl_aggregates
+        return load_pnl_aggregates().monthly_by_bot()
+
     from datetime import datetime, timedelta
     # Define o período mensal: do dia 01 às 23:59:59 do último dia do mês atual
     now = datetime.now()
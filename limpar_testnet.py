@@ -20,6 +20,7 @@ def limpar_arquivos_json():
         "coordinator_stats.json": {},
         "dashboard_balances.json": {},
         "poupanca.json": {},
+        "pnl_aggregates.json": {},
     }
     
     print("\n=== LIMPANDO ARQUIVOS JSON ===")
@@ -43,6 +44,19 @@ def limpar_arquivos_json():
         else:
             print(f"  [--] {arquivo} - nao existe")
 
+def limpar_journal():
+    """Move o journal de trades para backup (o bot recria vazio)"""
+    print("\n=== LIMPANDO JOURNAL DE TRADES ===")
+    journal_dir = DATA_DIR / "journal"
+    if journal_dir.exists():
+        import shutil
+        backup_path = DATA_DIR / "backups" / f"journal.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        backup_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(journal_dir), str(backup_path))
+        print(f"  [OK] journal/ - limpo (backup salvo)")
+    else:
+        print(f"  [--] journal/ - nao existe")
+
 def limpar_banco_dados():
     """Limpa as tabelas dos bancos de dados SQLite"""
     print("\n=== LIMPANDO BANCOS DE DADOS ===")
@@ -140,6 +154,7 @@ def main():
     input("\nPressione ENTER para continuar ou Ctrl+C para cancelar...")
     
     limpar_arquivos_json()
+    limpar_journal()
     limpar_banco_dados()
     limpar_ai_data()
     verificar_config()
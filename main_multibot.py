@@ -32,7 +32,11 @@ import time
 import yaml
 import json
 import logging
+import contextvars
+import math
 import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -41,8 +45,19 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from src.coordinator import BotCoordinator, get_coordinator
 from src.core.exchange_client import ExchangeClient
+from src.core.candle_store import get_candle_store
+from src.core.exit_lane import ExitLane
+from src.core.cycle_pacer import CyclePacer
+from src.core.request_scheduler import RequestDropped, RequestPriority, request_priority, request_wait
+from src.core.market_recorder import stop_market_recorder
+from src.core.trade_journal import TradeJournal, default_journal_dir
+from src.core.utils import get_data_dir
+from src.core.write_behind import start_write_behind, stop_write_behind
+from src.core.pnl_aggregates import get_pnl_aggregates
+from src.observability import get_metrics
 from src.strategies.smart_strategy import SmartStrategy
-from src.indicators.technical_indicators import TechnicalIndicators
+from src.strategies.batch_exit_evaluator import BatchExitEvaluator
+from src.indicators.technical_indicators import TechnicalIndicators, BatchIndicators
 
 # ===== IMPORTAÇÃO DO UNICO BOT =====
 try:
@@ -90,7 +105,7 @@ class MultiBotEngine:
     def __init__(self):
         # ===== DEFINE DIRETÓRIO DE DADOS =====
         # Permite subconta usar seu próprio diretório
-        self.data_dir = Path(os.getenv('DATA_DIR', 'data'))
+        self.data_dir = get_data_dir()
         self.data_dir.mkdir(parents=True, exist_ok=True)
         
         # ===== VERIFICA MODO DE OPERAÇÃO =====
@@ -118,6 +133,84 @@ class MultiBotEngine:
         # Exchange compartilhada
         self.exchange = self.coordinator.exchange
         
+        # ===== CANDLE STORE (WebSocket + cache compartilhado) =====
+        # Semeado uma vez via REST, depois atualizado pelos streams de kline
+        market_data_config = self.coordinator.config.get('global', {}).get('market_data', {})
+        self.candle_store = get_candle_store(
+            self.exchange,
+            capacity=market_data_config.get('capacity', 500),
+            stale_after_seconds=market_data_config.get('stale_after_seconds', 90),
+            streaming=market_data_config.get('streaming', True)
+        )
+        
+        # ===== MOTOR CONCORRENTE (análise de símbolos em paralelo) =====
+        # Busca de candles/indicadores/decisão roda em paralelo; posições e
+        # ordens continuam serializadas pelo _trade_lock
+        engine_config = self.coordinator.config.get('global', {}).get('engine', {})
+        self.max_workers = max(1, int(engine_config.get('max_workers', 4)))
+        self._executor = None
+        if self.max_workers > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='Analise'
+            )
+        self._trade_lock = threading.RLock()
+        self.last_cycle_ms = 0.0
+        
+        # Espera máxima por orçamento de peso nas threads de trading/saída:
+        # sem orçamento, a chamada é descartada e o próximo ciclo tenta de novo
+        self.max_request_wait = engine_config.get('max_request_wait_ms', 250) / 1000
+        
+        # Modo do ciclo: 'polling' (sleep fixo) ou 'event' (fechamento de candle):
+        # no modo event cada candle fechado enfileira SÓ aquele símbolo para entrada
+        self.engine_mode = engine_config.get('mode', 'polling')
+        self.event_coalesce_seconds = engine_config.get('event_coalesce_ms', 50) / 1000
+        self._closed_symbols = set()
+        # Timeframe de entrada -> símbolos dos bots nesse timeframe (o 1m das
+        # posições abertas não dispara análise de bots em outro timeframe)
+        self._entry_timeframes: dict = {}
+        self._closed_cond = threading.Condition()
+        self._last_close_event = 0.0
+        self.event_stats = {'events': 0, 'event_cycles': 0, 'heartbeat_cycles': 0, 'full_cycles': 0}
+        
+        # Spans de latência por fase/bot/símbolo (exportados em data/metrics.json)
+        self.metrics = get_metrics()
+        
+        # Persistência write-behind (posições, stats, dashboard): a thread de
+        # trading só serializa, o disco fica com a thread de fundo
+        self.persistence = start_write_behind(
+            self.coordinator.config.get('global', {}).get('persistence', {})
+        )
+        
+        # Último snapshot do dashboard gravado (reaproveitado quando o Earn é descartado)
+        self._last_dashboard = {}
+        
+        # Agregados de PnL (totais, streaks, dia/mês) atualizados a cada trade
+        self.pnl = get_pnl_aggregates(str(self.data_dir / "pnl_aggregates.json"))
+        
+        # Ritmo por deadline + corte de carga (o período vem do interval do run)
+        self.pacer = CyclePacer(
+            period=3,
+            shed_enabled=engine_config.get('shed_load', True),
+            shed_above=engine_config.get('shed_above_load', 0.9),
+            recover_below=engine_config.get('shed_recover_load', 0.6),
+            low_weight_fraction=engine_config.get('shed_low_weight_fraction', 0.5)
+        )
+        
+        # Saídas de preço de todas as posições num único passe NumPy (multi-bot)
+        self.batch_exits_enabled = engine_config.get('batch_exits', False)
+        self.batch_exits = BatchExitEvaluator()
+        
+        # ===== VIA RÁPIDA DE SAÍDA (stop/trailing/TP a cada tick) =====
+        exit_lane_config = self.coordinator.config.get('global', {}).get('exit_lane', {})
+        self.exit_lane_enabled = exit_lane_config.get('enabled', False)
+        self.exit_lane = ExitLane(
+            evaluate=self._fast_exit_reason,
+            on_exit=self._fast_exit,
+            stream=exit_lane_config.get('stream', 'bookTicker'),
+            min_interval_ms=exit_lane_config.get('min_interval_ms', 100)
+        )
+        
         # Indicadores
         self.indicators = TechnicalIndicators()
         
@@ -206,19 +299,22 @@ class MultiBotEngine:
         # Carrega posições existentes
         self._load_positions()
         
-        # Arquivo de histórico global
-        self.history_file = self.data_dir / "multibot_history.json"
-        
-        # ===== HISTÓRICO POR BOT =====
-        self.bot_history_files = {
-            'bot_estavel': self.data_dir / "history" / "bot_estavel_trades.json",
-            'bot_medio': self.data_dir / "history" / "bot_medio_trades.json",
-            'bot_volatil': self.data_dir / "history" / "bot_volatil_trades.json",
-            'bot_meme': self.data_dir / "history" / "bot_meme_trades.json",
-            'poupanca': self.data_dir / "history" / "poupanca_trades.json",
-        }
-        
-        # Cria diretório de histórico se não existir
+        # ===== HISTÓRICO DE TRADES (journal append-only, todos os bots) =====
+        journal_config = self.coordinator.config.get('global', {}).get('trade_journal', {})
+        self.trade_journal = TradeJournal(
+            base_dir=str(default_journal_dir()),
+            segment_records=journal_config.get('segment_records', 1000),
+            max_segments=journal_config.get('max_segments', 50),
+            fsync=journal_config.get('fsync', 'always')
+        )
+        # Instalação antiga: importa o multibot_history.json uma única vez
+        self.trade_journal.import_legacy(self.data_dir / "multibot_history.json")
+        if self.pnl.is_empty():
+            rebuilt = self.pnl.rebuild(self.trade_journal.read())
+            if rebuilt:
+                self.logger.info(f"📈 Agregados de PnL reconstruídos de {rebuilt} trades do journal")
+        
+        # Cria diretório de histórico se não existir (estatísticas por bot)
         (self.data_dir / "history").mkdir(parents=True, exist_ok=True)
         
         # Estatísticas por bot
@@ -271,10 +367,9 @@ class MultiBotEngine:
         return default_stats
     
     def _save_bot_stats(self, bot_type: str):
-        """Salva estatísticas do bot"""
+        """Salva estatísticas do bot (evento de trade: flush imediato)"""
         stats_file = self.data_dir / "history" / f"{bot_type}_stats.json"
-        with open(stats_file, 'w') as f:
-            json.dump(self.bot_stats[bot_type], f, indent=2)
+        self.persistence.put(stats_file, self.bot_stats[bot_type], urgent=True)
     
     def _load_watchlist(self) -> list:
         """
@@ -339,6 +434,9 @@ class MultiBotEngine:
             for crypto in bot.portfolio:
                 portfolio_symbols.add(crypto['symbol'])
         
+        # Coleta candles de todos os candidatos
+        candidates = []
+        frames = []
         for crypto in self.watchlist:
             symbol = crypto['symbol']
             
@@ -348,45 +446,50 @@ class MultiBotEngine:
             
             try:
                 # Obtém dados OHLCV
-                df = self.exchange.fetch_ohlcv_dataframe(symbol, '1m', limit=100)
+                df = self.candle_store.get_dataframe(symbol, '1m', limit=100)
                 if df is None or len(df) < 50:
                     continue
-                
-                # Calcula RSI
-                from src.strategies.smart_strategy import SmartStrategy
-                strategy = SmartStrategy()
-                df = strategy.calculate_indicators(df)
-                
-                current_rsi = df.iloc[-1].get('rsi', 50)
-                current_price = df.iloc[-1]['close']
-                
-                # Define thresholds por categoria
-                rsi_thresholds = {
-                    'stable': 35,
-                    'medium': 32,
-                    'volatile': 28,
-                    'meme': 25
-                }
-                
-                threshold = rsi_thresholds.get(crypto['category'], 30)
-                
-                # Alerta se RSI muito baixo
-                if current_rsi < threshold:
-                    alert = {
-                        'symbol': symbol,
-                        'name': crypto['name'],
-                        'category': crypto['category'],
-                        'rsi': round(current_rsi, 1),
-                        'price': current_price,
-                        'threshold': threshold,
-                        'timestamp': datetime.now().isoformat(),
-                        'suggested_bot': self._suggest_bot_for_crypto(crypto['category'])
-                    }
-                    alerts.append(alert)
-                    
+                candidates.append(crypto)
+                frames.append(df)
             except Exception as e:
                 pass  # Ignora erros silenciosamente
         
+        if not frames:
+            self.watchlist_alerts = []
+            return self.watchlist_alerts
+        
+        # RSI de toda a watchlist numa única passada vetorizada
+        closes = BatchIndicators.stack_frames(frames, 'close')
+        rsi_values = BatchIndicators.rsi(closes, 14)[:, -1]
+        
+        # Define thresholds por categoria
+        rsi_thresholds = {
+            'stable': 35,
+            'medium': 32,
+            'volatile': 28,
+            'meme': 25
+        }
+        
+        for crypto, current_rsi, current_price in zip(candidates, rsi_values, closes[:, -1]):
+            if np.isnan(current_rsi):
+                continue
+            
+            threshold = rsi_thresholds.get(crypto['category'], 30)
+            
+            # Alerta se RSI muito baixo
+            if current_rsi < threshold:
+                alert = {
+                    'symbol': crypto['symbol'],
+                    'name': crypto['name'],
+                    'category': crypto['category'],
+                    'rsi': round(float(current_rsi), 1),
+                    'price': float(current_price),
+                    'threshold': threshold,
+                    'timestamp': datetime.now().isoformat(),
+                    'suggested_bot': self._suggest_bot_for_crypto(crypto['category'])
+                }
+                alerts.append(alert)
+        
         # Ordena por RSI (menor = melhor oportunidade)
         alerts.sort(key=lambda x: x['rsi'])
         
@@ -415,91 +518,64 @@ class MultiBotEngine:
         if positions_file.exists():
             try:
                 with open(positions_file, 'r') as f:
-                    self.positions = json.load(f)
+                    positions = json.load(f)
                     
                     # Converte timestamps
-                    for symbol, pos in self.positions.items():
+                    for symbol, pos in positions.items():
                         if 'time' in pos and isinstance(pos['time'], str):
                             pos['time'] = datetime.fromisoformat(pos['time'])
                     
+                with self._trade_lock:
+                    self.positions = positions
+                
                 self.logger.info(f"📂 {len(self.positions)} posições restauradas")
             except Exception as e:
                 self.logger.warning(f"⚠️ Erro ao carregar posições: {e}")
     
-    def _save_positions(self):
-        """Salva posições abertas no arquivo"""
-        Path("data").mkdir(parents=True, exist_ok=True)
+    def _save_positions(self, urgent: bool = True):
+        """
+        Salva posições abertas no arquivo (write-behind)
         
-        # Prepara para JSON (converte datetime)
+        Args:
+            urgent: posição abriu/fechou - grava já; False = próximo flush
+        """
+        # Prepara para JSON (converte datetime) - snapshot sob o _trade_lock:
+        # a via rápida fecha posições na thread dela
         positions_to_save = {}
-        for symbol, pos in self.positions.items():
-            positions_to_save[symbol] = pos.copy()
-            if 'time' in positions_to_save[symbol]:
-                positions_to_save[symbol]['time'] = pos['time'].isoformat()
+        with self._trade_lock:
+            for symbol, pos in self.positions.items():
+                positions_to_save[symbol] = pos.copy()
+                if 'time' in positions_to_save[symbol]:
+                    positions_to_save[symbol]['time'] = pos['time'].isoformat()
         
-        with open(self.data_dir / "multibot_positions.json", 'w') as f:
-            json.dump(positions_to_save, f, indent=2)
+        with self.metrics.span('persist_positions'):
+            self.persistence.put(self.data_dir / "multibot_positions.json", positions_to_save, urgent=urgent)
     
-    def _save_trade_history(self, trade: dict):
-        """Salva histórico de trades (global)"""
-        history = []
-        if self.history_file.exists():
-            try:
-                with open(self.history_file, 'r') as f:
-                    history = json.load(f)
-            except:
-                pass
-        
-        history.append(trade)
-        
-        # Mantém últimos 1000 trades
-        if len(history) > 1000:
-            history = history[-1000:]
-        
-        with open(self.history_file, 'w') as f:
-            json.dump(history, f, indent=2)
+    def _positions_snapshot(self) -> dict:
+        """Cópia das posições abertas (a via rápida fecha posições em outra thread)"""
+        with self._trade_lock:
+            return dict(self.positions)
     
     def _save_bot_trade(self, bot_type: str, trade: dict):
         """
-        Salva trade no histórico específico do bot
+        Registra o trade no journal (uma linha, O(1)) e atualiza as
+        estatísticas e os agregados de PnL do bot
         
         Args:
             bot_type: 'bot_estavel', 'bot_medio', 'bot_volatil', 'bot_meme', 'poupanca'
             trade: dict com informações do trade
         """
-        # Arquivo de histórico do bot
-        history_file = self.bot_history_files.get(bot_type, self.history_file)
-        
-        # Carrega histórico existente
-        history = []
-        if history_file.exists():
-            try:
-                with open(history_file, 'r') as f:
-                    history = json.load(f)
-            except:
-                pass
-        
-        # Adiciona trade com timestamp
         trade_record = {
             **trade,
             'timestamp': datetime.now().isoformat(),
             'bot_type': bot_type,
         }
-        history.append(trade_record)
-        
-        # Mantém últimos 500 trades por bot
-        if len(history) > 500:
-            history = history[-500:]
-        
-        # Salva
-        with open(history_file, 'w') as f:
-            json.dump(history, f, indent=2)
+        with self.metrics.span('persist_trade', bot=bot_type):
+            self.trade_journal.append(trade_record)
+        self.pnl.record(trade_record)
         
         # Atualiza estatísticas do bot
         self._update_bot_stats(bot_type, trade)
-        
-        # Também salva no histórico global
-        self._save_trade_history(trade_record)
     
     def _update_bot_stats(self, bot_type: str, trade: dict):
         """Atualiza estatísticas do bot após um trade"""
@@ -614,13 +690,16 @@ class MultiBotEngine:
             
             print(f"📊 Encontradas {len(cryptos_to_sell)} posições para liquidar:")
             
+            # Preços de todos os pares numa única leitura
+            tickers = self.exchange.get_ticker_snapshot()
+            
             for crypto in cryptos_to_sell:
                 symbol = crypto['symbol']
                 amount = crypto['amount']
                 
                 try:
                     # Obtém preço atual
-                    ticker = self.exchange.fetch_ticker(symbol)
+                    ticker = tickers.get(symbol)
                     if not ticker:
                         continue
                     
@@ -637,17 +716,15 @@ class MultiBotEngine:
                         results['sold'] += 1
                         value_usd = amount * current_price
                         
-                        # Se tinha registro local da posição, calcula PnL
-                        if symbol in self.positions:
-                            pos = self.positions[symbol]
+                        # Se tinha registro local da posição, remove e calcula PnL
+                        with self._trade_lock:
+                            pos = self.positions.pop(symbol, None)
+                        if pos:
                             pnl_pct = ((current_price - pos['entry_price']) / pos['entry_price']) * 100
                             pnl_usd = pos['amount_usd'] * (pnl_pct / 100)
                             results['total_pnl'] += pnl_usd
                             
                             print(f"   💰 {symbol}: {amount:.6f} @ ${current_price:.4f} = ${value_usd:.2f} | PnL: {pnl_usd:+.2f}")
-                            
-                            # Remove do registro local
-                            del self.positions[symbol]
                         else:
                             print(f"   💰 {symbol}: {amount:.6f} @ ${current_price:.4f} = ${value_usd:.2f}")
                         
@@ -722,11 +799,18 @@ class MultiBotEngine:
     
     def _save_poupanca(self):
         """Salva estado da poupança"""
-        self.data_dir.mkdir(parents=True, exist_ok=True)
-        with open(self.data_dir / "poupanca.json", 'w') as f:
-            json.dump(self.poupanca, f, indent=2)
+        self.persistence.put(self.data_dir / "poupanca.json", self.poupanca, urgent=True)
     
     def _save_dashboard_data(self):
+        """
+        Salva dados do dashboard. Saldo e preços vão com prioridade de
+        posição (o AI monitor lê o saldo daqui); só o Simple Earn é analytics.
+        """
+        with request_priority(RequestPriority.POSITION), request_wait(self.max_request_wait), \
+                self.metrics.span('persist_dashboard'):
+            self._write_dashboard_data()
+    
+    def _write_dashboard_data(self):
         """
         Salva dados para o dashboard:
         - Saldo USDT
@@ -736,20 +820,30 @@ class MultiBotEngine:
         - Progresso Meta Diária
         """
         try:
+            # Sem saldo ou sem preços (descartado/erro): mantém o último
+            # snapshot bom em vez de gravar zeros
             balance = self.exchange.fetch_balance()
             if not balance:
+                self.logger.debug("🚦 Dashboard: saldo indisponível - mantendo último snapshot")
                 return
             
             # Saldo USDT
             usdt_balance = balance.get('USDT', {}).get('free', 0) + balance.get('USDT', {}).get('used', 0)
             
+            # Preços de todos os pares numa única leitura (1 request em vez de N)
+            tickers = self.exchange.get_ticker_snapshot()
+            if not len(tickers):
+                self.logger.debug("🚦 Dashboard: preços indisponíveis - mantendo último snapshot")
+                return
+            
             # Saldo em cryptos (incluindo posições abertas)
             crypto_balance = 0
             crypto_positions = {}
             
             # Identifica assets que têm posições abertas (para evitar duplicatas)
+            positions = self._positions_snapshot()
             position_assets = set()
-            for symbol, pos_data in self.positions.items():
+            for symbol, pos_data in positions.items():
                 asset = symbol.replace('USDT', '') if symbol.endswith('USDT') else symbol
                 position_assets.add(asset)
             
@@ -772,7 +866,7 @@ class MultiBotEngine:
                     
                     try:
                         # Obtém preço atual
-                        ticker = self.exchange.fetch_ticker(symbol)
+                        ticker = tickers.get(symbol)
                         if ticker:
                             price = ticker.get('last', ticker.get('close', 0))
                             value_usd = total_amount * price
@@ -787,7 +881,7 @@ class MultiBotEngine:
                         pass
             
             # Segundo, adiciona valor das posições abertas do bot
-            for symbol, pos_data in self.positions.items():
+            for symbol, pos_data in positions.items():
                 if symbol not in crypto_positions:  # Evita duplicatas
                     try:
                         # Remove 'USDT' do final para obter o asset
@@ -796,7 +890,7 @@ class MultiBotEngine:
                         entry_price = pos_data.get('entry_price', 0)
                         
                         # Usa preço atual para calcular valor corrente
-                        ticker = self.exchange.fetch_ticker(symbol)
+                        ticker = tickers.get(symbol)
                         if ticker:
                             current_price = ticker.get('last', ticker.get('close', entry_price))
                             value_usd = amount * current_price
@@ -835,8 +929,11 @@ class MultiBotEngine:
             earn_balance = 0
             earn_positions = {}
             try:
-                # Buscar posições em Flexible Earn
-                flexible_positions = self.exchange.exchange.sapi_get_simple_earn_flexible_position()
+                # Buscar posições em Flexible Earn (peso 150: analytics)
+                with request_priority(RequestPriority.ANALYTICS):
+                    flexible_positions = self.exchange.call(
+                        'sapi_get_simple_earn_flexible_position', weight=150
+                    )
                 if flexible_positions and 'rows' in flexible_positions:
                     for pos in flexible_positions['rows']:
                         asset = pos.get('asset')
@@ -846,8 +943,7 @@ class MultiBotEngine:
                                 if asset == 'USDT':
                                     value_usd = amount
                                 else:
-                                    ticker = self.exchange.fetch_ticker(f"{asset}USDT")
-                                    price = ticker.get('last', ticker.get('close', 0))
+                                    price = tickers.price(f"{asset}USDT", 0)
                                     value_usd = amount * price
                                 
                                 if value_usd > 0.01:
@@ -860,6 +956,10 @@ class MultiBotEngine:
                                     }
                             except:
                                 pass
+            except RequestDropped:
+                # Sem orçamento: repete o último valor conhecido
+                earn_balance = self._last_dashboard.get('earn_balance', 0)
+                earn_positions = self._last_dashboard.get('earn_positions', {})
             except Exception as e:
                 self.logger.warning(f"⚠️ Erro ao buscar Simple Earn: {e}")
             
@@ -871,21 +971,8 @@ class MultiBotEngine:
             daily_target_pct = config.get('percentage', 1.0)  # 1% por padrão
             daily_target_usd = total_balance * (daily_target_pct / 100)
             
-            # PnL do dia
-            history = []
-            if self.history_file.exists():
-                try:
-                    with open(self.history_file, 'r') as f:
-                        history = json.load(f)
-                except:
-                    pass
-            
-            today = datetime.now().date().isoformat()
-            daily_pnl = sum(
-                t.get('pnl_usd', 0) 
-                for t in history 
-                if t.get('exit_time', t.get('timestamp', '')).startswith(today)
-            )
+            # PnL do dia (bucket do dia nos agregados, O(1))
+            daily_pnl = self.pnl.daily_pnl()
             
             # Progresso da meta
             if daily_target_usd > 0:
@@ -907,10 +994,20 @@ class MultiBotEngine:
                 'daily_target_usd': daily_target_usd,
                 'daily_pnl': daily_pnl,
                 'daily_progress': daily_progress,
+                'cycle_ms': round(self.last_cycle_ms, 1),
+                'max_workers': self.max_workers,
+                'engine_mode': self.engine_mode,
+                'engine_events': dict(self.event_stats),
+                'exit_lane': self.exit_lane.get_status(),
+                'pacing': self.pacer.get_status(),
+                'persistence': self.persistence.get_status(),
+                'watchlist_alerts': self.watchlist_alerts,
+                'rate_limit': self.exchange.scheduler.get_status(),
+                'api_calls': self.exchange.api_stats.get_status(),
             }
             
-            with open(self.data_dir / "dashboard_balances.json", 'w') as f:
-                json.dump(dashboard_data, f, indent=2)
+            self._last_dashboard = dashboard_data
+            self.persistence.put(self.data_dir / "dashboard_balances.json", dashboard_data)
                 
         except Exception as e:
             self.logger.warning(f"⚠️ Erro ao salvar dados do dashboard: {e}")
@@ -1042,6 +1139,9 @@ class MultiBotEngine:
                 print("   ⚠️ Não foi possível obter saldo")
                 return
             
+            # Preços de todos os pares numa única leitura
+            tickers = self.exchange.get_ticker_snapshot()
+            
             synced = 0
             for asset, data in balance.items():
                 if asset in ['USDT', 'info', 'free', 'used', 'total', 'debt', 'timestamp', 'datetime']:
@@ -1054,7 +1154,7 @@ class MultiBotEngine:
                     # Se não está nas nossas posições registradas, adiciona
                     if symbol not in self.positions:
                         try:
-                            ticker = self.exchange.fetch_ticker(symbol)
+                            ticker = tickers.get(symbol)
                             if ticker:
                                 current_price = ticker.get('last', ticker.get('close', 0))
                                 value_usd = total_amount * current_price
@@ -1086,16 +1186,17 @@ class MultiBotEngine:
         # Salva posições após sincronização
         self._save_positions()
     
-    def _run_unico_bot_cycle(self):
+    def _run_unico_bot_cycle(self, entry_symbols: set = None):
         """
         Executa um ciclo completo do UnicoBot.
         Processa TODAS as cryptos do portfolio.
+        
+        entry_symbols: se informado, só esses símbolos são analisados para
+        entrada (modo event); as posições abertas são sempre avaliadas.
         """
         if not self.unico_bot or not self.unico_bot.enabled:
             return
         
-        import pandas as pd
-        
         # Configurações do UnicoBot
         trading_config = self.unico_bot.trading_config
         max_positions = trading_config.get('max_positions', 15)
@@ -1105,130 +1206,68 @@ class MultiBotEngine:
         open_positions = len(self.positions)
         
         # ===== 1. VERIFICA POSIÇÕES EXISTENTES (VENDER?) =====
-        positions_to_close = []
-        
-        for symbol, pos in list(self.positions.items()):
-            try:
-                # Obtém preço atual
-                ticker = self.exchange.fetch_ticker(symbol)
-                if not ticker:
-                    continue
-                
-                current_price = ticker.get('last', ticker.get('close', 0))
-                entry_price = pos.get('entry_price', current_price)
-                entry_time = pos.get('time', datetime.now())
-                
-                if isinstance(entry_time, str):
-                    entry_time = datetime.fromisoformat(entry_time)
-                
-                # Calcula PnL
-                pnl_pct = ((current_price - entry_price) / entry_price) * 100
-                pnl_usd = pos.get('amount_usd', 0) * (pnl_pct / 100)
-                
-                # Obtém dados para análise
-                ohlcv = self.exchange.fetch_ohlcv(symbol, '1m', limit=100)
-                df = None
-                if ohlcv and len(ohlcv) > 0:
-                    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                
-                # Verifica se deve vender
-                should_close, reason = self.unico_bot.should_close(
-                    symbol=symbol,
-                    entry_price=entry_price,
-                    current_price=current_price,
-                    entry_time=entry_time,
-                    df=df
-                )
-                
-                if should_close:
-                    positions_to_close.append({
-                        'symbol': symbol,
-                        'reason': reason,
-                        'pnl_pct': pnl_pct,
-                        'pnl_usd': pnl_usd,
-                        'current_price': current_price
-                    })
-                    
-            except Exception as e:
-                self.logger.warning(f"⚠️ Erro ao verificar {symbol}: {e}")
+        # Preços de todas as posições numa única leitura
+        with self.metrics.span('fetch', bot='unico_bot'):
+            tickers = self.exchange.get_ticker_snapshot()
+        
+        # Avaliação em paralelo; as vendas são executadas em sequência
+        positions_to_close = [
+            close_info
+            for close_info in self._map_concurrent(
+                self._evaluate_unico_exit,
+                [(symbol, pos, tickers) for symbol, pos in self._positions_snapshot().items()]
+            )
+            if close_info
+        ]
         
-        # Executa vendas
-        for close_info in positions_to_close:
-            symbol = close_info['symbol']
-            try:
-                pos = self.positions[symbol]
-                amount = pos.get('amount', 0)
-                
-                # Executa venda
-                order = self.exchange.create_market_order(
-                    symbol=symbol,
-                    side='sell',
-                    amount=amount
-                )
-                
-                if order:
-                    pnl_emoji = "✅" if close_info['pnl_usd'] >= 0 else "❌"
-                    print(f"{pnl_emoji} VENDA {symbol}: {close_info['reason']} | PnL: ${close_info['pnl_usd']:+.2f}")
-                    
-                    # Registra trade
-                    trade = {
-                        'symbol': symbol,
-                        'side': 'sell',
-                        'amount': amount,
-                        'price': close_info['current_price'],
-                        'pnl_pct': close_info['pnl_pct'],
-                        'pnl_usd': close_info['pnl_usd'],
-                        'reason': close_info['reason'],
-                        'bot_type': 'unico_bot'
-                    }
-                    self._save_bot_trade('unico_bot', trade)
-                    
-                    # Remove da lista de posições
-                    del self.positions[symbol]
+        # Executa vendas (serializado com as demais ordens)
+        with self._trade_lock:
+            for close_info in positions_to_close:
+                if self._close_unico_position(close_info):
                     open_positions -= 1
-                    
-            except Exception as e:
-                print(f"❌ Erro ao vender {symbol}: {e}")
         
         # ===== 2. PROCURA NOVAS OPORTUNIDADES (COMPRAR?) =====
         if open_positions < max_positions:
             # Verifica saldo disponível
-            usdt_balance = self.get_balance()
+            with self.metrics.span('fetch', bot='unico_bot'):
+                usdt_balance = self.get_balance()
             
             if usdt_balance >= amount_per_trade:
-                for crypto in self.unico_bot.portfolio:
-                    if open_positions >= max_positions:
-                        break
-                    
-                    symbol = crypto['symbol']
-                    
-                    # Pula se já tem posição
-                    if symbol in self.positions:
-                        continue
-                    
-                    try:
-                        # Obtém dados
-                        ohlcv = self.exchange.fetch_ohlcv(symbol, '1m', limit=100)
-                        if not ohlcv or len(ohlcv) < 50:
+                # Análise em paralelo (só símbolos sem posição)
+                candidates = [
+                    crypto['symbol'] for crypto in self.unico_bot.portfolio
+                    if crypto['symbol'] not in self.positions
+                    and (entry_symbols is None or crypto['symbol'] in entry_symbols)
+                ]
+                signals = self._map_concurrent(self._analyze_unico_entry, candidates)
+                
+                # Compras em sequência, na ordem do portfolio
+                with self._trade_lock:
+                    for entry in signals:
+                        if open_positions >= max_positions:
+                            break
+                        
+                        if not entry:
                             continue
                         
-                        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+                        symbol, reason, current_price = entry
                         
-                        # Analisa
-                        signal, reason, indicators = self.unico_bot.analyze_symbol(symbol, df)
+                        # Pode ter sido aberta por outro caminho durante a análise
+                        if symbol in self.positions:
+                            continue
                         
-                        if signal == 'BUY':
+                        try:
                             # Calcula quantidade
-                            current_price = df.iloc[-1]['close']
                             trade_amount = min(amount_per_trade, usdt_balance)
                             crypto_amount = trade_amount / current_price
                             
                             # Executa compra
-                            order = self.exchange.create_market_order(
-                                symbol=symbol,
-                                side='buy',
-                                amount=crypto_amount
-                            )
+                            with self.metrics.span('order', bot='unico_bot', symbol=symbol):
+                                order = self.exchange.create_market_order(
+                                    symbol=symbol,
+                                    side='buy',
+                                    amount=crypto_amount
+                                )
                             
                             if order:
                                 print(f"🟢 COMPRA {symbol}: {reason} | ${trade_amount:.2f}")
@@ -1249,15 +1288,184 @@ class MultiBotEngine:
                                 open_positions += 1
                                 usdt_balance -= trade_amount
                                 
-                    except Exception as e:
-                        self.logger.warning(f"⚠️ Erro ao analisar {symbol}: {e}")
+                        except Exception as e:
+                            self.logger.warning(f"⚠️ Erro ao comprar {symbol}: {e}")
             else:
                 # Modo observação - sem saldo para novas compras
                 if self.iteration % 20 == 0:  # Log a cada 20 ciclos (~1 min)
                     self.logger.info(f"👁️ MODO OBSERVAÇÃO: Saldo ${usdt_balance:.2f} insuficiente para novos trades (mín: ${amount_per_trade:.2f})")
         
-        # Salva posições
-        self._save_positions()
+        # Salva posições (o fechamento/abertura já pediu flush imediato)
+        self._save_positions(urgent=False)
+    
+    def _close_unico_position(self, close_info: dict) -> bool:
+        """Vende uma posição do UnicoBot (chamar com _trade_lock)"""
+        symbol = close_info['symbol']
+        
+        # Pode ter sido fechada pela via rápida durante a avaliação
+        if symbol not in self.positions:
+            return False
+        
+        try:
+            pos = self.positions[symbol]
+            amount = pos.get('amount', 0)
+            
+            # Executa venda
+            with self.metrics.span('order', bot='unico_bot', symbol=symbol):
+                order = self.exchange.create_market_order(
+                    symbol=symbol,
+                    side='sell',
+                    amount=amount
+                )
+            
+            if order:
+                pnl_emoji = "✅" if close_info['pnl_usd'] >= 0 else "❌"
+                print(f"{pnl_emoji} VENDA {symbol}: {close_info['reason']} | PnL: ${close_info['pnl_usd']:+.2f}")
+                
+                # Registra trade
+                trade = {
+                    'symbol': symbol,
+                    'side': 'sell',
+                    'amount': amount,
+                    'price': close_info['current_price'],
+                    'pnl_pct': close_info['pnl_pct'],
+                    'pnl_usd': close_info['pnl_usd'],
+                    'reason': close_info['reason'],
+                    'bot_type': 'unico_bot'
+                }
+                self._save_bot_trade('unico_bot', trade)
+                
+                # Remove da lista de posições
+                del self.positions[symbol]
+                return True
+            
+        except Exception as e:
+            print(f"❌ Erro ao vender {symbol}: {e}")
+        return False
+    
+    def _fast_exit_reason(self, symbol: str, price: float):
+        """
+        Regras de saída só de preço (thread do stream da via rápida).
+        Retorna o motivo da venda ou None.
+        """
+        pos = self.positions.get(symbol)
+        if not pos:
+            return None
+        
+        entry_price = pos.get('entry_price', price)
+        entry_time = pos.get('time', datetime.now())
+        if isinstance(entry_time, str):
+            entry_time = datetime.fromisoformat(entry_time)
+        
+        if self.unico_bot_mode:
+            should_close, reason = self.unico_bot.should_close_fast(symbol, entry_price, price, entry_time)
+        else:
+            bot = self.coordinator.bots.get(pos.get('bot_type'))
+            if not bot:
+                return None
+            should_close, reason = bot.should_sell_position_fast(
+                symbol, entry_price, price, entry_time,
+                position_size=pos.get('amount', 0) * entry_price
+            )
+        return reason if should_close else None
+    
+    def _fast_exit(self, symbol: str, price: float, reason: str):
+        """Fecha a posição disparada pela via rápida (thread de vendas)"""
+        reason = f"⚡ {reason}"
+        with self._trade_lock, request_wait(self.max_request_wait):
+            pos = self.positions.get(symbol)
+            if not pos:
+                return
+            
+            if self.unico_bot_mode:
+                pnl_pct = ((price - pos['entry_price']) / pos['entry_price']) * 100
+                closed = self._close_unico_position({
+                    'symbol': symbol,
+                    'reason': reason,
+                    'pnl_pct': pnl_pct,
+                    'pnl_usd': pos.get('amount_usd', 0) * (pnl_pct / 100),
+                    'current_price': price
+                })
+                if closed:
+                    self._save_positions()
+            else:
+                self._close_position(symbol, price, reason, pos['bot_type'])
+            
+            open_symbols = list(self.positions)
+        self.exit_lane.update_symbols(open_symbols)
+    
+    def _evaluate_unico_exit(self, item: tuple) -> dict:
+        """
+        Avalia se uma posição do UnicoBot deve ser fechada (executado nos workers).
+        Retorna dados da venda ou None.
+        """
+        symbol, pos, tickers = item
+        try:
+            # Obtém preço atual (snapshot do ciclo)
+            ticker = tickers.get(symbol)
+            if not ticker:
+                return None
+            
+            current_price = ticker.get('last', ticker.get('close', 0))
+            entry_price = pos.get('entry_price', current_price)
+            entry_time = pos.get('time', datetime.now())
+            
+            if isinstance(entry_time, str):
+                entry_time = datetime.fromisoformat(entry_time)
+            
+            # Calcula PnL
+            pnl_pct = ((current_price - entry_price) / entry_price) * 100
+            pnl_usd = pos.get('amount_usd', 0) * (pnl_pct / 100)
+            
+            with self.metrics.span('symbol', bot='unico_bot', symbol=symbol):
+                # Obtém dados para análise (CandleStore - sem REST com cache quente)
+                df = self.candle_store.get_dataframe(symbol, '1m', limit=100)
+                
+                # Verifica se deve vender
+                with self.metrics.span('decision'):
+                    should_close, reason = self.unico_bot.should_close(
+                        symbol=symbol,
+                        entry_price=entry_price,
+                        current_price=current_price,
+                        entry_time=entry_time,
+                        df=df
+                    )
+            
+            if should_close:
+                return {
+                    'symbol': symbol,
+                    'reason': reason,
+                    'pnl_pct': pnl_pct,
+                    'pnl_usd': pnl_usd,
+                    'current_price': current_price
+                }
+                
+        except Exception as e:
+            self.logger.warning(f"⚠️ Erro ao verificar {symbol}: {e}")
+        return None
+    
+    def _analyze_unico_entry(self, symbol: str) -> tuple:
+        """
+        Analisa sinal de compra do UnicoBot (executado nos workers).
+        Retorna (symbol, reason, price) se BUY, senão None.
+        """
+        try:
+            with self.metrics.span('symbol', bot='unico_bot', symbol=symbol):
+                # Obtém dados (CandleStore - sem REST com cache quente)
+                df = self.candle_store.get_dataframe(symbol, '1m', limit=100)
+                if df is None or len(df) < 50:
+                    return None
+                
+                # Analisa (indicadores + decisão no mesmo passo do UnicoBot)
+                with self.metrics.span('decision'):
+                    signal, reason, indicators = self.unico_bot.analyze_symbol(symbol, df)
+            
+            if signal == 'BUY':
+                return symbol, reason, df.iloc[-1]['close']
+                
+        except Exception as e:
+            self.logger.warning(f"⚠️ Erro ao analisar {symbol}: {e}")
+        return None
     
     # ===== MÉTODOS DO AUTO-TUNER =====
     
@@ -1347,49 +1555,140 @@ class MultiBotEngine:
             return self.ai_manager.force_market_scan()
         return {}
     
+    def _map_concurrent(self, fn, items: list) -> list:
+        """
+        Aplica fn a cada item usando o pool de workers (ordem preservada).
+        Sem pool (max_workers = 1) executa em sequência.
+        
+        Os workers herdam o contexto do chamador (request_priority /
+        request_wait), como se rodassem na mesma thread.
+        """
+        if self._executor is None or len(items) <= 1:
+            return [fn(item) for item in items]
+        context = contextvars.copy_context()
+        return list(self._executor.map(lambda item: context.copy().run(fn, item), items))
+    
+    def run_bots_cycle(self, bot_types: list = None, entry_symbols: set = None):
+        """
+        Executa um ciclo de análise para vários bots de uma vez.
+        
+        Todos os símbolos de todos os bots entram no mesmo pool de workers:
+        um símbolo lento não atrasa o stop-loss dos demais.
+        
+        entry_symbols: se informado, só esses símbolos (mais os que têm
+        posição aberta) são analisados - modo event.
+        """
+        if self.batch_exits_enabled:
+            with self.metrics.span('batch_exits'):
+                self._run_batch_exits()
+        
+        tasks = []
+        bots = []
+        for bot_type in (bot_types or list(self.coordinator.bots.keys())):
+            bot = self.coordinator.bots.get(bot_type)
+            if not bot or not bot.enabled:
+                continue
+            bot.stats.status = "running"
+            bots.append(bot)
+            for crypto in bot.portfolio:
+                symbol = crypto['symbol']
+                if entry_symbols is not None and symbol not in entry_symbols and symbol not in self.positions:
+                    continue
+                tasks.append((bot_type, bot, symbol))
+        
+        self._map_concurrent(lambda task: self._process_bot_symbol(*task), tasks)
+        
+        for bot in bots:
+            bot.stats.status = "idle"
+            bot.stats.last_update = datetime.now().isoformat()
+    
+    def _batch_exit_params(self, symbol: str, pos: dict):
+        """Parâmetros de saída da posição para o BatchExitEvaluator"""
+        bot = self.coordinator.bots.get(pos.get('bot_type'))
+        if not bot or not pos.get('entry_price'):
+            return None
+        return {
+            'entry_price': pos['entry_price'],
+            'entry_time': pos.get('time', datetime.now()),
+            'amount': pos.get('amount', 0),
+            'bot_type': pos['bot_type'],
+            **bot.strategy.exit_params(symbol),
+        }
+    
+    def _run_batch_exits(self):
+        """
+        Stop loss, trailing stop e TP dinâmico de TODAS as posições num único
+        passe NumPy (preços do snapshot do ciclo). As saídas com indicadores
+        continuam no should_sell_position de cada símbolo.
+        """
+        with self._trade_lock:
+            positions = dict(self.positions)
+        self.batch_exits.sync(positions, self._batch_exit_params)
+        if not len(self.batch_exits):
+            return
+        
+        # Tendência mais recente vista pelo should_sell de cada bot
+        trends = {}
+        for symbol, bot_type in zip(self.batch_exits.symbols, self.batch_exits.bot_types):
+            trend = self.coordinator.bots[bot_type].strategy.last_trend.get(symbol)
+            if trend:
+                trends[symbol] = trend
+        
+        tickers = self.exchange.get_ticker_snapshot()
+        exits = self.batch_exits.exits(tickers.price, trends=trends)
+        
+        with self._trade_lock:
+            for symbol, price, reason in exits:
+                pos = self.positions.get(symbol)
+                if pos:
+                    self._close_position(symbol, price, reason, pos['bot_type'])
+                    # Como no should_sell: a próxima posição no símbolo começa sem pico
+                    self.coordinator.bots[pos['bot_type']].strategy.clear_peak(symbol)
+    
     def run_bot_cycle(self, bot_type: str):
         """
         Executa um ciclo de análise para um bot específico.
         """
-        bot = self.coordinator.bots.get(bot_type)
-        if not bot or not bot.enabled:
+        self.run_bots_cycle([bot_type])
+    
+    def _process_bot_symbol(self, bot_type: str, bot, symbol: str):
+        """Analisa um símbolo de um bot (executado nos workers)"""
+        try:
+            # Spans internos (fetch, dataframe, order) herdam bot/símbolo
+            with self.metrics.span('symbol', bot=bot_type, symbol=symbol):
+                self._analyze_bot_symbol(bot_type, bot, symbol)
+        except Exception as e:
+            self.logger.error(f"[{bot.name}] Erro em {symbol}: {e}")
+    
+    def _analyze_bot_symbol(self, bot_type: str, bot, symbol: str):
+        # Obtém candles (CandleStore - sem REST com cache quente)
+        df = self.candle_store.get_dataframe(
+            symbol,
+            bot.trading_config.get('timeframe', '1m'),
+            limit=200
+        )
+        
+        if df is None or len(df) == 0:
             return
         
-        bot.stats.status = "running"
+        # Adiciona indicadores usando o método da estratégia
+        with self.metrics.span('indicators'):
+            df = bot.strategy.calculate_indicators(df, symbol)
         
-        for crypto in bot.portfolio:
-            symbol = crypto['symbol']
-            
-            try:
-                # Obtém candles
-                ohlcv = self.exchange.fetch_ohlcv(
-                    symbol=symbol,
-                    timeframe=bot.trading_config.get('timeframe', '1m'),
-                    limit=200
-                )
-                
-                if ohlcv is None or len(ohlcv) == 0:
-                    continue
-                
-                # Converte para DataFrame
-                import pandas as pd
-                df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-                
-                # Adiciona indicadores usando o método da estratégia
-                df = bot.strategy.calculate_indicators(df)
+        current_price = df.iloc[-1]['close']
+        current_rsi = df.iloc[-1].get('rsi', 50)
+        
+        # Decisão e ordens: serializadas (posições compartilhadas)
+        with self._trade_lock:
+            # Verifica se tem posição aberta
+            if symbol in self.positions:
+                pos = self.positions[symbol]
                 
-                current_price = df.iloc[-1]['close']
-                current_rsi = df.iloc[-1].get('rsi', 50)
+                # Calcula o tamanho da posição em USDT
+                position_size = pos.get('amount', 0) * pos.get('entry_price', 0)
                 
-                # Verifica se tem posição aberta
-                if symbol in self.positions:
-                    pos = self.positions[symbol]
-                    
-                    # Calcula o tamanho da posição em USDT
-                    position_size = pos.get('amount', 0) * pos.get('entry_price', 0)
-                    
-                    # Verifica se deve vender
+                # Verifica se deve vender
+                with self.metrics.span('decision'):
                     should_sell, reason = bot.should_sell_position(
                         symbol=symbol,
                         entry_price=pos['entry_price'],
@@ -1398,28 +1697,23 @@ class MultiBotEngine:
                         position_time=pos['time'],
                         position_size=position_size
                     )
-                    
-                    if should_sell:
-                        self._close_position(symbol, current_price, reason, bot_type)
-                else:
-                    # ===== VERIFICA SUPER OPORTUNIDADE =====
-                    if self.check_super_opportunity(symbol, current_rsi):
-                        self._open_super_opportunity(symbol, current_price, current_rsi, bot_type, bot)
-                    
-                    # ===== VERIFICA SINAL NORMAL =====
-                    elif len(self.positions) < self._get_max_total_positions():
-                        if bot.stats.open_positions < bot.stats.max_positions:
-                            
-                            signal, reason, indicators = bot.analyze_symbol(symbol, df)
-                            
-                            if signal == 'BUY':
-                                self._open_position(symbol, current_price, reason, bot_type, bot)
                 
-            except Exception as e:
-                self.logger.error(f"[{bot.name}] Erro em {symbol}: {e}")
-        
-        bot.stats.status = "idle"
-        bot.stats.last_update = datetime.now().isoformat()
+                if should_sell:
+                    self._close_position(symbol, current_price, reason, bot_type)
+            else:
+                # ===== VERIFICA SUPER OPORTUNIDADE =====
+                if self.check_super_opportunity(symbol, current_rsi):
+                    self._open_super_opportunity(symbol, current_price, current_rsi, bot_type, bot)
+                
+                # ===== VERIFICA SINAL NORMAL =====
+                elif len(self.positions) < self._get_max_total_positions():
+                    if bot.stats.open_positions < bot.stats.max_positions:
+                        
+                        with self.metrics.span('decision'):
+                            signal, reason, indicators = bot.analyze_symbol(symbol, df)
+                        
+                        if signal == 'BUY':
+                            self._open_position(symbol, current_price, reason, bot_type, bot)
     
     def _get_max_total_positions(self) -> int:
         """Retorna número máximo de posições total (todos os bots)"""
@@ -1455,11 +1749,12 @@ class MultiBotEngine:
             amount_crypto = total_amount / price
             
             # Executa ordem
-            order = self.exchange.create_market_order(
-                symbol=symbol,
-                side='buy',
-                amount=amount_crypto
-            )
+            with self.metrics.span('order', bot=bot_type, symbol=symbol):
+                order = self.exchange.create_market_order(
+                    symbol=symbol,
+                    side='buy',
+                    amount=amount_crypto
+                )
             
             if order:
                 # Registra posição
@@ -1524,11 +1819,12 @@ class MultiBotEngine:
             amount_crypto = amount_usd / price
             
             # Executa ordem
-            order = self.exchange.create_market_order(
-                symbol=symbol,
-                side='buy',
-                amount=amount_crypto
-            )
+            with self.metrics.span('order', bot=bot_type, symbol=symbol):
+                order = self.exchange.create_market_order(
+                    symbol=symbol,
+                    side='buy',
+                    amount=amount_crypto
+                )
             
             if order:
                 # Registra posição
@@ -1564,11 +1860,12 @@ class MultiBotEngine:
         
         try:
             # Executa ordem de venda
-            order = self.exchange.create_market_order(
-                symbol=symbol,
-                side='sell',
-                amount=pos['amount']
-            )
+            with self.metrics.span('order', bot=pos['bot_type'], symbol=symbol):
+                order = self.exchange.create_market_order(
+                    symbol=symbol,
+                    side='sell',
+                    amount=pos['amount']
+                )
             
             if order:
                 # Calcula PnL
@@ -1642,11 +1939,15 @@ class MultiBotEngine:
             print(f"\n🤖 UNICO BOT:")
             print(f"   Posições abertas: {len(self.positions)}/{self.unico_bot.trading_config.get('max_positions', 15)}")
             
+            # Preços de todas as posições numa única leitura
+            tickers = self.exchange.get_ticker_snapshot()
+            
             # Calcula PnL total das posições
+            positions = self._positions_snapshot()
             total_pnl = 0
-            for symbol, pos in self.positions.items():
+            for symbol, pos in positions.items():
                 try:
-                    ticker = self.exchange.fetch_ticker(symbol)
+                    ticker = tickers.get(symbol)
                     if ticker:
                         current_price = ticker.get('last', ticker.get('close', 0))
                         entry_price = pos.get('entry_price', current_price)
@@ -1659,11 +1960,11 @@ class MultiBotEngine:
             print(f"   PnL Aberto: ${total_pnl:+.2f}")
             
             # Lista posições
-            if self.positions:
+            if positions:
                 print(f"\n   📈 Posições:")
-                for symbol, pos in list(self.positions.items())[:10]:  # Mostra até 10
+                for symbol, pos in list(positions.items())[:10]:  # Mostra até 10
                     try:
-                        ticker = self.exchange.fetch_ticker(symbol)
+                        ticker = tickers.get(symbol)
                         if ticker:
                             current_price = ticker.get('last', ticker.get('close', 0))
                             entry_price = pos.get('entry_price', current_price)
@@ -1756,50 +2057,52 @@ class MultiBotEngine:
             print("   Bot continuará monitorando mercado e gerenciando posições existentes")
             print("   Transfira USDT para a conta para iniciar trading")
         
+        # ===== FASE 2.5: MARKET DATA (CANDLE STORE) =====
+        print("\n🕯️ FASE 2.5: INICIANDO CANDLE STORE")
+        self._start_market_data()
+        
         # ===== FASE 3: LOOP PRINCIPAL =====
         print("\n" + "="*70)
         print("🟢 FASE 3: INICIANDO OPERAÇÕES")
         print("="*70)
         
         try:
+            event_mode = self.engine_mode == 'event' and self.candle_store.streaming
+            if self.engine_mode == 'event' and not event_mode:
+                print("   ⚠️ Modo event requer streaming de klines - usando polling")
+            
+            self.pacer.period = interval
+            self.pacer.start()
+            
             while self.running:
-                self.iteration += 1
-                print(f"\n🔄 ITERAÇÃO {self.iteration} - Iniciando...")
-                
-                # ===== EXECUTA NO MODO APROPRIADO =====
-                if self.unico_bot_mode:
-                    # Modo UnicoBot - processa todas as cryptos
-                    print("🤖 Executando ciclo UnicoBot...")
-                    self._run_unico_bot_cycle()
-                    print("✅ Ciclo UnicoBot concluído")
-                else:
-                    # Modo MultiBots - processa cada bot separadamente
-                    for bot_type in self.coordinator.bots.keys():
-                        if not self.running:
-                            break
-                        self.run_bot_cycle(bot_type)
+                if not event_mode:
+                    # Período fixo: dorme só o que falta até o deadline
+                    cycle_start = time.monotonic()
+                    self._run_cycle()
+                    wait = self.pacer.cycle_done(time.monotonic() - cycle_start)
                     
-                    # Atualiza posições abertas nos stats
-                    for bot in self.coordinator.bots.values():
-                        bot.stats.open_positions = sum(
-                            1 for pos in self.positions.values() 
-                            if pos['bot_type'] == bot.bot_type
-                        )
-                
-                print(f"💾 Salvando estado...")
-                # Salva estado
-                self.coordinator.save_state()
-                
-                # Salva dados para o dashboard (saldos, meta diária)
-                self._save_dashboard_data()
-                self._save_dashboard_data()
-                
-                # Imprime resumo
-                self.print_summary()
+                    if wait > 0:
+                        print(f"\n⏳ Aguardando {wait:.1f} segundos...\n")
+                        time.sleep(wait)
+                    else:
+                        print(f"\n⚠️ Ciclo estourou o período de {interval}s - próximo ciclo já\n")
+                    continue
                 
-                # Aguarda
-                print(f"\n⏳ Aguardando {interval} segundos...\n")
-                time.sleep(interval)
+                # Modo event: acorda no fechamento de candle; sem evento dentro
+                # do intervalo, roda só as saídas (heartbeat). Stream parado há
+                # mais de stale_after_seconds -> ciclo completo, como no polling.
+                closed = self._wait_for_closed_symbols(interval)
+                cycle_start = time.monotonic()
+                if closed:
+                    self.event_stats['event_cycles'] += 1
+                    self._run_cycle(entry_symbols=closed)
+                elif time.time() - self._last_close_event > self.candle_store.stale_after_seconds:
+                    self.event_stats['full_cycles'] += 1
+                    self._run_cycle()
+                else:
+                    self.event_stats['heartbeat_cycles'] += 1
+                    self._run_cycle(entry_symbols=set())
+                self.pacer.observe(time.monotonic() - cycle_start)
                 
         except KeyboardInterrupt:
             print("\n\n⚠️ Parando bots... (KeyboardInterrupt)")
@@ -1808,10 +2111,184 @@ class MultiBotEngine:
             print("⚠️ Parando bots devido a erro...")
         finally:
             self.running = False
+            self.candle_store.stop()
+            self.exchange.ticker_feed.stop_stream()
+            self.exit_lane.stop()
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+            stop_market_recorder()
+            self.trade_journal.close()
             self.coordinator.stats.status = "stopped"
             self.coordinator.save_state()
+            stop_write_behind()
             print("✅ Sistema Multi-Bot finalizado")
     
+    def _run_cycle(self, entry_symbols: set = None):
+        """
+        Uma iteração do loop principal: análise, estado, dashboard e resumo.
+        
+        entry_symbols: None = todos os símbolos; conjunto = só esses para
+        entrada (as posições abertas são sempre avaliadas).
+        """
+        self.iteration += 1
+        if entry_symbols is None:
+            print(f"\n🔄 ITERAÇÃO {self.iteration} - Iniciando...")
+        else:
+            print(f"\n🔄 ITERAÇÃO {self.iteration} - candles fechados: {len(entry_symbols)} símbolos")
+        cycle_start = time.perf_counter()
+        
+        # Corte de carga nível 2: entrada só nos símbolos de maior peso
+        shed_level = self.pacer.level
+        if shed_level >= CyclePacer.SHED_LOW_WEIGHT:
+            entry_symbols = self._shed_low_weight_symbols(entry_symbols)
+        
+        # ===== EXECUTA NO MODO APROPRIADO =====
+        # Chamadas sem orçamento não seguram o ciclo além de max_request_wait
+        with request_wait(self.max_request_wait):
+            if self.unico_bot_mode:
+                # Modo UnicoBot - processa todas as cryptos
+                print("🤖 Executando ciclo UnicoBot...")
+                self._run_unico_bot_cycle(entry_symbols)
+                print("✅ Ciclo UnicoBot concluído")
+            else:
+                # Modo MultiBots - todos os símbolos de todos os bots no pool
+                self.run_bots_cycle(entry_symbols=entry_symbols)
+                
+                # Atualiza posições abertas nos stats
+                positions = self._positions_snapshot()
+                for bot in self.coordinator.bots.values():
+                    bot.stats.open_positions = sum(
+                        1 for pos in positions.values() 
+                        if pos['bot_type'] == bot.bot_type
+                    )
+        
+        # Via rápida acompanha as posições abertas/fechadas no ciclo
+        if self.exit_lane.running:
+            with self._trade_lock:
+                open_symbols = list(self.positions)
+            self.exit_lane.update_symbols(open_symbols)
+        
+        # Watchlist: a primeira coisa cortada sob pressão (nível 1+)
+        if shed_level >= CyclePacer.SHED_WATCHLIST:
+            self.pacer.stats['watchlist_skips'] += 1
+        else:
+            self.scan_watchlist()
+        
+        self.last_cycle_ms = (time.perf_counter() - cycle_start) * 1000
+        self.metrics.record_latency('analysis', self.last_cycle_ms)
+        print(f"⏱️ Ciclo de análise: {self.last_cycle_ms:.0f}ms ({self.max_workers} workers)")
+        
+        print(f"💾 Salvando estado...")
+        # Salva estado
+        self.coordinator.stats.pacing = self.pacer.get_status()
+        self.coordinator.save_state()
+        
+        # Salva dados para o dashboard (saldos, meta diária)
+        self._save_dashboard_data()
+        
+        # Latências p50/p95/p99 para o backend (a cada 20 ciclos)
+        self.metrics.record_latency('cycle', (time.perf_counter() - cycle_start) * 1000)
+        if self.iteration % 20 == 0:
+            self.metrics.save_metrics(str(self.data_dir / "metrics.json"))
+        
+        # Imprime resumo
+        self.print_summary()
+    
+    def _shed_low_weight_symbols(self, entry_symbols: set = None) -> set:
+        """
+        Corte de carga: mantém para entrada só a fração de maior peso de cada
+        carteira. Posições abertas continuam no ciclo (não passam por aqui).
+        """
+        if self.unico_bot_mode:
+            portfolios = [self.unico_bot.portfolio]
+        else:
+            portfolios = [bot.portfolio for bot in self.coordinator.bots.values() if bot.enabled]
+        
+        candidates = set()
+        keep = set()
+        for portfolio in portfolios:
+            ranked = sorted(portfolio, key=lambda crypto: crypto.get('weight', 0), reverse=True)
+            n_keep = max(1, math.ceil(len(ranked) * (1 - self.pacer.low_weight_fraction)))
+            keep.update(crypto['symbol'] for crypto in ranked[:n_keep])
+            candidates.update(crypto['symbol'] for crypto in ranked)
+        
+        if entry_symbols is not None:
+            candidates &= set(entry_symbols)
+        kept = candidates & keep
+        self.pacer.stats['shed_symbols'] += len(candidates) - len(kept)
+        return kept
+    
+    def _on_candle_closed(self, symbol: str, timeframe: str):
+        """
+        Listener do CandleStore (thread do WebSocket): enfileira o símbolo
+        se o candle é do timeframe de entrada de algum bot que o opera
+        """
+        if symbol not in self._entry_timeframes.get(timeframe, ()):
+            return
+        with self._closed_cond:
+            self._closed_symbols.add(symbol)
+            self.event_stats['events'] += 1
+            self._last_close_event = time.time()
+            self._closed_cond.notify()
+    
+    def _wait_for_closed_symbols(self, timeout: float) -> set:
+        """
+        Espera até `timeout` segundos por candles fechados.
+        Retorna os símbolos pendentes (vazio se nenhum fechou).
+        """
+        with self._closed_cond:
+            if not self._closed_symbols:
+                self._closed_cond.wait(timeout)
+            if not self._closed_symbols:
+                return set()
+        
+        # Os fechamentos do mesmo minuto chegam em rajada: agrupa num só ciclo
+        if self.event_coalesce_seconds > 0:
+            time.sleep(self.event_coalesce_seconds)
+        with self._closed_cond:
+            symbols, self._closed_symbols = self._closed_symbols, set()
+        return symbols
+    
+    def _start_market_data(self):
+        """
+        Semeia o CandleStore via REST e inicia os streams de kline.
+        Agrupa os símbolos por timeframe (um WebSocket por timeframe).
+        """
+        symbols_by_timeframe = {}
+        
+        if self.unico_bot_mode:
+            symbols_by_timeframe['1m'] = set(self.unico_bot.get_symbols())
+        else:
+            for bot in self.coordinator.bots.values():
+                if not bot.enabled:
+                    continue
+                timeframe = bot.trading_config.get('timeframe', '1m')
+                symbols_by_timeframe.setdefault(timeframe, set()).update(bot.get_symbols())
+        self._entry_timeframes = {tf: set(symbols) for tf, symbols in symbols_by_timeframe.items()}
+        
+        # Posições abertas também precisam de candles (análise de saída)
+        symbols_by_timeframe.setdefault('1m', set()).update(self.positions.keys())
+        
+        for timeframe, symbols in symbols_by_timeframe.items():
+            try:
+                self.candle_store.start(sorted(symbols), timeframe=timeframe, seed_limit=200)
+                print(f"   {timeframe}: {len(symbols)} símbolos")
+            except Exception as e:
+                self.logger.warning(f"⚠️ Erro ao iniciar CandleStore ({timeframe}): {e} - usando REST")
+        
+        # Preços de todos os pares (!miniTicker@arr) para os snapshots do ciclo
+        if self.candle_store.streaming and self.exchange.ticker_feed.start_stream():
+            print("   Tickers: !miniTicker@arr")
+        
+        # Via rápida de saída: preço a cada tick das posições abertas
+        if self.exit_lane_enabled and self.candle_store.streaming:
+            if self.exit_lane.start(list(self.positions)):
+                print(f"   Saídas: via rápida ({self.exit_lane.stream})")
+        
+        if self.engine_mode == 'event' and self.candle_store.streaming:
+            self.candle_store.add_close_listener(self._on_candle_closed)
+            print("   Ciclo: por fechamento de candle (modo event)")
+    
     def stop(self):
         """Para a execução"""
         self.running = False
@@ -24,6 +24,7 @@ from .adaptive_engine import AdaptiveEngine
 from .market_scanner import MarketScanner
 from .auto_config import AutoConfig
 from .ai_persistence import AIPersistence, get_ai_persistence
+from src.core.trade_journal import read_trades
 
 logger = logging.getLogger('AIManager')
 
@@ -296,8 +297,11 @@ class AIManager:
     
     def _load_all_trades(self) -> List[Dict]:
         """Carrega todos os trades do histórico"""
-        trades = []
+        trades = read_trades()
+        if trades:
+            return trades
         
+        # Sem journal ainda: arquivos JSON antigos
         history_files = [
             "data/multibot_history.json",
             "data/history/bot_estavel_trades.json",
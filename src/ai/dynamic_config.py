@@ -22,6 +22,9 @@ import json
 from pathlib import Path
 import numpy as np
 
+from src.core.utils import call_exchange
+from src.core.request_scheduler import RequestPriority, request_priority
+
 logger = logging.getLogger('DynamicConfig')
 
 
@@ -127,8 +130,11 @@ class DynamicConfigManager:
                 symbol in self.market_cache):
                 return self.market_cache[symbol]
             
-            # Busca dados frescos
-            ohlcv = self.exchange.fetch_ohlcv(symbol, '1h', limit=100)
+            # Busca dados frescos (sem bloquear o event loop)
+            with request_priority(RequestPriority.ANALYTICS):
+                ohlcv = await call_exchange(
+                    self.exchange, 'fetch_ohlcv', symbol, '1h', limit=100
+                )
             if ohlcv:
                 self.market_cache[symbol] = ohlcv
                 self.last_cache_time = now
@@ -28,6 +28,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Tuple
 
+from src.core.pnl_aggregates import get_pnl_aggregates
+
 
 class GoalMonitor:
     """Monitor de metas mensais e diárias - META 10%"""
@@ -111,10 +113,20 @@ class GoalMonitor:
         
         self._save_history()
     
+    def _period_pnl(self, period: str, key: str) -> float:
+        """
+        PnL do dia/mês: buckets dos agregados de PnL (trades reais do
+        engine) ou, sem trades lá, o histórico registrado aqui
+        """
+        aggregates = get_pnl_aggregates()
+        if not aggregates.is_empty():
+            return aggregates.daily_pnl(key) if period == 'daily' else aggregates.monthly_pnl(key)
+        return self.history[period].get(key, 0)
+    
     def get_daily_progress(self) -> Dict:
         """Retorna progresso diário"""
         today = datetime.now().strftime('%Y-%m-%d')
-        daily_pnl = self.history['daily'].get(today, 0)
+        daily_pnl = self._period_pnl('daily', today)
         
         result = {
             'date': today,
@@ -142,7 +154,7 @@ class GoalMonitor:
     def get_monthly_progress(self) -> Dict:
         """Retorna progresso mensal"""
         month = datetime.now().strftime('%Y-%m')
-        monthly_pnl = self.history['monthly'].get(month, 0)
+        monthly_pnl = self._period_pnl('monthly', month)
         
         # Dias passados no mês
         day_of_month = datetime.now().day
@@ -14,12 +14,16 @@ Fontes de dados:
 Autor: Sistema R7 Trading Bot API
 """
 
+import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, Optional, List, Tuple
 import numpy as np
 from dataclasses import dataclass
 
+from src.core.utils import call_exchange
+from src.core.request_scheduler import RequestPriority, request_priority
+
 logger = logging.getLogger('MarketAnalyzer')
 
 
@@ -68,14 +72,14 @@ class MarketAnalyzer:
         Retorna estrutura com todas as métricas.
         """
         try:
-            # Busca dados do BTC
-            btc_data = await self._fetch_ohlcv('BTCUSDT', '1h', 100)
+            # Busca dados do BTC (1h) e de 1 minuto (volatilidade recente) em paralelo
+            btc_data, btc_1m = await asyncio.gather(
+                self._fetch_ohlcv('BTCUSDT', '1h', 100),
+                self._fetch_ohlcv('BTCUSDT', '1m', 60),
+            )
             if not btc_data:
                 return self._get_default_conditions()
             
-            # Busca dados de 1 minuto para volatilidade recente
-            btc_1m = await self._fetch_ohlcv('BTCUSDT', '1m', 60)
-            
             # Calcula métricas
             btc_price = btc_data[-1][4]  # Close
             btc_change_24h = self._calc_change(btc_data, 24)
@@ -178,7 +182,11 @@ class MarketAnalyzer:
             return self.cache[cache_key]
         
         try:
-            data = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+            # Não bloqueia o event loop (chamada numa thread)
+            with request_priority(RequestPriority.ANALYTICS):
+                data = await call_exchange(
+                    self.exchange, 'fetch_ohlcv', symbol, timeframe, limit=limit
+                )
             if data:
                 self.cache[cache_key] = data
                 self.last_cache_time = now
@@ -198,7 +206,8 @@ class MarketAnalyzer:
             return self.cache[cache_key]
         
         try:
-            data = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+            with request_priority(RequestPriority.ANALYTICS):
+                data = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
             if data:
                 self.cache[cache_key] = data
                 self.last_cache_time = now
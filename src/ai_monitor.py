@@ -14,6 +14,10 @@ e ajusta seus parâmetros dinamicamente baseado em:
 
 Este módulo é inicializado automaticamente ao startar o sistema.
 
+Reescrever o bots_config.yaml com os ajustes só acontece com
+global.ai_monitor.auto_adjust_config: true; desligado (padrão), os
+ajustes sugeridos vão só para o histórico (applied: false).
+
 ============================================================
 """
 
@@ -26,6 +30,8 @@ from pathlib import Path
 from typing import Dict, List, Optional
 import yaml
 
+from src.core.pnl_aggregates import get_pnl_aggregates
+
 
 class AdaptiveAIMonitor:
     """
@@ -55,6 +61,9 @@ class AdaptiveAIMonitor:
             'win_rate_low': 0.40,       # < 40% win rate = precisa ajustar
         }
         
+        # Nome do bot no config -> bot_type gravado nos trades
+        self.trade_bot_types = {'bot_unico': 'unico_bot'}
+        
         # Cache de performance
         self.bot_performance = {
             'bot_estavel': {'wins': 0, 'losses': 0, 'pnl': 0, 'consecutive_losses': 0},
@@ -106,32 +115,24 @@ class AdaptiveAIMonitor:
     def _update_bot_performance(self):
         """Atualiza métricas de performance de todos os bots"""
         try:
-            # Carrega histórico de trades
-            trades_file = Path("data/all_trades_history.json")
-            if not trades_file.exists():
-                return
-            
-            with open(trades_file, 'r') as f:
-                trades = json.load(f)
+            # Últimos trades de cada bot vêm dos agregados de PnL (sem reler histórico)
+            aggregates = get_pnl_aggregates()
             
-            # Analisa últimos trades de cada bot
             for bot_type in self.bot_performance.keys():
-                bot_trades = [t for t in trades if t.get('bot_type') == bot_type]
+                # Últimos 20 trades
+                recent_pnls = aggregates.recent_pnls(self.trade_bot_types.get(bot_type, bot_type))[-20:]
                 
-                if not bot_trades:
+                if not recent_pnls:
                     continue
                 
-                # Últimos 20 trades
-                recent_trades = bot_trades[-20:]
-                
-                wins = sum(1 for t in recent_trades if t.get('pnl_usd', 0) > 0)
-                losses = sum(1 for t in recent_trades if t.get('pnl_usd', 0) <= 0)
-                total_pnl = sum(t.get('pnl_usd', 0) for t in recent_trades)
+                wins = sum(1 for pnl in recent_pnls if pnl > 0)
+                losses = len(recent_pnls) - wins
+                total_pnl = sum(recent_pnls)
                 
                 # Perdas consecutivas
                 consecutive_losses = 0
-                for t in reversed(recent_trades):
-                    if t.get('pnl_usd', 0) <= 0:
+                for pnl in reversed(recent_pnls):
+                    if pnl <= 0:
                         consecutive_losses += 1
                     else:
                         break
@@ -141,7 +142,7 @@ class AdaptiveAIMonitor:
                     'losses': losses,
                     'pnl': total_pnl,
                     'consecutive_losses': consecutive_losses,
-                    'win_rate': wins / len(recent_trades) if recent_trades else 0,
+                    'win_rate': wins / len(recent_pnls),
                     'last_updated': datetime.now().isoformat()
                 }
         
@@ -159,9 +160,12 @@ class AdaptiveAIMonitor:
             with open(self.config_path, 'r') as f:
                 config = yaml.safe_load(f)
             
-            # Carrega saldo atual
+            # Sem auto_adjust_config: só sugere (histórico), não reescreve o YAML
+            auto_adjust = config.get('global', {}).get('ai_monitor', {}).get('auto_adjust_config', False)
+            
+            # Carrega saldo atual (sem snapshot do dashboard: regra de saldo não vale)
             balances = self._load_balances()
-            usdt_balance = balances.get('usdt_balance', 0)
+            usdt_balance = balances.get('usdt_balance')
             
             adjustments_made = []
             
@@ -174,7 +178,7 @@ class AdaptiveAIMonitor:
                 bot_config = config[bot_type]
                 
                 # === AJUSTE 1: Saldo baixo ===
-                if usdt_balance < self.thresholds['low_balance']:
+                if usdt_balance is not None and usdt_balance < self.thresholds['low_balance']:
                     # Aumenta take profit (vender mais cedo)
                     current_tp = bot_config.get('risk', {}).get('take_profit', 1.0)
                     new_tp = max(0.3, current_tp - 0.2)
@@ -196,7 +200,7 @@ class AdaptiveAIMonitor:
                     current_sl = bot_config.get('risk', {}).get('stop_loss', -1.0)
                     new_sl = min(-0.3, current_sl + 0.3)  # Stop loss mais apertado
                     
-                    bot_config['risk']['stop_loss'] = new_sl
+                    bot_config.setdefault('risk', {})['stop_loss'] = new_sl
                     adjustments_made.append({
                         'bot': bot_type,
                         'reason': 'consecutive_losses',
@@ -223,13 +227,17 @@ class AdaptiveAIMonitor:
             
             # Salva configuração ajustada
             if adjustments_made:
-                with open(self.config_path, 'w') as f:
-                    yaml.dump(config, f, default_flow_style=False, allow_unicode=True)
+                if auto_adjust:
+                    with open(self.config_path, 'w') as f:
+                        yaml.dump(config, f, default_flow_style=False, allow_unicode=True)
                 
+                for adj in adjustments_made:
+                    adj['applied'] = auto_adjust
                 self.adjustments_history.extend(adjustments_made)
                 
                 for adj in adjustments_made:
-                    self.logger.info(f"🎛️ Ajuste: {adj['bot']} | {adj['reason']} | {adj['adjustment']}")
+                    prefix = "🎛️ Ajuste" if auto_adjust else "💡 Sugestão"
+                    self.logger.info(f"{prefix}: {adj['bot']} | {adj['reason']} | {adj['adjustment']}")
         
         except Exception as e:
             self.logger.error(f"Erro ao ajustar bots: {e}")
@@ -244,7 +252,7 @@ class AdaptiveAIMonitor:
         except Exception as e:
             self.logger.error(f"Erro ao carregar balances: {e}")
         
-        return {'usdt_balance': 0, 'total_balance': 0}
+        return {}
     
     def _save_adjustments_history(self):
         """Salva histórico de ajustes"""
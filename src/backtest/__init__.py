@@ -1,2 +1,10 @@
 """Módulo de Backtesting"""
-# Implementar futuramente com backtrader ou Zipline
+from .sim_exchange import (
+    SimulatedExchange, SyntheticCandles, RecordedCandles, create_simulated_exchange
+)
+from .sim_server import SimulatedMarketServer
+
+__all__ = [
+    'SimulatedExchange', 'SyntheticCandles', 'RecordedCandles',
+    'create_simulated_exchange', 'SimulatedMarketServer',
+]
@@ -0,0 +1,94 @@
+"""
+⏪ Market Replay - Reproduz gravações do MarketRecorder
+======================================================
+
+Alimenta o MESMO código do bot com o que foi gravado:
+- Mensagens WS -> BinanceWebSocket._handle_message (parser, cache, callbacks)
+- Respostas REST -> ReplayExchange, um ExchangeClient cujo _request devolve
+  as respostas gravadas, na ordem, por (método, símbolo, timeframe)
+
+Mesma entrada, mesma ordem -> mesmas decisões: regressões de performance
+e bugs de decisão reproduzidos exatamente.
+
+    replayer = MarketReplayer('data/recordings')
+    exchange = replayer.replay_exchange()
+    await replayer.replay_ws(ws)
+"""
+
+import asyncio
+import gzip
+import json
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+import ccxt
+
+from src.core.exchange_client import ExchangeClient
+from src.core.market_recorder import SEGMENT_GLOB, rest_key
+
+
+class MarketReplayer:
+    """Lê os segmentos gravados (um arquivo, uma lista ou um diretório)"""
+
+    def __init__(self, source: Union[str, Path, List[Union[str, Path]]]):
+        if isinstance(source, (str, Path)) and Path(source).is_dir():
+            self.paths = sorted(Path(source).glob(SEGMENT_GLOB))
+        elif isinstance(source, (str, Path)):
+            self.paths = [Path(source)]
+        else:
+            self.paths = [Path(p) for p in source]
+
+    def records(self, kind: Optional[str] = None) -> Iterator[Tuple[float, str, object]]:
+        """(recv_ts, 'ws'|'rest', payload) na ordem de gravação"""
+        for path in self.paths:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    recv_ts, record_kind, payload = line.rstrip('\n').split('\t', 2)
+                    if kind is not None and record_kind != kind:
+                        continue
+                    if record_kind == 'rest':
+                        payload = json.loads(payload)
+                    yield float(recv_ts), record_kind, payload
+
+    async def replay_ws(self, ws, speed: Optional[float] = None) -> int:
+        """
+        Reentrega as mensagens ao BinanceWebSocket.
+        speed=None -> o mais rápido possível; speed=1 -> ritmo original.
+        """
+        count = 0
+        previous = None
+        for recv_ts, _, message in self.records('ws'):
+            if speed and previous is not None and recv_ts > previous:
+                await asyncio.sleep((recv_ts - previous) / speed)
+            previous = recv_ts
+            await ws._handle_message(message)
+            count += 1
+        return count
+
+    def replay_exchange(self, **kwargs) -> 'ReplayExchange':
+        """ExchangeClient alimentado pelas respostas REST gravadas"""
+        return ReplayExchange(self, **kwargs)
+
+
+class ReplayExchange(ExchangeClient):
+    """
+    ExchangeClient offline: todo o tratamento do cliente (normalização,
+    ajustes, cache OHLCV) roda igual, só a chamada ao ccxt é trocada pela
+    próxima resposta gravada.
+    """
+
+    def __init__(self, replayer: MarketReplayer, **kwargs):
+        super().__init__('binance', '', '', **kwargs)
+        self._responses: Dict[Tuple, Deque] = defaultdict(deque)
+        for _, _, (method, args, result) in replayer.records('rest'):
+            self._responses[rest_key(method, args)].append(result)
+        self.replay_stats = {'served': 0, 'missing': 0}
+
+    def _request(self, method: str, *args, priority=None, weight=None, **kwargs):
+        responses = self._responses.get(rest_key(method, args))
+        if not responses:
+            self.replay_stats['missing'] += 1
+            raise ccxt.ExchangeError(f"Replay: sem resposta gravada para {method} {args[:2]}")
+        self.replay_stats['served'] += 1
+        return responses.popleft()
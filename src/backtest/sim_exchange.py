@@ -0,0 +1,601 @@
+"""
+🧪 Simulated Exchange - Exchange local para benchmark e regressão
+================================================================
+
+Mesma interface do ExchangeClient (fetch_ticker, fetch_ohlcv, fetch_balance,
+create_market_order, create_limit_order, cancel_order, fetch_order_status,
+fetch_open_orders, ...) sobre candles de 1m reproduzidos localmente:
+
+- Relógio simulado: avança `speed` vezes mais rápido que o real
+  (speed=100 -> 1 minuto de mercado a cada 0,6s)
+- Fonte dos candles: sintética (passeio aleatório determinístico por
+  símbolo) ou gravada (CandleWarehouse.read_range)
+- Preço dentro do minuto interpolado entre open e close do candle
+- Latência injetada por chamada (lognormal: mediana + cauda longa)
+- Orçamento de peso igual ao da Binance (RequestScheduler)
+- Ordens market executadas no preço simulado (+ slippage e taxa);
+  ordens limit executadas quando o preço cruza
+
+Uso (motor real, offline, 100x):
+    exchange = SimulatedExchange(SyntheticCandles(seed=42), speed=100)
+    server = exchange.start_ws_server()   # BinanceWebSocket passa a usar o local
+"""
+
+import hashlib
+import itertools
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.core.api_call_stats import ApiCallStats
+from src.core.candle_warehouse import CANDLE_DTYPE, get_candle_warehouse, timeframe_ms
+from src.core.request_scheduler import (
+    RequestDropped, RequestPriority, RequestScheduler, current_priority
+)
+from src.core.ticker_snapshot import TickerFeed, TickerSnapshot
+
+logger = logging.getLogger(__name__)
+
+MINUTE_MS = 60_000
+DAY_MS = 86_400_000
+
+
+def _key(symbol: str) -> str:
+    """Normaliza símbolo (BTC/USDT -> BTCUSDT)"""
+    return symbol.upper().replace('/', '')
+
+
+def _ccxt_symbol(symbol: str) -> str:
+    """BTCUSDT -> BTC/USDT"""
+    symbol = _key(symbol)
+    if symbol.endswith('USDT') and len(symbol) > 4:
+        return f"{symbol[:-4]}/USDT"
+    return symbol
+
+
+# ===== FONTES DE CANDLES =====
+
+class SyntheticCandles:
+    """
+    Candles de 1m sintéticos: passeio aleatório geométrico, determinístico
+    por (seed, símbolo) - o mesmo seed gera sempre o mesmo mercado.
+    """
+
+    def __init__(self, start_ms: Optional[int] = None, days: float = 5.0, seed: int = 42,
+                 volatility: float = 0.0015):
+        now = int(time.time() * 1000)
+        self.start_ms = (start_ms if start_ms is not None else now - int(days * DAY_MS))
+        self.start_ms -= self.start_ms % MINUTE_MS
+        self.end_ms = self.start_ms + int(days * DAY_MS)
+        self.seed = seed
+        self.volatility = volatility
+
+    def __call__(self, symbol: str) -> np.ndarray:
+        digest = hashlib.sha256(f"{self.seed}:{_key(symbol)}".encode()).digest()
+        rng = np.random.default_rng(int.from_bytes(digest[:8], 'little'))
+
+        n = (self.end_ms - self.start_ms) // MINUTE_MS
+        base = 10 ** rng.uniform(-1, 4)   # preço inicial entre 0.1 e 10000
+        returns = rng.normal(0, self.volatility, n)
+        close = base * np.exp(np.cumsum(returns))
+        open_ = np.concatenate([[base], close[:-1]])
+        wick = np.abs(rng.normal(0, self.volatility / 2, (2, n)))
+
+        candles = np.empty(n, dtype=CANDLE_DTYPE)
+        candles['timestamp'] = self.start_ms + np.arange(n, dtype=np.int64) * MINUTE_MS
+        candles['open'] = open_
+        candles['close'] = close
+        candles['high'] = np.maximum(open_, close) * (1 + wick[0])
+        candles['low'] = np.minimum(open_, close) * (1 - wick[1])
+        candles['volume'] = rng.lognormal(3, 1, n)
+        return candles
+
+
+class RecordedCandles:
+    """Candles de 1m gravados no CandleWarehouse (views, sem cópia)"""
+
+    def __init__(self, start, end=None, warehouse=None):
+        self.warehouse = warehouse or get_candle_warehouse()
+        self.start = start
+        self.end = end
+
+    def __call__(self, symbol: str) -> np.ndarray:
+        return self.warehouse.read_range(symbol, self.start, self.end, timeframe='1m')
+
+
+# ===== RELÓGIO =====
+
+class SimClock:
+    """Tempo simulado: start_ms + (tempo real decorrido) * speed"""
+
+    def __init__(self, start_ms: int, speed: float = 100.0, end_ms: Optional[int] = None):
+        self.start_ms = start_ms
+        self.speed = speed
+        self.end_ms = end_ms
+        self._real_start = time.monotonic()
+
+    def now_ms(self) -> int:
+        now = self.start_ms + int((time.monotonic() - self._real_start) * 1000 * self.speed)
+        return min(now, self.end_ms) if self.end_ms is not None else now
+
+
+# ===== EXCHANGE =====
+
+class SimulatedExchange:
+    """Backend drop-in do ExchangeClient, sem rede"""
+
+    # Mesmos pesos do ExchangeClient (orçamento da Binance)
+    ENDPOINT_WEIGHTS = {
+        'fetch_ticker': 2,
+        'fetch_tickers': 80,
+        'fetch_ohlcv': 2,
+        'fetch_balance': 20,
+        'create_order': 1,
+        'cancel_order': 1,
+        'fetch_order': 4,
+        'fetch_open_orders': 6,
+    }
+
+    def __init__(self, source: Callable[[str], np.ndarray], speed: float = 100.0,
+                 start_ms: Optional[int] = None, warmup_days: float = 1.0,
+                 initial_balance: Optional[Dict[str, float]] = None,
+                 latency_ms: float = 40.0, latency_sigma: float = 0.35,
+                 fee_rate: float = 0.001, slippage_bps: float = 2.0, spread_bps: float = 1.0,
+                 seed: int = 42, rate_limit: Optional[Dict] = None,
+                 api_health: Optional[Dict] = None):
+        """
+        Args:
+            source: source(symbol) -> candles 1m (array CANDLE_DTYPE)
+            speed: Multiplicador do relógio simulado
+            start_ms: Início do relógio (padrão: início da fonte + warmup_days)
+            warmup_days: Histórico disponível antes do início (seed dos indicadores)
+            latency_ms: Mediana da latência injetada por chamada REST (tempo real)
+            latency_sigma: Dispersão da lognormal (0 = latência fixa)
+        """
+        self.source = source
+        self.exchange_name = 'simulated'
+        self.testnet = False
+        self.dry_run = False
+
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.fee_rate = fee_rate
+        self.slippage = slippage_bps / 10_000
+        self.spread = spread_bps / 10_000
+        self._rng = random.Random(seed)
+
+        if start_ms is None:
+            start_ms = getattr(source, 'start_ms', int(time.time() * 1000) - int(warmup_days * DAY_MS))
+            start_ms += int(warmup_days * DAY_MS)
+        self.clock = SimClock(start_ms, speed, getattr(source, 'end_ms', None))
+
+        self._series: Dict[str, np.ndarray] = {}
+        self._balances: Dict[str, float] = dict(initial_balance or {'USDT': 1000.0})
+        self._orders: Dict[str, Dict] = {}
+        self._order_ids = itertools.count(1)
+        self._lock = threading.RLock()
+
+        rate_limit = rate_limit or {}
+        self.scheduler = RequestScheduler(
+            weight_per_minute=rate_limit.get('weight_per_minute', 6000),
+            safety_margin=rate_limit.get('safety_margin', 0.9),
+            max_wait=rate_limit.get('max_wait')
+        )
+        self.api_stats = ApiCallStats(self.scheduler, **(api_health or {}))
+        self.ticker_feed = TickerFeed(self)
+        self.ws_server = None
+
+        self.stats = {'calls': 0, 'orders': 0, 'fills': 0, 'latency_seconds': 0.0}
+
+    # ===== NÚCLEO =====
+
+    def _request(self, method: str, priority: RequestPriority = RequestPriority.ANALYTICS,
+                 weight: Optional[float] = None):
+        """Orçamento de peso + latência injetada (como uma chamada real)"""
+        priority = current_priority(priority)
+        weight = weight or self.ENDPOINT_WEIGHTS.get(method, 1)
+        if not self.scheduler.acquire(weight, priority):
+            self.api_stats.record_dropped(method)
+            raise RequestDropped(f"{method} descartada (prioridade {priority.name})")
+
+        self.stats['calls'] += 1
+        delay = 0.0
+        if self.latency_ms > 0:
+            with self._lock:
+                factor = self._rng.lognormvariate(0, self.latency_sigma) if self.latency_sigma else 1.0
+            delay = self.latency_ms * factor / 1000
+            self.stats['latency_seconds'] += delay
+            time.sleep(delay)
+        self.api_stats.record(method, delay * 1000, weight=weight)
+
+    def _candles(self, symbol: str) -> Optional[np.ndarray]:
+        """Série 1m do símbolo (carregada na primeira vez)"""
+        key = _key(symbol)
+        series = self._series.get(key)
+        if series is None:
+            series = self.source(key)
+            if series is None or len(series) == 0:
+                return None
+            with self._lock:
+                self._series.setdefault(key, series)
+        return series
+
+    def _position(self, series: np.ndarray, now_ms: int) -> int:
+        """Índice do candle 1m em andamento no instante now_ms"""
+        return int(np.searchsorted(series['timestamp'], now_ms, side='right')) - 1
+
+    def price(self, symbol: str, now_ms: Optional[int] = None) -> Optional[float]:
+        """Preço simulado (interpolado dentro do minuto)"""
+        series = self._candles(symbol)
+        if series is None:
+            return None
+        now_ms = self.clock.now_ms() if now_ms is None else now_ms
+        i = self._position(series, now_ms)
+        if i < 0:
+            return None
+        candle = series[i]
+        frac = min(1.0, max(0.0, (now_ms - int(candle['timestamp']) + 1) / MINUTE_MS))
+        return float(candle['open'] + (candle['close'] - candle['open']) * frac)
+
+    def ohlcv_window(self, symbol: str, timeframe: str, now_ms: int,
+                     limit: int, since: Optional[int] = None) -> List[list]:
+        """Candles agregados do timeframe até now_ms (o último em andamento)"""
+        series = self._candles(symbol)
+        if series is None:
+            return []
+
+        tf = timeframe_ms(timeframe)
+        end = self._position(series, now_ms) + 1
+        if end <= 0:
+            return []
+
+        ts = series['timestamp']
+        if since is not None:
+            lo = int(np.searchsorted(ts, since - since % tf, side='left'))
+        else:
+            current_bucket = now_ms - now_ms % tf
+            lo = int(np.searchsorted(ts, current_bucket - (limit - 1) * tf, side='left'))
+        window = series[lo:end]
+        if len(window) == 0:
+            return []
+
+        # Último minuto ainda em andamento: close = preço atual
+        price = self.price(symbol, now_ms)
+        close = window['close'].copy()
+        high = window['high'].copy()
+        low = window['low'].copy()
+        close[-1] = price
+        high[-1] = max(window['open'][-1], price)
+        low[-1] = min(window['open'][-1], price)
+
+        buckets = window['timestamp'] - window['timestamp'] % tf
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(window)] - 1
+
+        rows = np.column_stack([
+            buckets[starts],
+            window['open'][starts],
+            np.maximum.reduceat(high, starts),
+            np.minimum.reduceat(low, starts),
+            close[ends],
+            np.add.reduceat(window['volume'], starts),
+        ])
+        rows = rows[:limit] if since is not None else rows[-limit:]
+        return [[int(r[0]), float(r[1]), float(r[2]), float(r[3]), float(r[4]), float(r[5])] for r in rows]
+
+    @property
+    def symbols(self) -> List[str]:
+        """Símbolos já carregados (pedidos pelo motor)"""
+        return list(self._series)
+
+    def ticker_at(self, symbol: str, now_ms: int) -> Optional[Dict]:
+        """Ticker (formato ccxt) no instante simulado"""
+        series = self._candles(symbol)
+        price = self.price(symbol, now_ms)
+        if price is None:
+            return None
+        i = self._position(series, now_ms)
+        day = series[max(0, i - 1439):i + 1]
+        open_ = float(day['open'][0])
+        return {
+            'symbol': _ccxt_symbol(symbol),
+            'timestamp': now_ms,
+            'last': price,
+            'close': price,
+            'bid': price * (1 - self.spread / 2),
+            'ask': price * (1 + self.spread / 2),
+            'open': open_,
+            'high': max(float(day['high'][:-1].max()) if len(day) > 1 else price, price),
+            'low': min(float(day['low'][:-1].min()) if len(day) > 1 else price, price),
+            'baseVolume': float(day['volume'].sum()),
+            'quoteVolume': float(day['volume'].sum()) * price,
+            'percentage': (price - open_) / open_ * 100 if open_ else 0.0,
+        }
+
+    # ===== API (mesma do ExchangeClient) =====
+
+    def test_connection(self) -> bool:
+        return True
+
+    def is_valid_symbol(self, symbol: str) -> bool:
+        return self._candles(symbol) is not None
+
+    def call(self, method: str, *args, priority: RequestPriority = RequestPriority.ANALYTICS,
+             weight: float = 1, **kwargs):
+        """Endpoints crus (sapi) não existem no simulador"""
+        self._request(method, priority, weight)
+        return {}
+
+    def fetch_ticker(self, symbol: str) -> Optional[Dict]:
+        try:
+            self._request('fetch_ticker', RequestPriority.POSITION)
+        except RequestDropped as e:
+            logger.debug(f"🚦 {e}")
+            return None
+        return self.ticker_at(symbol, self.clock.now_ms())
+
+    def fetch_tickers(self, symbols: Optional[List[str]] = None) -> Dict:
+        try:
+            self._request('fetch_tickers', RequestPriority.POSITION)
+        except RequestDropped as e:
+            logger.debug(f"🚦 {e}")
+            return {}
+        now_ms = self.clock.now_ms()
+        tickers = {}
+        for symbol in (symbols or self.symbols):
+            ticker = self.ticker_at(symbol, now_ms)
+            if ticker:
+                tickers[ticker['symbol']] = ticker
+        return tickers
+
+    def get_ticker_snapshot(self, max_age: float = 2.0) -> TickerSnapshot:
+        return self.ticker_feed.snapshot(max_age)
+
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1h', limit: int = 100,
+                    since: Optional[int] = None) -> Optional[List]:
+        try:
+            self._request('fetch_ohlcv', RequestPriority.SCAN)
+        except RequestDropped as e:
+            logger.debug(f"🚦 {e}")
+            return None
+        return self.ohlcv_window(symbol, timeframe, self.clock.now_ms(), limit, since) or None
+
+    def fetch_balance(self) -> Optional[Dict]:
+        try:
+            self._request('fetch_balance', RequestPriority.POSITION)
+        except RequestDropped as e:
+            logger.debug(f"🚦 {e}")
+            return None
+        with self._lock:
+            self._match_limit_orders()
+            used: Dict[str, float] = {}
+            for order in self._orders.values():
+                if order['status'] == 'open':
+                    asset, amount = self._reserved(order)
+                    used[asset] = used.get(asset, 0.0) + amount
+
+            balance = {'free': {}, 'used': {}, 'total': {}}
+            for asset, total in self._balances.items():
+                free = total - used.get(asset, 0.0)
+                balance[asset] = {'free': free, 'used': used.get(asset, 0.0), 'total': total}
+                balance['free'][asset] = free
+                balance['used'][asset] = used.get(asset, 0.0)
+                balance['total'][asset] = total
+            return balance
+
+    # ===== ORDENS =====
+
+    @staticmethod
+    def _reserved(order: Dict):
+        """(ativo, quantidade) travados por uma ordem limit aberta"""
+        base = order['symbol'].split('/')[0]
+        if order['side'] == 'buy':
+            return 'USDT', order['amount'] * order['price']
+        return base, order['amount']
+
+    def _fill(self, order: Dict, price: float) -> bool:
+        """Executa a ordem no preço; False se não houver saldo"""
+        base = order['symbol'].split('/')[0]
+        amount = order['amount']
+        cost = amount * price
+        fee = cost * self.fee_rate
+
+        if order['side'] == 'buy':
+            if self._balances.get('USDT', 0.0) + 1e-9 < cost + fee:
+                return False
+            self._balances['USDT'] = self._balances.get('USDT', 0.0) - cost - fee
+            self._balances[base] = self._balances.get(base, 0.0) + amount
+        else:
+            if self._balances.get(base, 0.0) + 1e-12 < amount:
+                return False
+            self._balances[base] = self._balances.get(base, 0.0) - amount
+            self._balances['USDT'] = self._balances.get('USDT', 0.0) + cost - fee
+
+        order.update({
+            'status': 'closed',
+            'filled': amount,
+            'remaining': 0.0,
+            'average': price,
+            'cost': cost,
+            'fee': {'currency': 'USDT', 'cost': fee},
+            'lastTradeTimestamp': self.clock.now_ms(),
+        })
+        self.stats['fills'] += 1
+        return True
+
+    def _new_order(self, symbol: str, side: str, amount: float, order_type: str,
+                   price: Optional[float]) -> Dict:
+        order = {
+            'id': f"sim_{next(self._order_ids)}",
+            'symbol': _ccxt_symbol(symbol),
+            'type': order_type,
+            'side': side.lower(),
+            'amount': float(amount),
+            'price': price,
+            'average': None,
+            'filled': 0.0,
+            'remaining': float(amount),
+            'cost': 0.0,
+            'status': 'open',
+            'timestamp': self.clock.now_ms(),
+        }
+        self.stats['orders'] += 1
+        return order
+
+    def _match_limit_orders(self):
+        """Executa ordens limit cujo preço foi cruzado (chamar com lock)"""
+        for order in self._orders.values():
+            if order['status'] != 'open':
+                continue
+            price = self.price(order['symbol'])
+            if price is None:
+                continue
+            crossed = price <= order['price'] if order['side'] == 'buy' else price >= order['price']
+            if crossed:
+                self._fill(order, order['price'])
+
+    def create_market_order(self, symbol: str, side: str, amount: float) -> Optional[Dict]:
+        try:
+            self._request('create_order', RequestPriority.ORDER)
+        except RequestDropped as e:
+            logger.debug(f"🚦 {e}")
+            return None
+
+        price = self.price(symbol)
+        if price is None:
+            logger.error(f"❌ Símbolo sem dados no simulador: {symbol}")
+            return None
+        slip = self.slippage if side.lower() == 'buy' else -self.slippage
+        with self._lock:
+            order = self._new_order(symbol, side, amount, 'market', None)
+            if not self._fill(order, price * (1 + slip)):
+                logger.error(f"❌ Erro ao criar ordem market: saldo insuficiente ({symbol})")
+                return None
+            self._orders[order['id']] = order
+            logger.info(f"📝 Ordem MARKET {side.upper()}: {amount} {symbol} - ID: {order['id']}")
+            return dict(order)
+
+    def create_limit_order(self, symbol: str, side: str, amount: float, price: float) -> Optional[Dict]:
+        try:
+            self._request('create_order', RequestPriority.ORDER)
+        except RequestDropped as e:
+            logger.debug(f"🚦 {e}")
+            return None
+
+        with self._lock:
+            order = self._new_order(symbol, side, amount, 'limit', float(price))
+            asset, needed = self._reserved(order)
+            if self.fetch_balance_free(asset) + 1e-9 < needed:
+                logger.error(f"❌ Erro ao criar ordem limit: saldo insuficiente ({symbol})")
+                return None
+            self._orders[order['id']] = order
+            self._match_limit_orders()
+            logger.info(f"📝 Ordem LIMIT {side.upper()}: {amount} {symbol} @ {price} - ID: {order['id']}")
+            return dict(order)
+
+    def fetch_balance_free(self, asset: str) -> float:
+        """Saldo livre de um ativo (descontando ordens limit abertas)"""
+        with self._lock:
+            used = sum(amount for a, amount in
+                       (self._reserved(o) for o in self._orders.values() if o['status'] == 'open')
+                       if a == asset)
+            return self._balances.get(asset, 0.0) - used
+
+    def cancel_order(self, order_id: str, symbol: str) -> bool:
+        try:
+            self._request('cancel_order', RequestPriority.ORDER)
+        except RequestDropped:
+            return False
+        with self._lock:
+            order = self._orders.get(order_id)
+            if order is None or order['status'] != 'open':
+                logger.error(f"❌ Erro ao cancelar ordem {order_id}: não está aberta")
+                return False
+            order['status'] = 'canceled'
+            logger.info(f"❌ Ordem {order_id} cancelada")
+            return True
+
+    def fetch_order_status(self, order_id: str, symbol: str) -> Optional[Dict]:
+        try:
+            self._request('fetch_order', RequestPriority.ORDER)
+        except RequestDropped:
+            return None
+        with self._lock:
+            self._match_limit_orders()
+            order = self._orders.get(order_id)
+            return dict(order) if order else None
+
+    def fetch_open_orders(self, symbol: Optional[str] = None) -> List[Dict]:
+        try:
+            self._request('fetch_open_orders', RequestPriority.POSITION)
+        except RequestDropped:
+            return []
+        with self._lock:
+            self._match_limit_orders()
+            wanted = _ccxt_symbol(symbol) if symbol else None
+            return [dict(o) for o in self._orders.values()
+                    if o['status'] == 'open' and (wanted is None or o['symbol'] == wanted)]
+
+    # ===== WEBSOCKET LOCAL =====
+
+    def start_ws_server(self, host: str = '127.0.0.1', port: int = 0, **kwargs):
+        """
+        Sobe o WebSocket local compatível com BinanceWebSocket e aponta
+        os próximos BinanceWebSocket (CandleStore, TickerFeed) para ele.
+        """
+        from src.backtest.sim_server import SimulatedMarketServer
+
+        if self.ws_server is None:
+            self.ws_server = SimulatedMarketServer(self, host=host, port=port, **kwargs)
+            self.ws_server.start()
+        return self.ws_server
+
+    def stop_ws_server(self):
+        if self.ws_server is not None:
+            self.ws_server.stop()
+            self.ws_server = None
+
+
+def create_simulated_exchange(sim_config: Dict, rate_limit: Optional[Dict] = None,
+                              api_health: Optional[Dict] = None) -> SimulatedExchange:
+    """
+    Cria o simulador a partir de global.simulation do bots_config.yaml
+    (e sobe o WebSocket local se ws_enabled).
+    """
+    days = sim_config.get('days', 5)
+    warmup_days = sim_config.get('warmup_days', 1)
+
+    if sim_config.get('source', 'synthetic') == 'recorded':
+        start = sim_config.get('start')
+        end = sim_config.get('end')
+        source = RecordedCandles(start, end)
+        start_ms = None if start is None else int(np.datetime64(start, 'ms').astype(np.int64)) + int(warmup_days * DAY_MS)
+    else:
+        source = SyntheticCandles(days=days, seed=sim_config.get('seed', 42),
+                                  volatility=sim_config.get('volatility', 0.0015))
+        start_ms = None
+
+    exchange = SimulatedExchange(
+        source,
+        speed=sim_config.get('speed', 100),
+        start_ms=start_ms,
+        warmup_days=warmup_days,
+        initial_balance={'USDT': float(sim_config.get('initial_usdt', 1000))},
+        latency_ms=sim_config.get('latency_ms', 40),
+        latency_sigma=sim_config.get('latency_sigma', 0.35),
+        fee_rate=sim_config.get('fee_rate', 0.001),
+        slippage_bps=sim_config.get('slippage_bps', 2.0),
+        seed=sim_config.get('seed', 42),
+        rate_limit=rate_limit,
+        api_health=api_health,
+    )
+
+    if sim_config.get('ws_enabled', True):
+        exchange.start_ws_server(port=sim_config.get('ws_port', 0))
+
+    logger.warning(f"🧪 EXCHANGE SIMULADA ({sim_config.get('source', 'synthetic')}, {exchange.clock.speed:g}x)")
+    return exchange
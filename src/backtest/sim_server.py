@@ -0,0 +1,234 @@
+"""
+📡 Simulated Market Server - WebSocket local no formato da Binance
+=================================================================
+
+Servidor compatível com BinanceWebSocket, alimentado pelo relógio e pelos
+candles do SimulatedExchange:
+
+    ws://127.0.0.1:<porta>/ws/btcusdt@kline_1m
+    ws://127.0.0.1:<porta>/stream?streams=btcusdt@kline_1m/ethusdt@kline_1m
+    ws://127.0.0.1:<porta>/ws/!miniTicker@arr
+
+Streams suportados: <símbolo>@kline_<tf>, <símbolo>@ticker, <símbolo>@bookTicker,
+!miniTicker@arr.
+Cada candle que fecha no relógio simulado gera um evento com x=true (mesmo
+a 100x, nenhum fechamento é pulado).
+
+Ao iniciar, aponta BINANCE_WS_URL / BINANCE_WS_COMBINED_URL para o servidor:
+todo BinanceWebSocket criado depois (CandleStore, TickerFeed) usa o local.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from src.core.candle_warehouse import timeframe_ms
+
+try:
+    import websockets
+    HAS_WEBSOCKETS = True
+except ImportError:
+    HAS_WEBSOCKETS = False
+
+logger = logging.getLogger(__name__)
+
+# Máximo de candles fechados enviados por símbolo a cada tick (atraso grande)
+MAX_CLOSED_PER_TICK = 5
+
+
+class SimulatedMarketServer:
+    """WebSocket local que transmite o mercado simulado"""
+
+    def __init__(self, exchange, host: str = '127.0.0.1', port: int = 0,
+                 tick_seconds: float = 0.25, inject_latency: bool = True):
+        if not HAS_WEBSOCKETS:
+            raise ImportError("websockets não instalado - pip install websockets")
+
+        self.exchange = exchange
+        self.host = host
+        self.port = port
+        self.tick_seconds = tick_seconds
+        self.inject_latency = inject_latency
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._stop: Optional[asyncio.Event] = None
+        self._previous_env = {}
+
+        self.stats = {'connections': 0, 'messages': 0}
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/ws"
+
+    @property
+    def combined_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/stream"
+
+    # ===== CICLO DE VIDA =====
+
+    def start(self, timeout: float = 10.0):
+        """Sobe o servidor numa thread com event loop próprio"""
+        self._thread = threading.Thread(target=self._run, name="SimMarketServer", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise RuntimeError("Servidor WebSocket simulado não iniciou")
+
+        for name, value in (('BINANCE_WS_URL', self.ws_url),
+                            ('BINANCE_WS_COMBINED_URL', self.combined_url)):
+            self._previous_env[name] = os.environ.get(name)
+            os.environ[name] = value
+        logger.info(f"📡 Mercado simulado em {self.ws_url}")
+
+    def stop(self):
+        """Para o servidor e restaura as URLs da Binance"""
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+        for name, value in self._previous_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        self._previous_env = {}
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._serve())
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    async def _serve(self):
+        self._stop = asyncio.Event()
+        async with websockets.serve(self._handler, self.host, self.port) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self._ready.set()
+            await self._stop.wait()
+
+    # ===== CONEXÕES =====
+
+    @staticmethod
+    def _parse_streams(path: str) -> Tuple[List[str], bool]:
+        """Streams pedidos na URL e se é o formato combinado (wrapper stream/data)"""
+        url = urlparse(path)
+        if url.path.startswith('/stream'):
+            streams = parse_qs(url.query).get('streams', [''])[0]
+            return [s for s in streams.split('/') if s], True
+        return [url.path[len('/ws/'):]] if url.path.startswith('/ws/') else [], False
+
+    async def _handler(self, ws, path: Optional[str] = None):
+        # websockets >= 13 passa só a conexão (path em ws.request.path)
+        if path is None:
+            path = getattr(getattr(ws, 'request', None), 'path', None) or getattr(ws, 'path', '')
+        streams, combined = self._parse_streams(path)
+        if not streams:
+            await ws.close(code=1008, reason='stream inválido')
+            return
+
+        self.stats['connections'] += 1
+        last_bucket = {}
+
+        try:
+            while not self._stop.is_set():
+                now_ms = self.exchange.clock.now_ms()
+                for stream in streams:
+                    for payload in self._events(stream, now_ms, last_bucket):
+                        message = {'stream': stream, 'data': payload} if combined else payload
+                        if self.inject_latency and self.exchange.latency_ms > 0:
+                            await asyncio.sleep(self.exchange.latency_ms / 2000)
+                        await ws.send(json.dumps(message))
+                        self.stats['messages'] += 1
+                await asyncio.sleep(self.tick_seconds)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    # ===== EVENTOS (formato Binance) =====
+
+    def _events(self, stream: str, now_ms: int, last_bucket: dict) -> list:
+        if stream == '!miniTicker@arr':
+            return [self._mini_tickers(now_ms)]
+
+        symbol, _, kind = stream.partition('@')
+        symbol = symbol.upper()
+
+        if kind.startswith('kline_'):
+            timeframe = kind[len('kline_'):]
+            tf = timeframe_ms(timeframe)
+            bucket = now_ms - now_ms % tf
+            previous = last_bucket.get(stream, bucket)
+            last_bucket[stream] = bucket
+
+            events = []
+            # Candles que fecharam desde o último tick (x=true)
+            closed_from = max(previous, bucket - MAX_CLOSED_PER_TICK * tf)
+            if closed_from < bucket:
+                rows = self.exchange.ohlcv_window(symbol, timeframe, bucket - 1, MAX_CLOSED_PER_TICK,
+                                                  since=closed_from)
+                events += [self._kline(symbol, timeframe, tf, row, now_ms, True)
+                           for row in rows if row[0] < bucket]
+            # Candle em andamento
+            rows = self.exchange.ohlcv_window(symbol, timeframe, now_ms, 1)
+            events += [self._kline(symbol, timeframe, tf, row, now_ms, False) for row in rows]
+            return events
+
+        if kind == 'ticker':
+            ticker = self.exchange.ticker_at(symbol, now_ms)
+            if not ticker:
+                return []
+            return [{
+                'e': '24hrTicker', 'E': now_ms, 's': symbol,
+                'c': str(ticker['last']), 'o': str(ticker['open']),
+                'h': str(ticker['high']), 'l': str(ticker['low']),
+                'p': str(ticker['last'] - ticker['open']), 'P': str(ticker['percentage']),
+                'v': str(ticker['baseVolume']), 'q': str(ticker['quoteVolume']), 'n': 0,
+            }]
+
+        if kind == 'bookTicker':
+            price = self.exchange.price(symbol, now_ms)
+            if not price:
+                return []
+            spread = self.exchange.spread
+            return [{
+                'u': now_ms, 's': symbol,
+                'b': str(price * (1 - spread / 2)), 'B': '1.0',
+                'a': str(price * (1 + spread / 2)), 'A': '1.0',
+            }]
+
+        return []
+
+    @staticmethod
+    def _kline(symbol: str, timeframe: str, tf: int, row: list, now_ms: int, closed: bool) -> dict:
+        ts, o, h, l, c, v = row
+        return {
+            'e': 'kline', 'E': now_ms, 's': symbol,
+            'k': {
+                't': ts, 'T': ts + tf - 1, 's': symbol, 'i': timeframe,
+                'o': str(o), 'h': str(h), 'l': str(l), 'c': str(c), 'v': str(v),
+                'n': 0, 'x': closed,
+            },
+        }
+
+    def _mini_tickers(self, now_ms: int) -> list:
+        tickers = []
+        for symbol in self.exchange.symbols:
+            ticker = self.exchange.ticker_at(symbol, now_ms)
+            if ticker:
+                tickers.append({
+                    'e': '24hrMiniTicker', 'E': now_ms, 's': symbol,
+                    'c': str(ticker['last']), 'o': str(ticker['open']),
+                    'h': str(ticker['high']), 'l': str(ticker['low']),
+                    'v': str(ticker['baseVolume']), 'q': str(ticker['quoteVolume']),
+                })
+        return tickers
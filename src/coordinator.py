@@ -42,6 +42,8 @@ from src.audit import get_audit_logger, AuditEvent
 from src.observability import get_metrics, measure_execution_time
 
 from src.core.exchange_client import ExchangeClient
+from src.core.market_recorder import start_market_recorder
+from src.core.write_behind import get_write_behind
 
 
 @dataclass
@@ -113,6 +115,9 @@ class CoordinatorStats:
     # Por bot
     bots: Dict[str, BotStats] = field(default_factory=dict)
     
+    # Ritmo do ciclo (CyclePacer): atrasos e corte de carga
+    pacing: Dict[str, Any] = field(default_factory=dict)
+    
     def to_dict(self):
         result = asdict(self)
         result['bots'] = {k: v.to_dict() if hasattr(v, 'to_dict') else v for k, v in self.bots.items()}
@@ -192,6 +197,12 @@ class MultiBot:
         return self.strategy.should_sell(symbol, entry_price, current_price, df, 
                                          position_time, positions_full, position_size)
     
+    def should_sell_position_fast(self, symbol: str, entry_price: float, current_price: float,
+                                  position_time: datetime, position_size: float = None) -> tuple:
+        """Verifica só as saídas de preço (via rápida de saída, a cada tick)"""
+        return self.strategy.should_sell_fast(symbol, entry_price, current_price,
+                                              position_time, position_size)
+    
     def update_stats(self, pnl: float, is_win: bool):
         """Atualiza estatísticas do bot"""
         self.stats.total_trades += 1
@@ -222,6 +233,9 @@ class BotCoordinator:
         # Setup logging
         self._setup_logging()
         
+        # Gravação de mercado (WS + REST) para replay, se habilitada
+        start_market_recorder(self.config.get('global', {}).get('recorder', {}))
+        
         # Exchange client (compartilhado)
         self.exchange = self._setup_exchange()
         
@@ -302,6 +316,13 @@ class BotCoordinator:
         """Configura cliente da exchange"""
         global_config = self.config.get('global', {})
         
+        # Exchange simulada (benchmark/regressão offline, sem credenciais)
+        sim_config = global_config.get('simulation', {})
+        if sim_config.get('enabled', False):
+            from src.backtest.sim_exchange import create_simulated_exchange
+            return create_simulated_exchange(sim_config, rate_limit=global_config.get('rate_limit', {}),
+                                             api_health=global_config.get('api_health', {}))
+        
         # Carrega credenciais
         api_key = os.getenv('BINANCE_API_KEY', '')
         api_secret = os.getenv('BINANCE_API_SECRET', '')
@@ -324,7 +345,10 @@ class BotCoordinator:
             api_key=api_key,
             api_secret=api_secret,
             testnet=testnet,
-            dry_run=dry_run
+            dry_run=dry_run,
+            rate_limit=global_config.get('rate_limit', {}),
+            ohlcv_cache_size=global_config.get('market_data', {}).get('ohlcv_cache_size', 1000),
+            api_health=global_config.get('api_health', {})
         )
     
     def _init_bots(self):
@@ -374,8 +398,10 @@ class BotCoordinator:
     
     def save_state(self):
         """Salva estado atual no arquivo"""
-        self.data_path.mkdir(parents=True, exist_ok=True)
-        
+        with self.metrics.span('persist_state'):
+            self._save_state()
+    
+    def _save_state(self):
         # Atualiza estatísticas globais
         self._update_global_stats()
         
@@ -387,8 +413,8 @@ class BotCoordinator:
             if bot_type not in data['bots']:
                 data['bots'][bot_type] = {}
             data['bots'][bot_type]['positions'] = bot.positions
-        with open(self.stats_file, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
+        # Write-behind: serializa agora, a thread de fundo grava (atômico)
+        get_write_behind().put(self.stats_file, data)
 
     def reload_config(self):
         """Recarrega YAML de configuração em memória e atualiza bots."""
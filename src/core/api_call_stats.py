@@ -0,0 +1,234 @@
+"""
+📡 API Call Stats - Contabilidade das chamadas REST por endpoint
+================================================================
+
+Toda chamada do ccxt (ExchangeClient._request) registra aqui:
+
+    endpoint | símbolo | latência | peso | peso usado (header) | retries | exceção
+
+em janelas deslizantes (fatias de slot_seconds; a janela é a soma das
+últimas window_seconds). Memória constante: histograma log por fatia.
+
+Saúde da exchange: a cada check_seconds, se o p95 da latência ou a taxa
+de erros transitórios (rede, timeout, 429...) passar do limite, o
+RequestScheduler pausa as classes de menor prioridade:
+
+    nível 1: ANALYTICS (dashboard, AutoTuner, backfill)
+    nível 2 (2x o limite): + SCAN (busca de entradas)
+
+Ordens e preços de posições abertas nunca são pausados.
+"""
+
+import logging
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, Optional
+
+from src.core.request_scheduler import RequestPriority, RequestScheduler
+from src.observability import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+
+class _EndpointSlot:
+    """Contadores de um endpoint numa fatia da janela"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.transient_errors = 0
+        self.dropped = 0
+        self.retries = 0
+        self.weight = 0.0
+        self.used_weight_max = 0
+        self.error_classes: Counter = Counter()
+        self.latency = LatencyHistogram()
+        # símbolo -> [chamadas, erros, latência total ms]
+        self.symbols: Dict[str, list] = {}
+
+    def merge(self, other: '_EndpointSlot'):
+        self.calls += other.calls
+        self.errors += other.errors
+        self.transient_errors += other.transient_errors
+        self.dropped += other.dropped
+        self.retries += other.retries
+        self.weight += other.weight
+        self.used_weight_max = max(self.used_weight_max, other.used_weight_max)
+        self.error_classes.update(other.error_classes)
+        self.latency.merge(other.latency)
+        for symbol, (calls, errors, latency_ms) in other.symbols.items():
+            row = self.symbols.setdefault(symbol, [0, 0, 0.0])
+            row[0] += calls
+            row[1] += errors
+            row[2] += latency_ms
+
+
+class ApiCallStats:
+    """Janelas deslizantes por endpoint + backoff automático dos chamadores de baixa prioridade"""
+
+    def __init__(self, scheduler: Optional[RequestScheduler] = None, window_seconds: float = 300,
+                 slot_seconds: float = 10, p95_threshold_ms: float = 2000,
+                 error_rate_threshold: float = 0.2, min_calls: int = 20,
+                 backoff_seconds: float = 30, check_seconds: float = 5, enabled: bool = True):
+        """
+        Args:
+            scheduler: agendador a ser pausado quando a exchange degrada (None = só estatística)
+            p95_threshold_ms: p95 da latência (todas as chamadas) que dispara o backoff
+            error_rate_threshold: fração de erros transitórios que dispara o backoff
+            min_calls: mínimo de chamadas na janela para julgar a saúde
+            backoff_seconds: duração de cada pausa (renovada enquanto seguir degradado)
+        """
+        self.scheduler = scheduler
+        self.window_seconds = window_seconds
+        self.slot_seconds = slot_seconds
+        self.p95_threshold_ms = p95_threshold_ms
+        self.error_rate_threshold = error_rate_threshold
+        self.min_calls = min_calls
+        self.backoff_seconds = backoff_seconds
+        self.check_seconds = check_seconds
+        self.enabled = enabled
+
+        # (início da fatia, endpoint -> _EndpointSlot), mais nova à direita
+        self._slots: deque = deque()
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+
+        self.level = 0
+        self.stats = {'backoffs': 0, 'last_p95_ms': 0.0, 'last_error_rate': 0.0}
+
+    # ===== REGISTRO =====
+
+    def _slot(self, endpoint: str, now: float) -> _EndpointSlot:
+        """Fatia atual do endpoint (chamar com _lock)"""
+        start = now - now % self.slot_seconds
+        if not self._slots or self._slots[-1][0] != start:
+            self._slots.append((start, {}))
+            while self._slots and self._slots[0][0] <= now - self.window_seconds:
+                self._slots.popleft()
+        return self._slots[-1][1].setdefault(endpoint, _EndpointSlot())
+
+    def record(self, endpoint: str, latency_ms: float, symbol: Optional[str] = None,
+               weight: float = 0, used_weight: int = 0, retries: int = 0,
+               error: Optional[str] = None, transient: bool = False):
+        """Registra uma chamada que foi à exchange"""
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            slot = self._slot(endpoint, now)
+            slot.calls += 1
+            slot.retries += retries
+            slot.weight += weight
+            slot.used_weight_max = max(slot.used_weight_max, used_weight)
+            slot.latency.observe(latency_ms)
+            if error:
+                slot.errors += 1
+                slot.error_classes[error] += 1
+                if transient:
+                    slot.transient_errors += 1
+            if symbol:
+                row = slot.symbols.setdefault(symbol, [0, 0, 0.0])
+                row[0] += 1
+                row[1] += 1 if error else 0
+                row[2] += latency_ms
+        self._maybe_check()
+
+    def record_dropped(self, endpoint: str):
+        """Chamada descartada pelo agendador (não foi à exchange)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._slot(endpoint, time.time()).dropped += 1
+
+    # ===== JANELA =====
+
+    def _window(self) -> Dict[str, _EndpointSlot]:
+        """Endpoints somados sobre a janela"""
+        cutoff = time.time() - self.window_seconds
+        merged: Dict[str, _EndpointSlot] = {}
+        with self._lock:
+            for start, endpoints in self._slots:
+                if start <= cutoff:
+                    continue
+                for endpoint, slot in endpoints.items():
+                    merged.setdefault(endpoint, _EndpointSlot()).merge(slot)
+        return merged
+
+    # ===== SAÚDE / BACKOFF =====
+
+    def _maybe_check(self):
+        now = time.monotonic()
+        if self.scheduler is None or now - self._last_check < self.check_seconds:
+            return
+        self._last_check = now
+        self.check_health()
+
+    def check_health(self) -> int:
+        """Avalia a janela e pausa os chamadores de baixa prioridade se preciso"""
+        total = _EndpointSlot()
+        for slot in self._window().values():
+            total.merge(slot)
+
+        p95 = total.latency.percentile(95)
+        error_rate = total.transient_errors / total.calls if total.calls else 0.0
+        self.stats['last_p95_ms'] = round(p95, 1)
+        self.stats['last_error_rate'] = round(error_rate, 3)
+
+        level = 0
+        if total.calls >= self.min_calls:
+            severity = max(p95 / self.p95_threshold_ms, error_rate / self.error_rate_threshold)
+            if severity >= 2:
+                level = 2
+            elif severity >= 1:
+                level = 1
+
+        if level != self.level:
+            if level:
+                logger.warning(f"📡 Exchange degradada (p95 {p95:.0f}ms, erros {error_rate:.0%}) - "
+                               f"backoff nível {level}")
+            else:
+                logger.info(f"✅ Exchange normalizada (p95 {p95:.0f}ms, erros {error_rate:.0%})")
+            self.level = level
+
+        if level and self.scheduler is not None:
+            lowest = RequestPriority.SCAN if level >= 2 else RequestPriority.ANALYTICS
+            self.scheduler.throttle(lowest, self.backoff_seconds)
+            self.stats['backoffs'] += 1
+        return level
+
+    # ===== CONSULTA =====
+
+    def get_status(self, top_symbols: int = 10) -> dict:
+        """Resumo da janela por endpoint (para dashboard/backend)"""
+        endpoints = {}
+        symbols: Dict[str, list] = {}
+        for endpoint, slot in sorted(self._window().items()):
+            endpoints[endpoint] = {
+                'calls': slot.calls,
+                'errors': slot.errors,
+                'error_rate': round(slot.errors / slot.calls, 3) if slot.calls else 0.0,
+                'dropped': slot.dropped,
+                'retries': slot.retries,
+                'weight': slot.weight,
+                'used_weight_1m_max': slot.used_weight_max,
+                'error_classes': dict(slot.error_classes),
+                **{k: v for k, v in slot.latency.summary().items() if k != 'count'},
+            }
+            for symbol, (calls, errors, latency_ms) in slot.symbols.items():
+                row = symbols.setdefault(symbol, [0, 0, 0.0])
+                row[0] += calls
+                row[1] += errors
+                row[2] += latency_ms
+
+        busiest = sorted(symbols.items(), key=lambda item: item[1][0], reverse=True)[:top_symbols]
+        return {
+            'window_seconds': self.window_seconds,
+            'backoff_level': self.level,
+            **self.stats,
+            'endpoints': endpoints,
+            'symbols': {
+                symbol: {'calls': calls, 'errors': errors, 'avg_ms': round(latency_ms / calls, 1)}
+                for symbol, (calls, errors, latency_ms) in busiest
+            },
+        }
@@ -0,0 +1,126 @@
+"""
+🧮 Candle Ring Buffer - Buffer circular NumPy para candles
+=========================================================
+
+Armazena candles de um símbolo em arrays NumPy pré-alocados (por coluna):
+- append / update do candle aberto em O(1), sem alocação
+- leitura dos últimos N candles como VIEWS (zero-cópia)
+- DataFrame apenas sob demanda (to_dataframe)
+
+Truque do "espelho": cada candle é escrito em duas posições (i e i + capacity),
+assim qualquer janela dos últimos N candles é sempre uma fatia contígua.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class CandleRingBuffer:
+    """Buffer circular de capacidade fixa com colunas ts/open/high/low/close/volume"""
+
+    COLUMNS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+    PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, capacity: int = 500):
+        if capacity <= 0:
+            raise ValueError("capacity deve ser > 0")
+
+        self.capacity = capacity
+        self._ts = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.zeros((len(self.PRICE_COLUMNS), 2 * capacity), dtype=np.float64)
+        self._head = -1   # posição (mod capacity) do último candle escrito
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        """Timestamp (ms) do último candle, ou None se vazio"""
+        if self._count == 0:
+            return None
+        return int(self._ts[self._head])
+
+    def _write(self, pos: int, ts: int, o: float, h: float, l: float, c: float, v: float):
+        """Escreve o candle na posição e no seu espelho"""
+        for p in (pos, pos + self.capacity):
+            self._ts[p] = ts
+            self._values[0, p] = o
+            self._values[1, p] = h
+            self._values[2, p] = l
+            self._values[3, p] = c
+            self._values[4, p] = v
+
+    def append(self, ts: int, o: float, h: float, l: float, c: float, v: float):
+        """Adiciona candle novo (sobrescreve o mais antigo quando cheio)"""
+        self._head = (self._head + 1) % self.capacity
+        self._write(self._head, ts, o, h, l, c, v)
+        self._count = min(self._count + 1, self.capacity)
+
+    def update_last(self, ts: int, o: float, h: float, l: float, c: float, v: float):
+        """Atualiza in-place o último candle (candle em andamento)"""
+        if self._count == 0:
+            self.append(ts, o, h, l, c, v)
+        else:
+            self._write(self._head, ts, o, h, l, c, v)
+
+    def upsert(self, ts: int, o: float, h: float, l: float, c: float, v: float) -> bool:
+        """
+        Atualiza o último candle se for o mesmo timestamp, adiciona se for mais novo.
+        Mensagens atrasadas (timestamp antigo) são ignoradas.
+
+        Returns:
+            True se o buffer foi alterado
+        """
+        last = self.last_timestamp
+        if last is not None and ts == last:
+            self.update_last(ts, o, h, l, c, v)
+        elif last is None or ts > last:
+            self.append(ts, o, h, l, c, v)
+        else:
+            return False
+        return True
+
+    def extend(self, rows: List[list]):
+        """Adiciona várias linhas [ts, o, h, l, c, v] (formato do fetch_ohlcv)"""
+        for row in rows:
+            self.upsert(int(row[0]), float(row[1]), float(row[2]),
+                        float(row[3]), float(row[4]), float(row[5]))
+
+    def clear(self):
+        """Esvazia o buffer (mantém a memória alocada)"""
+        self._head = -1
+        self._count = 0
+
+    def _window(self, n: Optional[int] = None) -> slice:
+        """Fatia contígua com os últimos n candles"""
+        n = self._count if n is None else max(0, min(n, self._count))
+        start = (self._head + 1 - n) % self.capacity
+        return slice(start, start + n)
+
+    def view(self, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Retorna os últimos n candles como views NumPy (zero-cópia, somente leitura).
+
+        As views apontam para o buffer: o candle em andamento muda in-place e,
+        após novos appends, a janela desliza. Copie se precisar guardar.
+        """
+        sl = self._window(n)
+        columns = {'timestamp': self._ts[sl]}
+        for i, name in enumerate(self.PRICE_COLUMNS):
+            columns[name] = self._values[i, sl]
+        for arr in columns.values():
+            arr.flags.writeable = False
+        return columns
+
+    def to_dataframe(self, n: Optional[int] = None) -> pd.DataFrame:
+        """Copia os últimos n candles para um DataFrame (timestamp como datetime)"""
+        sl = self._window(n)
+        df = pd.DataFrame({
+            name: self._values[i, sl].copy()
+            for i, name in enumerate(self.PRICE_COLUMNS)
+        })
+        df.insert(0, 'timestamp', pd.to_datetime(self._ts[sl], unit='ms'))
+        return df
@@ -0,0 +1,328 @@
+"""
+🕯️ Candle Store - Cache de candles compartilhado pelo processo
+=============================================================
+
+Substitui o fetch_ohlcv via REST a cada ciclo por um cache único:
+- Semeado UMA vez via REST (fetch_ohlcv)
+- Mantido atualizado pelos streams de kline do BinanceWebSocket
+- Todas as estratégias leem daqui (zero chamadas de rede com cache quente)
+
+Se o stream cair ou o símbolo não estiver inscrito, cai para REST
+automaticamente (e re-semeia o cache).
+
+Uso:
+    store = get_candle_store(exchange)
+    store.start(['BTCUSDT', 'ETHUSDT'], timeframe='1m')
+    df = store.get_dataframe('BTCUSDT', '1m', limit=100)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.core.websocket_client import BinanceWebSocket, HAS_WEBSOCKETS
+from src.observability import get_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class CandleStore:
+    """
+    Store de candles por (símbolo, timeframe).
+
+    Um BinanceWebSocket (e uma thread com event loop próprio) por timeframe.
+    """
+
+    def __init__(self, exchange, capacity: int = 500, stale_after_seconds: float = 90,
+                 streaming: bool = True):
+        self.exchange = exchange
+        self.capacity = capacity
+        self.stale_after_seconds = stale_after_seconds
+        self.streaming = streaming and HAS_WEBSOCKETS
+
+        # timeframe -> WebSocket / thread / símbolos inscritos
+        self._streams: Dict[str, BinanceWebSocket] = {}
+        self._threads: Dict[str, threading.Thread] = {}
+        self._loops: Dict[str, asyncio.AbstractEventLoop] = {}
+        self._stop_events: Dict[str, threading.Event] = {}
+        self._symbols: Dict[str, Set[str]] = {}
+
+        # Estado do cache
+        self._seeded: Set[Tuple[str, str]] = set()
+        self._last_update: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+        self._running = False
+
+        # Chamados a cada candle FECHADO: listener(symbol, timeframe)
+        self._close_listeners: List[Callable[[str, str], None]] = []
+
+        # Estatísticas (quantas leituras custaram rede)
+        self.stats = {
+            'cache_hits': 0,
+            'rest_seeds': 0,
+            'rest_fallbacks': 0,
+            'reconnects': 0,
+        }
+
+    @staticmethod
+    def _key(symbol: str) -> str:
+        """Normaliza símbolo (BTC/USDT -> BTCUSDT)"""
+        return symbol.upper().replace('/', '')
+
+    # ===== CICLO DE VIDA =====
+
+    def start(self, symbols: List[str], timeframe: str = '1m', seed_limit: int = 200):
+        """
+        Semeia o cache via REST e inicia o stream de klines do timeframe.
+
+        Args:
+            symbols: Símbolos a acompanhar
+            timeframe: Timeframe dos candles ('1m', '15m', ...)
+            seed_limit: Quantos candles buscar via REST na semeadura
+        """
+        keys = sorted({self._key(s) for s in symbols})
+        if not keys:
+            return
+
+        self._running = True
+        ws = self._streams.get(timeframe)
+        if ws is None:
+            ws = BinanceWebSocket(max_candles=self.capacity)
+            ws.on_kline = lambda kline, tf=timeframe: self._on_kline(kline, tf)
+            self._streams[timeframe] = ws
+
+        self._symbols.setdefault(timeframe, set()).update(keys)
+
+        # Semeadura única via REST
+        seeded = 0
+        for symbol in keys:
+            if self._seed(symbol, timeframe, seed_limit):
+                seeded += 1
+        logger.info(f"🕯️ CandleStore: {seeded}/{len(keys)} símbolos semeados ({timeframe})")
+
+        if not self.streaming:
+            logger.warning("⚠️ CandleStore sem streaming - leituras usarão REST")
+            return
+
+        # (Re)inicia o stream com o conjunto completo de símbolos do timeframe
+        self._stop_stream(timeframe)
+        self._stop_events[timeframe] = threading.Event()
+        thread = threading.Thread(
+            target=self._stream_thread,
+            args=(timeframe,),
+            name=f"CandleStore-{timeframe}",
+            daemon=True
+        )
+        self._threads[timeframe] = thread
+        thread.start()
+
+    def stop(self):
+        """Para todos os streams"""
+        self._running = False
+        for timeframe in list(self._threads.keys()):
+            self._stop_stream(timeframe)
+        logger.info("🛑 CandleStore parado")
+
+    def _stop_stream(self, timeframe: str):
+        """Para o stream de um timeframe (se estiver rodando)"""
+        ws = self._streams.get(timeframe)
+        loop = self._loops.pop(timeframe, None)
+        thread = self._threads.pop(timeframe, None)
+        stop_event = self._stop_events.pop(timeframe, None)
+
+        if stop_event is not None:
+            stop_event.set()
+
+        if ws is not None:
+            ws.is_running = False
+            if loop is not None and loop.is_running():
+                try:
+                    asyncio.run_coroutine_threadsafe(ws.stop(), loop)
+                except RuntimeError:
+                    pass
+
+        if thread is not None and thread.is_alive():
+            thread.join(timeout=5)
+
+    def _stream_thread(self, timeframe: str):
+        """Thread com event loop próprio para o WebSocket do timeframe"""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loops[timeframe] = loop
+        try:
+            loop.run_until_complete(self._stream_forever(timeframe))
+        except Exception as e:
+            logger.error(f"❌ CandleStore stream {timeframe} finalizado com erro: {e}")
+        finally:
+            loop.close()
+
+    async def _stream_forever(self, timeframe: str):
+        """Conecta e escuta, reconectando com backoff exponencial"""
+        ws = self._streams[timeframe]
+        stop_event = self._stop_events[timeframe]
+        retries = 0
+
+        while self._running and not stop_event.is_set():
+            symbols = sorted(self._symbols.get(timeframe, set()))
+            await ws.subscribe_klines(symbols, timeframe)
+
+            if ws.is_running:
+                retries = 0
+                await ws.listen()
+
+            if not self._running or stop_event.is_set():
+                break
+
+            # Desconectou: o que chegar depois pode ter buraco -> re-semeia na próxima leitura
+            with self._lock:
+                self._seeded = {k for k in self._seeded if k[1] != timeframe}
+            self.stats['reconnects'] += 1
+
+            retries += 1
+            wait_time = min(30, 2 ** retries)
+            logger.warning(f"⚠️ CandleStore {timeframe}: reconectando em {wait_time}s...")
+            for _ in range(wait_time):
+                if stop_event.is_set():
+                    break
+                await asyncio.sleep(1)
+
+    # ===== ATUALIZAÇÃO =====
+
+    def _seed(self, symbol: str, timeframe: str, limit: int) -> bool:
+        """Busca candles via REST e semeia o cache do stream"""
+        ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+        if not ohlcv:
+            return False
+
+        ws = self._streams.get(timeframe)
+        if ws is None:
+            return False
+
+        ws.seed_candles(symbol, ohlcv)
+        with self._lock:
+            self._seeded.add((symbol, timeframe))
+            self._last_update[(symbol, timeframe)] = time.time()
+        self.stats['rest_seeds'] += 1
+        return True
+
+    def _on_kline(self, kline: dict, timeframe: str):
+        """Callback do WebSocket (o cache já foi atualizado pelo próprio stream)"""
+        with self._lock:
+            self._last_update[(kline['symbol'], timeframe)] = time.time()
+
+        if kline.get('is_closed'):
+            for listener in self._close_listeners:
+                try:
+                    listener(kline['symbol'], timeframe)
+                except Exception as e:
+                    logger.error(f"❌ Erro no listener de candle fechado: {e}")
+
+    def add_close_listener(self, listener: Callable[[str, str], None]):
+        """
+        Registra listener(symbol, timeframe) chamado quando um candle fecha.
+        Roda na thread do stream: deve ser rápido (ex: só enfileirar).
+        """
+        self._close_listeners.append(listener)
+
+    # ===== LEITURA =====
+
+    def is_warm(self, symbol: str, timeframe: str = '1m') -> bool:
+        """True se o cache do símbolo está semeado e recebendo dados do stream"""
+        key = (self._key(symbol), timeframe)
+        with self._lock:
+            if key not in self._seeded:
+                return False
+            last = self._last_update.get(key, 0)
+
+        thread = self._threads.get(timeframe)
+        if thread is None or not thread.is_alive():
+            return False
+        return (time.time() - last) <= self.stale_after_seconds
+
+    def _ensure_fresh(self, key: str, timeframe: str, limit: int) -> bool:
+        """Garante cache utilizável: quente -> nada a fazer; frio -> re-semeia via REST"""
+        if self.is_warm(key, timeframe):
+            self.stats['cache_hits'] += 1
+            return True
+
+        self.stats['rest_fallbacks'] += 1
+        return self._seed(key, timeframe, max(limit, 200))
+
+    def get_dataframe(self, symbol: str, timeframe: str = '1m',
+                      limit: int = 100) -> Optional[pd.DataFrame]:
+        """
+        Retorna os últimos `limit` candles como DataFrame
+        (colunas: timestamp, open, high, low, close, volume).
+
+        Cache quente -> zero chamadas de rede.
+        Símbolo acompanhado mas frio -> re-semeia via REST.
+        Símbolo não acompanhado -> REST direto (sem cache).
+        """
+        key = self._key(symbol)
+        metrics = get_metrics()
+
+        if key in self._symbols.get(timeframe, set()):
+            with metrics.span('fetch', symbol=key):
+                fresh = self._ensure_fresh(key, timeframe, limit)
+            if not fresh:
+                return None
+
+            with metrics.span('dataframe', symbol=key):
+                df = self._streams[timeframe].get_candles(key, limit)
+            if df.empty:
+                return None
+            return df
+
+        # Fora do store (ex: watchlist) - REST direto
+        self.stats['rest_fallbacks'] += 1
+        with metrics.span('fetch', symbol=key):
+            ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+        if not ohlcv:
+            return None
+        with metrics.span('dataframe', symbol=key):
+            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+
+    def get_arrays(self, symbol: str, timeframe: str = '1m',
+                   limit: int = 100) -> Dict[str, np.ndarray]:
+        """
+        Como get_dataframe, mas retorna views NumPy do buffer (zero-cópia).
+        Retorna {} se o símbolo não estiver acompanhado pelo store.
+        """
+        key = self._key(symbol)
+        if key not in self._symbols.get(timeframe, set()):
+            return {}
+
+        if not self._ensure_fresh(key, timeframe, limit):
+            return {}
+
+        return self._streams[timeframe].get_candle_arrays(key, limit)
+
+    def get_status(self) -> dict:
+        """Status do store para logs/dashboard"""
+        return {
+            'streaming': self.streaming,
+            'timeframes': {tf: len(symbols) for tf, symbols in self._symbols.items()},
+            'warm': sum(1 for tf, symbols in self._symbols.items()
+                        for s in symbols if self.is_warm(s, tf)),
+            **self.stats,
+        }
+
+
+# Singleton para acesso global
+_candle_store_instance: Optional[CandleStore] = None
+
+def get_candle_store(exchange=None, **kwargs) -> CandleStore:
+    """Retorna instância global do CandleStore"""
+    global _candle_store_instance
+    if _candle_store_instance is None:
+        if exchange is None:
+            raise ValueError("CandleStore ainda não inicializado - informe o exchange")
+        _candle_store_instance = CandleStore(exchange, **kwargs)
+    return _candle_store_instance
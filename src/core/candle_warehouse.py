@@ -0,0 +1,444 @@
+"""
+🏛️ Candle Warehouse - Armazém local de candles em disco
+======================================================
+
+Histórico de candles persistido em binário compacto, um arquivo por
+(timeframe, símbolo):
+
+    data/candles/5m/BTCUSDT.bin   -> registros fixos de 48 bytes
+                                     (timestamp int64 + OHLCV float64)
+    data/candles/5m/BTCUSDT.json  -> metadados (início já coberto)
+
+- Append-only: só candles FECHADOS, em ordem crescente de timestamp
+- Sincronização incremental: baixa apenas o que falta no início
+  (período pedido maior que o guardado) e no fim (candles novos)
+- Backfill paralelo em chunks de 1000 candles, dentro do orçamento de peso
+- Leitura por np.memmap + índice esparso de timestamps:
+  read_range(símbolo, início, fim) devolve VIEWS sobre o arquivo, então
+  varrer meses/anos de candles de 1m custa banda de disco, não objetos Python
+
+Uso:
+    warehouse = get_candle_warehouse()
+    warehouse.backfill(['BTCUSDT', 'ETHUSDT'], '5m', days=30)
+    df = warehouse.get_dataframe('BTCUSDT', '5m', days=30)
+    candles = warehouse.read_range('BTCUSDT', '2023-01-01', '2024-01-01')
+    closes = candles['close']   # view, sem cópia
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import ccxt
+import numpy as np
+import pandas as pd
+
+from src.core.request_scheduler import RequestPriority, RequestScheduler, request_priority, request_wait
+
+logger = logging.getLogger(__name__)
+
+# Registro em disco (little-endian, 48 bytes)
+CANDLE_DTYPE = np.dtype([
+    ('timestamp', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8'),
+])
+
+# Máximo de candles por request no /klines da Binance
+CHUNK_SIZE = 1000
+
+# Índice esparso: 1 timestamp a cada N registros (~190 KB de arquivo)
+INDEX_STRIDE = 4096
+
+# data/candles na raiz do projeto (independe do diretório de execução)
+DEFAULT_BASE_DIR = str(Path(__file__).resolve().parents[2] / 'data' / 'candles')
+
+# Um lock por arquivo, compartilhado entre instâncias do processo
+_path_locks: Dict[str, threading.Lock] = {}
+_path_locks_guard = threading.Lock()
+
+
+def _lock_for(path: Path) -> threading.Lock:
+    with _path_locks_guard:
+        lock = _path_locks.get(str(path))
+        if lock is None:
+            lock = _path_locks[str(path)] = threading.Lock()
+        return lock
+
+
+def timeframe_ms(timeframe: str) -> int:
+    """Duração do timeframe em ms ('5m' -> 300000)"""
+    return ccxt.Exchange.parse_timeframe(timeframe) * 1000
+
+
+def _to_ms(value) -> int:
+    """Timestamp em ms a partir de int/float (ms) ou datetime/pd.Timestamp"""
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return int(value)
+    return int(pd.Timestamp(value).timestamp() * 1000)
+
+
+def to_records(rows: Iterable) -> np.ndarray:
+    """Lista OHLCV (formato ccxt) -> array de registros CANDLE_DTYPE"""
+    rows = [tuple(row[:6]) for row in rows]
+    if not rows:
+        return np.empty(0, dtype=CANDLE_DTYPE)
+    return np.array(rows, dtype=CANDLE_DTYPE)
+
+
+class BinancePublicKlines:
+    """
+    Fonte de candles pela API pública da Binance (sem chave), para os
+    scripts de análise que rodam fora do bot. Usa um RequestScheduler
+    próprio para respeitar o limite de peso por minuto.
+    """
+
+    BASE_URL = "https://api.binance.com/api/v3/klines"
+
+    def __init__(self, weight_per_minute: int = 6000, timeout: float = 10.0):
+        self.timeout = timeout
+        # Backfill pode esperar pelo orçamento (não descarta)
+        self.scheduler = RequestScheduler(
+            weight_per_minute,
+            max_wait={p: 60.0 for p in RequestPriority}
+        )
+
+    def __call__(self, symbol: str, timeframe: str, since: Optional[int], limit: int) -> Optional[List]:
+        import requests
+
+        if not self.scheduler.acquire(10 if limit > 500 else 5, RequestPriority.ANALYTICS):
+            return None
+
+        params = {'symbol': symbol.replace('/', ''), 'interval': timeframe, 'limit': limit}
+        if since is not None:
+            params['startTime'] = since
+
+        try:
+            response = requests.get(self.BASE_URL, params=params, timeout=self.timeout)
+            self.scheduler.update_from_headers(response.headers)
+            if response.status_code in (418, 429):
+                retry_after = response.headers.get('Retry-After')
+                self.scheduler.on_rate_limited(float(retry_after) if retry_after else None,
+                                               banned=response.status_code == 418)
+                return None
+            if response.status_code != 200:
+                logger.warning(f"⚠️ Klines {symbol}: HTTP {response.status_code}")
+                return None
+            return [
+                [k[0], float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5])]
+                for k in response.json()
+            ]
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao buscar klines {symbol}: {e}")
+            return None
+
+
+def exchange_fetcher(client, max_wait: float = 0.5) -> Callable:
+    """
+    Fonte de candles via ExchangeClient: passa pelo agendador como SCAN,
+    esperando no máximo `max_wait` segundos por orçamento (ANALYTICS
+    descartava quase todo chunk). Chunk descartado -> nova tentativa.
+    """
+    def fetch(symbol: str, timeframe: str, since: Optional[int], limit: int) -> Optional[List]:
+        with request_priority(RequestPriority.SCAN), request_wait(max_wait):
+            return client.fetch_ohlcv(symbol, timeframe, limit=limit, since=since)
+    return fetch
+
+
+class CandleWarehouse:
+    """Armazém append-only de candles por (timeframe, símbolo)"""
+
+    def __init__(self, base_dir: str = DEFAULT_BASE_DIR, fetch_raw: Optional[Callable] = None,
+                 max_workers: int = 4, retries: int = 3):
+        """
+        Args:
+            base_dir: Diretório dos arquivos
+            fetch_raw: fetch_raw(symbol, timeframe, since, limit) -> lista OHLCV ou None
+            max_workers: Requests de backfill em paralelo
+            retries: Tentativas por chunk (descartado/erro)
+        """
+        self.base_dir = Path(base_dir)
+        self.fetch_raw = fetch_raw or BinancePublicKlines()
+        self.max_workers = max_workers
+        self.retries = retries
+
+        self.stats = {'chunks_fetched': 0, 'chunks_failed': 0, 'candles_stored': 0}
+        self._indexes: Dict[Path, Tuple[int, np.ndarray]] = {}
+
+    # ===== ARQUIVOS =====
+
+    @staticmethod
+    def _symbol(symbol: str) -> str:
+        return symbol.upper().replace('/', '')
+
+    def path_for(self, symbol: str, timeframe: str) -> Path:
+        return self.base_dir / timeframe / f"{self._symbol(symbol)}.bin"
+
+    def _meta_path(self, symbol: str, timeframe: str) -> Path:
+        return self.path_for(symbol, timeframe).with_suffix('.json')
+
+    def _read_meta(self, symbol: str, timeframe: str) -> dict:
+        try:
+            with open(self._meta_path(symbol, timeframe), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, symbol: str, timeframe: str, meta: dict):
+        path = self._meta_path(symbol, timeframe)
+        tmp = path.with_suffix('.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, path)
+
+    def load(self, symbol: str, timeframe: str) -> np.ndarray:
+        """Todos os candles guardados do par (array CANDLE_DTYPE)"""
+        path = self.path_for(symbol, timeframe)
+        if not path.exists():
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        return np.fromfile(path, dtype=CANDLE_DTYPE)
+
+    # ===== SINCRONIZAÇÃO =====
+
+    def _missing_ranges(self, symbol: str, timeframe: str, start_ms: int,
+                        end_ms: int) -> List[Tuple[str, int, int]]:
+        """Intervalos [início, fim) que faltam: ('head', ...) e/ou ('tail', ...)"""
+        data = self.load(symbol, timeframe)
+        if len(data) == 0:
+            return [('tail', start_ms, end_ms)] if start_ms < end_ms else []
+
+        tf = timeframe_ms(timeframe)
+        first_ts = int(data['timestamp'][0])
+        last_ts = int(data['timestamp'][-1])
+        covered_from = min(self._read_meta(symbol, timeframe).get('covered_from', first_ts), first_ts)
+
+        ranges = []
+        if start_ms < covered_from:
+            ranges.append(('head', start_ms, first_ts))
+        if last_ts + tf < end_ms:
+            ranges.append(('tail', last_ts + tf, end_ms))
+        return ranges
+
+    def _fetch_chunk(self, symbol: str, timeframe: str, start: int, end: int) -> Optional[np.ndarray]:
+        """Baixa [start, end) com novas tentativas; None se falhar"""
+        for attempt in range(self.retries):
+            rows = self.fetch_raw(symbol, timeframe, start, CHUNK_SIZE)
+            if rows is not None:
+                records = to_records(rows)
+                mask = (records['timestamp'] >= start) & (records['timestamp'] < end)
+                self.stats['chunks_fetched'] += 1
+                return records[mask]
+            time.sleep(min(5, 2 ** attempt))
+        self.stats['chunks_failed'] += 1
+        return None
+
+    def _store(self, symbol: str, timeframe: str, kind: str, start: int,
+               chunks: List[Tuple[int, Optional[np.ndarray]]]) -> int:
+        """
+        Grava os chunks baixados sem deixar buracos: no fim, até o primeiro
+        chunk que falhou; no início, só o trecho contíguo ao já guardado.
+        """
+        ok = []
+        if kind == 'tail':
+            for _, records in chunks:
+                if records is None:
+                    break
+                ok.append(records)
+        else:
+            start = None
+            for chunk_start, records in reversed(chunks):
+                if records is None:
+                    break
+                ok.insert(0, records)
+                start = chunk_start
+
+        if not ok:
+            return 0
+
+        new = np.concatenate(ok)
+        new = new[np.unique(new['timestamp'], return_index=True)[1]]
+
+        path = self.path_for(symbol, timeframe)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with _lock_for(path):
+            current = self.load(symbol, timeframe)
+            meta = self._read_meta(symbol, timeframe)
+
+            if kind == 'tail':
+                if len(current):
+                    new = new[new['timestamp'] > current['timestamp'][-1]]
+                with open(path, 'ab') as f:
+                    new.tofile(f)
+                if not len(current):
+                    meta['covered_from'] = start
+            else:
+                if len(current):
+                    new = new[new['timestamp'] < current['timestamp'][0]]
+                tmp = path.with_suffix('.bin.tmp')
+                with open(tmp, 'wb') as f:
+                    new.tofile(f)
+                    current.tofile(f)
+                os.replace(tmp, path)
+                meta['covered_from'] = min(start, meta.get('covered_from', start))
+
+            self._write_meta(symbol, timeframe, meta)
+
+        self.stats['candles_stored'] += len(new)
+        return len(new)
+
+    def backfill(self, symbols: Iterable[str], timeframe: str, days: Optional[float] = None,
+                 start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Dict[str, int]:
+        """
+        Garante no disco os candles fechados de [início, fim) para os símbolos.
+        Os chunks de TODOS os símbolos são baixados em paralelo.
+
+        Returns:
+            {símbolo: candles novos gravados}
+        """
+        tf = timeframe_ms(timeframe)
+        now_ms = int(time.time() * 1000)
+        # Candle aberto (ainda mudando) nunca vai para o disco
+        end = (now_ms // tf) * tf
+        if end_ms is not None:
+            end = min(end, end_ms)
+        if start_ms is None:
+            start_ms = now_ms - int((days or 30) * 86_400_000)
+        start = (start_ms // tf) * tf
+
+        # Plano: (símbolo, tipo, início do intervalo, [(chunk_start, chunk_end)])
+        plan = []
+        for symbol in symbols:
+            for kind, a, b in self._missing_ranges(symbol, timeframe, start, end):
+                bounds = [(s, min(s + CHUNK_SIZE * tf, b)) for s in range(a, b, CHUNK_SIZE * tf)]
+                plan.append((symbol, kind, a, bounds))
+
+        jobs = [(symbol, s, e) for symbol, _, _, bounds in plan for s, e in bounds]
+        if not jobs:
+            return {self._symbol(s): 0 for s in symbols}
+
+        logger.info(f"🏛️ Backfill {timeframe}: {len(jobs)} chunks para {len(plan)} intervalos")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="backfill") as pool:
+            results = list(pool.map(lambda job: self._fetch_chunk(job[0], timeframe, job[1], job[2]), jobs))
+
+        stored = {self._symbol(s): 0 for s in symbols}
+        i = 0
+        for symbol, kind, a, bounds in plan:
+            chunks = [(s, results[i + n]) for n, (s, _) in enumerate(bounds)]
+            i += len(bounds)
+            stored[self._symbol(symbol)] += self._store(symbol, timeframe, kind, a, chunks)
+
+        return stored
+
+    # ===== LEITURA =====
+
+    def _memmap(self, symbol: str, timeframe: str) -> np.ndarray:
+        """Arquivo do par mapeado em memória (somente leitura, zero-cópia)"""
+        path = self.path_for(symbol, timeframe)
+        try:
+            size = path.stat().st_size
+        except OSError:
+            size = 0
+        count = size // CANDLE_DTYPE.itemsize
+        if count == 0:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        return np.memmap(path, dtype=CANDLE_DTYPE, mode='r', shape=(count,))
+
+    def _sparse_index(self, symbol: str, timeframe: str, data: np.ndarray) -> np.ndarray:
+        """
+        Índice esparso: timestamp de 1 a cada INDEX_STRIDE registros.
+        Como o arquivo é append-only, o índice só cresce; se o arquivo foi
+        reescrito (início estendido), o índice é refeito.
+        """
+        path = self.path_for(symbol, timeframe)
+        inode = path.stat().st_ino
+        cached = self._indexes.get(path)
+
+        if cached is None or cached[0] != inode or (len(cached[1]) - 1) * INDEX_STRIDE >= len(data):
+            index = np.array(data['timestamp'][::INDEX_STRIDE])
+        else:
+            index = cached[1]
+            first_new = len(index) * INDEX_STRIDE
+            if first_new < len(data):
+                index = np.concatenate([index, data['timestamp'][first_new::INDEX_STRIDE]])
+
+        self._indexes[path] = (inode, index)
+        return index
+
+    @staticmethod
+    def _locate(ts: np.ndarray, index: np.ndarray, value: int) -> int:
+        """Posição do primeiro registro com timestamp >= value (lê só 1 bloco)"""
+        block = max(int(np.searchsorted(index, value, side='right')) - 1, 0)
+        lo = block * INDEX_STRIDE
+        hi = min(lo + INDEX_STRIDE, len(ts))
+        return lo + int(np.searchsorted(ts[lo:hi], value, side='left'))
+
+    def read_range(self, symbol: str, start, end=None, timeframe: str = '1m') -> np.ndarray:
+        """
+        Candles de [start, end) direto do disco, SEM cópia: o retorno é uma
+        view sobre o arquivo mapeado em memória (colunas via r['close']...).
+
+        start/end: timestamp em ms ou datetime. Não sincroniza com a exchange.
+
+        No Windows o arquivo fica aberto enquanto houver views vivas -
+        solte-as antes de um backfill que estenda o início do histórico.
+        """
+        data = self._memmap(symbol, timeframe)
+        if len(data) == 0:
+            return data
+
+        index = self._sparse_index(symbol, timeframe, data)
+        ts = data['timestamp']
+        lo = self._locate(ts, index, _to_ms(start))
+        hi = len(data) if end is None else self._locate(ts, index, _to_ms(end))
+        return data[lo:max(lo, hi)]
+
+    def read(self, symbol: str, timeframe: str, start_ms: int, end_ms: Optional[int] = None,
+             sync: bool = True) -> np.ndarray:
+        """Candles de [start_ms, end_ms) (sincroniza antes se sync=True)"""
+        if sync:
+            self.backfill([symbol], timeframe, start_ms=start_ms, end_ms=end_ms)
+        return self.read_range(symbol, start_ms, end_ms, timeframe=timeframe)
+
+    def get_dataframe(self, symbol: str, timeframe: str, days: Optional[float] = None,
+                      limit: Optional[int] = None, sync: bool = True) -> Optional[pd.DataFrame]:
+        """
+        DataFrame (timestamp datetime + OHLCV float) dos últimos `days` dias
+        ou dos últimos `limit` candles fechados. None se não houver dados.
+        """
+        now_ms = int(time.time() * 1000)
+        if limit is not None:
+            start_ms = now_ms - (limit + 1) * timeframe_ms(timeframe)
+        else:
+            start_ms = now_ms - int((days or 30) * 86_400_000)
+
+        records = self.read(symbol, timeframe, start_ms, sync=sync)
+        if limit is not None:
+            records = records[-limit:]
+        if len(records) == 0:
+            return None
+
+        df = pd.DataFrame({name: records[name] for name in CANDLE_DTYPE.names})
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+
+
+# Singleton (fonte: API pública da Binance)
+_candle_warehouse: Optional[CandleWarehouse] = None
+
+
+def get_candle_warehouse(base_dir: str = DEFAULT_BASE_DIR, **kwargs) -> CandleWarehouse:
+    """Retorna instância única do armazém de candles"""
+    global _candle_warehouse
+    if _candle_warehouse is None:
+        _candle_warehouse = CandleWarehouse(base_dir, **kwargs)
+    return _candle_warehouse
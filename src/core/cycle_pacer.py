@@ -0,0 +1,122 @@
+"""
+⏱️ Cycle Pacer - Ritmo do loop principal por deadline + corte de carga
+=====================================================================
+
+Antes: ciclo + sleep(interval). Um ciclo de 20s com interval=5 virava
+cadência de 25s, sem aviso nenhum.
+
+Agora o loop mira um período fixo:
+- Ciclo terminou antes do deadline -> dorme só o que falta
+- Estourou -> registra o atraso (log + stats) e começa o próximo na hora,
+  sem tentar "recuperar" ciclos perdidos
+
+Sob pressão (duração média do ciclo perto/acima do período), corta
+trabalho em ordem de prioridade:
+    nível 1: pula o scan da watchlist
+    nível 2: + analisa entrada só dos símbolos de maior peso da carteira
+Posições abertas NUNCA são cortadas (saídas sempre avaliadas).
+"""
+
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CyclePacer:
+    """Deadline do ciclo, medição de atraso e nível de corte de carga"""
+
+    SHED_NONE = 0
+    SHED_WATCHLIST = 1
+    SHED_LOW_WEIGHT = 2
+
+    def __init__(self, period: float, shed_enabled: bool = True, shed_above: float = 0.9,
+                 recover_below: float = 0.6, low_weight_fraction: float = 0.5,
+                 smoothing: float = 0.3):
+        """
+        Args:
+            period: período alvo do ciclo (segundos)
+            shed_above: carga (duração/período, média móvel) que sobe o nível de corte
+            recover_below: carga que desce o nível
+            low_weight_fraction: fração de menor peso de cada carteira cortada no nível 2
+            smoothing: peso do ciclo atual na média móvel da carga
+        """
+        self.period = max(0.001, float(period))
+        self.shed_enabled = shed_enabled
+        self.shed_above = shed_above
+        self.recover_below = recover_below
+        self.low_weight_fraction = low_weight_fraction
+        self.smoothing = smoothing
+
+        self.load = 0.0
+        self.level = self.SHED_NONE
+        self._next_deadline: Optional[float] = None
+
+        self.stats = {
+            'cycles': 0,
+            'overruns': 0,
+            'overrun_ms_total': 0.0,
+            'overrun_ms_max': 0.0,
+            'last_overrun_ms': 0.0,
+            'last_cycle_ms': 0.0,
+            'shed_cycles': 0,
+            'watchlist_skips': 0,
+            'shed_symbols': 0,
+        }
+
+    def start(self):
+        """Primeiro deadline: um período a partir de agora"""
+        self._next_deadline = time.monotonic() + self.period
+
+    def observe(self, duration: float):
+        """Registra a duração de um ciclo e ajusta o nível de corte"""
+        self.stats['cycles'] += 1
+        self.stats['last_cycle_ms'] = round(duration * 1000, 1)
+        self.load += self.smoothing * (duration / self.period - self.load)
+
+        if self.level > self.SHED_NONE:
+            self.stats['shed_cycles'] += 1
+
+        if not self.shed_enabled:
+            return
+        if self.load >= self.shed_above and self.level < self.SHED_LOW_WEIGHT:
+            self.level += 1
+            logger.warning(f"⚠️ Carga do ciclo {self.load:.0%} do período - corte nível {self.level}")
+        elif self.load <= self.recover_below and self.level > self.SHED_NONE:
+            self.level -= 1
+            logger.info(f"✅ Carga do ciclo {self.load:.0%} do período - corte nível {self.level}")
+
+    def cycle_done(self, duration: float) -> float:
+        """
+        Fecha o ciclo: registra a duração e retorna quanto dormir até o
+        próximo deadline (0 se estourou).
+        """
+        self.observe(duration)
+
+        now = time.monotonic()
+        if self._next_deadline is None:
+            self._next_deadline = now
+
+        overrun = now - self._next_deadline
+        if overrun > 0:
+            overrun_ms = overrun * 1000
+            self.stats['overruns'] += 1
+            self.stats['overrun_ms_total'] = round(self.stats['overrun_ms_total'] + overrun_ms, 1)
+            self.stats['overrun_ms_max'] = round(max(self.stats['overrun_ms_max'], overrun_ms), 1)
+            self.stats['last_overrun_ms'] = round(overrun_ms, 1)
+            logger.warning(f"⚠️ Ciclo estourou o período de {self.period:g}s em {overrun_ms:.0f}ms")
+            self._next_deadline = now + self.period
+            return 0.0
+
+        sleep = self._next_deadline - now
+        self._next_deadline += self.period
+        return sleep
+
+    def get_status(self) -> dict:
+        return {
+            'period_s': self.period,
+            'load': round(self.load, 3),
+            'shed_level': self.level,
+            **self.stats,
+        }
@@ -4,20 +4,57 @@ Módulo de Conexão com Exchanges via CCXT
 import ccxt
 import logging
 import os
+import time
 from typing import Optional, Dict, List
 from datetime import datetime
 
+from src.core.request_scheduler import (
+    RequestScheduler, RequestPriority, RequestDropped, current_priority
+)
+from src.core.ticker_snapshot import TickerFeed, TickerSnapshot
+from src.core.ohlcv_sync import OHLCVSync
+from src.core.market_recorder import get_market_recorder
+from src.core.api_call_stats import ApiCallStats
+
 logger = logging.getLogger(__name__)
 
 
 class ExchangeClient:
     """Cliente para conexão com exchanges"""
     
-    def __init__(self, exchange_name: str, api_key: str, api_secret: str, testnet: bool = False, dry_run: bool = False):
+    # Peso (REQUEST_WEIGHT) de cada endpoint na Binance spot
+    ENDPOINT_WEIGHTS = {
+        'load_markets': 20,
+        'fetch_ticker': 2,
+        'fetch_tickers': 80,
+        'fetch_ohlcv': 2,
+        'fetch_balance': 20,
+        'create_market_order': 1,
+        'create_limit_order': 1,
+        'cancel_order': 1,
+        'fetch_order': 4,
+        'fetch_open_orders': 6,
+    }
+    
+    def __init__(self, exchange_name: str, api_key: str, api_secret: str, testnet: bool = False,
+                 dry_run: bool = False, rate_limit: Optional[Dict] = None,
+                 ohlcv_cache_size: int = 1000, api_health: Optional[Dict] = None):
         self.exchange_name = exchange_name
         self.testnet = testnet
         self.dry_run = dry_run
         
+        # Agendador central de requisições (orçamento de peso + prioridades)
+        self.scheduler = RequestScheduler(**(rate_limit or {}))
+        
+        # Latência/peso/erros por endpoint + backoff dos chamadores de baixa prioridade
+        self.api_stats = ApiCallStats(self.scheduler, **(api_health or {}))
+        
+        # Preços de todos os pares por ciclo (stream ou 1 fetch_tickers)
+        self.ticker_feed = TickerFeed(self)
+        
+        # OHLCV incremental (só candles novos via since); 0 desativa
+        self.ohlcv_sync = OHLCVSync(self._fetch_ohlcv_raw, ohlcv_cache_size) if ohlcv_cache_size else None
+        
         # Inicializa exchange via CCXT
         exchange_class = getattr(ccxt, exchange_name)
         exchange_config = {
@@ -41,7 +78,7 @@ class ExchangeClient:
         # ✅ Carrega mercados com timeout maior e retry
         try:
             logger.info("🔄 Carregando mercados da exchange...")
-            self.exchange.load_markets()
+            self._request('load_markets', priority=RequestPriority.POSITION)
             logger.info(f"✅ Mercados carregados com sucesso")
         except KeyboardInterrupt:
             logger.warning("⚠️ Interrupção detectada durante carregamento de mercados - pode ser timeout de rede")
@@ -53,12 +90,73 @@ class ExchangeClient:
             # Não falha - continua sem mercados carregados
                 
         logger.info(f"✅ Conectado à {exchange_name}")
+    
+    def _request(self, method: str, *args, priority: RequestPriority = RequestPriority.ANALYTICS,
+                 weight: Optional[float] = None, retries: int = 0, **kwargs):
+        """
+        Executa um método do ccxt passando pelo agendador.
+        
+        A prioridade do contexto (request_priority) sobrepõe a padrão,
+        exceto para ordens (ORDER nunca é rebaixada).
+        Sem orçamento -> RequestDropped. 429/418 -> backoff global.
+        Toda chamada entra no api_stats (retries = tentativas anteriores).
+        """
+        priority = current_priority(priority)
+        if weight is None:
+            weight = self.ENDPOINT_WEIGHTS.get(method, 1)
+        
+        if not self.scheduler.acquire(weight, priority):
+            self.api_stats.record_dropped(method)
+            raise RequestDropped(f"{method} descartada (prioridade {priority.name})")
+        
+        start = time.perf_counter()
+        error = None
+        try:
+            result = getattr(self.exchange, method)(*args, **kwargs)
+        except Exception as e:
+            error = e
+            if isinstance(e, (ccxt.RateLimitExceeded, ccxt.DDoSProtection)):
+                headers = getattr(self.exchange, 'last_response_headers', None) or {}
+                retry_after = None
+                for key, value in headers.items():
+                    if key.lower() == 'retry-after':
+                        try:
+                            retry_after = float(value)
+                        except (TypeError, ValueError):
+                            pass
+                self.scheduler.on_rate_limited(
+                    retry_after, banned=not isinstance(e, ccxt.RateLimitExceeded)
+                )
+            raise
+        finally:
+            self.scheduler.update_from_headers(getattr(self.exchange, 'last_response_headers', None))
+            self.api_stats.record(
+                method, (time.perf_counter() - start) * 1000,
+                symbol=next((a for a in args if isinstance(a, str) and '/' in a), None),
+                weight=weight,
+                used_weight=self.scheduler.stats['used_weight_1m'],
+                retries=retries,
+                error=type(error).__name__ if error else None,
+                # Rede/timeout/429: conta para a saúde da exchange (erros do chamador não)
+                transient=isinstance(error, ccxt.NetworkError)
+            )
+        
+        # Gravação para replay (só enfileira; serializa em outra thread)
+        recorder = get_market_recorder()
+        if recorder is not None:
+            recorder.record_rest(method, args, result)
+        return result
+    
+    def call(self, method: str, *args, priority: RequestPriority = RequestPriority.ANALYTICS,
+             weight: float = 1, **kwargs):
+        """Chamada crua ao ccxt (ex: endpoints sapi) respeitando o agendador"""
+        return self._request(method, *args, priority=priority, weight=weight, **kwargs)
         
     def test_connection(self) -> bool:
         """Testa conexão com a exchange"""
         try:
             logger.info("🔄 Testando conexão com exchange...")
-            balance = self.exchange.fetch_balance()
+            balance = self._request('fetch_balance', priority=RequestPriority.POSITION)
             logger.info(f"✅ Conexão OK - Saldo total: {balance.get('total', {})}")
             return True
         except ccxt.NetworkError as e:
@@ -80,12 +178,41 @@ class ExchangeClient:
         """Obtém preço atual de um par"""
         try:
             ccxt_symbol = self._normalize_symbol(symbol)
-            ticker = self.exchange.fetch_ticker(ccxt_symbol)
+            ticker = self._request('fetch_ticker', ccxt_symbol, priority=RequestPriority.POSITION)
             return ticker
+        except RequestDropped as e:
+            logger.debug(f"🚦 {e}")
+            return None
         except Exception as e:
             logger.error(f"❌ Erro ao buscar ticker {symbol}: {e}")
             return None
     
+    def fetch_tickers(self, symbols: Optional[List[str]] = None) -> Dict:
+        """Obtém tickers de vários pares (todos se symbols=None) numa única requisição"""
+        try:
+            ccxt_symbols = [self._normalize_symbol(s) for s in symbols] if symbols else None
+            if ccxt_symbols is None or len(ccxt_symbols) > 100:
+                weight = 80
+            elif len(ccxt_symbols) > 20:
+                weight = 40
+            else:
+                weight = 2
+            return self._request('fetch_tickers', ccxt_symbols, priority=RequestPriority.POSITION,
+                                 weight=weight)
+        except RequestDropped as e:
+            logger.debug(f"🚦 {e}")
+            return {}
+        except Exception as e:
+            logger.error(f"❌ Erro ao buscar tickers: {e}")
+            return {}
+    
+    def get_ticker_snapshot(self, max_age: float = 2.0) -> TickerSnapshot:
+        """
+        Snapshot imutável com o preço de todos os pares.
+        Usa o stream !miniTicker@arr se ativo, senão UM fetch_tickers.
+        """
+        return self.ticker_feed.snapshot(max_age)
+    
     def is_valid_symbol(self, symbol: str) -> bool:
         """Verifica se um símbolo é válido na exchange"""
         if not hasattr(self.exchange, 'markets') or not self.exchange.markets:
@@ -94,21 +221,50 @@ class ExchangeClient:
         ccxt_symbol = self._normalize_symbol(symbol)
         return ccxt_symbol in self.exchange.markets
     
-    def fetch_ohlcv(self, symbol: str, timeframe: str = '1h', limit: int = 100) -> Optional[List]:
-        """Obtém dados históricos OHLCV"""
+    def fetch_ohlcv(self, symbol: str, timeframe: str = '1h', limit: int = 100,
+                    since: Optional[int] = None) -> Optional[List]:
+        """
+        Obtém dados históricos OHLCV.
+        
+        Sem `since`, usa a sincronização incremental: só os candles novos
+        são baixados e mesclados no cache do par/timeframe.
+        """
+        if since is None and self.ohlcv_sync is not None:
+            return self.ohlcv_sync.fetch(symbol, timeframe, limit)
+        return self._fetch_ohlcv_raw(symbol, timeframe, since, limit)
+    
+    def _fetch_ohlcv_raw(self, symbol: str, timeframe: str, since: Optional[int],
+                         limit: int) -> Optional[List]:
+        """Busca OHLCV direto na exchange (sem cache)"""
         try:
             ccxt_symbol = self._normalize_symbol(symbol)
-            ohlcv = self.exchange.fetch_ohlcv(ccxt_symbol, timeframe, limit=limit)
-            logger.info(f"📊 {len(ohlcv)} candles obtidos para {symbol} ({timeframe})")
+            ohlcv = self._request('fetch_ohlcv', ccxt_symbol, timeframe, since=since, limit=limit,
+                                  priority=RequestPriority.SCAN,
+                                  weight=self._klines_weight(limit))
+            logger.debug(f"📊 {len(ohlcv)} candles obtidos para {symbol} ({timeframe})")
             return ohlcv
+        except RequestDropped as e:
+            logger.debug(f"🚦 {e}")
+            return None
         except Exception as e:
             logger.error(f"❌ Erro ao buscar OHLCV {symbol}: {e}")
             return None
     
+    @staticmethod
+    def _klines_weight(limit: int) -> int:
+        """Peso do /klines na Binance depende do limit"""
+        if limit <= 100:
+            return 2
+        if limit <= 500:
+            return 5
+        if limit <= 1000:
+            return 10
+        return 20
+    
     def fetch_balance(self) -> Optional[Dict]:
         """Obtém saldo da conta (com correção para Testnet)"""
         try:
-            balance = self.exchange.fetch_balance()
+            balance = self._request('fetch_balance', priority=RequestPriority.POSITION)
             
             # Aplica correção de saldo para Testnet
             if self.testnet and TESTNET_BALANCE_CORRECTION > 1:
@@ -131,6 +287,9 @@ class ExchangeClient:
                 return corrected_balance
             
             return balance
+        except RequestDropped as e:
+            logger.debug(f"🚦 {e}")
+            return None
         except Exception as e:
             logger.error(f"❌ Erro ao buscar saldo: {e}")
             return None
@@ -157,7 +316,8 @@ class ExchangeClient:
         
         try:
             # Primeira tentativa com valor original
-            order = self.exchange.create_market_order(ccxt_symbol, side, amount)
+            order = self._request('create_market_order', ccxt_symbol, side, amount,
+                                  priority=RequestPriority.ORDER)
             logger.info(f"📝 Ordem MARKET {side.upper()}: {amount} {symbol} - ID: {order['id']}")
             return order
         except Exception as e:
@@ -177,14 +337,16 @@ class ExchangeClient:
                         available_usdt = balance.get('USDT', {}).get('free', 0)
                         if available_usdt > 1.0:  # Mínimo $1
                             # Obter preço atual para calcular quantidade
-                            ticker = self.exchange.fetch_ticker(symbol)
+                            ticker = self._request('fetch_ticker', ccxt_symbol,
+                                                   priority=RequestPriority.ORDER)
                             current_price = ticker['last']
                             max_amount_usdt = available_usdt * 0.9  # 90% do saldo
                             adjusted_amount = max_amount_usdt / current_price
                             
                             logger.warning(f"⚠️ Ajustando compra: {amount} -> {adjusted_amount:.6f} ({max_amount_usdt:.2f} USDT)")
                             
-                            order = self.exchange.create_market_order(symbol, side, adjusted_amount)
+                            order = self._request('create_market_order', ccxt_symbol, side, adjusted_amount,
+                                                  priority=RequestPriority.ORDER, retries=1)
                             logger.info(f"📝 Ordem AJUSTADA MARKET {side.upper()}: {adjusted_amount:.6f} {symbol} - ID: {order['id']}")
                             return order
                     
@@ -197,7 +359,8 @@ class ExchangeClient:
                             
                             logger.warning(f"⚠️ Ajustando venda: {amount} -> {adjusted_amount:.6f}")
                             
-                            order = self.exchange.create_market_order(symbol, side, adjusted_amount)
+                            order = self._request('create_market_order', ccxt_symbol, side, adjusted_amount,
+                                                  priority=RequestPriority.ORDER, retries=1)
                             logger.info(f"📝 Ordem AJUSTADA MARKET {side.upper()}: {adjusted_amount:.6f} {symbol} - ID: {order['id']}")
                             return order
                 
@@ -214,7 +377,8 @@ class ExchangeClient:
         """
         try:
             ccxt_symbol = self._normalize_symbol(symbol)
-            order = self.exchange.create_limit_order(ccxt_symbol, side, amount, price)
+            order = self._request('create_limit_order', ccxt_symbol, side, amount, price,
+                                  priority=RequestPriority.ORDER)
             logger.info(f"📝 Ordem LIMIT {side.upper()}: {amount} {symbol} @ {price} - ID: {order['id']}")
             return order
         except Exception as e:
@@ -225,7 +389,7 @@ class ExchangeClient:
         """Cancela uma ordem"""
         try:
             ccxt_symbol = self._normalize_symbol(symbol)
-            self.exchange.cancel_order(order_id, ccxt_symbol)
+            self._request('cancel_order', order_id, ccxt_symbol, priority=RequestPriority.ORDER)
             logger.info(f"❌ Ordem {order_id} cancelada")
             return True
         except Exception as e:
@@ -236,7 +400,7 @@ class ExchangeClient:
         """Verifica status de uma ordem (ANTI-ALUCINAÇÃO)"""
         try:
             ccxt_symbol = self._normalize_symbol(symbol)
-            order = self.exchange.fetch_order(order_id, ccxt_symbol)
+            order = self._request('fetch_order', order_id, ccxt_symbol, priority=RequestPriority.ORDER)
             logger.info(f"📋 Status ordem {order_id}: {order['status']}")
             return order
         except Exception as e:
@@ -247,7 +411,8 @@ class ExchangeClient:
         """Obtém todas as ordens abertas"""
         try:
             ccxt_symbol = self._normalize_symbol(symbol) if symbol else None
-            orders = self.exchange.fetch_open_orders(ccxt_symbol)
+            orders = self._request('fetch_open_orders', ccxt_symbol, priority=RequestPriority.POSITION,
+                                   weight=6 if ccxt_symbol else 80)
             logger.info(f"📋 {len(orders)} ordens abertas")
             return orders
         except Exception as e:
@@ -0,0 +1,228 @@
+"""
+⚡ Exit Lane - Via rápida de saída para posições abertas
+=======================================================
+
+O ciclo normal só confere stop loss / trailing / take profit uma vez por
+varredura do portfolio: com ciclos lentos, uma posição pode passar vários
+% do stop antes da reação. A via rápida:
+
+- Assina <símbolo>@bookTicker (ou @trade) SÓ dos símbolos com posição aberta
+- A cada tick roda as regras de saída que dependem só do preço
+  (SmartStrategy.should_sell_fast / UnicoBot.should_close_fast)
+- Saída disparada -> a venda roda numa thread própria (o stream não para)
+
+As saídas com indicadores (RSI, tendência, queda brusca) ficam no ciclo.
+
+    lane = ExitLane(evaluate=checa_saida, on_exit=fecha_posicao)
+    lane.start(positions.keys())
+    lane.update_symbols(positions.keys())   # posição abriu/fechou
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional
+
+from src.core.websocket_client import BinanceWebSocket, HAS_WEBSOCKETS
+
+logger = logging.getLogger(__name__)
+
+
+def _key(symbol: str) -> str:
+    """Normaliza símbolo (BTC/USDT -> BTCUSDT)"""
+    return symbol.upper().replace('/', '')
+
+
+class ExitLane:
+    """Stream de preços das posições abertas + checagem de saída a cada tick"""
+
+    def __init__(self, evaluate: Callable[[str, float], Optional[str]],
+                 on_exit: Callable[[str, float, str], None],
+                 stream: str = 'bookTicker', min_interval_ms: float = 100):
+        """
+        Args:
+            evaluate: evaluate(symbol, price) -> motivo da saída ou None
+                      (roda na thread do stream: só regras de preço)
+            on_exit: on_exit(symbol, price, reason) - executa a venda
+            stream: 'bookTicker' (preço = melhor bid) ou 'trade'
+            min_interval_ms: intervalo mínimo entre checagens do mesmo símbolo
+        """
+        self.evaluate = evaluate
+        self.on_exit = on_exit
+        self.stream = stream
+        self.min_interval = min_interval_ms / 1000
+
+        # chave normalizada -> símbolo como está nas posições
+        self._symbols: Dict[str, str] = {}
+        self._last_eval: Dict[str, float] = {}
+        self._pending = set()
+        self._lock = threading.Lock()
+
+        # Vendas fora da thread do stream (uma por vez)
+        self._executor: Optional[ThreadPoolExecutor] = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="ExitLane")
+        self._ws: Optional[BinanceWebSocket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event = threading.Event()
+
+        self.stats = {'ticks': 0, 'evaluations': 0, 'exits': 0, 'errors': 0, 'resubscribes': 0}
+
+    # ===== CICLO DE VIDA =====
+
+    def start(self, symbols: Iterable[str]) -> bool:
+        """Inicia o stream (retorna False sem websockets)"""
+        if not HAS_WEBSOCKETS:
+            logger.warning("⚠️ Via rápida de saída sem websockets - saídas só no ciclo")
+            return False
+        if self._thread is not None and self._thread.is_alive():
+            self.update_symbols(symbols)
+            return True
+
+        with self._lock:
+            self._symbols = {_key(s): s for s in symbols}
+        self._stop_event.clear()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ExitLane")
+        self._thread = threading.Thread(target=self._stream_thread, name="ExitLane", daemon=True)
+        self._thread.start()
+        logger.info(f"⚡ Via rápida de saída: {len(self._symbols)} posições ({self.stream})")
+        return True
+
+    def stop(self):
+        """Para o stream e espera as vendas em andamento"""
+        self._stop_event.set()
+        self._close_connection()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=5)
+        self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def update_symbols(self, symbols: Iterable[str]):
+        """Troca os símbolos monitorados (reconecta só se o conjunto mudou)"""
+        symbols = {_key(s): s for s in symbols}
+        with self._lock:
+            if symbols.keys() == self._symbols.keys():
+                return
+            self._symbols = symbols
+        self.stats['resubscribes'] += 1
+        self._close_connection()
+
+    def _close_connection(self):
+        """Fecha a conexão atual: o loop do stream reconecta com os símbolos novos"""
+        ws = self._ws
+        if ws is None or ws.ws is None or self._loop is None or not self._loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(ws.ws.close(), self._loop)
+        except RuntimeError:
+            pass
+
+    def _stream_thread(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._stream_forever())
+        except Exception as e:
+            logger.error(f"❌ Via rápida de saída finalizada com erro: {e}")
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    async def _stream_forever(self):
+        """Conecta e escuta; reconecta quando os símbolos mudam ou a conexão cai"""
+        retries = 0
+        while not self._stop_event.is_set():
+            with self._lock:
+                symbols = sorted(self._symbols)
+            if not symbols:
+                # Sem posições abertas: nada para assinar
+                await asyncio.sleep(0.5)
+                continue
+
+            self._ws = BinanceWebSocket()
+            if self.stream == 'trade':
+                await self._ws.subscribe_trades(symbols, self._on_trade)
+            else:
+                await self._ws.subscribe_book_tickers(symbols, self._on_book_ticker)
+
+            if self._ws.is_running:
+                retries = 0
+                await self._ws.listen()
+
+            if self._stop_event.is_set():
+                break
+            with self._lock:
+                if sorted(self._symbols) != symbols:
+                    continue   # troca de símbolos: reconecta já
+
+            retries += 1
+            wait_time = min(30, 2 ** retries)
+            logger.warning(f"⚠️ Via rápida de saída: reconectando em {wait_time}s...")
+            for _ in range(wait_time):
+                if self._stop_event.is_set() or sorted(self._symbols) != symbols:
+                    break
+                await asyncio.sleep(1)
+
+    # ===== TICKS =====
+
+    def _on_book_ticker(self, book: dict):
+        # Uma venda a mercado sai no melhor bid
+        self.on_price(book['symbol'], book['bid'])
+
+    def _on_trade(self, trade: dict):
+        self.on_price(trade['symbol'], trade['price'])
+
+    def on_price(self, symbol: str, price: float):
+        """Checa a saída de um símbolo com o preço do tick"""
+        self.stats['ticks'] += 1
+        if price <= 0:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            position_symbol = self._symbols.get(_key(symbol))
+            if position_symbol is None or position_symbol in self._pending:
+                return
+            if now - self._last_eval.get(position_symbol, 0.0) < self.min_interval:
+                return
+            self._last_eval[position_symbol] = now
+
+        self.stats['evaluations'] += 1
+        try:
+            reason = self.evaluate(position_symbol, price)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"❌ Erro na via rápida ({position_symbol}): {e}")
+            return
+
+        if not reason or self._executor is None:
+            return
+
+        with self._lock:
+            self._pending.add(position_symbol)
+        self.stats['exits'] += 1
+        self._executor.submit(self._run_exit, position_symbol, price, reason)
+
+    def _run_exit(self, symbol: str, price: float, reason: str):
+        try:
+            self.on_exit(symbol, price, reason)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"❌ Erro ao sair de {symbol} pela via rápida: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(symbol)
+
+    def get_status(self) -> dict:
+        with self._lock:
+            symbols = len(self._symbols)
+        return {'running': self.running, 'stream': self.stream, 'symbols': symbols, **self.stats}
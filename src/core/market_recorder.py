@@ -0,0 +1,191 @@
+"""
+🎙️ Market Recorder - Gravação do que o bot viu, para replay determinístico
+==========================================================================
+
+Grava, com o timestamp de recebimento:
+- Toda mensagem crua do WebSocket (BinanceWebSocket._handle_message)
+- Toda resposta REST do ccxt (ExchangeClient._request)
+
+Formato: segmentos gzip rotativos em data/recordings/, uma linha por
+mensagem, separada por TAB:
+
+    <recv_ts>\tws\t<mensagem crua da Binance>
+    <recv_ts>\trest\t[método, [args...], resposta]
+
+Barato o suficiente para ficar ligado em produção: o caminho quente só
+coloca a referência numa fila; serialização e compressão (nível 1) rodam
+numa thread própria. Fila cheia -> a mensagem é descartada (e contada),
+nunca bloqueia o bot.
+
+Replay: src/backtest/market_replay.py (MarketReplayer)
+"""
+
+import gzip
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_GLOB = 'segment_*.rec.gz'
+
+
+def rest_key(method: str, args) -> Tuple:
+    """Chave de replay: método + até 2 argumentos posicionais de texto (símbolo, timeframe)"""
+    leading = []
+    for arg in list(args)[:2]:
+        if not isinstance(arg, str):
+            break
+        leading.append(arg)
+    return (method, *leading)
+
+
+class MarketRecorder:
+    """Gravador assíncrono de mensagens WS e respostas REST"""
+
+    def __init__(self, base_dir: str = 'data/recordings', segment_minutes: float = 60,
+                 max_segment_mb: float = 256, max_segments: int = 48,
+                 record_ws: bool = True, record_rest: bool = True,
+                 queue_size: int = 100_000):
+        self.base_dir = Path(base_dir)
+        self.segment_seconds = segment_minutes * 60
+        self.max_segment_bytes = int(max_segment_mb * 1024 * 1024)
+        self.max_segments = max_segments
+        self.record_ws_enabled = record_ws
+        self.record_rest_enabled = record_rest
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self._segment_started = 0.0
+        self._segment_bytes = 0
+
+        self.stats = {'ws': 0, 'rest': 0, 'dropped': 0, 'segments': 0, 'bytes': 0}
+
+    # ===== CAMINHO QUENTE (sem I/O) =====
+
+    def record_ws(self, message: str, recv_ts: Optional[float] = None):
+        """Mensagem crua do WebSocket"""
+        if self.record_ws_enabled:
+            self._put((recv_ts or time.time(), 'ws', message))
+
+    def record_rest(self, method: str, args, result, recv_ts: Optional[float] = None):
+        """Resposta de uma chamada REST (serializada na thread do gravador)"""
+        if self.record_rest_enabled:
+            self._put((recv_ts or time.time(), 'rest', (method, list(args), result)))
+
+    def _put(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.stats['dropped'] += 1
+
+    # ===== THREAD DE ESCRITA =====
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._writer, name="MarketRecorder", daemon=True)
+        self._thread.start()
+        logger.info(f"🎙️ Gravando mercado em {self.base_dir}")
+
+    def stop(self, timeout: float = 10.0):
+        """Esvazia a fila e fecha o segmento atual"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def _writer(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._write(item)
+            except Exception as e:
+                logger.error(f"❌ Erro ao gravar mercado: {e}")
+        self._close_segment()
+
+    def _write(self, item):
+        recv_ts, kind, payload = item
+        if kind == 'ws':
+            line = f"{recv_ts:.6f}\tws\t{payload}\n"
+        else:
+            line = f"{recv_ts:.6f}\trest\t{json.dumps(payload, default=str, separators=(',', ':'))}\n"
+
+        if self._file is None or self._should_rotate():
+            self._rotate()
+        self._file.write(line)
+        self._segment_bytes += len(line)
+        self.stats[kind] += 1
+        self.stats['bytes'] += len(line)
+
+    def _should_rotate(self) -> bool:
+        return (time.time() - self._segment_started >= self.segment_seconds
+                or self._segment_bytes >= self.max_segment_bytes)
+
+    def _rotate(self):
+        self._close_segment()
+        name = f"segment_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.rec.gz"
+        self._file = gzip.open(self.base_dir / name, 'wt', compresslevel=1, encoding='utf-8')
+        self._segment_started = time.time()
+        self._segment_bytes = 0
+        self.stats['segments'] += 1
+
+        # Retenção: mantém só os N segmentos mais novos
+        segments = sorted(self.base_dir.glob(SEGMENT_GLOB))
+        for old in segments[:-self.max_segments] if self.max_segments else []:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+    def _close_segment(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# ===== GRAVADOR ATIVO (singleton) =====
+
+_market_recorder: Optional[MarketRecorder] = None
+
+
+def get_market_recorder() -> Optional[MarketRecorder]:
+    """Gravador ativo, ou None se a gravação está desligada"""
+    return _market_recorder
+
+
+def start_market_recorder(config: Optional[Dict] = None) -> Optional[MarketRecorder]:
+    """Liga a gravação conforme global.recorder do bots_config.yaml"""
+    global _market_recorder
+    config = config or {}
+    if not config.get('enabled', False):
+        return None
+    if _market_recorder is None:
+        _market_recorder = MarketRecorder(
+            base_dir=config.get('dir', 'data/recordings'),
+            segment_minutes=config.get('segment_minutes', 60),
+            max_segment_mb=config.get('max_segment_mb', 256),
+            max_segments=config.get('max_segments', 48),
+            record_ws=config.get('ws', True),
+            record_rest=config.get('rest', True),
+        )
+        _market_recorder.start()
+    return _market_recorder
+
+
+def stop_market_recorder():
+    """Desliga a gravação (fecha o segmento atual)"""
+    global _market_recorder
+    if _market_recorder is not None:
+        _market_recorder.stop()
+        _market_recorder = None
@@ -0,0 +1,169 @@
+"""
+🔁 OHLCV Sync - Sincronização incremental de candles via `since`
+================================================================
+
+Em vez de baixar 200 candles a cada chamada (199 já conhecidos):
+- Primeira chamada: janela completa (limit)
+- Próximas: só os candles a partir do último conhecido (since=último ts),
+  que também atualiza o candle ainda aberto
+- Atraso maior que 1000 candles: pagina com since até alcançar o presente
+- Buraco na janela (ex: resposta parcial): detectado e reparado com um
+  download completo da janela
+- limit maior que o histórico no cache: novo download completo (a não ser
+  que a exchange já tenha devolvido menos que isso - par recém-listado)
+
+Os candles ficam num CandleRingBuffer por (símbolo, timeframe).
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import ccxt
+import numpy as np
+
+from src.core.candle_buffer import CandleRingBuffer
+
+logger = logging.getLogger(__name__)
+
+# Máximo de candles por request no /klines da Binance
+MAX_KLINES_PER_REQUEST = 1000
+
+
+class OHLCVSync:
+    """Cache incremental de OHLCV por (símbolo, timeframe)"""
+
+    def __init__(self, fetch_raw: Callable, capacity: int = 1000):
+        """
+        Args:
+            fetch_raw: fetch_raw(symbol, timeframe, since, limit) -> lista OHLCV ou None
+            capacity: Candles mantidos por (símbolo, timeframe)
+        """
+        self.fetch_raw = fetch_raw
+        self.capacity = capacity
+
+        self._buffers: Dict[Tuple[str, str], CandleRingBuffer] = {}
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        # Buracos que persistem mesmo após reparo (ex: manutenção da exchange)
+        self._known_gaps: Dict[Tuple[str, str], set] = {}
+        # Maior limit já pedido num download completo (histórico disponível)
+        self._full_limits: Dict[Tuple[str, str], int] = {}
+
+        self.stats = {
+            'full_fetches': 0,
+            'delta_fetches': 0,
+            'candles_downloaded': 0,
+            'gap_repairs': 0,
+        }
+
+    @staticmethod
+    def _key(symbol: str, timeframe: str) -> Tuple[str, str]:
+        return symbol.upper().replace('/', ''), timeframe
+
+    def _lock_for(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    @staticmethod
+    def _rows(buf: CandleRingBuffer, limit: int) -> List[list]:
+        """Últimos `limit` candles no formato do fetch_ohlcv"""
+        view = buf.view(limit)
+        return [
+            [int(ts), float(o), float(h), float(l), float(c), float(v)]
+            for ts, o, h, l, c, v in zip(view['timestamp'], view['open'], view['high'],
+                                         view['low'], view['close'], view['volume'])
+        ]
+
+    @staticmethod
+    def find_gaps(buf: CandleRingBuffer, limit: int, timeframe_ms: int) -> set:
+        """Timestamps após os quais a janela dos últimos `limit` candles tem buraco"""
+        ts = buf.view(limit)['timestamp']
+        if len(ts) < 2:
+            return set()
+        return {int(t) for t in ts[:-1][np.diff(ts) != timeframe_ms]}
+
+    def reset(self, symbol: Optional[str] = None, timeframe: Optional[str] = None):
+        """Descarta o cache (de um par/timeframe ou tudo)"""
+        if symbol is None:
+            self._buffers.clear()
+            self._known_gaps.clear()
+            self._full_limits.clear()
+            return
+        key = self._key(symbol, timeframe or '1m')
+        self._buffers.pop(key, None)
+        self._known_gaps.pop(key, None)
+        self._full_limits.pop(key, None)
+
+    def _full_fetch(self, key, symbol: str, timeframe: str, limit: int) -> Optional[CandleRingBuffer]:
+        rows = self.fetch_raw(symbol, timeframe, None, limit)
+        if not rows:
+            return None
+        buf = CandleRingBuffer(max(self.capacity, limit))
+        buf.extend(rows)
+        self._buffers[key] = buf
+        self._full_limits[key] = max(self._full_limits.get(key, 0), limit)
+        self.stats['full_fetches'] += 1
+        self.stats['candles_downloaded'] += len(rows)
+        return buf
+
+    def fetch(self, symbol: str, timeframe: str = '1h', limit: int = 100) -> Optional[List]:
+        """
+        Retorna os últimos `limit` candles (mesmo formato do fetch_ohlcv),
+        baixando apenas o que ainda não está no cache.
+        """
+        key = self._key(symbol, timeframe)
+        timeframe_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+
+        with self._lock_for(key):
+            buf = self._buffers.get(key)
+
+            # Cache com menos candles que o pedido (limit cresceu): janela completa
+            if (buf is None or len(buf) == 0 or buf.capacity < limit
+                    or (len(buf) < limit and limit > self._full_limits.get(key, 0))):
+                buf = self._full_fetch(key, symbol, timeframe, limit)
+                return self._rows(buf, limit) if buf is not None else None
+
+            now_ms = int(time.time() * 1000)
+            since = buf.last_timestamp
+            missing = (now_ms - since) // timeframe_ms + 1
+
+            # Atraso maior que o cache inteiro: baixar tudo de novo é mais barato
+            if missing > buf.capacity:
+                buf = self._full_fetch(key, symbol, timeframe, limit)
+                return self._rows(buf, limit) if buf is not None else None
+
+            # Delta: a partir do último candle conhecido (atualiza o candle aberto)
+            while True:
+                request_limit = int(min(MAX_KLINES_PER_REQUEST, missing + 1))
+                rows = self.fetch_raw(symbol, timeframe, since, request_limit)
+                if rows is None:
+                    return None
+
+                self.stats['delta_fetches'] += 1
+                self.stats['candles_downloaded'] += len(rows)
+                buf.extend(rows)
+
+                if len(rows) < request_limit or rows[-1][0] <= since:
+                    break
+                since = rows[-1][0]
+                missing = (now_ms - since) // timeframe_ms + 1
+                if missing <= 1:
+                    break
+
+            # Buraco novo na janela -> repara com download completo
+            gaps = self.find_gaps(buf, limit, timeframe_ms)
+            if gaps - self._known_gaps.get(key, set()):
+                logger.warning(f"🔁 Buraco nos candles de {symbol} ({timeframe}) - reparando")
+                self.stats['gap_repairs'] += 1
+                repaired = self._full_fetch(key, symbol, timeframe, limit)
+                if repaired is not None:
+                    buf = repaired
+                    # O que sobrar é buraco real da exchange: não repara de novo
+                    self._known_gaps[key] = self.find_gaps(buf, limit, timeframe_ms)
+
+            return self._rows(buf, limit)
@@ -0,0 +1,274 @@
+"""
+📈 PnL Aggregates - Agregados de PnL atualizados a cada trade fechado
+====================================================================
+
+Antes: PnL do dia/mês, win rate, streak etc. eram recalculados do zero
+em vários lugares, relendo o histórico inteiro e parseando o timestamp
+de cada trade (dashboard a cada ciclo, /dashboard/comparison com sort
+por bot, AI Monitor, calculators do frontend).
+
+Agora um único store é atualizado no fechamento do trade (O(1)):
+- Por bot: trades, wins/losses, PnL total, melhor/pior trade,
+  duração média, streak atual (+N wins / -N losses), últimos N PnLs
+- Buckets por dia (YYYY-MM-DD) e mês (YYYY-MM) por bot (chave = fatia
+  da string ISO, sem parse de data)
+
+Leituras em O(1) no número de trades:
+
+    agg = get_pnl_aggregates()          # processo do engine (vivo)
+    agg.daily_pnl()                     # PnL de hoje, todos os bots
+    agg.bot_summary('bot_estavel')
+
+    load_pnl_aggregates()               # outro processo (backend): lê o arquivo
+
+O estado é salvo em <DATA_DIR>/pnl_aggregates.json (write-behind). Sem o
+arquivo, o engine reconstrói uma vez a partir do journal de trades.
+Um store por arquivo (caminho resolvido): engine, GoalMonitor e backend
+caem no mesmo arquivo qualquer que seja a ordem dos imports.
+"""
+
+import json
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from src.core.utils import get_data_dir
+from src.core.write_behind import get_write_behind
+
+logger = logging.getLogger(__name__)
+
+RECENT_TRADES = 20
+
+
+def default_pnl_path() -> Path:
+    """pnl_aggregates.json no diretório de dados (o mesmo para engine e backend)"""
+    return get_data_dir() / 'pnl_aggregates.json'
+
+
+def _new_stats() -> Dict:
+    return {
+        'trades': 0,
+        'wins': 0,
+        'losses': 0,
+        'total_pnl': 0.0,
+        'best_trade': 0.0,
+        'worst_trade': 0.0,
+        'duration_sum': 0.0,
+        'duration_count': 0,
+        'streak': 0,
+        'last_trade': None,
+    }
+
+
+def _new_bucket() -> Dict:
+    return {'pnl': 0.0, 'trades': 0, 'wins': 0, 'losses': 0}
+
+
+def trade_pnl(trade: Dict) -> float:
+    return float(trade.get('pnl_usd', trade.get('pnl', 0)) or 0)
+
+
+def trade_time(trade: Dict) -> str:
+    return trade.get('exit_time') or trade.get('timestamp') or datetime.now().isoformat()
+
+
+class PnLAggregates:
+    """Totais, streaks e buckets dia/mês de PnL por bot"""
+
+    def __init__(self, path: Optional[str], keep_days: int = 400,
+                 recent_trades: int = RECENT_TRADES):
+        """
+        Args:
+            path: arquivo do estado (None = só memória)
+            keep_days: retenção dos buckets diários (meses ficam todos)
+            recent_trades: PnLs recentes guardados por bot (janela do AI Monitor)
+        """
+        self.path = Path(path) if path else None
+        self.keep_days = keep_days
+        self.recent_trades = recent_trades
+
+        self._lock = threading.Lock()
+        self.bots: Dict[str, Dict] = {}
+        self.recent: Dict[str, deque] = {}
+        self.days: Dict[str, Dict[str, Dict]] = {}
+        self.months: Dict[str, Dict[str, Dict]] = {}
+
+    # ===== ATUALIZAÇÃO =====
+
+    def record(self, trade: Dict, save: bool = True):
+        """Contabiliza um trade fechado"""
+        bot_type = trade.get('bot_type', 'unknown')
+        pnl = trade_pnl(trade)
+        when = trade_time(trade)
+        day, month = when[:10], when[:7]
+        win = pnl > 0
+
+        with self._lock:
+            stats = self.bots.setdefault(bot_type, _new_stats())
+            if not stats['trades']:
+                stats['best_trade'] = stats['worst_trade'] = pnl
+            stats['trades'] += 1
+            stats['wins' if win else 'losses'] += 1
+            stats['total_pnl'] += pnl
+            stats['best_trade'] = max(stats['best_trade'], pnl)
+            stats['worst_trade'] = min(stats['worst_trade'], pnl)
+            if trade.get('duration_min'):
+                stats['duration_sum'] += trade['duration_min']
+                stats['duration_count'] += 1
+            if win:
+                stats['streak'] = stats['streak'] + 1 if stats['streak'] > 0 else 1
+            else:
+                stats['streak'] = stats['streak'] - 1 if stats['streak'] < 0 else -1
+            stats['last_trade'] = when
+
+            self.recent.setdefault(bot_type, deque(maxlen=self.recent_trades)).append(pnl)
+
+            if day not in self.days:
+                self.days[day] = {}
+                self._prune_days()
+            for buckets in (self.days[day], self.months.setdefault(month, {})):
+                bucket = buckets.setdefault(bot_type, _new_bucket())
+                bucket['pnl'] += pnl
+                bucket['trades'] += 1
+                bucket['wins' if win else 'losses'] += 1
+
+        if save:
+            self.save(urgent=True)
+
+    def _prune_days(self):
+        """Retenção dos buckets diários (roda só quando um dia novo aparece)"""
+        if self.keep_days and len(self.days) > self.keep_days:
+            for day in sorted(self.days)[:len(self.days) - self.keep_days]:
+                del self.days[day]
+
+    def rebuild(self, trades: Iterable[Dict]) -> int:
+        """Recalcula tudo a partir do histórico (uma vez, sem arquivo de estado)"""
+        with self._lock:
+            self.bots, self.recent, self.days, self.months = {}, {}, {}, {}
+        count = 0
+        for trade in sorted(trades, key=trade_time):
+            self.record(trade, save=False)
+            count += 1
+        self.save()
+        return count
+
+    # ===== CONSULTA =====
+
+    def daily_pnl(self, day: Optional[str] = None, bot_type: Optional[str] = None) -> float:
+        """PnL do dia (padrão hoje), de um bot ou de todos"""
+        day = day or datetime.now().strftime('%Y-%m-%d')
+        return self._bucket_pnl(self.days.get(day, {}), bot_type)
+
+    def monthly_pnl(self, month: Optional[str] = None, bot_type: Optional[str] = None) -> float:
+        """PnL do mês (padrão mês atual), de um bot ou de todos"""
+        month = month or datetime.now().strftime('%Y-%m')
+        return self._bucket_pnl(self.months.get(month, {}), bot_type)
+
+    def _bucket_pnl(self, buckets: Dict[str, Dict], bot_type: Optional[str]) -> float:
+        with self._lock:
+            if bot_type:
+                return buckets.get(bot_type, {}).get('pnl', 0.0)
+            return sum(bucket['pnl'] for bucket in buckets.values())
+
+    def daily_by_bot(self, day: Optional[str] = None) -> Dict[str, float]:
+        day = day or datetime.now().strftime('%Y-%m-%d')
+        with self._lock:
+            return {bot: bucket['pnl'] for bot, bucket in self.days.get(day, {}).items()}
+
+    def monthly_by_bot(self, month: Optional[str] = None) -> Dict[str, float]:
+        month = month or datetime.now().strftime('%Y-%m')
+        with self._lock:
+            return {bot: bucket['pnl'] for bot, bucket in self.months.get(month, {}).items()}
+
+    def recent_pnls(self, bot_type: str) -> List[float]:
+        """Últimos recent_trades PnLs do bot (mais antigo primeiro)"""
+        with self._lock:
+            return list(self.recent.get(bot_type, ()))
+
+    def bot_summary(self, bot_type: str) -> Dict:
+        """Resumo do bot no formato do /dashboard/comparison"""
+        with self._lock:
+            stats = dict(self.bots.get(bot_type) or _new_stats())
+        trades = stats['trades']
+        return {
+            'total_trades': trades,
+            'wins': stats['wins'],
+            'losses': stats['losses'],
+            'win_rate': stats['wins'] / trades * 100 if trades else 0,
+            'total_pnl': stats['total_pnl'],
+            'daily_pnl': self.daily_pnl(bot_type=bot_type),
+            'monthly_pnl': self.monthly_pnl(bot_type=bot_type),
+            'avg_profit': stats['total_pnl'] / trades if trades else 0,
+            'avg_duration': stats['duration_sum'] / stats['duration_count'] if stats['duration_count'] else 0,
+            'best_trade': stats['best_trade'],
+            'worst_trade': stats['worst_trade'],
+            'current_streak': stats['streak'],
+            'last_trade': stats['last_trade'],
+        }
+
+    def is_empty(self) -> bool:
+        return not self.bots
+
+    # ===== PERSISTÊNCIA =====
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'bots': self.bots,
+                'recent': {bot: list(pnls) for bot, pnls in self.recent.items()},
+                'days': self.days,
+                'months': self.months,
+                'updated_at': datetime.now().isoformat(),
+            }
+
+    def save(self, urgent: bool = False):
+        if self.path is not None:
+            get_write_behind().put(self.path, self.to_dict(), indent=None, urgent=urgent)
+
+    def load(self) -> bool:
+        """Carrega o estado salvo (False se não houver arquivo válido)"""
+        if self.path is None or not self.path.exists():
+            return False
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠️ PnL aggregates: estado inválido em {self.path}: {e}")
+            return False
+        with self._lock:
+            self.bots = {bot: {**_new_stats(), **stats} for bot, stats in data.get('bots', {}).items()}
+            self.recent = {bot: deque(pnls, maxlen=self.recent_trades)
+                           for bot, pnls in data.get('recent', {}).items()}
+            self.days = data.get('days', {})
+            self.months = data.get('months', {})
+        return True
+
+
+# ===== STORE DO PROCESSO (singleton) =====
+
+_pnl_aggregates: Dict[Path, PnLAggregates] = {}
+_pnl_aggregates_lock = threading.Lock()
+
+
+def get_pnl_aggregates(path: Optional[str] = None) -> PnLAggregates:
+    """
+    Store do processo para o arquivo (None = default_pnl_path()),
+    carregado na primeira chamada com esse caminho
+    """
+    key = Path(path or default_pnl_path()).resolve()
+    with _pnl_aggregates_lock:
+        aggregates = _pnl_aggregates.get(key)
+        if aggregates is None:
+            aggregates = _pnl_aggregates[key] = PnLAggregates(str(key))
+            aggregates.load()
+        return aggregates
+
+
+def load_pnl_aggregates(path: Optional[str] = None) -> PnLAggregates:
+    """Leitura por outro processo (backend, scripts): foto do arquivo atual"""
+    aggregates = PnLAggregates(str(path or default_pnl_path()))
+    aggregates.load()
+    return aggregates
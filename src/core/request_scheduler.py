@@ -0,0 +1,263 @@
+"""
+🚦 Request Scheduler - Orçamento de peso da Binance com prioridades
+==================================================================
+
+Todas as chamadas REST passam pelo ExchangeClient, que consulta este
+agendador antes de ir à exchange:
+
+- Token bucket com o limite de peso por minuto (REQUEST_WEIGHT da Binance)
+- Sincronizado com o header X-MBX-USED-WEIGHT-1M de cada resposta
+- Classes de prioridade: ORDEM > POSIÇÃO > SCAN > ANALYTICS
+  Cada classe tem uma reserva: tarefas de baixa prioridade param de
+  consumir antes, deixando sempre folga para ordens
+- 429/418: backoff global (Retry-After). Durante o backoff apenas ordens
+  passam; o resto é descartado na hora
+- Exchange lenta ou com erros (ApiCallStats): pausa só as classes de
+  menor prioridade (throttle)
+- Esperas curtas (max_wait por classe) e o chamador pode encurtá-las:
+  a thread de trading não fica parada esperando orçamento
+
+    with request_wait(0.25):     # no máximo 250ms por chamada neste bloco
+        exchange.fetch_ticker('BTCUSDT')
+
+A prioridade vem do próprio método (ordem, ticker, ...) ou do contexto
+(que nunca rebaixa uma ordem):
+
+    with request_priority(RequestPriority.ANALYTICS):
+        exchange.fetch_ohlcv('BTCUSDT', '1h', limit=500)
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RequestPriority(IntEnum):
+    """Classes de prioridade (menor = mais importante)"""
+    ORDER = 0       # Criar/consultar ordens
+    POSITION = 1    # Preços de posições abertas (stop loss / take profit)
+    SCAN = 2        # Busca de entradas
+    ANALYTICS = 3   # AutoTuner, dashboard, backfill
+
+
+class RequestDropped(Exception):
+    """Requisição descartada pelo agendador (sem orçamento de peso)"""
+
+
+# Prioridade definida pelo chamador (sobrepõe a padrão do método, exceto ORDER)
+_current_priority: contextvars.ContextVar = contextvars.ContextVar('request_priority', default=None)
+
+# Espera máxima definida pelo chamador (limita a da classe; 0 = não espera)
+_current_max_wait: contextvars.ContextVar = contextvars.ContextVar('request_max_wait', default=None)
+
+
+@contextmanager
+def request_priority(priority: RequestPriority):
+    """Define a prioridade das chamadas REST feitas dentro do bloco"""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+@contextmanager
+def request_wait(max_wait: float):
+    """Limita a espera por orçamento das chamadas feitas dentro do bloco"""
+    token = _current_max_wait.set(max_wait)
+    try:
+        yield
+    finally:
+        _current_max_wait.reset(token)
+
+
+def current_priority(default: RequestPriority) -> RequestPriority:
+    """
+    Prioridade do contexto atual (ou a padrão do método).
+    Ordens ficam sempre como ORDER: um bloco de analytics em volta não
+    pode fazer uma ordem esperar ou ser descartada.
+    """
+    priority = _current_priority.get()
+    if priority is None or default == RequestPriority.ORDER:
+        return default
+    return priority
+
+
+class RequestScheduler:
+    """Token bucket de peso por minuto com reservas por prioridade"""
+
+    # Fração do orçamento que precisa SOBRAR para a classe poder consumir
+    DEFAULT_RESERVES = {
+        RequestPriority.ORDER: 0.0,
+        RequestPriority.POSITION: 0.10,
+        RequestPriority.SCAN: 0.30,
+        RequestPriority.ANALYTICS: 0.50,
+    }
+
+    # Espera máxima (s) antes de descartar (None = espera o necessário).
+    # Curtas: quem espera é a thread de trading/saídas; sem orçamento agora,
+    # o próximo ciclo tenta de novo
+    DEFAULT_MAX_WAIT = {
+        RequestPriority.ORDER: None,
+        RequestPriority.POSITION: 1.0,
+        RequestPriority.SCAN: 0.5,
+        RequestPriority.ANALYTICS: 0.0,
+    }
+
+    def __init__(self, weight_per_minute: int = 6000, safety_margin: float = 0.9,
+                 reserves: Optional[Dict] = None, max_wait: Optional[Dict] = None):
+        self.capacity = weight_per_minute * safety_margin
+        self.refill_per_second = self.capacity / 60.0
+        self.reserves = {**self.DEFAULT_RESERVES,
+                         **{self._priority(k): v for k, v in (reserves or {}).items()}}
+        self.max_wait = {**self.DEFAULT_MAX_WAIT,
+                         **{self._priority(k): v for k, v in (max_wait or {}).items()}}
+
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._banned_until = 0.0
+        self._throttled_until: Dict[RequestPriority, float] = {}
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'granted': {p.name: 0 for p in RequestPriority},
+            'dropped': {p.name: 0 for p in RequestPriority},
+            'waited_seconds': 0.0,
+            'rate_limited': 0,
+            'throttles': 0,
+            'used_weight_1m': 0,
+        }
+
+    @staticmethod
+    def _priority(key) -> RequestPriority:
+        """Aceita o nome ('POSITION', do YAML) ou o valor da classe"""
+        return RequestPriority[key.upper()] if isinstance(key, str) else RequestPriority(key)
+
+    # ===== ORÇAMENTO =====
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.refill_per_second)
+        self._last_refill = now
+
+    def _try_take(self, weight: float, priority: RequestPriority) -> float:
+        """Tenta consumir; retorna 0 se conseguiu ou os segundos até ter orçamento"""
+        with self._lock:
+            self._refill()
+
+            if priority != RequestPriority.ORDER:
+                now = time.monotonic()
+                ban_left = max(self._banned_until, self._throttled_until.get(priority, 0.0)) - now
+                if ban_left > 0:
+                    return ban_left
+
+            floor = self.reserves.get(priority, 0.0) * self.capacity
+            if priority == RequestPriority.ORDER or self._tokens - weight >= floor:
+                self._tokens -= weight
+                return 0.0
+
+            return (floor + weight - self._tokens) / self.refill_per_second
+
+    def acquire(self, weight: float, priority: RequestPriority,
+                max_wait: Optional[float] = None) -> bool:
+        """
+        Reserva `weight` do orçamento para uma chamada.
+
+        Ordens nunca esperam nem são descartadas. As demais classes esperam
+        até max_wait[priority] - limitado pelo max_wait do chamador (ou do
+        request_wait em volta) - e, se ainda não couberem, são descartadas.
+        """
+        if priority == RequestPriority.ORDER:
+            max_wait = None
+        else:
+            caller_wait = max_wait if max_wait is not None else _current_max_wait.get()
+            max_wait = self.max_wait.get(priority)
+            if caller_wait is not None:
+                max_wait = caller_wait if max_wait is None else min(max_wait, caller_wait)
+        waited = 0.0
+
+        while True:
+            wait = self._try_take(weight, priority)
+            if wait <= 0:
+                self.stats['granted'][priority.name] += 1
+                self.stats['waited_seconds'] += waited
+                return True
+
+            if max_wait is not None and waited + wait > max_wait:
+                self.stats['dropped'][priority.name] += 1
+                return False
+
+            step = min(wait, 0.5)
+            time.sleep(step)
+            waited += step
+
+    # ===== FEEDBACK DA EXCHANGE =====
+
+    def update_from_headers(self, headers: Optional[Dict]):
+        """Sincroniza o bucket com o peso usado informado pela Binance"""
+        if not headers:
+            return
+
+        used = None
+        for key, value in headers.items():
+            if key.lower() == 'x-mbx-used-weight-1m':
+                try:
+                    used = int(value)
+                except (TypeError, ValueError):
+                    return
+                break
+
+        if used is None:
+            return
+
+        with self._lock:
+            self._refill()
+            self.stats['used_weight_1m'] = used
+            # A exchange é a fonte da verdade: nunca acredita em mais folga que ela
+            self._tokens = min(self._tokens, self.capacity - used)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None, banned: bool = False):
+        """429 (rate limit) ou 418 (IP banido): zera o orçamento e pausa o não-urgente"""
+        backoff = retry_after if retry_after else (120.0 if banned else 30.0)
+        with self._lock:
+            self._tokens = 0.0
+            self._last_refill = time.monotonic()
+            self._banned_until = max(self._banned_until, time.monotonic() + backoff)
+        self.stats['rate_limited'] += 1
+        logger.warning(f"🚦 {'IP banido (418)' if banned else 'Rate limit (429)'} - "
+                       f"pausando requisições não-urgentes por {backoff:.0f}s")
+
+    def throttle(self, priority: RequestPriority, seconds: float):
+        """
+        Pausa por `seconds` a classe `priority` e as menos importantes.
+        Ordens nunca são pausadas.
+        """
+        until = time.monotonic() + seconds
+        with self._lock:
+            for p in RequestPriority:
+                if p >= priority and p != RequestPriority.ORDER:
+                    self._throttled_until[p] = max(self._throttled_until.get(p, 0.0), until)
+        self.stats['throttles'] += 1
+
+    def get_status(self) -> dict:
+        """Status para logs/dashboard"""
+        with self._lock:
+            self._refill()
+            tokens = self._tokens
+            now = time.monotonic()
+            ban_left = max(0.0, self._banned_until - now)
+            throttled = {p.name: round(until - now, 1)
+                         for p, until in self._throttled_until.items() if until > now}
+        return {
+            'available_weight': round(tokens, 1),
+            'capacity': self.capacity,
+            'backoff_seconds': round(ban_left, 1),
+            'throttled_seconds': throttled,
+            **self.stats,
+        }
@@ -0,0 +1,196 @@
+"""
+📸 Ticker Snapshot - Preços de TODOS os pares numa única leitura
+================================================================
+
+Em vez de um fetch_ticker por ativo (N requests para avaliar a carteira):
+- Stream !miniTicker@arr (WebSocket, todos os pares a cada ~1s), ou
+- UM fetch_tickers via REST quando o stream não está disponível
+
+O resultado é um TickerSnapshot imutável, compartilhado pelo ciclo:
+
+    snapshot = exchange.get_ticker_snapshot()
+    price = snapshot.price('BTCUSDT')
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
+
+from src.core.websocket_client import BinanceWebSocket, HAS_WEBSOCKETS
+
+logger = logging.getLogger(__name__)
+
+
+def _key(symbol: str) -> str:
+    """Normaliza símbolo (BTC/USDT -> BTCUSDT)"""
+    return symbol.upper().replace('/', '')
+
+
+class TickerSnapshot:
+    """Mapa imutável símbolo -> ticker, tirado num instante"""
+
+    def __init__(self, tickers: Mapping[str, dict], taken_at: Optional[float] = None,
+                 source: str = 'rest'):
+        self._tickers = MappingProxyType({
+            _key(symbol): MappingProxyType(dict(ticker))
+            for symbol, ticker in tickers.items()
+        })
+        self.taken_at = taken_at or time.time()
+        self.source = source
+
+    @classmethod
+    def from_ccxt(cls, tickers: Mapping[str, dict]) -> 'TickerSnapshot':
+        """Cria a partir do retorno do fetch_tickers do ccxt"""
+        return cls(tickers or {}, source='rest')
+
+    def __contains__(self, symbol: str) -> bool:
+        return _key(symbol) in self._tickers
+
+    def __len__(self) -> int:
+        return len(self._tickers)
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.taken_at
+
+    def get(self, symbol: str) -> Optional[Mapping]:
+        """Ticker do símbolo (mesmo formato do fetch_ticker) ou None"""
+        return self._tickers.get(_key(symbol))
+
+    def price(self, symbol: str, default: Optional[float] = None) -> Optional[float]:
+        """Último preço do símbolo"""
+        ticker = self.get(symbol)
+        if not ticker:
+            return default
+        price = ticker.get('last') or ticker.get('close')
+        return price if price else default
+
+
+class TickerFeed:
+    """
+    Fonte de snapshots: stream !miniTicker@arr com fallback para fetch_tickers.
+
+    O stream roda numa thread com event loop próprio (como o CandleStore).
+    """
+
+    def __init__(self, client, stale_after_seconds: float = 10.0):
+        self.client = client
+        self.stale_after_seconds = stale_after_seconds
+
+        self._tickers: Dict[str, dict] = {}
+        self._last_message = 0.0
+        self._lock = threading.Lock()
+
+        self._snapshot: Optional[TickerSnapshot] = None
+        self._ws: Optional[BinanceWebSocket] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop_event = threading.Event()
+
+        self.stats = {'ws_snapshots': 0, 'rest_snapshots': 0, 'cached_snapshots': 0}
+
+    # ===== STREAM =====
+
+    def start_stream(self) -> bool:
+        """Inicia o stream !miniTicker@arr (retorna False sem websockets)"""
+        if not HAS_WEBSOCKETS:
+            logger.warning("⚠️ TickerFeed sem websockets - snapshots via REST")
+            return False
+        if self._thread is not None and self._thread.is_alive():
+            return True
+
+        self._stop_event.clear()
+        self._ws = BinanceWebSocket()
+        self._ws.on_mini_tickers = self._on_mini_tickers
+        self._thread = threading.Thread(target=self._stream_thread, name="TickerFeed", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop_stream(self):
+        """Para o stream"""
+        self._stop_event.set()
+        if self._ws is not None:
+            self._ws.is_running = False
+            if self._loop is not None and self._loop.is_running():
+                try:
+                    asyncio.run_coroutine_threadsafe(self._ws.stop(), self._loop)
+                except RuntimeError:
+                    pass
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def _stream_thread(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._stream_forever())
+        except Exception as e:
+            logger.error(f"❌ TickerFeed finalizado com erro: {e}")
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    async def _stream_forever(self):
+        """Conecta e escuta, reconectando com backoff exponencial"""
+        retries = 0
+        while not self._stop_event.is_set():
+            await self._ws.subscribe_all_mini_tickers()
+            if self._ws.is_running:
+                retries = 0
+                await self._ws.listen()
+
+            if self._stop_event.is_set():
+                break
+
+            retries += 1
+            wait_time = min(30, 2 ** retries)
+            logger.warning(f"⚠️ TickerFeed: reconectando em {wait_time}s...")
+            for _ in range(wait_time):
+                if self._stop_event.is_set():
+                    break
+                await asyncio.sleep(1)
+
+    def _on_mini_tickers(self, tickers: list):
+        """Callback do stream: atualiza o mapa de preços"""
+        with self._lock:
+            for ticker in tickers:
+                self._tickers[ticker['symbol']] = ticker
+            self._last_message = time.time()
+
+    def is_stream_fresh(self) -> bool:
+        with self._lock:
+            has_data = bool(self._tickers)
+            last = self._last_message
+        return has_data and (time.time() - last) <= self.stale_after_seconds
+
+    # ===== SNAPSHOT =====
+
+    def snapshot(self, max_age: float = 2.0) -> TickerSnapshot:
+        """
+        Snapshot de preços com no máximo `max_age` segundos.
+
+        Stream ativo -> cópia do mapa do stream (zero requests).
+        Senão -> reaproveita o último snapshot ou faz UM fetch_tickers.
+        """
+        cached = self._snapshot
+        if cached is not None and cached.age_seconds <= max_age:
+            self.stats['cached_snapshots'] += 1
+            return cached
+
+        if self.is_stream_fresh():
+            with self._lock:
+                snapshot = TickerSnapshot(self._tickers, taken_at=self._last_message, source='ws')
+            self.stats['ws_snapshots'] += 1
+        else:
+            snapshot = TickerSnapshot.from_ccxt(self.client.fetch_tickers())
+            self.stats['rest_snapshots'] += 1
+            if not len(snapshot):
+                # Falhou: não guarda, a próxima leitura tenta de novo
+                return snapshot
+
+        self._snapshot = snapshot
+        return snapshot
@@ -0,0 +1,329 @@
+"""
+📒 Trade Journal - Histórico de trades append-only em segmentos JSONL
+====================================================================
+
+Antes: cada trade fechado relia multibot_history.json + o histórico do
+bot, acrescentava 1 item, cortava a lista e reescrevia os dois arquivos
+inteiros (O(histórico) por trade, arquivo truncado se o processo cair no
+meio da escrita).
+
+Agora:
+- Cada trade é UMA linha JSON acrescentada ao segmento ativo: O(1)
+- Segmentos rotativos em <DATA_DIR>/journal/trades/ (segment_000001.jsonl, ...)
+- fsync configurável: 'always' (cada trade), 'interval' ou 'never'
+- Índice lateral (index.jsonl): uma linha por segmento fechado com
+  contagem, primeiro/último timestamp e trades por bot - leituras por
+  bot/período pulam os segmentos que não interessam
+- Retenção: apaga segmentos inteiros (nunca fatia listas)
+- Queda no meio de uma escrita: a linha incompleta é descartada ao reabrir
+
+Leitura (qualquer processo - backend, IA, dashboard):
+
+    read_trades(bot_type='bot_estavel', since='2025-01-01', limit=100)
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from src.core.utils import get_data_dir
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'index.jsonl'
+SEGMENT_GLOB = 'segment_*.jsonl'
+
+TimeBound = Optional[Union[datetime, str]]
+
+
+def _iso(value: TimeBound) -> Optional[str]:
+    if value is None or isinstance(value, str):
+        return value
+    return value.isoformat()
+
+
+def default_journal_dir() -> Path:
+    """journal/trades no diretório de dados (o mesmo para engine e backend)"""
+    return get_data_dir() / 'journal' / 'trades'
+
+
+def _segment_name(seq: int) -> str:
+    return f"segment_{seq:06d}.jsonl"
+
+
+def _new_meta(name: str) -> Dict:
+    return {'segment': name, 'count': 0, 'first': None, 'last': None, 'bots': {}}
+
+
+def _track(meta: Dict, record: Dict):
+    """Atualiza o resumo do segmento com um trade"""
+    ts = record.get('timestamp', '')
+    meta['count'] += 1
+    meta['first'] = ts if meta['first'] is None else min(meta['first'], ts)
+    meta['last'] = ts if meta['last'] is None else max(meta['last'], ts)
+    bot = record.get('bot_type', 'unknown')
+    meta['bots'][bot] = meta['bots'].get(bot, 0) + 1
+
+
+class TradeJournal:
+    """Diário de trades append-only com segmentos, índice e retenção"""
+
+    def __init__(self, base_dir: Optional[str] = None, segment_records: int = 1000,
+                 max_segment_kb: float = 1024, max_segments: int = 50,
+                 fsync: str = 'always', fsync_interval: float = 1.0):
+        """
+        Args:
+            base_dir: diretório dos segmentos (None = default_journal_dir())
+            segment_records: trades por segmento antes de rotacionar
+            max_segment_kb: tamanho máximo do segmento
+            max_segments: retenção (0 = sem limite)
+            fsync: 'always' | 'interval' | 'never' (só flush)
+            fsync_interval: segundos entre fsyncs no modo 'interval'
+        """
+        self.base_dir = Path(base_dir) if base_dir else default_journal_dir()
+        self.segment_records = segment_records
+        self.max_segment_bytes = int(max_segment_kb * 1024)
+        self.max_segments = max_segments
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._active: Optional[Dict] = None
+        self._seq = 0
+        self._last_fsync = 0.0
+
+        self.stats = {'appended': 0, 'segments_rotated': 0, 'segments_dropped': 0, 'recovered_bytes': 0}
+
+    # ===== ESCRITA =====
+
+    def append(self, trade: Dict) -> Dict:
+        """Acrescenta um trade (carimba 'timestamp' se não houver)"""
+        return self.append_many([trade])[-1]
+
+    def append_many(self, trades: Iterable[Dict]) -> List[Dict]:
+        """Acrescenta vários trades com um único fsync"""
+        records = []
+        with self._lock:
+            if self._file is None:
+                self._open()
+            for trade in trades:
+                record = trade if 'timestamp' in trade else {**trade, 'timestamp': datetime.now().isoformat()}
+                line = json.dumps(record, default=str, separators=(',', ':')) + '\n'
+                self._file.write(line.encode('utf-8'))
+                _track(self._active, record)
+                self.stats['appended'] += 1
+                records.append(record)
+                if self._should_rotate():
+                    self._rotate()
+            self._sync()
+        return records
+
+    def _sync(self, force: bool = False):
+        self._file.flush()
+        now = time.monotonic()
+        if force or self.fsync == 'always' or (
+                self.fsync == 'interval' and now - self._last_fsync >= self.fsync_interval):
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+    def _should_rotate(self) -> bool:
+        return (self._active['count'] >= self.segment_records
+                or self._file.tell() >= self.max_segment_bytes)
+
+    def _open(self):
+        """Abre (ou recupera) o segmento ativo"""
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        indexed = {entry['segment'] for entry in self._read_index()}
+        segments = sorted(self.base_dir.glob(SEGMENT_GLOB))
+        self._seq = int(segments[-1].stem.split('_')[1]) if segments else 0
+
+        if segments and segments[-1].name not in indexed:
+            # Continua o último segmento (descarta a linha incompleta de uma queda)
+            path = segments[-1]
+            self._truncate_partial_line(path)
+            self._active = _new_meta(path.name)
+            for record in self._scan(path):
+                _track(self._active, record)
+            self._file = open(path, 'ab')
+        else:
+            self._start_segment()
+
+    def _truncate_partial_line(self, path: Path):
+        with open(path, 'rb+') as f:
+            data = f.read()
+            if not data or data.endswith(b'\n'):
+                return
+            keep = data.rfind(b'\n') + 1
+            f.truncate(keep)
+            self.stats['recovered_bytes'] += len(data) - keep
+            logger.warning(f"📒 Journal: {len(data) - keep} bytes de escrita incompleta descartados em {path.name}")
+
+    def _start_segment(self):
+        self._seq += 1
+        name = _segment_name(self._seq)
+        self._active = _new_meta(name)
+        self._file = open(self.base_dir / name, 'ab')
+
+    def _rotate(self):
+        """Fecha o segmento ativo, registra no índice e aplica a retenção"""
+        self._sync(force=True)
+        self._file.close()
+        with open(self.base_dir / INDEX_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(self._active, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.stats['segments_rotated'] += 1
+        self._start_segment()
+        self._apply_retention()
+
+    def _apply_retention(self):
+        if not self.max_segments:
+            return
+        segments = sorted(self.base_dir.glob(SEGMENT_GLOB))
+        old = segments[:-self.max_segments]
+        if not old:
+            return
+        for path in old:
+            try:
+                path.unlink()
+                self.stats['segments_dropped'] += 1
+            except OSError:
+                pass
+
+        # Índice reescrito sem os segmentos apagados (pequeno: 1 linha por segmento)
+        dropped = {path.name for path in old}
+        entries = [e for e in self._read_index() if e['segment'] not in dropped]
+        tmp = self.base_dir / (INDEX_FILE + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.base_dir / INDEX_FILE)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._sync(force=True)
+                self._file.close()
+                self._file = None
+
+    # ===== LEITURA =====
+
+    def _read_index(self) -> List[Dict]:
+        entries = []
+        try:
+            with open(self.base_dir / INDEX_FILE, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return entries
+
+    @staticmethod
+    def _scan(path: Path) -> Iterable[Dict]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue   # linha incompleta (escrita em andamento)
+        except FileNotFoundError:
+            return
+
+    def read(self, bot_type: Optional[str] = None, since: TimeBound = None,
+             until: TimeBound = None, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Trades em ordem cronológica, filtrados por bot e período
+        (since <= timestamp <= until). limit = os N mais recentes.
+        """
+        since, until = _iso(since), _iso(until)
+        index = {entry['segment']: entry for entry in self._read_index()}
+        segments = sorted(self.base_dir.glob(SEGMENT_GLOB))
+
+        def wanted(path: Path) -> bool:
+            entry = index.get(path.name)
+            if entry is None:
+                return True   # segmento ativo: sem resumo, lê tudo
+            if bot_type and not entry['bots'].get(bot_type):
+                return False
+            if since and entry['last'] and entry['last'] < since:
+                return False
+            if until and entry['first'] and entry['first'] > until:
+                return False
+            return True
+
+        def matches(record: Dict) -> bool:
+            ts = record.get('timestamp', '')
+            return ((not bot_type or record.get('bot_type') == bot_type)
+                    and (not since or ts >= since)
+                    and (not until or ts <= until))
+
+        if limit is None:
+            return [r for path in segments if wanted(path) for r in self._scan(path) if matches(r)]
+
+        # Só os N mais recentes: do segmento mais novo para o mais velho
+        chunks = deque()
+        found = 0
+        for path in reversed(segments):
+            if found >= limit:
+                break
+            if not wanted(path):
+                continue
+            chunk = [r for r in self._scan(path) if matches(r)]
+            chunks.appendleft(chunk)
+            found += len(chunk)
+        return [r for chunk in chunks for r in chunk][-limit:] if limit else []
+
+    def is_empty(self) -> bool:
+        return not any(self.base_dir.glob(SEGMENT_GLOB))
+
+    def import_legacy(self, history_file: Union[str, Path]) -> int:
+        """Importa uma vez o multibot_history.json antigo (journal vazio)"""
+        path = Path(history_file)
+        if not path.exists() or not self.is_empty():
+            return 0
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return 0
+        if isinstance(history, dict):
+            history = history.get('trades', [])
+        trades = sorted(
+            (t for t in history if isinstance(t, dict)),
+            key=lambda t: t.get('timestamp', t.get('exit_time', ''))
+        )
+        self.append_many(trades)
+        logger.info(f"📒 Journal: {len(trades)} trades importados de {path.name}")
+        return len(trades)
+
+    def get_status(self) -> dict:
+        with self._lock:
+            active = dict(self._active) if self._active else None
+        return {
+            'dir': str(self.base_dir),
+            'segments': len(list(self.base_dir.glob(SEGMENT_GLOB))),
+            'active_segment': active['segment'] if active else None,
+            'active_count': active['count'] if active else 0,
+            'fsync': self.fsync,
+            **self.stats,
+        }
+
+
+def read_trades(bot_type: Optional[str] = None, since: TimeBound = None,
+                until: TimeBound = None, limit: Optional[int] = None,
+                base_dir: Optional[str] = None) -> List[Dict]:
+    """Leitura do journal por outro processo (backend, IA, scripts)"""
+    return TradeJournal(base_dir).read(bot_type=bot_type, since=since, until=until, limit=limit)
@@ -1,14 +1,27 @@
 """
 Utilitários e funções auxiliares
 """
+import asyncio
 import yaml
 import logging
 import os
-from typing import Dict
+from pathlib import Path
+from typing import Any, Dict
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
 
+# Raiz do projeto (independe do diretório de execução)
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+def get_data_dir() -> Path:
+    """
+    Diretório de dados do engine, backend e IA: DATA_DIR (subconta;
+    relativo = à raiz do projeto) ou data/ na raiz
+    """
+    return PROJECT_ROOT / os.getenv('DATA_DIR', 'data')
+
 
 def load_config(config_path: str = "config/config.yaml") -> Dict:
     """Carrega arquivo de configuração YAML"""
@@ -70,3 +83,11 @@ def setup_logging(log_level: str = "INFO", log_file: str = "logs/trading_bot.log
 def format_number(value: float, decimals: int = 2) -> str:
     """Formata números para exibição"""
     return f"{value:,.{decimals}f}"
+
+
+async def call_exchange(exchange, method: str, *args, **kwargs) -> Any:
+    """
+    Chama um método do ExchangeClient (síncrono) numa thread, sem
+    bloquear o event loop (o contexto - ex. request_priority - vai junto)
+    """
+    return await asyncio.to_thread(getattr(exchange, method), *args, **kwargs)
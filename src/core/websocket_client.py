@@ -13,10 +13,15 @@ import json
 import asyncio
 import logging
 import os
+import threading
 from datetime import datetime
 from typing import Dict, Callable, Optional, List
+import numpy as np
 import pandas as pd
 
+from src.core.candle_buffer import CandleRingBuffer
+from src.core.market_recorder import get_market_recorder
+
 try:
     import websockets
     HAS_WEBSOCKETS = True
@@ -41,23 +46,28 @@ class BinanceWebSocket:
     MAINNET_WS = "wss://stream.binance.com:9443/ws"
     MAINNET_COMBINED = "wss://stream.binance.com:9443/stream"
     
-    def __init__(self):
+    def __init__(self, max_candles: int = 100):
         self.testnet = False
-        self.base_url = self.MAINNET_WS
-        self.combined_url = self.MAINNET_COMBINED
+        # Sobrescrevível por ambiente (ex: mercado simulado local)
+        self.base_url = os.getenv('BINANCE_WS_URL', self.MAINNET_WS)
+        self.combined_url = os.getenv('BINANCE_WS_COMBINED_URL', self.MAINNET_COMBINED)
         
         self.ws = None
         self.is_running = False
         self.subscriptions: Dict[str, Callable] = {}
         
-        # Cache de candles para cada símbolo
-        self.candles_cache: Dict[str, pd.DataFrame] = {}
-        self.max_candles = 100  # Mantém últimos 100 candles
+        # Cache de candles para cada símbolo (buffer circular NumPy pré-alocado)
+        # (lido por outras threads via CandleStore - acesso protegido por lock)
+        self.candles_cache: Dict[str, CandleRingBuffer] = {}
+        self.max_candles = max_candles
+        self._cache_lock = threading.Lock()
         
         # Callbacks
         self.on_kline: Optional[Callable] = None
         self.on_trade: Optional[Callable] = None
         self.on_ticker: Optional[Callable] = None
+        self.on_book_ticker: Optional[Callable] = None
+        self.on_mini_tickers: Optional[Callable] = None
         self.on_error: Optional[Callable] = None
         
         logger.info(f"🔌 WebSocket inicializado (MAINNET)")
@@ -110,9 +120,10 @@ class BinanceWebSocket:
         
         await self.connect(streams)
         
-        # Inicializa cache de candles
-        for symbol in symbols:
-            self.candles_cache[symbol.upper()] = pd.DataFrame()
+        # Inicializa cache de candles (preserva candles já semeados via REST)
+        with self._cache_lock:
+            for symbol in symbols:
+                self._get_buffer(symbol.upper())
         
         logger.info(f"📊 Inscrito em klines: {symbols} ({interval})")
     
@@ -141,6 +152,27 @@ class BinanceWebSocket:
         logger.info(f"📈 Inscrito em tickers: {symbols}")
     
     
+    async def subscribe_book_tickers(self, symbols: List[str], callback: Optional[Callable] = None):
+        """Inscreve no melhor bid/ask (bookTicker) - atualiza a cada mudança do livro"""
+        
+        streams = [f"{s.lower()}@bookTicker" for s in symbols]
+        
+        if callback:
+            self.on_book_ticker = callback
+        
+        await self.connect(streams)
+        logger.info(f"📗 Inscrito em bookTicker: {symbols}")
+    
+    
+    async def subscribe_all_mini_tickers(self, callback: Optional[Callable] = None):
+        """Inscreve no mini-ticker de TODOS os pares (!miniTicker@arr, ~1s)"""
+        if callback:
+            self.on_mini_tickers = callback
+        
+        await self.connect(['!miniTicker@arr'])
+        logger.info("📈 Inscrito em !miniTicker@arr (todos os pares)")
+    
+    
     async def subscribe_multi(self, symbols: List[str], interval: str = '1m'):
         """
         Inscreve em múltiplos streams de uma vez
@@ -155,9 +187,9 @@ class BinanceWebSocket:
         
         await self.connect(streams)
         
-        for symbol in symbols:
-            key = symbol.upper().replace('/', '')
-            self.candles_cache[key] = pd.DataFrame()
+        with self._cache_lock:
+            for symbol in symbols:
+                self._get_buffer(symbol.upper().replace('/', ''))
         
         logger.info(f"🔄 Inscrito em multi-stream: {len(symbols)} símbolos")
     
@@ -168,6 +200,7 @@ class BinanceWebSocket:
         
         return {
             'symbol': data.get('s', ''),
+            'open_time': int(k.get('t', 0)),  # ms (usado pelo cache)
             'timestamp': pd.to_datetime(k.get('t', 0), unit='ms'),
             'open': float(k.get('o', 0)),
             'high': float(k.get('h', 0)),
@@ -204,48 +237,105 @@ class BinanceWebSocket:
         }
     
     
+    def _parse_book_ticker(self, data: dict) -> dict:
+        """Parse melhor bid/ask (bookTicker não tem campo 'e')"""
+        return {
+            'symbol': data.get('s', ''),
+            'bid': float(data.get('b', 0)),
+            'bid_qty': float(data.get('B', 0)),
+            'ask': float(data.get('a', 0)),
+            'ask_qty': float(data.get('A', 0)),
+            'update_id': int(data.get('u', 0)),
+        }
+    
+    
+    def _parse_mini_ticker(self, data: dict) -> dict:
+        """Parse mini-ticker (formato compatível com o ticker do ccxt)"""
+        close = float(data.get('c', 0))
+        open_ = float(data.get('o', 0))
+        return {
+            'symbol': data.get('s', ''),
+            'last': close,
+            'close': close,
+            'open': open_,
+            'high': float(data.get('h', 0)),
+            'low': float(data.get('l', 0)),
+            'baseVolume': float(data.get('v', 0)),
+            'quoteVolume': float(data.get('q', 0)),
+            'percentage': ((close - open_) / open_ * 100) if open_ else 0.0,
+            'timestamp': int(data.get('E', 0)),
+        }
+    
+    
+    def _get_buffer(self, key: str) -> CandleRingBuffer:
+        """Retorna (criando se necessário) o buffer do símbolo - chamar com lock"""
+        buffer = self.candles_cache.get(key)
+        if buffer is None:
+            buffer = CandleRingBuffer(self.max_candles)
+            self.candles_cache[key] = buffer
+        return buffer
+    
+    
     def _update_candles_cache(self, kline: dict):
-        """Atualiza cache de candles"""
-        symbol = kline['symbol']
-        
-        if symbol not in self.candles_cache:
-            self.candles_cache[symbol] = pd.DataFrame()
-        
-        df = self.candles_cache[symbol]
-        
-        # Cria novo row
-        new_row = pd.DataFrame([{
-            'timestamp': kline['timestamp'],
-            'open': kline['open'],
-            'high': kline['high'],
-            'low': kline['low'],
-            'close': kline['close'],
-            'volume': kline['volume'],
-        }])
-        
-        if kline['is_closed']:
-            # Candle fechado - adiciona ao histórico
-            self.candles_cache[symbol] = pd.concat([df, new_row], ignore_index=True)
-            
-            # Limita tamanho do cache
-            if len(self.candles_cache[symbol]) > self.max_candles:
-                self.candles_cache[symbol] = self.candles_cache[symbol].tail(self.max_candles)
-        else:
-            # Candle em andamento - atualiza último
-            if len(df) > 0:
-                self.candles_cache[symbol].iloc[-1] = new_row.iloc[0]
-            else:
-                self.candles_cache[symbol] = new_row
+        """Atualiza cache de candles (O(1), sem alocação)"""
+        with self._cache_lock:
+            # Mesmo timestamp -> atualiza candle em andamento
+            # Timestamp novo -> adiciona; atrasado -> ignora
+            self._get_buffer(kline['symbol']).upsert(
+                kline['open_time'],
+                kline['open'],
+                kline['high'],
+                kline['low'],
+                kline['close'],
+                kline['volume'],
+            )
+    
+    
+    def seed_candles(self, symbol: str, ohlcv: List[list]):
+        """
+        Semeia o cache com candles obtidos via REST
+        
+        Args:
+            symbol: Símbolo ('BTCUSDT' ou 'BTC/USDT')
+            ohlcv: Lista [[timestamp_ms, open, high, low, close, volume], ...]
+        """
+        key = symbol.upper().replace('/', '')
+        
+        with self._cache_lock:
+            buffer = self._get_buffer(key)
+            buffer.clear()
+            buffer.extend(ohlcv[-self.max_candles:])
     
     
-    def get_candles(self, symbol: str) -> pd.DataFrame:
-        """Retorna DataFrame com candles do símbolo"""
+    def get_candles(self, symbol: str, limit: Optional[int] = None) -> pd.DataFrame:
+        """Retorna DataFrame com os últimos candles do símbolo (cópia)"""
         key = symbol.upper().replace('/', '')
-        return self.candles_cache.get(key, pd.DataFrame())
+        with self._cache_lock:
+            buffer = self.candles_cache.get(key)
+            if buffer is None or len(buffer) == 0:
+                return pd.DataFrame()
+            return buffer.to_dataframe(limit)
+    
+    
+    def get_candle_arrays(self, symbol: str, limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Retorna os últimos candles como views NumPy (zero-cópia).
+        Ver CandleRingBuffer.view - as views acompanham o buffer.
+        """
+        key = symbol.upper().replace('/', '')
+        with self._cache_lock:
+            buffer = self.candles_cache.get(key)
+            if buffer is None:
+                return {}
+            return buffer.view(limit)
     
     
     async def _handle_message(self, message: str):
         """Processa mensagem recebida do WebSocket"""
+        recorder = get_market_recorder()
+        if recorder is not None:
+            recorder.record_ws(message)
+        
         try:
             data = json.loads(message)
             
@@ -256,6 +346,14 @@ class BinanceWebSocket:
             else:
                 stream = None
             
+            # !miniTicker@arr: array com todos os pares
+            if isinstance(data, list):
+                tickers = [self._parse_mini_ticker(t) for t in data
+                           if t.get('e') == '24hrMiniTicker']
+                if tickers and self.on_mini_tickers:
+                    await self._call_callback(self.on_mini_tickers, tickers)
+                return
+            
             # Identifica tipo de evento
             event_type = data.get('e', '')
             
@@ -282,6 +380,12 @@ class BinanceWebSocket:
                 if self.on_ticker:
                     await self._call_callback(self.on_ticker, ticker)
             
+            elif not event_type and 'b' in data and 'a' in data:
+                book = self._parse_book_ticker(data)
+                
+                if self.on_book_ticker:
+                    await self._call_callback(self.on_book_ticker, book)
+            
         except json.JSONDecodeError as e:
             logger.error(f"❌ Erro ao decodificar JSON: {e}")
         except Exception as e:
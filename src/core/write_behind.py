@@ -0,0 +1,236 @@
+"""
+💾 Write-Behind - Persistência coalescida dos documentos de estado
+=================================================================
+
+Antes: a cada ciclo a thread de trading reescrevia, de forma síncrona,
+multibot_positions.json, coordinator_stats.json e dashboard_balances.json
+(este duas vezes seguidas), e as estatísticas do bot a cada trade. Disco
+lento = ciclo lento; processo caindo no meio = JSON truncado.
+
+Agora:
+- put(path, data) só serializa o documento (foto consistente do estado)
+  e marca como sujo - nunca toca o disco na thread de trading
+- Vários put do mesmo documento antes do flush viram UMA escrita
+- Thread de fundo grava os sujos a cada flush_interval segundos, com
+  arquivo temporário + os.replace (leitor nunca vê arquivo pela metade)
+- Eventos de trade (urgent=True) acordam a thread na hora
+- stop() grava tudo o que estiver pendente (shutdown)
+
+Sem a thread rodando (backend, scripts, testes) o put grava na hora,
+igual ao comportamento antigo.
+
+    store = start_write_behind(config['global'].get('persistence'))
+    store.put('data/multibot_positions.json', positions)
+    store.put('data/bot_estavel_stats.json', stats, urgent=True)
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+
+class _Document:
+    """Último conteúdo serializado de um arquivo + flag de sujo"""
+
+    __slots__ = ('payload', 'dirty', 'version')
+
+    def __init__(self):
+        self.payload = b''
+        self.dirty = False
+        self.version = 0
+
+
+def atomic_write(path: PathLike, payload: bytes, fsync: bool = True):
+    """Grava via temporário + rename (o arquivo antigo fica até o replace)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class WriteBehindStore:
+    """Documentos JSON sujos gravados em lote por uma thread de fundo"""
+
+    def __init__(self, flush_interval: float = 1.0, fsync: bool = True):
+        """
+        Args:
+            flush_interval: segundos entre flushes periódicos
+            fsync: fsync do temporário antes do rename
+        """
+        self.flush_interval = max(0.01, float(flush_interval))
+        self.fsync = fsync
+
+        self._docs: Dict[Path, _Document] = {}
+        self._lock = threading.Lock()
+        # Um flush por vez (thread de fundo x flush forçado)
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {
+            'puts': 0,
+            'coalesced': 0,
+            'writes': 0,
+            'flushes': 0,
+            'urgent_flushes': 0,
+            'errors': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+        }
+
+    # ===== CICLO DE VIDA =====
+
+    def start(self):
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._flush_loop, name="WriteBehind", daemon=True)
+        self._thread.start()
+        logger.info(f"💾 Write-behind ativo (flush a cada {self.flush_interval:g}s)")
+
+    def stop(self):
+        """Para a thread e grava todos os documentos pendentes"""
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=10)
+        self._thread = None
+        self.flush()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ===== ESCRITA =====
+
+    def put(self, path: PathLike, data, indent: Optional[int] = 2, urgent: bool = False):
+        """
+        Atualiza o documento (serializa agora, grava depois).
+
+        Args:
+            urgent: evento de trade - acorda a thread para gravar já
+        """
+        payload = json.dumps(data, indent=indent, default=str).encode('utf-8')
+        path = Path(path)
+        with self._lock:
+            doc = self._docs.setdefault(path, _Document())
+            if doc.dirty:
+                self.stats['coalesced'] += 1
+            doc.payload = payload
+            doc.dirty = True
+            doc.version += 1
+            self.stats['puts'] += 1
+
+        if not self.running:
+            self.flush()
+        elif urgent:
+            self.stats['urgent_flushes'] += 1
+            self._wake.set()
+
+    def request_flush(self):
+        """Pede um flush imediato sem esperar (evento de trade)"""
+        if self.running:
+            self.stats['urgent_flushes'] += 1
+            self._wake.set()
+        else:
+            self.flush()
+
+    def flush(self) -> int:
+        """Grava todos os documentos sujos; retorna quantos foram gravados"""
+        with self._io_lock:
+            with self._lock:
+                pending = [(path, doc, doc.payload, doc.version)
+                           for path, doc in self._docs.items() if doc.dirty]
+                for _, doc, _, _ in pending:
+                    doc.dirty = False
+            if not pending:
+                return 0
+
+            start = time.perf_counter()
+            written = 0
+            for path, doc, payload, version in pending:
+                try:
+                    atomic_write(path, payload, self.fsync)
+                    written += 1
+                except OSError as e:
+                    self.stats['errors'] += 1
+                    logger.warning(f"⚠️ Write-behind: erro ao gravar {path.name}: {e}")
+                    with self._lock:
+                        if doc.version == version:
+                            doc.dirty = True   # tenta de novo no próximo flush
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.stats['writes'] += written
+            self.stats['flushes'] += 1
+            self.stats['last_flush_ms'] = round(elapsed_ms, 2)
+            self.stats['max_flush_ms'] = round(max(self.stats['max_flush_ms'], elapsed_ms), 2)
+            return written
+
+    def _flush_loop(self):
+        while not self._stop_event.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"❌ Write-behind: erro no flush: {e}")
+
+    # ===== CONSULTA =====
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for doc in self._docs.values() if doc.dirty)
+
+    def get_status(self) -> dict:
+        return {
+            'running': self.running,
+            'flush_interval_s': self.flush_interval,
+            'documents': len(self._docs),
+            'pending': self.pending(),
+            **self.stats,
+        }
+
+
+# ===== STORE GLOBAL (singleton) =====
+
+_write_behind: Optional[WriteBehindStore] = None
+
+
+def get_write_behind() -> WriteBehindStore:
+    """Store global (sem start() grava na hora, como antes)"""
+    global _write_behind
+    if _write_behind is None:
+        _write_behind = WriteBehindStore()
+    return _write_behind
+
+
+def start_write_behind(config: Optional[Dict] = None) -> WriteBehindStore:
+    """Liga a thread de flush conforme global.persistence do bots_config.yaml"""
+    config = config or {}
+    store = get_write_behind()
+    store.flush_interval = max(0.01, config.get('flush_interval_ms', 1000) / 1000)
+    store.fsync = config.get('fsync', True)
+    if config.get('write_behind', True):
+        store.start()
+    return store
+
+
+def stop_write_behind():
+    """Para a thread e grava o que estiver pendente"""
+    if _write_behind is not None:
+        _write_behind.stop()
@@ -69,6 +69,8 @@ class BackupService:
             "data/config_history/",
             # Históricos
             "data/history/",
+            "data/journal/",
+            "data/pnl_aggregates.json",
             "data/multibot_history.json",
             "data/crypto_profiles.json",
             "data/daily_stats.json",
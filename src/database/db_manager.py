@@ -9,8 +9,12 @@ Sistema robusto de banco de dados SQLite com:
 - Recuperação de falhas
 - Índices otimizados
 - Compressão de backups
+- Escritas de alta frequência (market_data, event_log, portfolio_history)
+  em lote via WriteBuffer
+- Rollups 1m/15m/1h/1d + retenção de market_data e portfolio_history
 """
 
+import atexit
 import os
 import sqlite3
 import json
@@ -19,6 +23,7 @@ import hashlib
 import gzip
 import logging
 import threading
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
@@ -28,9 +33,14 @@ from .models import (
     Trade, BotState, AILearning, MarketData, Backup,
     DailyStats, CREATE_TABLES_SQL
 )
+from .rollups import DEFAULT_MAX_BUCKETS, TimeSeriesRollup, portfolio_point
+from .write_buffer import WriteBuffer
 
 logger = logging.getLogger('DatabaseManager')
 
+# Pontos por série que um gráfico do dashboard comporta
+DEFAULT_MAX_POINTS = 2000
+
 
 class DatabaseManager:
     """
@@ -46,7 +56,21 @@ class DatabaseManager:
     
     VERSION = "3.0.0"
     
-    def __init__(self, db_path: str = "data/app_leonardo.db"):
+    def __init__(self, db_path: str = "data/app_leonardo.db", buffered_writes: bool = True,
+                 batch_rows: int = 500, flush_interval_ms: float = 200, max_queue: int = 10000,
+                 rollups: bool = True, rollup_interval_s: float = 60,
+                 retention_hours: Optional[Dict[str, float]] = None,
+                 rollup_max_buckets: int = DEFAULT_MAX_BUCKETS):
+        """
+        Args:
+            buffered_writes: market_data/event_log/portfolio_history em lote
+                             (False = commit por linha, como antes)
+            batch_rows / flush_interval_ms / max_queue: ver WriteBuffer
+            rollups: consolida market_data/portfolio_history (1m, 15m, 1h, 1d)
+            rollup_interval_s: intervalo entre rodadas de consolidação
+            rollup_max_buckets: buckets por nível por rodada (atraso alcançado aos poucos)
+            retention_hours: horas por resolução ('raw', '1m', '15m', '1h', '1d'), 0 = sempre
+        """
         self.db_path = db_path
         self.db_dir = os.path.dirname(db_path)
         self.backup_dir = os.path.join(self.db_dir, "db_backups")
@@ -61,6 +85,25 @@ class DatabaseManager:
         # Pool de conexões (por thread)
         self._local = threading.local()
         
+        # Rollups + retenção das séries temporais (None = só dados brutos)
+        self.rollup: Optional[TimeSeriesRollup] = None
+        if rollups:
+            self.rollup = TimeSeriesRollup(self._get_connection, self.transaction, retention_hours,
+                                           max_buckets=rollup_max_buckets)
+        self.rollup_interval = rollup_interval_s
+        self._last_rollup = time.monotonic()
+        
+        # Buffer das escritas de alta frequência (None = síncrono)
+        self.write_buffer: Optional[WriteBuffer] = None
+        if buffered_writes:
+            self.write_buffer = WriteBuffer(
+                self.transaction, batch_rows=batch_rows,
+                flush_interval_ms=flush_interval_ms, max_queue=max_queue,
+                after_flush=self._maybe_rollup
+            )
+            # Saída do processo sem close(): não perde o que está na fila
+            atexit.register(self.write_buffer.stop)
+        
         # Inicializar banco
         self._initialize_database()
         
@@ -97,6 +140,51 @@ class DatabaseManager:
             logger.error(f"❌ Transação revertida: {e}")
             raise
     
+    def _write(self, sql: str, params: Tuple):
+        """INSERT de alta frequência: no buffer (lote) ou commit imediato"""
+        if self.write_buffer is not None:
+            self.write_buffer.add(sql, params)
+            return
+        with self.transaction() as conn:
+            conn.execute(sql, params)
+        self._maybe_rollup()
+    
+    def _maybe_rollup(self):
+        """
+        Uma rodada limitada de consolidação se passou rollup_interval desde
+        a última - ou já no próximo flush enquanto houver atraso
+        """
+        if self.rollup is None:
+            return
+        if self.rollup.caught_up and time.monotonic() - self._last_rollup < self.rollup_interval:
+            return
+        self._last_rollup = time.monotonic()
+        self.maintain_time_series(catch_up=False)
+    
+    def maintain_time_series(self, catch_up: bool = True) -> Dict[str, int]:
+        """
+        Consolida market_data/portfolio_history e aplica a retenção.
+        catch_up: repete as rodadas até chegar no presente (False = uma rodada)
+        """
+        if self.rollup is None:
+            return {}
+        try:
+            self.flush_writes()
+            rolled = self.rollup.run()
+            while catch_up and not self.rollup.caught_up:
+                for key, count in self.rollup.run().items():
+                    rolled[key] = rolled.get(key, 0) + count
+            return rolled
+        except Exception as e:
+            logger.error(f"❌ Erro na consolidação das séries: {e}")
+            return {}
+    
+    def flush_writes(self) -> int:
+        """Grava agora as linhas pendentes no buffer (leitura vê o que foi escrito)"""
+        if self.write_buffer is None:
+            return 0
+        return self.write_buffer.flush()
+    
     def _initialize_database(self):
         """Cria tabelas se não existirem"""
         with self._lock:
@@ -326,23 +414,33 @@ class DatabaseManager:
     # ============ MARKET DATA ============
     
     def save_market_data(self, data: MarketData):
-        """Salva dados de mercado"""
-        with self.transaction() as conn:
-            conn.execute("""
-                INSERT OR REPLACE INTO market_data (
-                    symbol, timestamp, open_price, high_price, low_price,
-                    close_price, volume, rsi, macd, macd_signal,
-                    bb_upper, bb_lower, fear_greed, sentiment
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                data.symbol, data.timestamp, data.open_price, data.high_price,
-                data.low_price, data.close_price, data.volume, data.rsi,
-                data.macd, data.macd_signal, data.bb_upper, data.bb_lower,
-                data.fear_greed, data.sentiment
-            ))
-    
-    def get_market_history(self, symbol: str, hours: int = 24) -> List[MarketData]:
-        """Busca histórico de mercado"""
+        """Salva dados de mercado (em lote)"""
+        self._write("""
+            INSERT OR REPLACE INTO market_data (
+                symbol, timestamp, open_price, high_price, low_price,
+                close_price, volume, rsi, macd, macd_signal,
+                bb_upper, bb_lower, fear_greed, sentiment
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            data.symbol, data.timestamp, data.open_price, data.high_price,
+            data.low_price, data.close_price, data.volume, data.rsi,
+            data.macd, data.macd_signal, data.bb_upper, data.bb_lower,
+            data.fear_greed, data.sentiment
+        ))
+    
+    def get_market_history(self, symbol: str, hours: int = 24,
+                           max_points: Optional[int] = DEFAULT_MAX_POINTS) -> List[MarketData]:
+        """
+        Busca histórico de mercado
+        
+        Com rollups, a resolução é a mais fina que cobre o período e cabe
+        em max_points (None = a mais fina disponível para o período).
+        """
+        self.flush_writes()
+        if self.rollup is not None:
+            _, rows = self.rollup.history('market_data', hours, max_points, symbol=symbol)
+            return [MarketData(**row) for row in rows]
+        
         start = (datetime.now() - timedelta(hours=hours)).isoformat()
         
         conn = self._get_connection()
@@ -396,19 +494,20 @@ class DatabaseManager:
     def log_event(self, event_type: str, message: str, 
                   bot_name: str = None, data: Dict = None, 
                   severity: str = 'INFO'):
-        """Registra evento no log"""
-        with self.transaction() as conn:
-            conn.execute("""
-                INSERT INTO event_log (event_type, bot_name, message, data, severity)
-                VALUES (?, ?, ?, ?, ?)
-            """, (
-                event_type, bot_name, message, 
-                json.dumps(data) if data else None, severity
-            ))
+        """Registra evento no log (em lote; created_at = hora do evento)"""
+        self._write("""
+            INSERT INTO event_log (event_type, bot_name, message, data, severity, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (
+            event_type, bot_name, message, 
+            json.dumps(data) if data else None, severity,
+            datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        ))
     
     def get_events(self, event_type: str = None, 
                    severity: str = None, hours: int = 24) -> List[Dict]:
         """Busca eventos do log"""
+        self.flush_writes()
         start = (datetime.now() - timedelta(hours=hours)).isoformat()
         
         query = "SELECT * FROM event_log WHERE created_at>=?"
@@ -471,22 +570,28 @@ class DatabaseManager:
     
     def save_portfolio_snapshot(self, total_usdt: float, total_crypto: float,
                                  bot_balances: Dict, positions: List):
-        """Salva snapshot do portfólio"""
-        with self.transaction() as conn:
-            conn.execute("""
-                INSERT INTO portfolio_history (
-                    timestamp, total_balance_usdt, total_balance_crypto,
-                    bot_balances, positions
-                ) VALUES (?, ?, ?, ?, ?)
-            """, (
-                datetime.now().isoformat(),
-                total_usdt, total_crypto,
-                json.dumps(bot_balances),
-                json.dumps(positions)
-            ))
-    
-    def get_portfolio_history(self, hours: int = 24) -> List[Dict]:
-        """Busca histórico do portfólio"""
+        """Salva snapshot do portfólio (em lote)"""
+        self._write("""
+            INSERT INTO portfolio_history (
+                timestamp, total_balance_usdt, total_balance_crypto,
+                bot_balances, positions, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?)
+        """, (
+            datetime.now().isoformat(),
+            total_usdt, total_crypto,
+            json.dumps(bot_balances),
+            json.dumps(positions),
+            datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        ))
+    
+    def get_portfolio_history(self, hours: int = 24,
+                              max_points: Optional[int] = DEFAULT_MAX_POINTS) -> List[Dict]:
+        """Busca histórico do portfólio (resolução como em get_market_history)"""
+        self.flush_writes()
+        if self.rollup is not None:
+            _, rows = self.rollup.history('portfolio_history', hours, max_points)
+            return [portfolio_point(row) for row in rows]
+        
         start = (datetime.now() - timedelta(hours=hours)).isoformat()
         
         conn = self._get_connection()
@@ -496,7 +601,7 @@ class DatabaseManager:
             ORDER BY timestamp
         """, (start,)).fetchall()
         
-        return [dict(row) for row in rows]
+        return [portfolio_point(dict(row)) for row in rows]
     
     # ============ BACKUP ============
     
@@ -515,6 +620,7 @@ class DatabaseManager:
         backup_path = os.path.join(self.backup_dir, backup_name)
         
         try:
+            self.flush_writes()
             with self._lock:
                 # Fazer cópia usando backup API do SQLite
                 conn = self._get_connection()
@@ -662,6 +768,7 @@ class DatabaseManager:
     
     def get_statistics(self) -> Dict:
         """Retorna estatísticas do banco"""
+        self.flush_writes()
         conn = self._get_connection()
         
         stats = {
@@ -687,7 +794,9 @@ class DatabaseManager:
                 'total': conn.execute("SELECT COUNT(*) FROM backups").fetchone()[0],
                 'last': conn.execute("SELECT created_at FROM backups ORDER BY created_at DESC LIMIT 1").fetchone(),
             },
-            'db_size_mb': os.path.getsize(self.db_path) / (1024 * 1024) if os.path.exists(self.db_path) else 0
+            'db_size_mb': os.path.getsize(self.db_path) / (1024 * 1024) if os.path.exists(self.db_path) else 0,
+            'write_buffer': self.write_buffer.get_status() if self.write_buffer else None,
+            'rollups': self.rollup.stats if self.rollup else None
         }
         
         if stats['backups']['last']:
@@ -698,6 +807,7 @@ class DatabaseManager:
     def vacuum(self):
         """Compacta o banco de dados"""
         try:
+            self.flush_writes()
             conn = self._get_connection()
             conn.execute("VACUUM")
             logger.info("✅ Banco de dados compactado")
@@ -705,7 +815,11 @@ class DatabaseManager:
             logger.error(f"❌ Erro ao compactar: {e}")
     
     def close(self):
-        """Fecha conexões"""
+        """Descarrega o buffer de escritas e fecha conexões"""
+        if self.write_buffer is not None:
+            # Já descarregado aqui: o atexit não precisa (nem deve) segurar o buffer
+            atexit.unregister(self.write_buffer.stop)
+            self.write_buffer.stop()
         if hasattr(self._local, 'conn') and self._local.conn:
             self._local.conn.close()
             self._local.conn = None
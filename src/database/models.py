@@ -152,6 +152,9 @@ class MarketData:
     bb_lower: float = 0.0
     fear_greed: int = 50
     sentiment: str = "NEUTRAL"
+    # 'raw' ou rollup ('1m', '15m', '1h', '1d': timestamp = início do bucket)
+    resolution: str = "raw"
+    samples: int = 1
     
     def to_dict(self) -> Dict:
         return {
@@ -169,7 +172,9 @@ class MarketData:
             'bb_upper': self.bb_upper,
             'bb_lower': self.bb_lower,
             'fear_greed': self.fear_greed,
-            'sentiment': self.sentiment
+            'sentiment': self.sentiment,
+            'resolution': self.resolution,
+            'samples': self.samples
         }
 
 
@@ -426,4 +431,41 @@ CREATE TABLE IF NOT EXISTS portfolio_history (
 );
 
 CREATE INDEX IF NOT EXISTS idx_portfolio_time ON portfolio_history(timestamp);
+
+-- Rollups de market_data (resolution: 1m, 15m, 1h, 1d; timestamp = início do bucket)
+CREATE TABLE IF NOT EXISTS market_data_rollup (
+    resolution TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    open_price REAL,
+    high_price REAL,
+    low_price REAL,
+    close_price REAL,
+    volume REAL,
+    rsi REAL,
+    macd REAL,
+    macd_signal REAL,
+    bb_upper REAL,
+    bb_lower REAL,
+    fear_greed INTEGER,
+    sentiment TEXT,
+    samples INTEGER DEFAULT 0,
+    PRIMARY KEY (resolution, symbol, timestamp)
+);
+
+CREATE INDEX IF NOT EXISTS idx_market_rollup_time ON market_data_rollup(resolution, timestamp);
+
+-- Rollups de portfolio_history (último saldo do bucket + mín/máx)
+CREATE TABLE IF NOT EXISTS portfolio_history_rollup (
+    resolution TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    total_balance_usdt REAL,
+    min_balance_usdt REAL,
+    max_balance_usdt REAL,
+    total_balance_crypto REAL,
+    bot_balances TEXT,
+    positions TEXT,
+    samples INTEGER DEFAULT 0,
+    PRIMARY KEY (resolution, timestamp)
+);
 """
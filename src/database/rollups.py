@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+"""
+App Leonardo v3.0 - Rollups e Retenção de Séries Temporais
+==========================================================
+
+market_data e portfolio_history cresciam sem limite, e
+get_market_history / get_portfolio_history varriam faixas cada vez
+maiores.
+
+Agora cada série é reduzida em cascata:
+
+    bruto -> 1m -> 15m -> 1h -> 1d
+
+(market_data_rollup / portfolio_history_rollup, coluna resolution).
+Só buckets completos são consolidados; o último bucket de cada nível é
+reprocessado na rodada seguinte (pega linhas que chegaram atrasadas).
+
+Cada rodada consolida no máximo max_buckets buckets por nível, cada nível
+na sua transação: a primeira rodada num banco antigo não varre tudo de
+uma vez na thread do buffer de escrita - o atraso é alcançado em rodadas
+seguidas (caught_up = False até chegar no presente).
+Uma janela sem dado novo (buraco maior que uma rodada, ex.: bot parado
+um dia) pula direto para o próximo dado da fonte.
+
+Retenção por resolução (horas, 0 = para sempre). Uma linha só é apagada
+depois de consolidada no nível seguinte.
+
+Consulta: a resolução é a mais fina que cobre o período (retenção) e
+cabe no orçamento de pontos; o trecho recente ainda não consolidado vem
+dos níveis mais finos e, por fim, do bruto.
+"""
+
+import json
+import logging
+import sqlite3
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Callable, ContextManager, Dict, List, Optional, Tuple
+
+logger = logging.getLogger('DatabaseManager')
+
+RESOLUTIONS = {'1m': 60, '15m': 900, '1h': 3600, '1d': 86400}
+LEVELS = ('raw', '1m', '15m', '1h', '1d')
+
+# Horas mantidas por resolução (0 = sem limite)
+DEFAULT_RETENTION_HOURS = {'raw': 48, '1m': 24 * 7, '15m': 24 * 30, '1h': 24 * 365, '1d': 0}
+
+MARKET_AVG_COLUMNS = ('rsi', 'macd', 'macd_signal', 'bb_upper', 'bb_lower', 'fear_greed')
+
+# Buckets por nível por rodada (1 dia de 1m)
+DEFAULT_MAX_BUCKETS = 1440
+
+
+def bucket_start(timestamp: str, resolution: str) -> str:
+    """Início do bucket de um timestamp ISO (sem parse: fatia da string)"""
+    ts = timestamp.replace(' ', 'T')
+    if resolution == '1m':
+        return ts[:16] + ':00'
+    if resolution == '15m':
+        return f"{ts[:14]}{int(ts[14:16]) // 15 * 15:02d}:00"
+    if resolution == '1h':
+        return ts[:13] + ':00:00'
+    return ts[:10] + 'T00:00:00'
+
+
+def bucket_end(bucket: str, resolution: str) -> str:
+    return (datetime.fromisoformat(bucket) + timedelta(seconds=RESOLUTIONS[resolution])).isoformat()
+
+
+def _weighted_avg(rows: List[Dict], column: str) -> Optional[float]:
+    total = weight = 0
+    for row in rows:
+        value = row.get(column)
+        if value is not None:
+            total += value * row['samples']
+            weight += row['samples']
+    return total / weight if weight else None
+
+
+def _aggregate_market(rows: List[Dict]) -> Dict:
+    """OHLC do bucket + médias dos indicadores (ponderadas por amostras)"""
+    highs = [r['high_price'] for r in rows if r.get('high_price') is not None]
+    lows = [r['low_price'] for r in rows if r.get('low_price') is not None]
+    result = {
+        'symbol': rows[0]['symbol'],
+        'open_price': rows[0].get('open_price'),
+        'high_price': max(highs) if highs else None,
+        'low_price': min(lows) if lows else None,
+        'close_price': rows[-1].get('close_price'),
+        'volume': sum(r.get('volume') or 0 for r in rows),
+        'sentiment': rows[-1].get('sentiment'),
+        'samples': sum(r['samples'] for r in rows),
+    }
+    for column in MARKET_AVG_COLUMNS:
+        result[column] = _weighted_avg(rows, column)
+    if result['fear_greed'] is not None:
+        result['fear_greed'] = round(result['fear_greed'])
+    return result
+
+
+def _aggregate_portfolio(rows: List[Dict]) -> Dict:
+    """Último saldo do bucket + mínimo/máximo"""
+    last = rows[-1]
+    return {
+        'total_balance_usdt': last.get('total_balance_usdt'),
+        'min_balance_usdt': min(r.get('min_balance_usdt', r.get('total_balance_usdt')) or 0 for r in rows),
+        'max_balance_usdt': max(r.get('max_balance_usdt', r.get('total_balance_usdt')) or 0 for r in rows),
+        'total_balance_crypto': last.get('total_balance_crypto'),
+        'bot_balances': last.get('bot_balances'),
+        'positions': last.get('positions'),
+        'samples': sum(r['samples'] for r in rows),
+    }
+
+
+def portfolio_point(row: Dict) -> Dict:
+    """Linha bruta ou de rollup do portfólio -> mesmo formato"""
+    total = row.get('total_balance_usdt')
+    return {
+        'timestamp': row['timestamp'],
+        'resolution': row.get('resolution', 'raw'),
+        'total_balance_usdt': total,
+        'min_balance_usdt': row.get('min_balance_usdt', total),
+        'max_balance_usdt': row.get('max_balance_usdt', total),
+        'total_balance_crypto': row.get('total_balance_crypto'),
+        'bot_balances': row.get('bot_balances'),
+        'positions': row.get('positions'),
+        'samples': row.get('samples', 1),
+    }
+
+
+# Série -> (tabela bruta, tabela de rollup, chaves, agregador, colunas do rollup)
+SERIES = {
+    'market_data': (
+        'market_data', 'market_data_rollup', ('symbol',), _aggregate_market,
+        ('symbol', 'open_price', 'high_price', 'low_price', 'close_price', 'volume',
+         'rsi', 'macd', 'macd_signal', 'bb_upper', 'bb_lower', 'fear_greed', 'sentiment', 'samples'),
+    ),
+    'portfolio_history': (
+        'portfolio_history', 'portfolio_history_rollup', (), _aggregate_portfolio,
+        ('total_balance_usdt', 'min_balance_usdt', 'max_balance_usdt', 'total_balance_crypto',
+         'bot_balances', 'positions', 'samples'),
+    ),
+}
+
+
+class TimeSeriesRollup:
+    """Consolidação em cascata, retenção e escolha de resolução das séries"""
+
+    def __init__(self, connection: Callable[[], sqlite3.Connection],
+                 transaction: Callable[[], ContextManager[sqlite3.Connection]],
+                 retention_hours: Optional[Dict[str, float]] = None,
+                 max_buckets: int = DEFAULT_MAX_BUCKETS):
+        """
+        Args:
+            connection: conexão da thread atual (leituras)
+            transaction: context manager de transação do DatabaseManager
+            retention_hours: horas por resolução ('raw', '1m', ...), 0 = sem limite
+            max_buckets: buckets consolidados por nível por rodada (0 = sem limite)
+        """
+        self.connection = connection
+        self.transaction = transaction
+        self.retention_hours = {**DEFAULT_RETENTION_HOURS, **(retention_hours or {})}
+        self.max_buckets = max_buckets
+        self.caught_up = False
+        self.stats = {'runs': 0, 'rolled': 0, 'deleted': 0, 'last_run_ms': 0.0, 'caught_up': False}
+
+    # ============ CONSOLIDAÇÃO ============
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Uma rodada: até max_buckets buckets completos por nível (uma transação
+        por nível) e a retenção. caught_up indica se chegou no presente.
+        """
+        now = now or datetime.now()
+        start = datetime.now()
+        rolled = {}
+        caught_up = True
+        for series in SERIES:
+            for previous, level in zip(LEVELS, LEVELS[1:]):
+                with self.transaction() as conn:
+                    count, done = self._roll(conn, series, previous, level, now)
+                rolled[f"{series}:{level}"] = count
+                caught_up = caught_up and done
+        with self.transaction() as conn:
+            deleted = self._apply_retention(conn, now)
+
+        self.caught_up = caught_up
+        self.stats['runs'] += 1
+        self.stats['rolled'] += sum(rolled.values())
+        self.stats['deleted'] += deleted
+        self.stats['caught_up'] = caught_up
+        self.stats['last_run_ms'] = round((datetime.now() - start).total_seconds() * 1000, 1)
+        return rolled
+
+    def _roll(self, conn: sqlite3.Connection, series: str, previous: str, level: str,
+              now: datetime) -> Tuple[int, bool]:
+        """Consolida um nível; retorna (buckets gravados, chegou no presente)"""
+        raw_table, rollup_table, _, _, columns = SERIES[series]
+        if previous == 'raw':
+            source_table, where, source_params = raw_table, "", ()
+        else:
+            source_table, where, source_params = rollup_table, "resolution=? AND ", (previous,)
+
+        last = conn.execute(
+            f"SELECT MAX(timestamp) FROM {rollup_table} WHERE resolution=?", (level,)
+        ).fetchone()[0]
+        # Primeiro dado da fonte a partir do último bucket (reprocessado);
+        # buracos na série são pulados sem gastar a rodada
+        first = conn.execute(
+            f"SELECT MIN(timestamp) FROM {source_table} WHERE {where}timestamp>=?",
+            source_params + (last or '',)
+        ).fetchone()[0]
+        if first is None:
+            return 0, True
+        start = bucket_start(first, level)
+
+        buckets = []
+        while True:
+            end, done = self._window_end(start, level, now)
+            buckets.extend(self._aggregate_window(
+                conn, source_table, where, source_params, series, level, start, end))
+            if done or any(bucket[1] > (last or '') for bucket in buckets):
+                break
+            # Janela sem bucket novo (buraco maior que max_buckets): pula
+            # para o próximo dado da fonte em vez de repetir a mesma janela
+            following = conn.execute(
+                f"SELECT MIN(timestamp) FROM {source_table} WHERE {where}timestamp>=?",
+                source_params + (end,)
+            ).fetchone()[0]
+            if following is None:
+                done = True
+                break
+            start = bucket_start(following, level)
+
+        if buckets:
+            placeholders = ', '.join('?' * (len(columns) + 2))
+            conn.executemany(
+                f"INSERT OR REPLACE INTO {rollup_table} (resolution, timestamp, {', '.join(columns)}) "
+                f"VALUES ({placeholders})",
+                buckets
+            )
+        return len(buckets), done
+
+    def _window_end(self, start: str, level: str, now: datetime) -> Tuple[str, bool]:
+        """Fim da janela: último bucket completo, no máximo max_buckets depois de start"""
+        end = bucket_start(now.isoformat(), level)
+        if self.max_buckets:
+            limit = (datetime.fromisoformat(start)
+                     + timedelta(seconds=RESOLUTIONS[level] * self.max_buckets)).isoformat()
+            if limit < end:
+                return limit, False
+        return end, True
+
+    def _aggregate_window(self, conn: sqlite3.Connection, source_table: str, where: str,
+                          source_params: Tuple, series: str, level: str,
+                          start: str, end: str) -> List[Tuple]:
+        """Buckets de level com as linhas da fonte em [start, end)"""
+        _, _, keys, aggregate, columns = SERIES[series]
+        order = ', '.join(keys + ('timestamp',))
+        query = f"SELECT * FROM {source_table} WHERE {where}timestamp>=? AND timestamp<? ORDER BY {order}"
+        cursor = conn.execute(query, source_params + (start, end))
+        names = [d[0] for d in cursor.description]
+
+        def source():
+            for values in cursor:
+                row = dict(zip(names, values))
+                row.setdefault('samples', 1)
+                yield row
+
+        buckets = []
+        group_key = lambda row: tuple(row[k] for k in keys) + (bucket_start(row['timestamp'], level),)
+        for key, rows in groupby(source(), key=group_key):
+            result = aggregate(list(rows))
+            buckets.append((level, key[-1]) + tuple(result[c] for c in columns))
+        return buckets
+
+    def _apply_retention(self, conn: sqlite3.Connection, now: datetime) -> int:
+        """Apaga o que passou da retenção E já está no nível seguinte"""
+        deleted = 0
+        for series, (raw_table, rollup_table, _, _, _) in SERIES.items():
+            for level, next_level in zip(LEVELS, LEVELS[1:] + (None,)):
+                hours = self.retention_hours.get(level, 0)
+                if not hours:
+                    continue
+                cutoff = (now - timedelta(hours=hours)).isoformat()
+                if next_level is not None:
+                    rolled_until = conn.execute(
+                        f"SELECT MAX(timestamp) FROM {rollup_table} WHERE resolution=?", (next_level,)
+                    ).fetchone()[0]
+                    if rolled_until is None:
+                        continue
+                    cutoff = min(cutoff, rolled_until)
+                if level == 'raw':
+                    cursor = conn.execute(f"DELETE FROM {raw_table} WHERE timestamp<?", (cutoff,))
+                else:
+                    cursor = conn.execute(
+                        f"DELETE FROM {rollup_table} WHERE resolution=? AND timestamp<?", (level, cutoff))
+                deleted += cursor.rowcount
+        return deleted
+
+    # ============ CONSULTA ============
+
+    def covers(self, level: str, hours: float) -> bool:
+        retention = self.retention_hours.get(level, 0)
+        return not retention or hours <= retention
+
+    def pick_resolution(self, hours: float, max_points: Optional[int],
+                        count_raw: Callable[[], int]) -> str:
+        """
+        Resolução mais fina que cobre o período e cabe em max_points
+        (nenhuma cabe: a mais grossa). Sem orçamento: a mais fina que cobre.
+        """
+        levels = [level for level in LEVELS if self.covers(level, hours)] or [LEVELS[-1]]
+        if not max_points:
+            return levels[0]
+        for level in levels:
+            points = count_raw() if level == 'raw' else hours * 3600 / RESOLUTIONS[level]
+            if points <= max_points:
+                return level
+        return levels[-1]
+
+    def history(self, series: str, hours: float, max_points: Optional[int] = None,
+                symbol: Optional[str] = None) -> Tuple[str, List[Dict]]:
+        """(resolução escolhida, linhas em ordem cronológica)"""
+        raw_table, rollup_table, _, _, _ = SERIES[series]
+        start = (datetime.now() - timedelta(hours=hours)).isoformat()
+        where, params = ("symbol=? AND ", (symbol,)) if symbol else ("", ())
+        conn = self.connection()
+
+        def raw_rows(since: str) -> List[Dict]:
+            rows = conn.execute(
+                f"SELECT * FROM {raw_table} WHERE {where}timestamp>=? ORDER BY timestamp",
+                params + (since,)
+            ).fetchall()
+            return [dict(row) for row in rows]
+
+        def count_raw() -> int:
+            return conn.execute(
+                f"SELECT COUNT(*) FROM {raw_table} WHERE {where}timestamp>=?", params + (start,)
+            ).fetchone()[0]
+
+        resolution = self.pick_resolution(hours, max_points, count_raw)
+        if resolution == 'raw':
+            return resolution, raw_rows(start)
+
+        # Nível escolhido + cauda ainda não consolidada dos níveis mais finos
+        rows: List[Dict] = []
+        cursor = start
+        for level in LEVELS[LEVELS.index(resolution):0:-1]:
+            part = conn.execute(
+                f"SELECT * FROM {rollup_table} WHERE resolution=? AND {where}timestamp>=? ORDER BY timestamp",
+                (level,) + params + (cursor,)
+            ).fetchall()
+            rows.extend(dict(row) for row in part)
+            if part:
+                cursor = bucket_end(part[-1]['timestamp'], level)
+        rows.extend(raw_rows(cursor))
+        return resolution, rows
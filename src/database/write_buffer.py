@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+App Leonardo v3.0 - Buffer de Escritas de Alta Frequência
+=========================================================
+
+save_market_data, log_event e save_portfolio_snapshot abriam uma
+transação e davam commit por linha: em frequência de tick o commit do
+SQLite vira o gargalo e disputa o banco com a gravação dos trades.
+
+O buffer:
+- Enfileira (sql, parâmetros) em memória - o chamador não espera o commit
+- Descarrega com executemany numa ÚNICA transação a cada batch_rows
+  linhas ou flush_interval_ms (o que vier primeiro)
+- Fila limitada (max_queue): cheia -> o chamador espera até
+  block_timeout_ms pelo flush; se ainda cheia a linha é descartada
+- Métricas de pressão: profundidade, esperas, descartes, tempo do lote
+
+Trades, estados dos bots e configurações continuam síncronos.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from itertools import groupby
+from typing import Callable, ContextManager, Dict, Optional, Sequence
+
+logger = logging.getLogger('DatabaseManager')
+
+
+class WriteBuffer:
+    """Fila limitada de INSERTs descarregada em lote por uma thread de fundo"""
+
+    def __init__(self, transaction: Callable[[], ContextManager[sqlite3.Connection]],
+                 batch_rows: int = 500, flush_interval_ms: float = 200,
+                 max_queue: int = 10000, block_timeout_ms: float = 1000,
+                 after_flush: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            transaction: context manager de transação do DatabaseManager
+            batch_rows: linhas na fila que disparam o flush
+            flush_interval_ms: intervalo máximo entre flushes
+            max_queue: limite da fila (backpressure)
+            block_timeout_ms: espera máxima do chamador com a fila cheia
+            after_flush: chamado na thread de fundo após cada flush (manutenção)
+        """
+        self.transaction = transaction
+        self.batch_rows = max(1, batch_rows)
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue = max(self.batch_rows, max_queue)
+        self.block_timeout = block_timeout_ms / 1000
+        self.after_flush = after_flush
+
+        self._queue: deque = deque()
+        # Protege a fila E o self.stats (add, flush e get_status em threads diferentes)
+        self._cond = threading.Condition()
+        # Um lote por vez (thread de fundo x flush antes de leitura)
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        self.stats = {
+            'enqueued': 0,
+            'written': 0,
+            'batches': 0,
+            'dropped': 0,
+            'blocked': 0,
+            'blocked_ms_total': 0.0,
+            'max_depth': 0,
+            'errors': 0,
+            'last_batch_rows': 0,
+            'last_batch_ms': 0.0,
+        }
+
+    # ============ CICLO DE VIDA ============
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._flush_loop, name="DBWriteBuffer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Para a thread e descarrega o que estiver na fila"""
+        self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=10)
+        self._thread = None
+        self.flush()
+
+    # ============ ENFILEIRAMENTO ============
+
+    def add(self, sql: str, params: Sequence) -> bool:
+        """Enfileira uma linha (False = descartada por fila cheia)"""
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                self.stats['blocked'] += 1
+                self._cond.notify_all()
+                start = time.perf_counter()
+                self._cond.wait_for(lambda: len(self._queue) < self.max_queue, self.block_timeout)
+                self.stats['blocked_ms_total'] = round(
+                    self.stats['blocked_ms_total'] + (time.perf_counter() - start) * 1000, 1)
+                if len(self._queue) >= self.max_queue:
+                    self.stats['dropped'] += 1
+                    return False
+
+            self._queue.append((sql, params))
+            self.stats['enqueued'] += 1
+            self.stats['max_depth'] = max(self.stats['max_depth'], len(self._queue))
+            if len(self._queue) >= self.batch_rows:
+                self._cond.notify_all()
+
+        self._ensure_started()
+        return True
+
+    # ============ FLUSH ============
+
+    def flush(self) -> int:
+        """Grava toda a fila numa transação; retorna linhas gravadas"""
+        with self._flush_lock:
+            with self._cond:
+                rows = list(self._queue)
+                self._queue.clear()
+                self._cond.notify_all()   # libera chamadores esperando espaço
+            if not rows:
+                return 0
+
+            start = time.perf_counter()
+            try:
+                with self.transaction() as conn:
+                    # Linhas consecutivas do mesmo INSERT -> um executemany
+                    for sql, group in groupby(rows, key=lambda row: row[0]):
+                        conn.executemany(sql, [params for _, params in group])
+            except sqlite3.OperationalError as e:
+                # Banco ocupado/travado: devolve o lote para a frente da fila
+                logger.warning(f"⚠️ Lote de {len(rows)} linhas adiado: {e}")
+                with self._cond:
+                    room = max(0, self.max_queue - len(self._queue))
+                    self._queue.extendleft(reversed(rows[-room:] if room else []))
+                    self.stats['errors'] += 1
+                    self.stats['dropped'] += len(rows) - min(room, len(rows))
+                return 0
+            except Exception as e:
+                logger.error(f"❌ Lote de {len(rows)} linhas descartado: {e}")
+                with self._cond:
+                    self.stats['errors'] += 1
+                    self.stats['dropped'] += len(rows)
+                return 0
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._cond:
+                self.stats['written'] += len(rows)
+                self.stats['batches'] += 1
+                self.stats['last_batch_rows'] = len(rows)
+                self.stats['last_batch_ms'] = round(elapsed_ms, 2)
+            return len(rows)
+
+    def _flush_loop(self):
+        while not self._stop_event.is_set():
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: len(self._queue) >= self.batch_rows or self._stop_event.is_set(),
+                    self.flush_interval
+                )
+            try:
+                self.flush()
+                if self.after_flush is not None:
+                    self.after_flush()
+            except Exception as e:
+                logger.error(f"❌ Erro no flush do buffer de escrita: {e}")
+
+    # ============ STATUS ============
+
+    def get_status(self) -> Dict:
+        with self._cond:
+            depth = len(self._queue)
+            stats = dict(self.stats)
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'queue_depth': depth,
+            'max_queue': self.max_queue,
+            'batch_rows': self.batch_rows,
+            'flush_interval_ms': self.flush_interval * 1000,
+            **stats,
+        }
@@ -1,4 +1,5 @@
 """Módulo de Indicadores"""
-from .technical_indicators import TechnicalIndicators
+from .technical_indicators import TechnicalIndicators, BatchIndicators
+from .streaming_indicators import IncrementalIndicatorEngine, StreamingIndicators
 
-__all__ = ['TechnicalIndicators']
+__all__ = ['TechnicalIndicators', 'BatchIndicators', 'IncrementalIndicatorEngine', 'StreamingIndicators']
@@ -0,0 +1,400 @@
+"""
+⚡ Indicadores Incrementais (Streaming) - O(1) por candle
+========================================================
+
+Mantém o estado de RSI, MACD, SMA20/50, EMA9/21, Bollinger, ATR e ADX por
+símbolo e atualiza em O(1) quando:
+- o candle em andamento muda (tick) -> recalcula só o candle vivo
+- um novo candle abre -> "fecha" (commit) o anterior no estado
+
+Os valores reproduzem a biblioteca `ta` usada em SmartStrategy/UnicoBot
+(Wilder para RSI/ATR/ADX, EMA com adjust=False, desvio padrão ddof=0).
+
+Uso:
+    engine = IncrementalIndicatorEngine()
+    df = engine.apply('BTCUSDT', df)   # preenche as últimas linhas do df
+"""
+
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+NAN = float('nan')
+
+
+class _EMA:
+    """EMA (adjust=False) com contagem de observações"""
+
+    def __init__(self, span: Optional[int] = None, alpha: Optional[float] = None):
+        self.alpha = alpha if alpha is not None else 2.0 / (span + 1)
+        self.value: Optional[float] = None
+        self.count = 0
+
+    def advance(self, x: float, commit: bool) -> Tuple[float, int]:
+        value = x if self.value is None else self.value + self.alpha * (x - self.value)
+        count = self.count + 1
+        if commit:
+            self.value, self.count = value, count
+        return value, count
+
+
+class _RollingWindow:
+    """Média e desvio padrão (ddof=0) em janela deslizante (Welford)"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.values: deque = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._pushes = 0
+
+    def advance(self, x: float, commit: bool) -> Tuple[float, float, int]:
+        n = len(self.values)
+        if n < self.size:
+            count = n + 1
+            delta = x - self.mean
+            mean = self.mean + delta / count
+            m2 = self.m2 + delta * (x - mean)
+        else:
+            count = self.size
+            old = self.values[0]
+            mean = self.mean + (x - old) / self.size
+            m2 = self.m2 + (x - old) * (x - mean + old - self.mean)
+        m2 = max(m2, 0.0)
+
+        if commit:
+            self.values.append(x)
+            if len(self.values) > self.size:
+                self.values.popleft()
+            self.mean, self.m2 = mean, m2
+            self._pushes += 1
+            # Re-sincroniza periodicamente para evitar drift numérico
+            if self._pushes % (self.size * 10) == 0:
+                arr = np.fromiter(self.values, dtype=np.float64)
+                self.mean = float(arr.mean())
+                self.m2 = float(((arr - self.mean) ** 2).sum())
+
+        return mean, (m2 / count) ** 0.5, count
+
+
+class _WilderSum:
+    """Soma suavizada de Wilder (TR, +DM, -DM do ADX)"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.value = 0.0
+        self.count = 0
+
+    def advance(self, x: float, commit: bool) -> Tuple[float, int]:
+        if self.count < self.period:
+            value = self.value + x
+        else:
+            value = self.value - self.value / self.period + x
+        count = self.count + 1
+        if commit:
+            self.value, self.count = value, count
+        return value, count
+
+
+class StreamingIndicators:
+    """Estado incremental dos indicadores de UM símbolo"""
+
+    COLUMNS = ('rsi', 'macd', 'macd_signal', 'macd_hist', 'sma20', 'sma50',
+               'ema9', 'ema21', 'bb_upper', 'bb_lower', 'atr', 'adx')
+
+    def __init__(self, rsi_period: int = 14, macd_fast: int = 12, macd_slow: int = 26,
+                 macd_signal: int = 9, bb_period: int = 20, bb_dev: float = 2.0,
+                 atr_period: int = 14, adx_period: int = 14, history: int = 8):
+        self.rsi_period = rsi_period
+        self.macd_slow = macd_slow
+        self.macd_signal_period = macd_signal
+        self.bb_dev = bb_dev
+        self.atr_period = atr_period
+        self.adx_period = adx_period
+
+        # RSI (Wilder: alpha = 1/n)
+        self._rsi_up = _EMA(alpha=1.0 / rsi_period)
+        self._rsi_down = _EMA(alpha=1.0 / rsi_period)
+
+        # MACD
+        self._ema_fast = _EMA(span=macd_fast)
+        self._ema_slow = _EMA(span=macd_slow)
+        self._macd_signal = _EMA(span=macd_signal)
+
+        # Médias
+        self._ema9 = _EMA(span=9)
+        self._ema21 = _EMA(span=21)
+        self._win20 = _RollingWindow(bb_period)
+        self._win50 = _RollingWindow(50)
+
+        # ATR (primeiro valor = média simples dos n primeiros TR)
+        self._atr_sum = 0.0
+        self._atr: Optional[float] = None
+        self._atr_count = 0
+
+        # ADX
+        self._adx_tr = _WilderSum(adx_period)
+        self._adx_pos = _WilderSum(adx_period)
+        self._adx_neg = _WilderSum(adx_period)
+        self._dx_sum = 0.0
+        self._dx_count = 0
+        self._adx: Optional[float] = None
+
+        # Candle anterior (já fechado)
+        self._prev: Optional[Tuple[float, float, float]] = None  # high, low, close
+
+        # Candle em andamento
+        self.committed_ts: Optional[int] = None
+        self.live_ts: Optional[int] = None
+        self._live_candle: Optional[Tuple[float, float, float]] = None
+        self.live_values: Dict[str, float] = {}
+
+        # Últimos candles fechados: (timestamp, valores)
+        self.history: deque = deque(maxlen=history)
+
+    # ===== API =====
+
+    def update(self, ts: int, high: float, low: float, close: float) -> Dict[str, float]:
+        """
+        Atualiza com o candle `ts` (em andamento ou recém-fechado).
+
+        Timestamp igual ao do candle vivo -> recalcula o candle vivo.
+        Timestamp novo -> fecha o candle vivo anterior e abre este.
+        """
+        if self.live_ts is not None:
+            if ts < self.live_ts:
+                return self.live_values  # mensagem atrasada
+            if ts > self.live_ts:
+                self._commit()
+
+        self.live_ts = ts
+        self._live_candle = (high, low, close)
+        self.live_values = self._compute(high, low, close, commit=False)
+        return self.live_values
+
+    @property
+    def previous_values(self) -> Dict[str, float]:
+        """Valores do último candle fechado"""
+        return self.history[-1][1] if self.history else {}
+
+    # ===== INTERNOS =====
+
+    def _commit(self):
+        """Fecha o candle vivo: aplica no estado"""
+        high, low, close = self._live_candle
+        values = self._compute(high, low, close, commit=True)
+        self._prev = (high, low, close)
+        self.committed_ts = self.live_ts
+        self.history.append((self.live_ts, values))
+
+    def _compute(self, high: float, low: float, close: float, commit: bool) -> Dict[str, float]:
+        """Calcula os indicadores do candle (commit=False não altera o estado)"""
+        prev = self._prev
+        values: Dict[str, float] = {}
+
+        # ----- RSI -----
+        diff = 0.0 if prev is None else close - prev[2]
+        avg_up, count = self._rsi_up.advance(max(diff, 0.0), commit)
+        avg_down, _ = self._rsi_down.advance(max(-diff, 0.0), commit)
+        if count < self.rsi_period:
+            values['rsi'] = NAN
+        elif avg_down == 0:
+            values['rsi'] = 100.0
+        else:
+            values['rsi'] = 100.0 - 100.0 / (1.0 + avg_up / avg_down)
+
+        # ----- MACD -----
+        fast, _ = self._ema_fast.advance(close, commit)
+        slow, slow_count = self._ema_slow.advance(close, commit)
+        values['macd'] = values['macd_signal'] = values['macd_hist'] = NAN
+        if slow_count >= self.macd_slow:
+            macd = fast - slow
+            signal, signal_count = self._macd_signal.advance(macd, commit)
+            values['macd'] = macd
+            if signal_count >= self.macd_signal_period:
+                values['macd_signal'] = signal
+                values['macd_hist'] = macd - signal
+
+        # ----- EMAs -----
+        ema9, count9 = self._ema9.advance(close, commit)
+        ema21, count21 = self._ema21.advance(close, commit)
+        values['ema9'] = ema9 if count9 >= 9 else NAN
+        values['ema21'] = ema21 if count21 >= 21 else NAN
+
+        # ----- SMAs + Bollinger -----
+        mean20, std20, count20 = self._win20.advance(close, commit)
+        mean50, _, count50 = self._win50.advance(close, commit)
+        if count20 >= self._win20.size:
+            values['sma20'] = mean20
+            values['bb_upper'] = mean20 + self.bb_dev * std20
+            values['bb_lower'] = mean20 - self.bb_dev * std20
+        else:
+            values['sma20'] = values['bb_upper'] = values['bb_lower'] = NAN
+        values['sma50'] = mean50 if count50 >= self._win50.size else NAN
+
+        # ----- ATR -----
+        if prev is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - prev[2]), abs(low - prev[2]))
+        values['atr'] = self._advance_atr(tr, commit)
+
+        # ----- ADX -----
+        values['adx'] = self._advance_adx(high, low, close, prev, commit)
+
+        return values
+
+    def _advance_atr(self, tr: float, commit: bool) -> float:
+        n = self.atr_period
+        count = self._atr_count + 1
+        atr_sum = self._atr_sum
+        atr = self._atr
+
+        if count < n:
+            atr_sum += tr
+            value = 0.0  # `ta` retorna 0 no aquecimento
+        elif count == n:
+            atr_sum += tr
+            atr = atr_sum / n
+            value = atr
+        else:
+            atr = (atr * (n - 1) + tr) / n
+            value = atr
+
+        if commit:
+            self._atr_count, self._atr_sum, self._atr = count, atr_sum, atr
+        return value
+
+    def _advance_adx(self, high: float, low: float, close: float,
+                     prev: Optional[Tuple[float, float, float]], commit: bool) -> float:
+        if prev is None:
+            return 0.0
+
+        n = self.adx_period
+        prev_high, prev_low, prev_close = prev
+
+        tr = max(high, prev_close) - min(low, prev_close)
+        up = high - prev_high
+        down = prev_low - low
+        pos = up if (up > down and up > 0) else 0.0
+        neg = down if (down > up and down > 0) else 0.0
+
+        s_tr, count = self._adx_tr.advance(tr, commit)
+        s_pos, _ = self._adx_pos.advance(pos, commit)
+        s_neg, _ = self._adx_neg.advance(neg, commit)
+
+        if count < n:
+            return 0.0  # `ta` retorna 0 no aquecimento
+
+        di_pos = 100 * s_pos / s_tr if s_tr != 0 else 0.0
+        di_neg = 100 * s_neg / s_tr if s_tr != 0 else 0.0
+        dx = 100 * abs((di_pos - di_neg) / (di_pos + di_neg)) if (di_pos + di_neg) != 0 else 0.0
+
+        dx_sum, dx_count, adx = self._dx_sum, self._dx_count + 1, self._adx
+        if dx_count < n:
+            dx_sum += dx
+            value = 0.0
+        elif dx_count == n:
+            adx = (dx_sum + dx) / n
+            value = adx
+        else:
+            adx = (adx * (n - 1) + dx) / n
+            value = adx
+
+        if commit:
+            self._dx_sum, self._dx_count, self._adx = dx_sum, dx_count, adx
+        return value
+
+
+def _timestamps_ms(series: pd.Series) -> np.ndarray:
+    """Converte a coluna timestamp (datetime ou ms) para int64 em ms"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.values.astype('datetime64[ms]').astype(np.int64)
+    return series.to_numpy(dtype=np.int64)
+
+
+class IncrementalIndicatorEngine:
+    """
+    Indicadores incrementais para vários símbolos.
+
+    apply() sincroniza o estado com o DataFrame pelo timestamp:
+    só os candles novos (ou o candle vivo) são processados. Se o DataFrame
+    não continuar o estado (buraco, dados antigos), o estado é refeito.
+    """
+
+    def __init__(self, tail_rows: int = 3, **indicator_params):
+        self.tail_rows = tail_rows
+        self.indicator_params = indicator_params
+        self._states: Dict[str, StreamingIndicators] = {}
+
+    def reset(self, symbol: Optional[str] = None):
+        """Descarta o estado de um símbolo (ou de todos)"""
+        if symbol is None:
+            self._states.clear()
+        else:
+            self._states.pop(symbol, None)
+
+    def get_state(self, symbol: str) -> Optional[StreamingIndicators]:
+        return self._states.get(symbol)
+
+    def update(self, symbol: str, ts: int, high: float, low: float, close: float) -> Dict[str, float]:
+        """Atualização direta por candle (ex: callback de kline do WebSocket)"""
+        state = self._states.get(symbol)
+        if state is None:
+            state = StreamingIndicators(history=self.tail_rows, **self.indicator_params)
+            self._states[symbol] = state
+        return state.update(ts, high, low, close)
+
+    def apply(self, symbol: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Atualiza o estado com os candles novos do df e preenche as colunas
+        dos indicadores nas últimas `tail_rows` linhas (demais ficam NaN).
+        """
+        if df.empty:
+            return df
+
+        ts = _timestamps_ms(df['timestamp'])
+        state = self._states.get(symbol)
+        start = 0
+
+        if state is not None and state.committed_ts is not None:
+            pos = int(np.searchsorted(ts, state.committed_ts))
+            continues = (pos < len(ts) - 1 and ts[pos] == state.committed_ts
+                         and ts[-1] >= state.live_ts)
+            if continues:
+                start = pos + 1
+            else:
+                state = None
+        elif state is not None:
+            state = None
+
+        if state is None:
+            state = StreamingIndicators(history=self.tail_rows, **self.indicator_params)
+            self._states[symbol] = state
+
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        close = df['close'].to_numpy(dtype=np.float64)
+
+        for i in range(start, len(ts)):
+            state.update(int(ts[i]), high[i], low[i], close[i])
+
+        # Linhas de saída: candle vivo + últimos fechados (alinhados por timestamp)
+        rows = [(int(ts[-1]), state.live_values)]
+        for hist_ts, values in reversed(state.history):
+            if len(rows) >= min(self.tail_rows, len(ts)):
+                break
+            if hist_ts != int(ts[-1 - len(rows)]):
+                break
+            rows.append((hist_ts, values))
+
+        n = len(df)
+        for column in StreamingIndicators.COLUMNS:
+            arr = np.full(n, np.nan)
+            for offset, (_, values) in enumerate(rows):
+                arr[n - 1 - offset] = values[column]
+            df[column] = arr
+
+        return df
@@ -5,7 +5,7 @@ Utiliza cálculos nativos com pandas/numpy (compatível com Python 3.14)
 import pandas as pd
 import numpy as np
 import logging
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -109,3 +109,177 @@ class TechnicalIndicators:
         
         logger.info(f"✅ Indicadores calculados: {df.columns.tolist()}")
         return df
+
+
+class BatchIndicators:
+    """
+    Indicadores vetorizados para VÁRIOS símbolos de uma vez.
+
+    Entrada: matriz NumPy (símbolos × candles), uma linha por símbolo.
+    Linhas mais curtas podem ser preenchidas com NaN à ESQUERDA
+    (ver stack_frames); cada linha é calculada como se fosse uma série
+    independente. Mesmas convenções da biblioteca `ta` usada pelas
+    estratégias (RSI de Wilder, EMA com adjust=False, desvio ddof=0).
+    """
+
+    @staticmethod
+    def stack_frames(frames: List[pd.DataFrame], column: str = 'close',
+                     length: Optional[int] = None) -> np.ndarray:
+        """Empilha a coluna dos DataFrames numa matriz, com padding NaN à esquerda"""
+        length = length or max((len(df) for df in frames), default=0)
+        out = np.full((len(frames), length), np.nan)
+        for i, df in enumerate(frames):
+            values = df[column].to_numpy(dtype=np.float64)[-length:]
+            if len(values):
+                out[i, -len(values):] = values
+        return out
+
+    @staticmethod
+    def _ewm(values: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+        """EWM (adjust=False) por linha, ignorando NaN iniciais"""
+        values = np.atleast_2d(np.asarray(values, dtype=np.float64))
+        out = np.full(values.shape, np.nan)
+        state = np.full(values.shape[0], np.nan)
+        count = np.zeros(values.shape[0], dtype=np.int64)
+
+        for t in range(values.shape[1]):
+            x = values[:, t]
+            valid = ~np.isnan(x)
+            state = np.where(np.isnan(state), x, state + alpha * (x - state))
+            count += valid
+            out[:, t] = np.where(valid & (count >= min_periods), state, np.nan)
+
+        return out
+
+    @staticmethod
+    def ema(closes: np.ndarray, period: int = 20) -> np.ndarray:
+        """EMA (span=period)"""
+        return BatchIndicators._ewm(closes, 2.0 / (period + 1), period)
+
+    @staticmethod
+    def sma(closes: np.ndarray, period: int = 20) -> np.ndarray:
+        """SMA via soma acumulada (janela com NaN -> NaN)"""
+        closes = np.atleast_2d(np.asarray(closes, dtype=np.float64))
+        out = np.full(closes.shape, np.nan)
+        if closes.shape[1] < period:
+            return out
+        cumsum = np.cumsum(np.nan_to_num(closes), axis=1)
+        nan_count = np.cumsum(np.isnan(closes), axis=1)
+        window_sum = cumsum[:, period - 1:].copy()
+        window_sum[:, 1:] -= cumsum[:, :-period]
+        window_nan = nan_count[:, period - 1:].copy()
+        window_nan[:, 1:] -= nan_count[:, :-period]
+        out[:, period - 1:] = np.where(window_nan == 0, window_sum / period, np.nan)
+        return out
+
+    @staticmethod
+    def rsi(closes: np.ndarray, period: int = 14, method: str = 'wilder') -> np.ndarray:
+        """
+        RSI por linha.
+
+        method='wilder': média exponencial 1/period (igual ao `ta`)
+        method='sma': médias simples (igual a TechnicalIndicators.calculate_rsi)
+        """
+        closes = np.atleast_2d(np.asarray(closes, dtype=np.float64))
+        delta = np.full(closes.shape, np.nan)
+        delta[:, 1:] = np.diff(closes, axis=1)
+
+        # Primeira variação de cada série conta como 0 (como no pandas/`ta`)
+        delta = np.where(np.isnan(delta) & ~np.isnan(closes), 0.0, delta)
+
+        if method == 'sma':
+            gain = BatchIndicators.sma(np.where(np.isnan(delta), np.nan, np.maximum(delta, 0)), period)
+            loss = BatchIndicators.sma(np.where(np.isnan(delta), np.nan, np.maximum(-delta, 0)), period)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return 100 - (100 / (1 + gain / loss))
+
+        up = np.where(np.isnan(delta), np.nan, np.maximum(delta, 0))
+        down = np.where(np.isnan(delta), np.nan, np.maximum(-delta, 0))
+        ema_up = BatchIndicators._ewm(up, 1.0 / period, period)
+        ema_down = BatchIndicators._ewm(down, 1.0 / period, period)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100 - (100 / (1 + ema_up / ema_down))
+        return np.where(ema_down == 0, 100.0, rsi)
+
+    @staticmethod
+    def macd(closes: np.ndarray, fast: int = 12, slow: int = 26,
+             signal: int = 9) -> Dict[str, np.ndarray]:
+        """MACD, linha de sinal e histograma"""
+        macd = BatchIndicators.ema(closes, fast) - BatchIndicators.ema(closes, slow)
+        macd_signal = BatchIndicators.ema(macd, signal)
+        return {'macd': macd, 'macd_signal': macd_signal, 'macd_hist': macd - macd_signal}
+
+    @staticmethod
+    def bollinger(closes: np.ndarray, period: int = 20, std: float = 2.0) -> Dict[str, np.ndarray]:
+        """Bandas de Bollinger (desvio populacional, ddof=0)"""
+        closes = np.atleast_2d(np.asarray(closes, dtype=np.float64))
+        mid = BatchIndicators.sma(closes, period)
+        out_std = np.full(closes.shape, np.nan)
+        if closes.shape[1] >= period:
+            windows = np.lib.stride_tricks.sliding_window_view(closes, period, axis=1)
+            out_std[:, period - 1:] = windows.std(axis=2)
+        return {
+            'bb_upper': mid + std * out_std,
+            'bb_middle': mid,
+            'bb_lower': mid - std * out_std,
+        }
+
+    @staticmethod
+    def atr(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+            period: int = 14) -> np.ndarray:
+        """
+        ATR de Wilder (igual ao `ta`): 0 durante o aquecimento,
+        primeiro valor = média dos `period` primeiros TR. Padding -> NaN.
+        """
+        highs = np.atleast_2d(np.asarray(highs, dtype=np.float64))
+        lows = np.atleast_2d(np.asarray(lows, dtype=np.float64))
+        closes = np.atleast_2d(np.asarray(closes, dtype=np.float64))
+
+        prev_close = np.full(closes.shape, np.nan)
+        prev_close[:, 1:] = closes[:, :-1]
+        with np.errstate(invalid='ignore'):
+            tr = np.fmax(highs - lows, np.fmax(np.abs(highs - prev_close),
+                                               np.abs(lows - prev_close)))
+
+        out = np.full(closes.shape, np.nan)
+        atr = np.zeros(closes.shape[0])
+        tr_sum = np.zeros(closes.shape[0])
+        count = np.zeros(closes.shape[0], dtype=np.int64)
+
+        for t in range(closes.shape[1]):
+            x = tr[:, t]
+            valid = ~np.isnan(x)
+            count += valid
+            tr_sum += np.where(valid & (count <= period), x, 0.0)
+            atr = np.where(count == period, tr_sum / period,
+                           np.where(valid & (count > period),
+                                    (atr * (period - 1) + np.nan_to_num(x)) / period, atr))
+            out[:, t] = np.where(valid, atr, np.nan)
+
+        return out
+
+    @staticmethod
+    def compute(frames: List[pd.DataFrame], length: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Calcula o conjunto padrão das estratégias para vários DataFrames.
+
+        Returns:
+            Dict coluna -> matriz (len(frames) × length)
+        """
+        closes = BatchIndicators.stack_frames(frames, 'close', length)
+        highs = BatchIndicators.stack_frames(frames, 'high', length)
+        lows = BatchIndicators.stack_frames(frames, 'low', length)
+
+        result = {
+            'rsi': BatchIndicators.rsi(closes, 14),
+            'sma20': BatchIndicators.sma(closes, 20),
+            'sma50': BatchIndicators.sma(closes, 50),
+            'ema9': BatchIndicators.ema(closes, 9),
+            'ema21': BatchIndicators.ema(closes, 21),
+            'atr': BatchIndicators.atr(highs, lows, closes, 14),
+            'close': closes,
+        }
+        result.update(BatchIndicators.macd(closes))
+        result.update(BatchIndicators.bollinger(closes, 20))
+        return result
@@ -1,15 +1,121 @@
 """
 OBSERVABILIDADE - Métricas, logging e monitoramento do sistema
 """
+import bisect
 import logging
+import threading
 import time
+from contextlib import contextmanager
 from functools import wraps
 from datetime import datetime
-from typing import Callable, Any, Dict, Optional
+from typing import Callable, Any, Dict, Optional, Sequence
 from pathlib import Path
 import json
 
 
+def log_buckets(min_ms: float = 0.1, max_ms: float = 60000, per_decade: int = 10) -> tuple:
+    """
+    Limites de buckets em escala log: per_decade buckets por década, de
+    min_ms até (pelo menos) max_ms. Erro relativo do percentil limitado a
+    10 ** (1 / per_decade) - 1 (~26% com 10 por década), em qualquer escala.
+    """
+    bounds = []
+    i = 0
+    while True:
+        bound = float(f"{min_ms * 10 ** (i / per_decade):.6g}")
+        bounds.append(bound)
+        if bound >= max_ms:
+            return tuple(bounds)
+        i += 1
+
+
+# Limites superiores (ms) dos buckets de latência - o último bucket é aberto
+LATENCY_BUCKETS_MS = log_buckets()
+
+
+class LatencyHistogram:
+    """
+    Histograma de latência com buckets fixos (log por padrão): memória
+    constante, não importa quantos ciclos rodem. Percentis estimados pelo
+    limite superior do bucket (limitado ao máximo observado).
+    
+    Snapshots são mergeáveis: somar contagens de histogramas com os mesmos
+    buckets dá o histograma do conjunto (ex: bot + backend, vários dias).
+    """
+    
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+    
+    def observe(self, elapsed_ms: float):
+        self.counts[bisect.bisect_left(self.buckets, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+    
+    def percentile(self, q: float) -> float:
+        """Latência (ms) abaixo da qual estão q% das amostras"""
+        if self.count == 0:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                bound = self.buckets[i] if i < len(self.buckets) else self.max_ms
+                return min(bound, self.max_ms)
+        return self.max_ms
+    
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 2) if self.count else 0,
+            'p50_ms': round(self.percentile(50), 3),
+            'p95_ms': round(self.percentile(95), 3),
+            'p99_ms': round(self.percentile(99), 3),
+            'max_ms': round(self.max_ms, 2),
+        }
+    
+    def merge(self, other: 'LatencyHistogram'):
+        """Soma outro histograma (mesmos buckets) a este"""
+        if other.buckets != self.buckets:
+            raise ValueError("Histogramas com buckets diferentes não podem ser somados")
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado serializável (JSON); contagens esparsas [índice, n]"""
+        data = {
+            'counts': [[i, n] for i, n in enumerate(self.counts) if n],
+            'count': self.count,
+            'sum_ms': round(self.total_ms, 3),
+            'max_ms': round(self.max_ms, 3),
+        }
+        if self.buckets != LATENCY_BUCKETS_MS:
+            data['buckets'] = list(self.buckets)
+        return data
+    
+    @classmethod
+    def from_snapshot(cls, data: Dict[str, Any]) -> 'LatencyHistogram':
+        hist = cls(data.get('buckets', LATENCY_BUCKETS_MS))
+        for i, n in data.get('counts', []):
+            hist.counts[i] += n
+        hist.count = data.get('count', 0)
+        hist.total_ms = data.get('sum_ms', 0.0)
+        hist.max_ms = data.get('max_ms', 0.0)
+        return hist
+
+
+def _is_histogram_snapshot(value) -> bool:
+    return isinstance(value, dict) and 'counts' in value and 'sum_ms' in value
+
+
 class MetricsCollector:
     """Coleta métricas de performance do sistema"""
     
@@ -20,7 +126,7 @@ class MetricsCollector:
                 'successful': 0,
                 'failed': 0,
                 'by_bot': {},
-                'duration_ms': []
+                'duration_ms': LatencyHistogram()
             },
             'stops': {
                 'total': 0,
@@ -31,7 +137,7 @@ class MetricsCollector:
             'api_requests': {
                 'total': 0,
                 'by_endpoint': {},
-                'response_time_ms': []
+                'response_time_ms': LatencyHistogram()
             },
             'trades': {
                 'total': 0,
@@ -43,9 +149,18 @@ class MetricsCollector:
                 'total': 0,
                 'by_type': {},
                 'by_source': {}
+            },
+            'latency': {
+                'by_phase': {},
+                'by_bot': {},
+                'by_symbol': {}
             }
         }
         self.logger = logging.getLogger('Metrics')
+        
+        # Spans rodam nos workers do ciclo: histogramas protegidos por lock
+        self._lock = threading.Lock()
+        self._span_labels = threading.local()
     
     def record_restart(self, bot_type: str, success: bool, duration_ms: float):
         """Registra métrica de restart"""
@@ -64,7 +179,8 @@ class MetricsCollector:
         else:
             self.metrics['restarts']['by_bot'][bot_type]['fail'] += 1
         
-        self.metrics['restarts']['duration_ms'].append(duration_ms)
+        with self._lock:
+            self.metrics['restarts']['duration_ms'].observe(duration_ms)
         
         self.logger.debug(f"Restart metrics recorded: {bot_type} - {duration_ms:.0f}ms - {'OK' if success else 'FAILED'}")
     
@@ -106,7 +222,8 @@ class MetricsCollector:
         if status_code >= 400:
             endpoint_metrics['errors'] += 1
         
-        self.metrics['api_requests']['response_time_ms'].append(response_time_ms)
+        with self._lock:
+            self.metrics['api_requests']['response_time_ms'].observe(response_time_ms)
     
     def record_trade(self, bot_type: str, win: bool):
         """Registra métrica de trade"""
@@ -131,6 +248,54 @@ class MetricsCollector:
         self.metrics['errors']['by_type'][error_type] = self.metrics['errors']['by_type'].get(error_type, 0) + 1
         self.metrics['errors']['by_source'][source] = self.metrics['errors']['by_source'].get(source, 0) + 1
     
+    def record_latency(self, phase: str, elapsed_ms: float,
+                       bot: Optional[str] = None, symbol: Optional[str] = None):
+        """Registra a duração de uma fase do ciclo (geral, por bot e por símbolo)"""
+        latency = self.metrics['latency']
+        with self._lock:
+            latency['by_phase'].setdefault(phase, LatencyHistogram()).observe(elapsed_ms)
+            if bot:
+                latency['by_bot'].setdefault(bot, {}).setdefault(phase, LatencyHistogram()).observe(elapsed_ms)
+            if symbol:
+                latency['by_symbol'].setdefault(symbol, {}).setdefault(phase, LatencyHistogram()).observe(elapsed_ms)
+    
+    @contextmanager
+    def span(self, phase: str, bot: Optional[str] = None, symbol: Optional[str] = None):
+        """
+        Mede um trecho do ciclo:
+        
+            with metrics.span('indicators', bot='bot_estavel', symbol='BTCUSDT'):
+                ...
+        
+        Spans internos herdam bot/símbolo do span externo da mesma thread
+        (ex: 'fetch' dentro do CandleStore conta para o bot que pediu).
+        """
+        parent = getattr(self._span_labels, 'labels', (None, None))
+        labels = (bot or parent[0], symbol or parent[1])
+        self._span_labels.labels = labels
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._span_labels.labels = parent
+            self.record_latency(phase, (time.perf_counter() - start) * 1000, *labels)
+    
+    def get_latency_summary(self) -> Dict[str, Any]:
+        """p50/p95/p99 por fase, por bot e por símbolo"""
+        latency = self.metrics['latency']
+        with self._lock:
+            return {
+                'by_phase': {phase: h.summary() for phase, h in latency['by_phase'].items()},
+                'by_bot': {
+                    bot: {phase: h.summary() for phase, h in phases.items()}
+                    for bot, phases in latency['by_bot'].items()
+                },
+                'by_symbol': {
+                    symbol: {phase: h.summary() for phase, h in phases.items()}
+                    for symbol, phases in latency['by_symbol'].items()
+                },
+            }
+    
     def get_summary(self) -> Dict[str, Any]:
         """Retorna sumário das métricas"""
         return {
@@ -143,10 +308,8 @@ class MetricsCollector:
                     self.metrics['restarts']['successful'] / self.metrics['restarts']['total'] * 100
                     if self.metrics['restarts']['total'] > 0 else 0
                 ),
-                'avg_duration_ms': (
-                    sum(self.metrics['restarts']['duration_ms']) / len(self.metrics['restarts']['duration_ms'])
-                    if self.metrics['restarts']['duration_ms'] else 0
-                ),
+                'avg_duration_ms': self.metrics['restarts']['duration_ms'].summary()['avg_ms'],
+                'duration_ms': self.metrics['restarts']['duration_ms'].summary(),
                 'by_bot': self.metrics['restarts']['by_bot']
             },
             'stops': {
@@ -161,10 +324,8 @@ class MetricsCollector:
             },
             'api_requests': {
                 'total': self.metrics['api_requests']['total'],
-                'avg_response_time_ms': (
-                    sum(self.metrics['api_requests']['response_time_ms']) / len(self.metrics['api_requests']['response_time_ms'])
-                    if self.metrics['api_requests']['response_time_ms'] else 0
-                ),
+                'avg_response_time_ms': self.metrics['api_requests']['response_time_ms'].summary()['avg_ms'],
+                'response_time_ms': self.metrics['api_requests']['response_time_ms'].summary(),
                 'by_endpoint': self.metrics['api_requests']['by_endpoint']
             },
             'trades': {
@@ -181,17 +342,140 @@ class MetricsCollector:
                 'total': self.metrics['errors']['total'],
                 'by_type': self.metrics['errors']['by_type'],
                 'by_source': self.metrics['errors']['by_source']
-            }
+            },
+            'latency': self.get_latency_summary()
         }
     
+    def snapshot(self) -> Dict[str, Any]:
+        """Cópia serializável de todas as métricas (histogramas como snapshot mergeável)"""
+        def copy(value):
+            if isinstance(value, LatencyHistogram):
+                return value.snapshot()
+            if isinstance(value, dict):
+                return {k: copy(v) for k, v in value.items()}
+            return value
+        
+        with self._lock:
+            return copy(self.metrics)
+    
+    def merge(self, snapshot: Dict[str, Any]):
+        """
+        Soma um snapshot (de outro processo ou de outro período) a estas
+        métricas: contadores somados, histogramas mergeados e médias por
+        endpoint ponderadas pela contagem.
+        """
+        def merge_into(dst: dict, src: dict):
+            if 'avg_time_ms' in src and 'count' in src:
+                count = dst.get('count', 0) + src['count']
+                if count:
+                    dst['avg_time_ms'] = (
+                        dst.get('avg_time_ms', 0) * dst.get('count', 0) + src['avg_time_ms'] * src['count']
+                    ) / count
+            for key, value in src.items():
+                if key == 'avg_time_ms':
+                    continue
+                if _is_histogram_snapshot(value):
+                    hist = LatencyHistogram.from_snapshot(value)
+                    if isinstance(dst.get(key), LatencyHistogram):
+                        dst[key].merge(hist)
+                    else:
+                        dst[key] = hist
+                elif isinstance(value, dict):
+                    merge_into(dst.setdefault(key, {}), value)
+                elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                    dst[key] = dst.get(key, 0) + value
+        
+        with self._lock:
+            merge_into(self.metrics, snapshot)
+    
     def save_metrics(self, output_file: str):
-        """Salva métricas em arquivo JSON"""
+        """Salva métricas em arquivo JSON (sumário + snapshot mergeável)"""
         metrics_data = self.get_summary()
+        metrics_data['snapshot'] = self.snapshot()
         
         with open(output_file, 'w') as f:
             json.dump(metrics_data, f, indent=2, default=str)
         
         self.logger.info(f"Métricas salvas em {output_file}")
+    
+    def to_prometheus(self, prefix: str = 'leonardo') -> str:
+        """
+        Métricas no formato texto do Prometheus (exposition format 0.0.4).
+        Latências em segundos; por símbolo fica de fora (cardinalidade) -
+        use o /dashboard/latency para isso.
+        """
+        lines = []
+        
+        def header(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+        
+        def sample(name: str, value, **labels):
+            label_text = ','.join(f'{k}="{_prometheus_escape(v)}"' for k, v in labels.items())
+            lines.append(f"{prefix}_{name}{{{label_text}}} {value}" if label_text
+                         else f"{prefix}_{name} {value}")
+        
+        def histogram(name: str, hist: LatencyHistogram, **labels):
+            cumulative = 0
+            for bound, n in zip(hist.buckets, hist.counts):
+                cumulative += n
+                sample(f"{name}_bucket", cumulative, **labels, le=f"{bound / 1000:g}")
+            sample(f"{name}_bucket", hist.count, **labels, le="+Inf")
+            sample(f"{name}_sum", f"{hist.total_ms / 1000:.6f}", **labels)
+            sample(f"{name}_count", hist.count, **labels)
+        
+        with self._lock:
+            m = self.metrics
+            
+            header('restarts_total', 'counter', 'Restarts de bots por resultado')
+            sample('restarts_total', m['restarts']['successful'], result='success')
+            sample('restarts_total', m['restarts']['failed'], result='failure')
+            header('restart_duration_seconds', 'histogram', 'Duração dos restarts de bots')
+            histogram('restart_duration_seconds', m['restarts']['duration_ms'])
+            
+            header('stops_total', 'counter', 'Stops de bots por resultado')
+            sample('stops_total', m['stops']['successful'], result='success')
+            sample('stops_total', m['stops']['failed'], result='failure')
+            
+            header('api_requests_total', 'counter', 'Requisições da API por endpoint')
+            for endpoint, data in m['api_requests']['by_endpoint'].items():
+                sample('api_requests_total', data['count'], endpoint=endpoint)
+            header('api_request_errors_total', 'counter', 'Requisições da API com status >= 400')
+            for endpoint, data in m['api_requests']['by_endpoint'].items():
+                sample('api_request_errors_total', data['errors'], endpoint=endpoint)
+            header('api_request_duration_seconds', 'histogram', 'Tempo de resposta da API')
+            histogram('api_request_duration_seconds', m['api_requests']['response_time_ms'])
+            
+            header('trades_total', 'counter', 'Trades fechados por resultado')
+            sample('trades_total', m['trades']['wins'], result='win')
+            sample('trades_total', m['trades']['losses'], result='loss')
+            
+            header('errors_total', 'counter', 'Erros por tipo')
+            for error_type, count in m['errors']['by_type'].items():
+                sample('errors_total', count, type=error_type)
+            
+            header('cycle_phase_seconds', 'histogram', 'Latência das fases do ciclo')
+            for phase, hist in sorted(m['latency']['by_phase'].items()):
+                histogram('cycle_phase_seconds', hist, phase=phase)
+            header('bot_phase_seconds', 'histogram', 'Latência das fases do ciclo por bot')
+            for bot, phases in sorted(m['latency']['by_bot'].items()):
+                for phase, hist in sorted(phases.items()):
+                    histogram('bot_phase_seconds', hist, bot=bot, phase=phase)
+        
+        return '\n'.join(lines) + '\n'
+
+
+def _prometheus_escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def load_metrics_snapshot(path: str) -> Dict[str, Any]:
+    """Snapshot salvo por save_metrics em outro processo ({} se não existir)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('snapshot', {})
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
 
 
 # Decorator para medir tempo de execução
@@ -9,6 +9,8 @@ from datetime import datetime, timedelta
 from typing import Dict, Tuple, Optional
 import logging
 
+from src.core.candle_warehouse import CandleWarehouse, exchange_fetcher, get_candle_warehouse
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,6 +40,12 @@ class AdaptiveStrategy:
         # Histórico de cada moeda (será populado)
         self.crypto_profiles = {}
         
+        # Candles históricos em disco (só o que falta vem da exchange)
+        if hasattr(self.exchange, 'fetch_ohlcv'):
+            self.warehouse = CandleWarehouse(fetch_raw=exchange_fetcher(self.exchange))
+        else:
+            self.warehouse = get_candle_warehouse()
+        
         # Estado de trading
         self.last_trade_time = {}  # Última vez que operou cada moeda
         self.daily_stats = {
@@ -63,6 +71,9 @@ class AdaptiveStrategy:
         """
         logger.info("Analisando histórico de 7 dias para cada moeda...")
         
+        # Baixa o que falta de todas as moedas em paralelo
+        self.warehouse.backfill(self.symbols, '1m', days=7)
+        
         for symbol in self.symbols:
             try:
                 logger.info(f"Analisando {symbol}...")
@@ -99,71 +110,14 @@ class AdaptiveStrategy:
     
     
     def _fetch_historical_data(self, symbol: str, days: int = 7) -> Optional[pd.DataFrame]:
-        """Busca dados históricos da exchange"""
+        """Busca dados históricos (armazém local + só o que falta na exchange)"""
         try:
-            # Calcula timestamp de 7 dias atrás
-            since = int((datetime.now() - timedelta(days=days)).timestamp() * 1000)
-            
-            # Busca candles de 1 minuto (limite da API: ~1000 candles)
-            # Para 7 dias completos, faremos múltiplas requisições
-            all_candles = []
-            
-            # Divide em chunks de 1000 candles (aproximadamente 16 horas por chunk)
-            chunks_needed = min((days * 24 * 60) // 1000 + 1, 10)  # Máximo 10 chunks
+            df = self.warehouse.get_dataframe(symbol, '1m', days=days)
             
-            logger.info(f"Buscando {chunks_needed} chunks de dados para {symbol}...")
-            
-            for i in range(chunks_needed):
-                chunk_since = since + (i * 1000 * 60 * 1000)  # 1000 minutos depois
-                
-                try:
-                    # Verifica se exchange tem método síncrono ou async
-                    if hasattr(self.exchange, 'fetch_ohlcv'):
-                        # Método síncrono
-                        candles = self.exchange.fetch_ohlcv(
-                            symbol=symbol,
-                            timeframe='1m',
-                            since=chunk_since,
-                            limit=1000
-                        )
-                    else:
-                        # Usa API direta da Binance (fallback)
-                        import requests
-                        url = f"https://api.binance.com/api/v3/klines"
-                        params = {
-                            'symbol': symbol.replace('/', ''),
-                            'interval': '1m',
-                            'startTime': chunk_since,
-                            'limit': 1000
-                        }
-                        response = requests.get(url, params=params)
-                        data = response.json()
-                        
-                        # Converte formato Binance para CCXT
-                        candles = [
-                            [k[0], float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5])]
-                            for k in data
-                        ]
-                    
-                    if candles:
-                        all_candles.extend(candles)
-                        logger.info(f"Chunk {i+1}/{chunks_needed}: {len(candles)} candles")
-                    
-                except Exception as e:
-                    logger.warning(f"Erro no chunk {i}: {e}")
-                    continue
-            
-            if not all_candles:
+            if df is None:
                 logger.warning(f"Nenhum dado histórico para {symbol}")
                 return None
             
-            # Converte para DataFrame
-            df = pd.DataFrame(
-                all_candles,
-                columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']
-            )
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            
             logger.info(f"Total de {len(df)} candles para {symbol}")
             
             return df
@@ -4,12 +4,16 @@ Usa API pública da Binance para analisar histórico de cada moeda
 e descobrir os melhores pontos de entrada/saída
 """
 
-import requests
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import json
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core.candle_warehouse import get_candle_warehouse
 
 # Bibliotecas de análise técnica
 try:
@@ -39,6 +43,7 @@ class CryptoProfileAnalyzer:
         ]
         self.profiles = {}
         self.base_url = "https://api.binance.com/api/v3"
+        self.warehouse = get_candle_warehouse()
     
     
     def fetch_historical_data(self, symbol: str, days: int = 30) -> pd.DataFrame:
@@ -48,66 +53,12 @@ class CryptoProfileAnalyzer:
         """
         print(f"\n📊 Buscando dados de {symbol} ({days} dias)...")
         
-        all_candles = []
-        end_time = int(datetime.now().timestamp() * 1000)
+        # Armazém local: só baixa da Binance o que ainda não está no disco
+        df = self.warehouse.get_dataframe(symbol, '5m', days=days)
         
-        # Binance retorna max 1000 candles por request
-        # Para 30 dias em 5min = 8640 candles, precisamos de ~9 requests
-        candles_needed = days * 24 * 12  # 12 candles de 5min por hora
-        requests_needed = (candles_needed // 1000) + 1
-        
-        for i in range(requests_needed):
-            try:
-                params = {
-                    'symbol': symbol,
-                    'interval': '5m',  # 5 minutos para melhor análise
-                    'endTime': end_time,
-                    'limit': 1000
-                }
-                
-                response = requests.get(f"{self.base_url}/klines", params=params)
-                
-                if response.status_code != 200:
-                    print(f"   ❌ Erro API: {response.status_code}")
-                    break
-                
-                data = response.json()
-                
-                if not data:
-                    break
-                
-                all_candles.extend(data)
-                
-                # Próximo request começa antes do primeiro candle retornado
-                end_time = data[0][0] - 1
-                
-                print(f"   ✓ Chunk {i+1}/{requests_needed}: {len(data)} candles")
-                
-            except Exception as e:
-                print(f"   ❌ Erro: {e}")
-                break
-        
-        if not all_candles:
+        if df is None:
             return None
         
-        # Converte para DataFrame
-        df = pd.DataFrame(all_candles, columns=[
-            'timestamp', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_volume', 'trades', 'taker_buy_base',
-            'taker_buy_quote', 'ignore'
-        ])
-        
-        # Converte tipos
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        for col in ['open', 'high', 'low', 'close', 'volume']:
-            df[col] = df[col].astype(float)
-        
-        # Ordena por tempo
-        df = df.sort_values('timestamp').reset_index(drop=True)
-        
-        # Remove duplicatas
-        df = df.drop_duplicates(subset=['timestamp'])
-        
         print(f"   📈 Total: {len(df)} candles de {df['timestamp'].min()} a {df['timestamp'].max()}")
         
         return df
@@ -498,6 +449,9 @@ class CryptoProfileAnalyzer:
         
         all_profiles = {}
         
+        # Backfill paralelo de todas as moedas (só o que falta no disco)
+        self.warehouse.backfill(self.symbols, '5m', days=30)
+        
         for symbol in self.symbols:
             try:
                 profile = self.create_full_profile(symbol)
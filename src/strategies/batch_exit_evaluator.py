@@ -0,0 +1,247 @@
+"""
+📐 Batch Exit Evaluator - Saídas de TODAS as posições num único passe NumPy
+==========================================================================
+
+Em vez de chamar should_sell_position posição por posição (com DataFrame),
+as posições abertas ficam em arrays:
+
+    entry_price | entry_time | amount | bot_type | fator de tempo | pico (trailing)
+
+e, dado o vetor de preços, um passe calcula para todas ao mesmo tempo:
+- PnL%
+- TP dinâmico da feira (SmartStrategy.feira_take_profit_batch: mesmo
+  fator por crypto, corte de ALTA e TP mínimo do should_sell)
+- Stop loss (mais apertado com o tempo, como no SmartStrategy)
+- Trailing stop (pico atualizado a cada avaliação)
+
+O custo por ciclo fica praticamente constante com o número de posições.
+Saídas com indicadores (RSI, tendência, queda brusca) continuam no
+should_sell de cada estratégia.
+
+    evaluator = BatchExitEvaluator()
+    evaluator.sync(positions, params)          # posições abertas/fechadas
+    for symbol, price, reason in evaluator.exits(snapshot.price, trends=...):
+        ...
+"""
+
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+from src.strategies.smart_strategy import SmartStrategy
+
+TREND_CODES = SmartStrategy.TREND_CODES
+
+# Lucro em USDT a partir do qual, em ALTA, quem decide é o should_sell
+MIN_PROFIT_USDT_HOLD = SmartStrategy.MIN_PROFIT_USDT_HOLD
+
+_COLUMNS = (
+    'entry_price', 'entry_time', 'amount', 'base_tp', 'stop_loss', 'max_hold',
+    'feira_factor', 'trailing_pct', 'trailing_trigger', 'high_water',
+)
+
+
+def _to_epoch(value: Union[datetime, str, float, int]) -> float:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+
+class BatchExitEvaluator:
+    """Posições abertas em arrays + checagem de saída vetorizada"""
+
+    def __init__(self, capacity: int = 32):
+        self.symbols: List[str] = []
+        self.bot_types: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._cols: Dict[str, np.ndarray] = {
+            name: np.zeros(max(1, capacity)) for name in _COLUMNS
+        }
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._index
+
+    def column(self, name: str) -> np.ndarray:
+        """View da coluna para as posições atuais"""
+        return self._cols[name][:len(self.symbols)]
+
+    # ===== POSIÇÕES =====
+
+    def add(self, symbol: str, entry_price: float, entry_time, amount: float, bot_type: str,
+            base_tp: float, stop_loss: float, max_hold_minutes: float,
+            trailing_pct: float, trailing_trigger: float, feira_factor: float = 0.5):
+        """
+        Adiciona (ou atualiza) uma posição.
+
+        Args:
+            base_tp: take profit base (%), reduzido com o tempo pela feira
+            stop_loss: stop loss (%, negativo)
+            max_hold_minutes: tempo máximo da crypto (aperta o stop e reduz o TP)
+            trailing_pct: queda do pico (%) que dispara o trailing
+            trailing_trigger: lucro no pico (%) a partir do qual o trailing vale
+            feira_factor: fator da feira da crypto (SmartStrategy._feira_factor)
+        """
+        i = self._index.get(symbol)
+        if i is None:
+            i = len(self.symbols)
+            if i == len(self._cols['entry_price']):
+                for name, values in self._cols.items():
+                    self._cols[name] = np.concatenate([values, np.zeros(len(values))])
+            self._index[symbol] = i
+            self.symbols.append(symbol)
+            self.bot_types.append(bot_type)
+            self._cols['high_water'][i] = entry_price
+        elif self._cols['entry_price'][i] != entry_price:
+            self._cols['high_water'][i] = entry_price
+        self.bot_types[i] = bot_type
+
+        row = {
+            'entry_price': entry_price,
+            'entry_time': _to_epoch(entry_time),
+            'amount': amount,
+            'base_tp': base_tp,
+            'stop_loss': stop_loss,
+            'max_hold': max_hold_minutes,
+            'feira_factor': feira_factor,
+            'trailing_pct': trailing_pct,
+            'trailing_trigger': trailing_trigger,
+        }
+        for name, value in row.items():
+            self._cols[name][i] = value
+
+    def remove(self, symbol: str):
+        """Remove uma posição (a última ocupa o lugar dela)"""
+        i = self._index.pop(symbol, None)
+        if i is None:
+            return
+        last = len(self.symbols) - 1
+        if i != last:
+            for values in self._cols.values():
+                values[i] = values[last]
+            self.symbols[i] = self.symbols[last]
+            self.bot_types[i] = self.bot_types[last]
+            self._index[self.symbols[i]] = i
+        self.symbols.pop()
+        self.bot_types.pop()
+
+    def sync(self, positions: Mapping[str, dict], params: Callable[[str, dict], Optional[dict]]):
+        """
+        Deixa os arrays iguais às posições abertas.
+        params(symbol, pos) -> kwargs do add (None = ignora a posição).
+        """
+        for symbol in [s for s in self.symbols if s not in positions]:
+            self.remove(symbol)
+        for symbol, pos in positions.items():
+            kwargs = params(symbol, pos)
+            if kwargs is None:
+                self.remove(symbol)
+            else:
+                self.add(symbol, **kwargs)
+
+    # ===== AVALIAÇÃO =====
+
+    def _vector(self, values, default: float) -> np.ndarray:
+        if callable(values):
+            values = [values(symbol) for symbol in self.symbols]
+        elif isinstance(values, Mapping):
+            values = [values.get(symbol) for symbol in self.symbols]
+        return np.array([default if v is None else v for v in values], dtype=np.float64)
+
+    def evaluate(self, prices, now: Optional[float] = None,
+                 trends: Optional[Mapping[str, str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Avalia todas as posições de uma vez.
+
+        Args:
+            prices: array alinhado com self.symbols, dict símbolo -> preço ou
+                    função price(symbol) (ex: TickerSnapshot.price)
+            now: timestamp (segundos) - padrão time.time()
+            trends: símbolo -> 'ALTA'/'LATERAL'/'QUEDA' (sem tendência o TP não vale)
+
+        Returns: dict de arrays (pnl_pct, take_profit, stop_loss, stop,
+                 trailing, take, exit...) alinhados com self.symbols
+        """
+        n = len(self.symbols)
+        now = time.time() if now is None else now
+        price = (np.asarray(prices, dtype=np.float64)[:n]
+                 if isinstance(prices, np.ndarray) else self._vector(prices, np.nan))
+        trend = np.full(n, -1, dtype=np.int64)
+        if trends:
+            trend[:] = [TREND_CODES.get(trends.get(s), -1) for s in self.symbols]
+
+        entry = self.column('entry_price')
+        valid = (price > 0) & (entry > 0)
+        minutes = (now - self.column('entry_time')) / 60
+        pnl_pct = np.where(valid, (price - entry) / np.where(entry > 0, entry, 1) * 100, np.nan)
+
+        # Pico para o trailing (preço ausente não mexe)
+        high_water = self.column('high_water')
+        np.fmax(high_water, np.where(valid, price, np.nan), out=high_water)
+
+        # Stop loss: metade do stop se ficar muito tempo sem lucro (SmartStrategy)
+        sl = self.column('stop_loss')
+        max_hold = self.column('max_hold')
+        stop_loss = np.where((minutes > max_hold) & (pnl_pct < 0.2), sl * 0.5, sl)
+        stop_loss = np.where((minutes > max_hold * 0.5) & (pnl_pct < -0.3),
+                             np.maximum(sl * 0.5, -0.5), stop_loss)
+        stop = valid & (pnl_pct <= stop_loss)
+
+        # Trailing stop
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdown = (price - high_water) / high_water * 100
+            run_up = (high_water - entry) / entry * 100
+        trailing = valid & (run_up > self.column('trailing_trigger')) & (drawdown < -self.column('trailing_pct'))
+
+        # TP dinâmico da feira
+        take_profit, pode_vender = SmartStrategy.feira_take_profit_batch(
+            self.column('base_tp'), self.column('feira_factor'), np.maximum(minutes, 0), max_hold, trend
+        )
+        take = valid & pode_vender & (pnl_pct >= take_profit)
+
+        # Lucro grande em ALTA: segura (decisão do should_sell)
+        profit_usdt = self.column('amount') * entry * pnl_pct / 100
+        hold = (profit_usdt >= MIN_PROFIT_USDT_HOLD) & (trend == TREND_CODES['ALTA'])
+        trailing &= ~hold
+        take &= ~hold
+
+        return {
+            'price': price,
+            'pnl_pct': pnl_pct,
+            'minutes_open': minutes,
+            'take_profit': take_profit,
+            'stop_loss': stop_loss,
+            'high_water': high_water.copy(),
+            'stop': stop,
+            'trailing': trailing,
+            'take': take,
+            'exit': stop | trailing | take,
+        }
+
+    def exits(self, prices, now: Optional[float] = None,
+              trends: Optional[Mapping[str, str]] = None) -> List[Tuple[str, float, str]]:
+        """Posições que devem sair agora: [(symbol, price, reason), ...]"""
+        if not self.symbols:
+            return []
+        result = self.evaluate(prices, now, trends)
+
+        exits = []
+        for i in np.flatnonzero(result['exit']):
+            symbol = self.symbols[i]
+            price = float(result['price'][i])
+            pnl = result['pnl_pct'][i]
+            if result['stop'][i]:
+                reason = f"🛑 STOP LOSS {pnl:.2f}% (limite: {result['stop_loss'][i]:.2f}%)"
+            elif result['trailing'][i]:
+                drop = (price - result['high_water'][i]) / result['high_water'][i] * 100
+                reason = f"📉 TRAILING STOP (caiu {drop:.2f}% do pico) +{pnl:.2f}%"
+            else:
+                reason = f"🏪 FEIRA TP {result['take_profit'][i]:.2f}% +{pnl:.2f}%"
+            exits.append((symbol, price, reason))
+        return exits
@@ -3,13 +3,16 @@
 Versão otimizada - 7 dias de dados, mais rápido
 """
 
-import requests
 import pandas as pd
 import numpy as np
 from datetime import datetime
 import json
 import os
-import time
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.core.candle_warehouse import get_candle_warehouse
 
 # Verifica se tem biblioteca TA
 try:
@@ -22,31 +25,14 @@ except ImportError:
 
 
 def fetch_data(symbol: str, limit: int = 1000) -> pd.DataFrame:
-    """Busca dados da Binance (versão rápida)"""
-    url = "https://api.binance.com/api/v3/klines"
-    params = {
-        'symbol': symbol,
-        'interval': '15m',  # 15 minutos (mais rápido)
-        'limit': limit
-    }
-    
+    """Busca dados (armazém local + só os candles novos da Binance)"""
     try:
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
+        df = get_candle_warehouse().get_dataframe(symbol, '15m', limit=limit)  # 15 minutos (mais rápido)
         
-        if not data or isinstance(data, dict):
-            print(f"   ❌ Erro: {data}")
+        if df is None:
+            print(f"   ❌ Erro: sem dados para {symbol}")
             return None
         
-        df = pd.DataFrame(data, columns=[
-            'timestamp', 'open', 'high', 'low', 'close', 'volume',
-            'close_time', 'quote_volume', 'trades', 'taker_buy_base',
-            'taker_buy_quote', 'ignore'
-        ])
-        
-        for col in ['open', 'high', 'low', 'close', 'volume']:
-            df[col] = df[col].astype(float)
-        
         return df
         
     except Exception as e:
@@ -138,11 +124,13 @@ def main():
     
     profiles = {}
     
+    # Backfill paralelo (o armazém respeita o limite de peso da Binance)
+    get_candle_warehouse().backfill(symbols, '15m', days=11)
+    
     for symbol in symbols:
         try:
             result = analyze_symbol(symbol)
             profiles[symbol] = result
-            time.sleep(0.5)  # Respeita rate limit
         except Exception as e:
             print(f"   ❌ Erro: {e}")
             profiles[symbol] = {'symbol': symbol, 'buy_rsi': 35, 'sell_rsi': 65, 'error': True}
@@ -13,6 +13,7 @@ Características:
 import json
 import os
 import logging
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, Tuple, Optional
 import pandas as pd
@@ -25,6 +26,8 @@ try:
 except ImportError:
     HAS_TA = False
 
+from src.indicators.streaming_indicators import IncrementalIndicatorEngine
+
 
 class SmartStrategy:
     """
@@ -37,6 +40,20 @@ class SmartStrategy:
     
     name = "Smart Strategy v2.0"
     
+    # Lucro mínimo em USDT para a regra "segura em ALTA"
+    MIN_PROFIT_USDT_HOLD = 2.0
+    
+    # 🏪 Feira: redução máxima do TP, TP mínimo, fração do tempo que libera
+    # a venda em ALTA e corte extra em QUEDA (escalar e vetorizado)
+    FEIRA_MAX_REDUCTION = 0.7
+    FEIRA_MIN_TP = 0.2
+    FEIRA_ALTA_RELEASE = 0.9
+    FEIRA_QUEDA_FACTOR = 0.5
+    FEIRA_QUEDA_MIN_TP = 0.1
+    
+    # Códigos de tendência da versão vetorizada (-1 = desconhecida: não vende no TP)
+    TREND_CODES = {'ALTA': 0, 'LATERAL': 1, 'QUEDA': 2}
+    
     def __init__(self, config: dict = None):
         self.config = config or {}
         
@@ -377,7 +394,17 @@ class SmartStrategy:
         self.trailing_stop_pct = 0.15  # Trailing stop 0.15%
         
         # Controle de picos de preço
+        # (via rápida e ciclo normal atualizam em threads diferentes: só com o lock)
         self.price_peaks: Dict[str, float] = {}
+        self._peaks_lock = threading.Lock()
+        
+        # Última tendência vista pelo should_sell (usada pelo should_sell_fast)
+        self.last_trend: Dict[str, str] = {}
+        
+        # Indicadores incrementais por símbolo (O(1) por candle novo)
+        self.indicator_engine = None
+        if self.config.get('incremental_indicators', True):
+            self.indicator_engine = IncrementalIndicatorEngine()
         
         # Estatísticas do dia
         self.daily_stats = {
@@ -504,8 +531,16 @@ class SmartStrategy:
         return {'buy_rsi': 38, 'sell_rsi': 62, 'rsi_mean': 50}
     
     
-    def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Calcula todos os indicadores técnicos"""
+    def calculate_indicators(self, df: pd.DataFrame, symbol: str = None) -> pd.DataFrame:
+        """
+        Calcula todos os indicadores técnicos
+        
+        Com `symbol`, usa o motor incremental: só os candles novos são
+        processados e apenas as últimas linhas do df são preenchidas.
+        """
+        
+        if symbol and self.indicator_engine is not None and 'timestamp' in df.columns:
+            return self.indicator_engine.apply(symbol, df)
         
         if HAS_TA:
             # ===== BIBLIOTECA TA (PROFISSIONAL) =====
@@ -707,7 +742,7 @@ class SmartStrategy:
         """
         
         # Calcula indicadores
-        df = self.calculate_indicators(df)
+        df = self.calculate_indicators(df, symbol)
         
         current = df.iloc[-1]
         profile = self.get_profile(symbol)
@@ -765,6 +800,102 @@ class SmartStrategy:
         return 'HOLD', f"Aguardando (RSI {rsi:.1f}, threshold {buy_rsi:.1f})", indicators
     
     
+    def _feira_factor(self, symbol: str) -> float:
+        """Fator da feira da crypto (quanto o TP cai com o tempo)"""
+        # Carrega config da feira se existir
+        feira_config = self.config.get('feira_strategy', {})
+        if feira_config.get('enabled', True):
+            # Usa fatores do config YAML
+            feira_factors = feira_config.get('crypto_factors', {
+                'BTCUSDT': 0.3, 'ETHUSDT': 0.3,  # Blue chips - HOLD
+                'BNBUSDT': 0.4, 'LTCUSDT': 0.7,  # Médio
+                'SOLUSDT': 0.5, 'XRPUSDT': 0.5,  # Voláteis - FEIRA MODERADA
+                'LINKUSDT': 0.7, 'AVAXUSDT': 0.6,  # Alta vol + baixo volume
+                'DOTUSDT': 0.6, 'NEARUSDT': 0.6, 'ADAUSDT': 0.5, 'TRXUSDT': 0.5,
+                'DOGEUSDT': 0.9, 'SHIBUSDT': 0.9, 'PEPEUSDT': 0.9,  # Memes - FEIRA AGRESSIVA
+                'UNIUSDT': 0.5, 'AAVEUSDT': 0.5,
+            })
+            default_feira_factor = feira_factors.get('default', 0.5)
+        else:
+            # Fallback hardcoded se desabilitado
+            feira_factors = {
+                'BTCUSDT': 0.3, 'ETHUSDT': 0.3,  # Blue chips - HOLD
+                'BNBUSDT': 0.4, 'LTCUSDT': 0.7,  # Médio
+                'SOLUSDT': 0.5, 'XRPUSDT': 0.5,  # Voláteis - FEIRA MODERADA
+                'LINKUSDT': 0.7, 'AVAXUSDT': 0.6,  # Alta vol + baixo volume
+                'DOTUSDT': 0.6, 'NEARUSDT': 0.6, 'ADAUSDT': 0.5, 'TRXUSDT': 0.5,
+                'DOGEUSDT': 0.9, 'SHIBUSDT': 0.9, 'PEPEUSDT': 0.9,  # Memes - FEIRA AGRESSIVA
+                'UNIUSDT': 0.5, 'AAVEUSDT': 0.5,
+            }
+            default_feira_factor = 0.5
+        
+        return feira_factors.get(symbol, default_feira_factor)
+    
+    
+    def _stop_loss_limit(self, crypto_stop_loss: float, crypto_max_hold: float,
+                         minutes_open: float, profit_pct: float) -> float:
+        """Stop loss da crypto, mais apertado se ficar muito tempo sem lucro"""
+        current_stop = crypto_stop_loss
+        
+        if minutes_open > crypto_max_hold and profit_pct < 0.2:
+            current_stop = crypto_stop_loss * 0.5
+        
+        if minutes_open > crypto_max_hold * 0.5 and profit_pct < -0.3:
+            current_stop = max(crypto_stop_loss * 0.5, -0.5)
+        
+        return current_stop
+    
+    
+    def _feira_take_profit(self, crypto_take_profit: float, feira_factor: float,
+                           minutes_open: float, crypto_max_hold: float, trend: str) -> tuple:
+        """
+        🏪 TP dinâmico da feira: com o tempo o TP DIMINUI (feirante baixando preço)
+        
+        Returns: (tp_dinamico, pode_vender, motivo)
+        """
+        time_factor = min(1.0, minutes_open / crypto_max_hold)
+        tp_reduction = time_factor * feira_factor  # Quanto reduzir (0 a feira_factor)
+        tp_dinamico = crypto_take_profit * (1 - tp_reduction * self.FEIRA_MAX_REDUCTION)  # Reduz até 70% do TP
+        tp_dinamico = max(tp_dinamico, self.FEIRA_MIN_TP)  # Mínimo 0.2%
+        
+        # REGRA DA FEIRA: Só vende quando tendência SAI de ALTA
+        if trend == 'ALTA':
+            # Em ALTA: SEGURA! (a menos que tempo muito longo)
+            if time_factor > self.FEIRA_ALTA_RELEASE:  # Mais de 90% do tempo max
+                return tp_dinamico, True, f"⏰ Tempo longo ({minutes_open:.0f}m) - liberando capital"
+            return tp_dinamico, False, f"📈 ALTA - segurando (TP feira: {tp_dinamico:.2f}%)"
+        elif trend == 'LATERAL':
+            # LATERAL: Pode vender no TP dinâmico
+            return tp_dinamico, True, f"➖ LATERAL - TP feira: {tp_dinamico:.2f}%"
+        
+        # QUEDA: Vende mais rápido ainda
+        tp_dinamico = max(self.FEIRA_QUEDA_MIN_TP, tp_dinamico * self.FEIRA_QUEDA_FACTOR)  # Reduz mais
+        return tp_dinamico, True, f"📉 QUEDA - vendendo rápido (TP: {tp_dinamico:.2f}%)"
+    
+    @classmethod
+    def feira_take_profit_batch(cls, crypto_take_profit: np.ndarray, feira_factor: np.ndarray,
+                                minutes_open: np.ndarray, crypto_max_hold: np.ndarray,
+                                trends: np.ndarray) -> tuple:
+        """
+        _feira_take_profit para N posições de uma vez (mesmas regras)
+        
+        Args:
+            trends: códigos de TREND_CODES (-1 = tendência desconhecida)
+        
+        Returns: (tp_dinamico, pode_vender) - arrays
+        """
+        time_factor = np.minimum(1.0, minutes_open / crypto_max_hold)
+        tp_dinamico = crypto_take_profit * (1 - time_factor * feira_factor * cls.FEIRA_MAX_REDUCTION)
+        tp_dinamico = np.maximum(tp_dinamico, cls.FEIRA_MIN_TP)
+        
+        queda = trends == cls.TREND_CODES['QUEDA']
+        tp_dinamico = np.where(queda, np.maximum(cls.FEIRA_QUEDA_MIN_TP, tp_dinamico * cls.FEIRA_QUEDA_FACTOR),
+                               tp_dinamico)
+        
+        pode_vender = np.where(trends == cls.TREND_CODES['ALTA'], time_factor > cls.FEIRA_ALTA_RELEASE, trends >= 0)
+        return tp_dinamico, pode_vender
+    
+    
     def should_sell(self, symbol: str, entry_price: float, current_price: float, 
                     df: pd.DataFrame, position_time: datetime = None,
                     positions_full: bool = False,
@@ -802,34 +933,7 @@ class SmartStrategy:
         crypto_config = self.get_crypto_config(symbol)
         
         # ===== ESTRATÉGIA DE FEIRA - FATOR POR CRYPTO =====
-        # Carrega config da feira se existir
-        feira_config = self.config.get('feira_strategy', {})
-        if feira_config.get('enabled', True):
-            # Usa fatores do config YAML
-            feira_factors = feira_config.get('crypto_factors', {
-                'BTCUSDT': 0.3, 'ETHUSDT': 0.3,  # Blue chips - HOLD
-                'BNBUSDT': 0.4, 'LTCUSDT': 0.7,  # Médio
-                'SOLUSDT': 0.5, 'XRPUSDT': 0.5,  # Voláteis - FEIRA MODERADA
-                'LINKUSDT': 0.7, 'AVAXUSDT': 0.6,  # Alta vol + baixo volume
-                'DOTUSDT': 0.6, 'NEARUSDT': 0.6, 'ADAUSDT': 0.5, 'TRXUSDT': 0.5,
-                'DOGEUSDT': 0.9, 'SHIBUSDT': 0.9, 'PEPEUSDT': 0.9,  # Memes - FEIRA AGRESSIVA
-                'UNIUSDT': 0.5, 'AAVEUSDT': 0.5,
-            })
-            default_feira_factor = feira_factors.get('default', 0.5)
-        else:
-            # Fallback hardcoded se desabilitado
-            feira_factors = {
-                'BTCUSDT': 0.3, 'ETHUSDT': 0.3,  # Blue chips - HOLD
-                'BNBUSDT': 0.4, 'LTCUSDT': 0.7,  # Médio
-                'SOLUSDT': 0.5, 'XRPUSDT': 0.5,  # Voláteis - FEIRA MODERADA
-                'LINKUSDT': 0.7, 'AVAXUSDT': 0.6,  # Alta vol + baixo volume
-                'DOTUSDT': 0.6, 'NEARUSDT': 0.6, 'ADAUSDT': 0.5, 'TRXUSDT': 0.5,
-                'DOGEUSDT': 0.9, 'SHIBUSDT': 0.9, 'PEPEUSDT': 0.9,  # Memes - FEIRA AGRESSIVA
-                'UNIUSDT': 0.5, 'AAVEUSDT': 0.5,
-            }
-            default_feira_factor = 0.5
-        
-        feira_factor = feira_factors.get(symbol, default_feira_factor)
+        feira_factor = self._feira_factor(symbol)
         
         # ===== PARÂMETROS ESPECÍFICOS DA CRYPTO (baseado no estudo) =====
         # Cada categoria tem configs diferentes:
@@ -847,25 +951,24 @@ class SmartStrategy:
         sell_rsi = crypto_rsi_sell  # Usa RSI de venda específico da crypto
         
         # Calcula indicadores
-        df = self.calculate_indicators(df)
+        df = self.calculate_indicators(df, symbol)
         current = df.iloc[-1]
         rsi = current.get('rsi', 50)
         
-        # Detecta tendência
+        # Detecta tendência (guardada para a via rápida de saída)
         trend, strength, reasons = self.detect_trend(df)
+        self.last_trend[symbol] = trend
         
         # ===== 💰 REGRA DOS 2 USDT - HOLD EM ALTA, VENDE EM NEUTRO/BAIXA =====
         # Se lucro > 2 USDT: só vende quando tendência sair de ALTA
-        MIN_PROFIT_USDT_HOLD = 2.0  # Lucro mínimo em USDT para aplicar regra
-        
-        if profit_usdt >= MIN_PROFIT_USDT_HOLD:
+        if profit_usdt >= self.MIN_PROFIT_USDT_HOLD:
             if trend == 'ALTA':
                 # Tendência de ALTA → SEGURA para maximizar lucro
                 self.logger.info(f"💰 [{symbol}] Lucro ${profit_usdt:.2f} com tendência ALTA - SEGURANDO!")
                 return False, f"💰 HOLD ALTA: ${profit_usdt:.2f} lucro ({strength}/4 sinais alta) - Segurando!"
             else:
                 # Tendência LATERAL ou QUEDA → VENDE para garantir lucro
-                self.price_peaks.pop(symbol, None)
+                self.clear_peak(symbol)
                 self.logger.info(f"💰 [{symbol}] Lucro ${profit_usdt:.2f} com tendência {trend} - VENDENDO!")
                 return True, f"💰 VENDA {trend}: ${profit_usdt:.2f} lucro (+{profit_pct:.2f}%) - Tendência virou!"
         
@@ -879,12 +982,7 @@ class SmartStrategy:
         
         # ===== 0. TRAILING STOP (PROTEGE LUCRO) =====
         # Atualiza pico de preço
-        if symbol not in self.price_peaks:
-            self.price_peaks[symbol] = current_price
-        elif current_price > self.price_peaks[symbol]:
-            self.price_peaks[symbol] = current_price
-        
-        peak_price = self.price_peaks.get(symbol, current_price)
+        peak_price = self._update_peak(symbol, current_price)
         drawdown_from_peak = ((current_price - peak_price) / peak_price) * 100
         
         # Se subiu mais que take_profit e agora caiu 0.15% do pico → VENDE
@@ -892,61 +990,31 @@ class SmartStrategy:
         trailing_trigger = crypto_take_profit * 0.6  # 60% do take profit
         if profit_from_entry_to_peak > trailing_trigger and drawdown_from_peak < -self.trailing_stop_pct:
             # Limpa o pico
-            self.price_peaks.pop(symbol, None)
+            self.clear_peak(symbol)
             return True, f"📉 TRAILING STOP (caiu {drawdown_from_peak:.2f}% do pico) +{profit_pct:.2f}%"
         
         # ===== 0.5. LUCRO MÍNIMO GARANTIDO (ESPECÍFICO POR CRYPTO) =====
         if profit_pct >= crypto_min_profit:
             # Se RSI está subindo muito ou descendo, vende
             if rsi > 55 or (trend == 'QUEDA' and strength >= 2):
-                self.price_peaks.pop(symbol, None)
+                self.clear_peak(symbol)
                 return True, f"💰 LUCRO RÁPIDO +{profit_pct:.2f}% (min: {crypto_min_profit}%)"
         
         # ===== 1. STOP LOSS ESPECÍFICO POR CRYPTO =====
-        current_stop = crypto_stop_loss
-        
-        # Stop mais apertado se ficar muito tempo sem lucro
-        if minutes_open > crypto_max_hold and profit_pct < 0.2:
-            current_stop = crypto_stop_loss * 0.5
-        
-        if minutes_open > crypto_max_hold * 0.5 and profit_pct < -0.3:
-            current_stop = max(crypto_stop_loss * 0.5, -0.5)
+        current_stop = self._stop_loss_limit(crypto_stop_loss, crypto_max_hold, minutes_open, profit_pct)
         
         if profit_pct <= current_stop:
-            self.price_peaks.pop(symbol, None)
+            self.clear_peak(symbol)
             return True, f"🛑 STOP LOSS {profit_pct:.2f}% (limite: {current_stop:.2f}%)"
         
         # ===== 2. 🏪 TAKE PROFIT DINÂMICO (ESTRATÉGIA FEIRA) =====
-        # Com o tempo, o TP DIMINUI (feirante baixando preço)
-        time_factor = min(1.0, minutes_open / crypto_max_hold)
-        tp_reduction = time_factor * feira_factor  # Quanto reduzir (0 a feira_factor)
-        tp_dinamico = crypto_take_profit * (1 - tp_reduction * 0.7)  # Reduz até 70% do TP
-        tp_dinamico = max(tp_dinamico, 0.2)  # Mínimo 0.2%
-        
-        # REGRA DA FEIRA: Só vende quando tendência SAI de ALTA
-        pode_vender_feira = False
-        
-        if trend == 'ALTA':
-            # Em ALTA: SEGURA! (a menos que tempo muito longo)
-            if time_factor > 0.9:  # Mais de 90% do tempo max
-                pode_vender_feira = True
-                motivo_feira = f"⏰ Tempo longo ({minutes_open:.0f}m) - liberando capital"
-            else:
-                pode_vender_feira = False
-                motivo_feira = f"📈 ALTA - segurando (TP feira: {tp_dinamico:.2f}%)"
-        elif trend == 'LATERAL':
-            # LATERAL: Pode vender no TP dinâmico
-            pode_vender_feira = True
-            motivo_feira = f"➖ LATERAL - TP feira: {tp_dinamico:.2f}%"
-        else:  # QUEDA
-            # QUEDA: Vende mais rápido ainda
-            pode_vender_feira = True
-            tp_dinamico = max(0.1, tp_dinamico * 0.5)  # Reduz mais
-            motivo_feira = f"📉 QUEDA - vendendo rápido (TP: {tp_dinamico:.2f}%)"
+        tp_dinamico, pode_vender_feira, motivo_feira = self._feira_take_profit(
+            crypto_take_profit, feira_factor, minutes_open, crypto_max_hold, trend
+        )
         
         # Verifica se atingiu TP dinâmico E pode vender
         if profit_pct >= tp_dinamico and pode_vender_feira:
-            self.price_peaks.pop(symbol, None)
+            self.clear_peak(symbol)
             return True, f"🏪 FEIRA {motivo_feira} +{profit_pct:.2f}%"
         
         # Se não pode vender (em ALTA), mostra status
@@ -969,28 +1037,28 @@ class SmartStrategy:
             # Após 60% do tempo max: vende se tendência não for mais ALTA ou queda brusca
             if minutes_open > adjusted_max_hold * 0.6 and profit_pct >= 0:
                 if trend != 'ALTA':  # Tendência virou para LATERAL ou QUEDA
-                    self.price_peaks.pop(symbol, None)
+                    self.clear_peak(symbol)
                     return True, f"⚡ TEND VIROU ({minutes_open:.0f}min) {trend} +{profit_pct:.2f}%"
                 if queda_brusca < -0.3:  # Queda brusca de mais de 0.3%
-                    self.price_peaks.pop(symbol, None)
+                    self.clear_peak(symbol)
                     return True, f"📉 QUEDA BRUSCA ({queda_brusca:.2f}%) +{profit_pct:.2f}%"
             
             # Após tempo max: mesma lógica, mas também vende se no prejuízo com tendência ruim
             if minutes_open > adjusted_max_hold:
                 if trend != 'ALTA':  # Tendência não é mais de alta
-                    self.price_peaks.pop(symbol, None)
+                    self.clear_peak(symbol)
                     return True, f"⏰ TEMPO+TEND ({minutes_open:.0f}min/{adjusted_max_hold:.0f}max) {trend} {profit_pct:+.2f}%"
                 if queda_brusca < -0.3:  # Queda brusca
-                    self.price_peaks.pop(symbol, None)
+                    self.clear_peak(symbol)
                     return True, f"⏰ TEMPO+QUEDA ({minutes_open:.0f}min) {queda_brusca:.2f}% {profit_pct:+.2f}%"
                 # Se ainda está em ALTA após max_hold, segura mais 60% do tempo
                 if minutes_open > adjusted_max_hold * 1.6:
-                    self.price_peaks.pop(symbol, None)
+                    self.clear_peak(symbol)
                     return True, f"⏰ TEMPO MAX ({minutes_open:.0f}min) {profit_pct:+.2f}%"
         
         # ===== 4. RSI OVERBOUGHT =====
         if rsi > sell_rsi and profit_pct > 0.2:
-            self.price_peaks.pop(symbol, None)
+            self.clear_peak(symbol)
             return True, f"📈 RSI {rsi:.1f} > {sell_rsi} +{profit_pct:.2f}%"
         
         # ===== 5. MODO AGRESSIVO (POSIÇÕES CHEIAS) =====
@@ -1002,23 +1070,23 @@ class SmartStrategy:
             aggressive_sell_rsi = 50
             
             if rsi > aggressive_sell_rsi:
-                self.price_peaks.pop(symbol, None)
+                self.clear_peak(symbol)
                 return True, f"🚀 AGRESSIVO RSI {rsi:.1f} > {aggressive_sell_rsi} +{profit_pct:.2f}%"
             
             # Aceita vender em LATERAL com qualquer lucro
             if trend == 'LATERAL' and profit_pct > 0:
-                self.price_peaks.pop(symbol, None)
+                self.clear_peak(symbol)
                 return True, f"🚀 AGRESSIVO LATERAL +{profit_pct:.2f}%"
             
             # Se estiver no lucro e com sinal de queda fraco (2+ sinais)
             if trend == 'QUEDA' and strength >= 2 and profit_pct > 0:
-                self.price_peaks.pop(symbol, None)
+                self.clear_peak(symbol)
                 return True, f"🚀 AGRESSIVO QUEDA ({strength}/4) +{profit_pct:.2f}%"
         
         # ===== 6. REGRA PRINCIPAL: TENDÊNCIA VIROU QUEDA? =====
         if profit_pct > self.min_profit_to_hold:
             if trend == 'QUEDA' and strength >= 3:
-                self.price_peaks.pop(symbol, None)
+                self.clear_peak(symbol)
                 return True, f"📉 QUEDA ({strength}/4): {' '.join(reasons)} +{profit_pct:.2f}%"
             elif trend == 'ALTA':
                 # Tendência ainda ALTA → SEGURA!
@@ -1026,13 +1094,92 @@ class SmartStrategy:
             else:
                 # LATERAL com lucro bom → pode vender
                 if profit_pct > 0.8:
-                    self.price_peaks.pop(symbol, None)
+                    self.clear_peak(symbol)
                     return True, f"↔️ LATERAL +{profit_pct:.2f}%"
         
         # ===== 7. Ainda não tem lucro suficiente =====
         return False, f"⏳ Aguardando ({profit_pct:+.2f}%) - Tend: {trend}"
     
     
+    def exit_params(self, symbol: str) -> dict:
+        """Parâmetros das saídas de preço do should_sell (BatchExitEvaluator.add)"""
+        crypto_config = self.get_crypto_config(symbol)
+        crypto_take_profit = crypto_config.get('take_profit', 0.5)
+        return {
+            'base_tp': crypto_take_profit,
+            'stop_loss': crypto_config.get('stop_loss', -1.0),
+            'max_hold_minutes': crypto_config.get('max_hold_min', 120),
+            'trailing_pct': self.trailing_stop_pct,
+            'trailing_trigger': crypto_take_profit * 0.6,
+            'feira_factor': self._feira_factor(symbol),
+        }
+    
+    def _update_peak(self, symbol: str, price: float) -> float:
+        """Atualiza e retorna o pico de preço do símbolo (atômico)"""
+        with self._peaks_lock:
+            peak = max(self.price_peaks.get(symbol, price), price)
+            self.price_peaks[symbol] = peak
+            return peak
+    
+    def clear_peak(self, symbol: str):
+        """Esquece o pico (posição vendida)"""
+        with self._peaks_lock:
+            self.price_peaks.pop(symbol, None)
+    
+    def should_sell_fast(self, symbol: str, entry_price: float, current_price: float,
+                         position_time: datetime = None,
+                         position_size: float = None) -> Tuple[bool, str]:
+        """
+        Saídas que dependem SÓ do preço - chamado a cada tick pela via rápida.
+        
+        Trailing stop, stop loss e TP da feira com os mesmos limites do
+        should_sell. A tendência é a última vista pelo ciclo normal (sem
+        tendência ainda, o TP fica para o ciclo). RSI, queda brusca e demais
+        regras com indicadores continuam só no should_sell.
+        """
+        profit_pct = ((current_price - entry_price) / entry_price) * 100
+        trend = self.last_trend.get(symbol)
+        
+        # Regra dos 2 USDT: em ALTA quem decide é o ciclo normal
+        profit_usdt = position_size * (profit_pct / 100) if position_size else 0
+        if profit_usdt >= self.MIN_PROFIT_USDT_HOLD and trend == 'ALTA':
+            return False, f"💰 HOLD ALTA: ${profit_usdt:.2f} lucro"
+        
+        crypto_config = self.get_crypto_config(symbol)
+        crypto_stop_loss = crypto_config.get('stop_loss', -1.0)
+        crypto_take_profit = crypto_config.get('take_profit', 0.5)
+        crypto_max_hold = crypto_config.get('max_hold_min', 120)
+        
+        minutes_open = 0
+        if position_time:
+            minutes_open = (datetime.now() - position_time).total_seconds() / 60
+        
+        # Trailing stop (o pico acompanha cada tick)
+        peak_price = self._update_peak(symbol, current_price)
+        drawdown_from_peak = ((current_price - peak_price) / peak_price) * 100
+        profit_from_entry_to_peak = ((peak_price - entry_price) / entry_price) * 100
+        if profit_from_entry_to_peak > crypto_take_profit * 0.6 and drawdown_from_peak < -self.trailing_stop_pct:
+            self.clear_peak(symbol)
+            return True, f"📉 TRAILING STOP (caiu {drawdown_from_peak:.2f}% do pico) +{profit_pct:.2f}%"
+        
+        # Stop loss
+        current_stop = self._stop_loss_limit(crypto_stop_loss, crypto_max_hold, minutes_open, profit_pct)
+        if profit_pct <= current_stop:
+            self.clear_peak(symbol)
+            return True, f"🛑 STOP LOSS {profit_pct:.2f}% (limite: {current_stop:.2f}%)"
+        
+        # TP da feira
+        if trend is not None:
+            tp_dinamico, pode_vender, motivo = self._feira_take_profit(
+                crypto_take_profit, self._feira_factor(symbol), minutes_open, crypto_max_hold, trend
+            )
+            if profit_pct >= tp_dinamico and pode_vender:
+                self.clear_peak(symbol)
+                return True, f"🏪 FEIRA {motivo} +{profit_pct:.2f}%"
+        
+        return False, f"⏳ Aguardando ({profit_pct:+.2f}%)"
+    
+    
     def update_daily_stats(self, pnl: float):
         """Atualiza estatísticas diárias"""
         today = datetime.now().date()
@@ -19,6 +19,7 @@ import os
 import json
 import yaml
 import logging
+import threading
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -32,6 +33,8 @@ try:
 except ImportError:
     HAS_TA = False
 
+from src.indicators.streaming_indicators import IncrementalIndicatorEngine
+
 logger = logging.getLogger(__name__)
 
 
@@ -65,8 +68,14 @@ class SmartStrategy:
         self.max_hold_minutes = self.smart_config.get('max_hold_minutes', 5)
         self.min_profit_to_hold = config.get('targets', {}).get('min_trade_profit', 0.05)
         
-        # Controle de picos de preço
+        # Controle de picos de preço (só com o lock: via rápida x ciclo)
         self.price_peaks: Dict[str, float] = {}
+        self._peaks_lock = threading.Lock()
+        
+        # Indicadores incrementais por símbolo (O(1) por candle novo)
+        self.indicator_engine = None
+        if self.config.get('incremental_indicators', True):
+            self.indicator_engine = IncrementalIndicatorEngine()
         
         # Estatísticas do dia
         self.daily_stats = {
@@ -93,8 +102,16 @@ class SmartStrategy:
         # Perfil padrão
         return {'buy_rsi': 38, 'sell_rsi': 62, 'rsi_mean': 50}
     
-    def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Calcula todos os indicadores técnicos"""
+    def calculate_indicators(self, df: pd.DataFrame, symbol: str = None) -> pd.DataFrame:
+        """
+        Calcula todos os indicadores técnicos
+        
+        Com `symbol`, usa o motor incremental: só os candles novos são
+        processados e apenas as últimas linhas do df são preenchidas.
+        """
+        
+        if symbol and self.indicator_engine is not None and 'timestamp' in df.columns:
+            return self.indicator_engine.apply(symbol, df)
         
         if HAS_TA:
             # ===== BIBLIOTECA TA (PROFISSIONAL) =====
@@ -263,7 +280,7 @@ class SmartStrategy:
         """
         
         # Calcula indicadores
-        df = self.calculate_indicators(df)
+        df = self.calculate_indicators(df, symbol)
         
         current = df.iloc[-1]
         profile = self.get_profile(symbol)
@@ -326,17 +343,45 @@ class SmartStrategy:
             reason: Motivo do fechamento
         """
         
+        # 1-5. Regras de preço/tempo
+        should_close, reason = self.should_close_fast(symbol, entry_price, current_price, entry_time)
+        if should_close:
+            return True, reason
+        
+        pnl_pct = ((current_price - entry_price) / entry_price) * 100
+        
+        # 6. Tendência virou para QUEDA (se tiver df)
+        if df is not None:
+            df = self.calculate_indicators(df, symbol)
+            trend, strength, reasons = self.detect_trend(df)
+            
+            if trend == 'QUEDA' and strength >= 3 and pnl_pct > 0:
+                return True, f"TENDÊNCIA QUEDA: {', '.join(reasons)} | Lucro: {pnl_pct:.2f}%"
+        
+        return False, reason
+    
+    def should_close_fast(
+        self,
+        symbol: str,
+        entry_price: float,
+        current_price: float,
+        entry_time: datetime
+    ) -> Tuple[bool, str]:
+        """
+        Regras de saída que dependem só do preço e do tempo (sem indicadores).
+        Barato o suficiente para rodar a cada tick (via rápida de saída).
+        """
+        
         # Calcula PnL%
         pnl_pct = ((current_price - entry_price) / entry_price) * 100
         
         # Tempo na posição
         hold_minutes = (datetime.now() - entry_time).total_seconds() / 60
         
-        # Atualiza pico de preço (para trailing stop)
-        peak = self.price_peaks.get(symbol, entry_price)
-        if current_price > peak:
-            self.price_peaks[symbol] = current_price
-            peak = current_price
+        # Atualiza pico de preço (para trailing stop) - via rápida e ciclo em threads diferentes
+        with self._peaks_lock:
+            peak = max(self.price_peaks.get(symbol, entry_price), current_price)
+            self.price_peaks[symbol] = peak
         
         # ===== VERIFICAÇÕES DE SAÍDA =====
         
@@ -365,14 +410,6 @@ class SmartStrategy:
             elif pnl_pct < 0:
                 return True, f"TEMPO: {hold_minutes:.1f}min com prejuízo {pnl_pct:.2f}%"
         
-        # 6. Tendência virou para QUEDA (se tiver df)
-        if df is not None:
-            df = self.calculate_indicators(df)
-            trend, strength, reasons = self.detect_trend(df)
-            
-            if trend == 'QUEDA' and strength >= 3 and pnl_pct > 0:
-                return True, f"TENDÊNCIA QUEDA: {', '.join(reasons)} | Lucro: {pnl_pct:.2f}%"
-        
         return False, f"HOLD: PnL {pnl_pct:.2f}% | {hold_minutes:.1f}min"
 
 
@@ -467,6 +504,16 @@ class UnicoBot:
             symbol, entry_price, current_price, entry_time, df
         )
     
+    def should_close_fast(
+        self,
+        symbol: str,
+        entry_price: float,
+        current_price: float,
+        entry_time: datetime
+    ) -> Tuple[bool, str]:
+        """Verifica só as saídas de preço/tempo (via rápida, a cada tick)"""
+        return self.strategy.should_close_fast(symbol, entry_price, current_price, entry_time)
+    
     def update_trade_time(self, symbol: str):
         """Atualiza tempo do último trade"""
         self.strategy.last_trade_time[symbol] = datetime.now()
@@ -0,0 +1,45 @@
+import yaml
+
+import src.ai_monitor as ai_monitor
+from src.core.pnl_aggregates import PnLAggregates
+
+
+def make_monitor(tmp_path, monkeypatch, auto_adjust):
+    config = {
+        'global': {'ai_monitor': {'auto_adjust_config': auto_adjust}},
+        'bot_unico': {'risk': {'stop_loss': -1.0}, 'trading': {'amount_per_trade': 20}},
+    }
+    path = tmp_path / 'bots_config.yaml'
+    path.write_text(yaml.dump(config))
+
+    # Trades do UnicoBot são gravados como 'unico_bot'
+    aggregates = PnLAggregates(path=None)
+    for pnl in (1.0, -0.5, -0.4, -0.3):
+        aggregates.record({'bot_type': 'unico_bot', 'pnl_usd': pnl, 'exit_time': '2025-01-15T10:00:00'})
+    monkeypatch.setattr(ai_monitor, 'get_pnl_aggregates', lambda: aggregates)
+
+    monitor = ai_monitor.AdaptiveAIMonitor(str(path))
+    monitor._load_balances = lambda: {}   # sem snapshot do dashboard
+    monitor._update_bot_performance()
+    return monitor, path
+
+
+def test_unico_bot_trades_feed_bot_unico(tmp_path, monkeypatch):
+    monitor, _ = make_monitor(tmp_path, monkeypatch, auto_adjust=False)
+    perf = monitor.bot_performance['bot_unico']
+    assert (perf['wins'], perf['losses'], perf['consecutive_losses']) == (1, 3, 3)
+
+
+def test_config_is_only_rewritten_with_auto_adjust(tmp_path, monkeypatch):
+    monitor, path = make_monitor(tmp_path, monkeypatch, auto_adjust=False)
+    before = path.read_text()
+    monitor._analyze_and_adjust_bots()
+    assert path.read_text() == before
+    assert {adj['reason'] for adj in monitor.adjustments_history} == {'consecutive_losses', 'low_win_rate'}
+    assert not any(adj['applied'] for adj in monitor.adjustments_history)
+
+    monitor, path = make_monitor(tmp_path, monkeypatch, auto_adjust=True)
+    monitor._analyze_and_adjust_bots()
+    config = yaml.safe_load(path.read_text())
+    assert config['bot_unico']['risk']['stop_loss'] == -0.7
+    assert config['bot_unico']['trading']['amount_per_trade'] == 15
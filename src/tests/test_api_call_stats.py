@@ -0,0 +1,51 @@
+from src.core.api_call_stats import ApiCallStats
+from src.core.request_scheduler import RequestPriority, RequestScheduler
+
+
+def test_window_aggregates_per_endpoint_and_symbol():
+    stats = ApiCallStats(window_seconds=60)
+    for ms in range(1, 101):
+        stats.record('fetch_ohlcv', ms, symbol='BTC/USDT', weight=2, used_weight=300 + ms)
+    stats.record('create_market_order', 50, symbol='ETH/USDT', weight=1, retries=1,
+                 error='InsufficientFunds')
+    stats.record_dropped('fetch_tickers')
+
+    status = stats.get_status()
+    ohlcv = status['endpoints']['fetch_ohlcv']
+    assert ohlcv['calls'] == 100 and ohlcv['weight'] == 200
+    assert ohlcv['used_weight_1m_max'] == 400
+    assert 95 <= ohlcv['p95_ms'] <= 100
+
+    order = status['endpoints']['create_market_order']
+    assert order['retries'] == 1 and order['error_rate'] == 1.0
+    assert order['error_classes'] == {'InsufficientFunds': 1}
+    assert status['endpoints']['fetch_tickers']['dropped'] == 1
+    assert status['symbols']['BTC/USDT']['calls'] == 100
+
+
+def test_degraded_exchange_backs_off_lowest_priority_first():
+    scheduler = RequestScheduler(weight_per_minute=6000)
+    stats = ApiCallStats(scheduler, p95_threshold_ms=1000, error_rate_threshold=0.2,
+                         min_calls=10, backoff_seconds=30, check_seconds=3600)
+
+    # Erros do chamador (saldo, ordem inválida) não contam para a saúde
+    for _ in range(10):
+        stats.record('fetch_ohlcv', 10, error='BadSymbol')
+    assert stats.check_health() == 0
+    assert scheduler.acquire(1, RequestPriority.ANALYTICS)
+
+    # p95 acima do limite: só ANALYTICS pausa
+    for _ in range(30):
+        stats.record('fetch_ohlcv', 1500)
+    assert stats.check_health() == 1
+    assert not scheduler.acquire(1, RequestPriority.ANALYTICS)
+    assert scheduler.acquire(1, RequestPriority.SCAN)
+
+    # Rede caindo (2x o limite de erros): SCAN também; ordens e posições seguem
+    for _ in range(60):
+        stats.record('fetch_ohlcv', 10, error='RequestTimeout', transient=True)
+    assert stats.check_health() == 2
+    assert not scheduler.acquire(1, RequestPriority.SCAN)
+    assert scheduler.acquire(1, RequestPriority.POSITION)
+    assert scheduler.acquire(1, RequestPriority.ORDER)
+    assert scheduler.get_status()['throttled_seconds'].keys() == {'SCAN', 'ANALYTICS'}
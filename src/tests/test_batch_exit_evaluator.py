@@ -0,0 +1,106 @@
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.strategies.batch_exit_evaluator import TREND_CODES, BatchExitEvaluator
+from src.strategies.smart_strategy import SmartStrategy
+
+NOW = 1_700_000_000.0
+
+
+def add(evaluator, symbol, entry=100.0, minutes=0, bot_type='bot_medio', **kwargs):
+    params = dict(entry_price=entry, entry_time=NOW - minutes * 60, amount=1.0, bot_type=bot_type,
+                  base_tp=1.0, stop_loss=-1.0, max_hold_minutes=120,
+                  trailing_pct=0.15, trailing_trigger=0.6)
+    params.update(kwargs)
+    evaluator.add(symbol, **params)
+
+
+def test_feira_take_profit_batch_matches_scalar():
+    strategy = SmartStrategy({'bot_type': 'bot_teste'})
+    rng = np.random.default_rng(1)
+    trends = ['ALTA', 'LATERAL', 'QUEDA']
+
+    base_tp = rng.uniform(0.2, 3.0, 200)
+    factor = rng.choice([0.3, 0.5, 0.7, 0.9], 200)
+    minutes = rng.uniform(0, 250, 200)
+    max_hold = rng.choice([30.0, 60.0, 120.0, 180.0], 200)
+    trend = rng.choice(trends, 200)
+
+    tp, pode = SmartStrategy.feira_take_profit_batch(
+        base_tp, factor, minutes, max_hold, np.array([TREND_CODES[t] for t in trend]))
+    for i in range(200):
+        expected_tp, expected_pode, _ = strategy._feira_take_profit(
+            base_tp[i], factor[i], minutes[i], max_hold[i], trend[i])
+        assert tp[i] == pytest.approx(expected_tp)
+        assert pode[i] == expected_pode
+
+
+def test_batch_exits_agree_with_should_sell():
+    """Mesmas posições, mesmos preços: saída do lote <=> saída de preço do should_sell"""
+    strategy = SmartStrategy({'bot_type': 'bot_teste', 'feira_strategy': {
+        'crypto_factors': {'BTCUSDT': 0.3, 'DOGEUSDT': 0.9, 'default': 0.6}}})
+    trend = {}
+    # Indicadores neutros: só as regras de preço/tempo decidem
+    strategy.calculate_indicators = lambda df, symbol=None: df
+    strategy.detect_trend = lambda df: (trend['value'], 1, [])
+
+    rng = np.random.default_rng(7)
+    price_exits = ('🛑 STOP LOSS', '📉 TRAILING STOP', '🏪 FEIRA')
+    seen = {'both': 0, 'none': 0}
+    for case in range(300):
+        symbol = ['BTCUSDT', 'DOGEUSDT', 'SOLUSDT'][case % 3]
+        trend['value'] = ['ALTA', 'LATERAL', 'QUEDA'][rng.integers(3)]
+        minutes = float(rng.uniform(0, 200))
+        position_time = datetime.now() - timedelta(minutes=minutes)
+        amount = 0.01  # posição de 1 USDT: fora da regra dos 2 USDT
+
+        strategy.clear_peak(symbol)
+        evaluator = BatchExitEvaluator()
+        evaluator.add(symbol, entry_price=100.0, entry_time=position_time, amount=amount,
+                      bot_type='bot_teste', **strategy.exit_params(symbol))
+
+        for price in rng.uniform(98.0, 102.5, 2):
+            df = pd.DataFrame({'close': [price] * 3, 'rsi': [50.0] * 3})
+            result = evaluator.evaluate({symbol: price}, now=time.time(), trends={symbol: trend['value']})
+            sell, reason = strategy.should_sell(symbol, 100.0, price, df, position_time,
+                                                position_size=amount * 100.0)
+            batch_exit = bool(result['exit'][0])
+
+            # Toda saída do lote o should_sell também faz; toda saída de preço dele, o lote faz
+            assert not batch_exit or sell, (symbol, trend['value'], minutes, price, reason)
+            if reason.startswith(price_exits):
+                assert batch_exit, (symbol, trend['value'], minutes, price, reason)
+            seen['both' if batch_exit else 'none'] += 1
+            if sell:
+                break
+
+    assert seen['both'] > 20 and seen['none'] > 20
+
+
+def test_exits_for_all_positions_in_one_pass():
+    evaluator = BatchExitEvaluator(capacity=2)
+    add(evaluator, 'STOPUSDT')
+    add(evaluator, 'TRAILUSDT')
+    add(evaluator, 'TAKEUSDT', minutes=60)
+    add(evaluator, 'HOLDUSDT', minutes=60)
+    add(evaluator, 'GONEUSDT')
+
+    # Sobe: marca o pico do trailing
+    assert evaluator.exits({'TRAILUSDT': 101.0}, now=NOW) == []
+    evaluator.remove('GONEUSDT')
+
+    prices = {'STOPUSDT': 98.9, 'TRAILUSDT': 100.8, 'TAKEUSDT': 100.9, 'HOLDUSDT': 100.9}
+    exits = evaluator.exits(prices, now=NOW, trends={'TAKEUSDT': 'LATERAL', 'HOLDUSDT': 'ALTA'})
+    reasons = {symbol: reason for symbol, price, reason in exits}
+    assert set(reasons) == {'STOPUSDT', 'TRAILUSDT', 'TAKEUSDT'}
+    assert 'STOP LOSS' in reasons['STOPUSDT']
+    assert 'TRAILING' in reasons['TRAILUSDT']
+    assert 'FEIRA' in reasons['TAKEUSDT']
+
+    # Sem preço no snapshot: nenhuma decisão
+    assert evaluator.exits({}, now=NOW) == []
+    assert len(evaluator) == 4 and 'GONEUSDT' not in evaluator
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+ta = pytest.importorskip('ta')
+
+from src.indicators.technical_indicators import BatchIndicators, TechnicalIndicators
+
+
+def make_frames(lengths=(120, 100, 80), seed=1):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for n in lengths:
+        close = 100 + np.cumsum(rng.normal(0, 1, n))
+        frames.append(pd.DataFrame({
+            'close': close,
+            'high': close + rng.uniform(0, 1, n),
+            'low': close - rng.uniform(0, 1, n),
+        }))
+    return frames
+
+
+def test_batch_matches_ta_per_symbol_with_padding():
+    frames = make_frames()
+    result = BatchIndicators.compute(frames)
+
+    for i, df in enumerate(frames):
+        n = len(df)
+        close = df['close']
+        macd = ta.trend.MACD(close)
+        bb = ta.volatility.BollingerBands(close, window=20)
+        expected = {
+            'rsi': ta.momentum.RSIIndicator(close, window=14).rsi(),
+            'ema21': ta.trend.EMAIndicator(close, window=21).ema_indicator(),
+            'sma50': ta.trend.SMAIndicator(close, window=50).sma_indicator(),
+            'macd': macd.macd(),
+            'macd_signal': macd.macd_signal(),
+            'bb_upper': bb.bollinger_hband(),
+            'bb_lower': bb.bollinger_lband(),
+            'atr': ta.volatility.AverageTrueRange(df['high'], df['low'], close).average_true_range(),
+        }
+        for column, series in expected.items():
+            got = result[column][i, -n:]
+            assert np.allclose(got, series.to_numpy(), rtol=1e-9, atol=1e-9, equal_nan=True), column
+        # Padding à esquerda fica NaN
+        assert np.isnan(result['rsi'][i, :-n]).all()
+
+
+def test_batch_sma_rsi_matches_technical_indicators():
+    df = make_frames((100,))[0]
+    closes = BatchIndicators.stack_frames([df])
+
+    expected = TechnicalIndicators.calculate_rsi(df).to_numpy()
+    got = BatchIndicators.rsi(closes, method='sma')[0]
+    assert np.allclose(got, expected, equal_nan=True)
@@ -0,0 +1,12 @@
+import asyncio
+
+from src.core.utils import call_exchange
+
+
+def test_call_exchange_runs_sync_clients_in_thread():
+    class SyncExchange:
+        def fetch_ohlcv(self, symbol, timeframe, limit=100):
+            return [[0, 1, 1, 1, 1, 1]] * limit
+
+    data = asyncio.run(call_exchange(SyncExchange(), 'fetch_ohlcv', 'BTCUSDT', '1h', limit=3))
+    assert len(data) == 3
@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from src.core.candle_buffer import CandleRingBuffer
+from src.core.websocket_client import BinanceWebSocket
+
+
+def make_rows(n, start=0):
+    return [[60000 * i, i, i + 1, i - 1, i + 0.5, 10 * i] for i in range(start, start + n)]
+
+
+def test_append_wraps_and_keeps_last_candles():
+    buf = CandleRingBuffer(capacity=5)
+    buf.extend(make_rows(12))
+
+    assert len(buf) == 5
+    view = buf.view()
+    assert list(view['timestamp']) == [60000 * i for i in range(7, 12)]
+    assert list(view['close']) == [i + 0.5 for i in range(7, 12)]
+
+
+def test_view_is_zero_copy_and_tracks_open_candle():
+    buf = CandleRingBuffer(capacity=4)
+    buf.extend(make_rows(6))
+
+    view = buf.view(3)
+    assert np.shares_memory(view['close'], buf._values)
+    assert not view['close'].flags.writeable
+
+    # Candle em andamento: mesmo timestamp atualiza in-place
+    buf.upsert(60000 * 5, 5, 9, 4, 8.0, 99)
+    assert view['close'][-1] == 8.0
+    assert len(buf) == 4
+
+
+def test_upsert_ignores_late_messages():
+    buf = CandleRingBuffer(capacity=4)
+    buf.extend(make_rows(3))
+
+    assert buf.upsert(0, 1, 1, 1, 1, 1) is False
+    assert buf.last_timestamp == 60000 * 2
+
+
+def test_to_dataframe_copies():
+    buf = CandleRingBuffer(capacity=4)
+    buf.extend(make_rows(4))
+
+    df = buf.to_dataframe(2)
+    buf.upsert(60000 * 3, 0, 0, 0, -1.0, 0)
+
+    assert list(df.columns) == ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    assert df['close'].iloc[-1] == pytest.approx(3.5)
+
+
+def test_websocket_kline_updates_ring_buffer():
+    ws = BinanceWebSocket(max_candles=10)
+    ws.seed_candles('BTCUSDT', make_rows(10))
+
+    msg = {'e': 'kline', 's': 'BTCUSDT',
+           'k': {'t': 60000 * 10, 'o': 1, 'h': 2, 'l': 0.5, 'c': 1.7, 'v': 3, 'x': False}}
+    asyncio.run(ws._handle_message(json.dumps(msg)))
+
+    df = ws.get_candles('BTCUSDT')
+    assert len(df) == 10
+    assert df['close'].iloc[-1] == pytest.approx(1.7)
+    assert ws.get_candle_arrays('BTC/USDT', 3)['close'][-1] == pytest.approx(1.7)
+
+
+def test_candle_store_notifies_only_closed_klines():
+    from src.core.candle_store import CandleStore
+
+    store = CandleStore(exchange=None, streaming=False)
+    closed = []
+    store.add_close_listener(lambda symbol, tf: closed.append((symbol, tf)))
+    store.add_close_listener(lambda symbol, tf: 1 / 0)   # listener com erro não derruba o stream
+
+    store._on_kline({'symbol': 'BTCUSDT', 'is_closed': False}, '1m')
+    store._on_kline({'symbol': 'ETHUSDT', 'is_closed': True}, '1m')
+    assert closed == [('ETHUSDT', '1m')]
@@ -0,0 +1,132 @@
+import threading
+import time
+
+from src.backtest.sim_exchange import SimulatedExchange, SyntheticCandles
+from src.core.candle_warehouse import CandleWarehouse, exchange_fetcher
+from src.core.request_scheduler import RequestPriority
+
+MINUTE = 60_000
+NOW = 1_700_000_000_000
+
+
+class FakeKlines:
+    """Exchange de teste: 1m desde `listed_at` até o minuto atual"""
+
+    def __init__(self, listed_at, fail_since=()):
+        self.listed_at = listed_at
+        self.fail_since = set(fail_since)
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def __call__(self, symbol, timeframe, since, limit):
+        with self._lock:
+            self.requests.append(since)
+        if since in self.fail_since:
+            return None
+        now_ms = int(time.time() * 1000)
+        end = now_ms - now_ms % MINUTE
+        start = max(since, self.listed_at)
+        return [[ts, 1.0, 2.0, 0.5, ts / MINUTE, 1.0]
+                for ts in range(start, min(end + MINUTE, start + limit * MINUTE), MINUTE)]
+
+
+def test_backfill_then_incremental_sync(tmp_path, monkeypatch):
+    now = [NOW]
+    monkeypatch.setattr(time, 'time', lambda: now[0] / 1000)
+    exchange = FakeKlines(listed_at=0)
+    warehouse = CandleWarehouse(tmp_path, fetch_raw=exchange, max_workers=4)
+
+    stored = warehouse.backfill(['BTCUSDT', 'ETHUSDT'], '1m', days=2)
+    assert stored['BTCUSDT'] == 2 * 1440
+    assert len(exchange.requests) == 2 * 3   # 2880 candles = 3 chunks por símbolo
+
+    data = warehouse.load('BTCUSDT', '1m')
+    assert (data['timestamp'][1:] - data['timestamp'][:-1] == MINUTE).all()
+    # Candle aberto (minuto atual) não vai para o disco
+    assert data['timestamp'][-1] == NOW - NOW % MINUTE - MINUTE
+
+    # Já sincronizado: nenhum request
+    exchange.requests.clear()
+    df = warehouse.get_dataframe('BTCUSDT', '1m', days=1)
+    assert exchange.requests == []
+    assert len(df) >= 1439
+
+    # 5 minutos depois: só o fim
+    now[0] += 5 * MINUTE
+    assert warehouse.backfill(['BTCUSDT'], '1m', days=2)['BTCUSDT'] == 5
+    assert len(exchange.requests) == 1
+
+    # Período maior: só o início que faltava
+    exchange.requests.clear()
+    assert warehouse.backfill(['BTCUSDT'], '1m', days=3)['BTCUSDT'] == 1440 - 5
+    data = warehouse.load('BTCUSDT', '1m')
+    assert (data['timestamp'][1:] - data['timestamp'][:-1] == MINUTE).all()
+
+
+def test_failed_chunk_never_leaves_holes(tmp_path, monkeypatch):
+    monkeypatch.setattr(time, 'time', lambda: NOW / 1000)
+    monkeypatch.setattr(time, 'sleep', lambda s: None)
+
+    start = NOW - NOW % MINUTE - 3000 * MINUTE
+    exchange = FakeKlines(listed_at=0, fail_since={start + 1000 * MINUTE})
+    warehouse = CandleWarehouse(tmp_path, fetch_raw=exchange)
+
+    assert warehouse.backfill(['BTCUSDT'], '1m', start_ms=start)['BTCUSDT'] == 1000
+    assert warehouse.stats['chunks_failed'] == 1
+
+    # A exchange voltou: continua de onde parou
+    exchange.fail_since.clear()
+    assert warehouse.backfill(['BTCUSDT'], '1m', start_ms=start)['BTCUSDT'] == 2000
+    data = warehouse.load('BTCUSDT', '1m')
+    assert (data['timestamp'][1:] - data['timestamp'][:-1] == MINUTE).all()
+
+    # Par listado depois do início pedido: o período vazio não é baixado de novo
+    listed = start + 500 * MINUTE
+    new_pair = FakeKlines(listed_at=listed)
+    warehouse.fetch_raw = new_pair
+    warehouse.backfill(['NEWUSDT'], '1m', start_ms=start)
+    assert warehouse.load('NEWUSDT', '1m')['timestamp'][0] == listed
+    new_pair.requests.clear()
+    warehouse.backfill(['NEWUSDT'], '1m', start_ms=start)
+    assert new_pair.requests == []
+
+
+def test_read_range_returns_memmap_views(tmp_path, monkeypatch):
+    from src.core import candle_warehouse as cw
+    monkeypatch.setattr(cw, 'INDEX_STRIDE', 64)
+    monkeypatch.setattr(time, 'time', lambda: NOW / 1000)
+
+    warehouse = CandleWarehouse(tmp_path, fetch_raw=FakeKlines(listed_at=0))
+    start = NOW - NOW % MINUTE - 1000 * MINUTE
+    warehouse.backfill(['BTCUSDT'], '1m', start_ms=start)
+
+    # Janela atravessando vários blocos do índice
+    candles = warehouse.read_range('BTCUSDT', start + 100 * MINUTE, start + 400 * MINUTE)
+    assert len(candles) == 300
+    assert candles['timestamp'][0] == start + 100 * MINUTE
+    assert isinstance(candles, cw.np.memmap)   # view sobre o arquivo, sem cópia
+    assert len(warehouse.read_range('BTCUSDT', 0, start)) == 0
+
+    # Append: o índice só é estendido
+    monkeypatch.setattr(time, 'time', lambda: (NOW + 200 * MINUTE) / 1000)
+    warehouse.backfill(['BTCUSDT'], '1m', start_ms=start)
+    candles = warehouse.read_range('BTCUSDT', start + 1100 * MINUTE)
+    assert candles['timestamp'][0] == start + 1100 * MINUTE
+    assert candles['timestamp'][-1] == NOW - NOW % MINUTE + 199 * MINUTE
+
+
+def test_exchange_fetcher_waits_briefly_at_scan_priority():
+    exchange = SimulatedExchange(SyntheticCandles(start_ms=NOW, days=1, seed=7), speed=0, latency_ms=0,
+                                 rate_limit={'weight_per_minute': 6000, 'safety_margin': 1.0})
+    fetch = exchange_fetcher(exchange, max_wait=0.3)
+
+    # Pouco acima da reserva de SCAN (30%): analytics seria descartado, scan passa
+    assert exchange.scheduler.acquire(4100, RequestPriority.ORDER)
+    assert fetch('BTCUSDT', '1m', None, 10)
+
+    # Orçamento esgotado: desiste em vez de segurar a thread
+    assert exchange.scheduler.acquire(1800, RequestPriority.ORDER)
+    start = time.monotonic()
+    assert fetch('BTCUSDT', '1m', None, 10) is None
+    assert time.monotonic() - start < 0.35
+    assert exchange.scheduler.get_status()['dropped']['SCAN'] == 1
@@ -0,0 +1,39 @@
+import time
+
+from src.core.cycle_pacer import CyclePacer
+
+
+def test_deadline_pacing_and_load_shedding(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: clock[0])
+    pacer = CyclePacer(period=5, smoothing=1.0)
+    pacer.start()
+
+    # Ciclo de 2s: dorme só os 3s que faltam (e não o interval inteiro)
+    clock[0] += 2
+    assert pacer.cycle_done(2) == 3
+    assert pacer.level == CyclePacer.SHED_NONE
+    clock[0] += 3
+
+    # Ciclo de 8s: estoura 3s, sem sleep, e começa a cortar carga
+    clock[0] += 8
+    assert pacer.cycle_done(8) == 0
+    assert pacer.stats['overruns'] == 1
+    assert pacer.stats['overrun_ms_max'] == 3000
+    assert pacer.level == CyclePacer.SHED_WATCHLIST
+
+    clock[0] += 6
+    pacer.cycle_done(6)
+    assert pacer.level == CyclePacer.SHED_LOW_WEIGHT   # nível máximo
+    clock[0] += 7
+    pacer.cycle_done(7)
+    assert pacer.level == CyclePacer.SHED_LOW_WEIGHT
+
+    # Alívio: volta um nível por ciclo leve; o deadline segue o período
+    clock[0] += 1
+    assert pacer.cycle_done(1) == 4
+    assert pacer.level == CyclePacer.SHED_WATCHLIST
+    clock[0] += 4 + 1
+    pacer.cycle_done(1)
+    assert pacer.level == CyclePacer.SHED_NONE
+    assert pacer.get_status()['shed_cycles'] == 4
@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+
+from src.database.db_manager import DatabaseManager
+from src.database.models import MarketData
+from src.database.rollups import bucket_start
+
+
+def test_bucket_start():
+    ts = '2025-01-15T10:37:42.123456'
+    assert bucket_start(ts, '1m') == '2025-01-15T10:37:00'
+    assert bucket_start(ts, '15m') == '2025-01-15T10:30:00'
+    assert bucket_start(ts, '1h') == '2025-01-15T10:00:00'
+    assert bucket_start(ts, '1d') == '2025-01-15T00:00:00'
+
+
+def test_rollup_cascade_retention_and_resolution_choice(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'test.db'), buffered_writes=False, rollup_interval_s=3600,
+                         retention_hours={'raw': 2, '1m': 24})
+    try:
+        # 3 dias de preços, um por minuto (close = índice)
+        now = datetime.now().replace(second=0, microsecond=0)
+        start = now - timedelta(days=3)
+        with db.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO market_data (symbol, timestamp, open_price, high_price, low_price, "
+                "close_price, volume, rsi) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [('BTCUSDT', (start + timedelta(minutes=i, seconds=5)).isoformat(),
+                  float(i), float(i) + 0.5, float(i) - 0.5, float(i), 1.0, 50.0)
+                 for i in range(3 * 24 * 60)]
+            )
+
+        db.maintain_time_series()
+        assert db.rollup.caught_up
+
+        conn = db._get_connection()
+        # Todas as horas completas consolidadas antes da retenção apagar o bruto
+        minutes = conn.execute(
+            "SELECT SUM(samples) FROM market_data_rollup WHERE resolution='1h'").fetchone()[0]
+        assert minutes == 3 * 24 * 60 - now.minute
+        # Retenção: bruto só das últimas 2h, 1m das últimas 24h
+        oldest_raw = conn.execute("SELECT MIN(timestamp) FROM market_data").fetchone()[0]
+        assert oldest_raw >= (now - timedelta(hours=2, minutes=1)).isoformat()
+        oldest_1m = conn.execute(
+            "SELECT MIN(timestamp) FROM market_data_rollup WHERE resolution='1m'").fetchone()[0]
+        assert oldest_1m >= (now - timedelta(hours=24, minutes=1)).isoformat()
+
+        # Bucket de 1h: OHLC e volume dos 60 minutos
+        hour = conn.execute(
+            "SELECT * FROM market_data_rollup WHERE resolution='1h' ORDER BY timestamp LIMIT 1 OFFSET 1"
+        ).fetchone()
+        assert hour['samples'] == 60
+        assert hour['volume'] == 60.0
+        assert hour['high_price'] - hour['low_price'] == 60.0
+        assert hour['rsi'] == 50.0
+
+        # 1h de gráfico: bruto; 48h em 500 pontos: 15m; 72h em 200 pontos: 1h
+        assert {p.resolution for p in db.get_market_history('BTCUSDT', hours=1)} == {'raw'}
+        day2 = db.get_market_history('BTCUSDT', hours=48, max_points=500)
+        assert day2[0].resolution == '15m' and len(day2) <= 500
+        day3 = db.get_market_history('BTCUSDT', hours=72, max_points=200)
+        assert day3[0].resolution == '1h'
+        # Série contínua até o último preço (cauda dos níveis finos + bruto)
+        assert day3[-1].close_price == 3 * 24 * 60 - 1
+        assert [p.timestamp for p in day3] == sorted(p.timestamp for p in day3)
+    finally:
+        db.close()
+
+
+def test_catch_up_is_chunked_per_round(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'test.db'), buffered_writes=False, rollup_max_buckets=60)
+    try:
+        start = datetime.now().replace(second=0, microsecond=0) - timedelta(hours=5)
+        with db.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO market_data (symbol, timestamp, close_price) VALUES (?, ?, ?)",
+                [('BTCUSDT', (start + timedelta(minutes=i)).isoformat(), float(i)) for i in range(5 * 60)]
+            )
+
+        # Uma rodada: no máximo 60 buckets de 1m, ainda atrasado
+        rolled = db.rollup.run()
+        assert rolled['market_data:1m'] <= 60
+        assert not db.rollup.caught_up
+
+        # Rodadas seguidas alcançam o presente
+        db.maintain_time_series()
+        assert db.rollup.caught_up
+        conn = db._get_connection()
+        assert conn.execute(
+            "SELECT SUM(samples) FROM market_data_rollup WHERE resolution='1m'").fetchone()[0] == 5 * 60
+    finally:
+        db.close()
+
+
+def test_catch_up_jumps_gaps_longer_than_a_round(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'test.db'), buffered_writes=False, rollup_max_buckets=60)
+    try:
+        # 1h de preços há 4 dias (bot parado) e 1h agora
+        now = datetime.now().replace(second=0, microsecond=0)
+        minutes = [now - timedelta(days=4, hours=1) + timedelta(minutes=i) for i in range(60)]
+        minutes += [now - timedelta(hours=1) + timedelta(minutes=i) for i in range(60)]
+        with db.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO market_data (symbol, timestamp, close_price) VALUES (?, ?, ?)",
+                [('BTCUSDT', ts.isoformat(), 1.0) for ts in minutes]
+            )
+
+        for _ in range(5):
+            db.rollup.run()
+        assert db.rollup.caught_up
+        conn = db._get_connection()
+        latest = conn.execute(
+            "SELECT MAX(timestamp) FROM market_data_rollup WHERE resolution='1m'").fetchone()[0]
+        assert latest == (now - timedelta(minutes=1)).isoformat()
+        assert conn.execute(
+            "SELECT SUM(samples) FROM market_data_rollup WHERE resolution='1m'").fetchone()[0] == 120
+    finally:
+        db.close()
+
+
+def test_portfolio_history_rows_share_shape(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'test.db'), buffered_writes=False)
+    try:
+        start = datetime.now().replace(second=0, microsecond=0) - timedelta(hours=3)
+        with db.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO portfolio_history (timestamp, total_balance_usdt, total_balance_crypto, "
+                "bot_balances, positions) VALUES (?, ?, ?, ?, ?)",
+                [((start + timedelta(minutes=i)).isoformat(), 1000.0 + i, 0.5, '{}', '[]')
+                 for i in range(3 * 60)]
+            )
+        db.maintain_time_series()
+
+        raw = db.get_portfolio_history(hours=1)
+        rolled = db.get_portfolio_history(hours=3, max_points=20)
+        assert raw[0]['resolution'] == 'raw' and rolled[0]['resolution'] != 'raw'
+        assert set(raw[0]) == set(rolled[0])
+        assert raw[0]['min_balance_usdt'] == raw[0]['max_balance_usdt'] == raw[0]['total_balance_usdt']
+    finally:
+        db.close()
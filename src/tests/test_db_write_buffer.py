@@ -0,0 +1,57 @@
+import atexit
+from datetime import datetime
+
+from src.database.db_manager import DatabaseManager
+from src.database.models import MarketData
+
+
+def test_high_frequency_writes_are_batched(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'test.db'), batch_rows=50, flush_interval_ms=60000)
+    try:
+        now = datetime.now()
+        for i in range(120):
+            db.save_market_data(MarketData(symbol='BTCUSDT', timestamp=f"{now.isoformat()}-{i:03d}",
+                                           close_price=100.0 + i))
+        db.log_event('TEST', 'evento', bot_name='bot_estavel', data={'i': 1})
+        db.save_portfolio_snapshot(1000.0, 0.5, {'bot_estavel': 1000.0}, [])
+
+        # Leitura descarrega o buffer antes (vê as próprias escritas)
+        history = db.get_market_history('BTCUSDT', hours=1)
+        assert len(history) == 120
+        assert history[-1].close_price == 219.0
+        assert len(db.get_portfolio_history(hours=1)) == 1
+
+        status = db.write_buffer.get_status()
+        assert status['written'] == 122
+        assert status['queue_depth'] == 0
+        # 122 linhas em poucas transações, não uma por linha
+        assert status['batches'] <= 5
+    finally:
+        db.close()
+
+
+def test_full_queue_drops_after_timeout(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'test.db'), batch_rows=1, flush_interval_ms=60000, max_queue=2)
+    buffer = db.write_buffer
+    buffer.block_timeout = 0.01
+    try:
+        # Flush travado: a fila enche e o chamador desiste depois do timeout
+        with buffer._flush_lock:
+            results = [buffer.add("INSERT INTO event_log (event_type) VALUES (?)", ('X',))
+                       for _ in range(4)]
+        assert results.count(False) >= 1
+        assert buffer.stats['blocked'] >= 1
+        assert buffer.stats['dropped'] == results.count(False)
+    finally:
+        db.close()
+
+
+def test_close_unregisters_atexit_hook(tmp_path, monkeypatch):
+    registered = []
+    monkeypatch.setattr(atexit, 'register', lambda fn: registered.append(fn))
+    monkeypatch.setattr(atexit, 'unregister', lambda fn: registered.remove(fn))
+
+    db = DatabaseManager(str(tmp_path / 'test.db'))
+    assert registered == [db.write_buffer.stop]
+    db.close()
+    assert registered == []
@@ -0,0 +1,77 @@
+import threading
+from datetime import datetime
+
+from src.backtest.sim_exchange import SimulatedExchange, SyntheticCandles
+from src.core.exit_lane import ExitLane
+from src.strategies.smart_strategy import SmartStrategy
+
+START = 1_700_000_000_000 - 1_700_000_000_000 % 60_000
+
+
+def test_exit_lane_checks_open_positions_on_each_tick():
+    exchange = SimulatedExchange(SyntheticCandles(start_ms=START, days=2, seed=3),
+                                 speed=600, latency_ms=0)
+    exchange.fetch_ohlcv('BTCUSDT', '1m', limit=1)
+    server = exchange.start_ws_server()
+    server.tick_seconds = 0.05
+
+    checked, exited = [], []
+    done = threading.Event()
+
+    def evaluate(symbol, price):
+        checked.append(symbol)
+        return 'STOP LOSS' if symbol == 'ETHUSDT' else None
+
+    def on_exit(symbol, price, reason):
+        exited.append((symbol, reason))
+        lane.update_symbols(['BTC/USDT'])   # posição fechada: sai do stream
+        done.set()
+
+    lane = ExitLane(evaluate, on_exit, min_interval_ms=0)
+    try:
+        assert lane.start(['BTC/USDT', 'ETHUSDT'])
+        assert done.wait(10)
+        assert exited == [('ETHUSDT', 'STOP LOSS')]
+        assert 'BTC/USDT' in checked   # símbolo devolvido como está nas posições
+        assert lane.get_status()['resubscribes'] == 1
+    finally:
+        lane.stop()
+        exchange.stop_ws_server()
+
+
+def test_should_sell_fast_uses_price_rules_only():
+    strategy = SmartStrategy({'bot_type': 'bot_teste', 'risk': {'stop_loss': -1.0, 'take_profit': 1.0}})
+    strategy.trailing_stop_pct = 0.15
+    now = datetime.now()
+
+    assert strategy.should_sell_fast('BTCUSDT', 100.0, 98.5, now)[0]   # stop loss
+
+    # Sem tendência conhecida o TP fica para o ciclo; o trailing acompanha o pico
+    assert not strategy.should_sell_fast('ETHUSDT', 100.0, 101.5, now)[0]
+    sell, reason = strategy.should_sell_fast('ETHUSDT', 100.0, 101.2, now)
+    assert sell and 'TRAILING' in reason
+
+    # Com tendência vista pelo ciclo, o TP da feira vale a cada tick
+    strategy.last_trend['SOLUSDT'] = 'LATERAL'
+    assert strategy.should_sell_fast('SOLUSDT', 100.0, 101.1, now)[0]
+    strategy.last_trend['SOLUSDT'] = 'ALTA'
+    assert not strategy.should_sell_fast('SOLUSDT', 100.0, 101.1, now)[0]
+
+
+def test_price_peak_is_consistent_across_threads():
+    strategy = SmartStrategy({'bot_type': 'bot_teste', 'risk': {'stop_loss': -50.0, 'take_profit': 1000.0}})
+    now = datetime.now()
+    prices = [100.0 + i / 100 for i in range(4000)]
+
+    # Stream da via rápida e ciclo normal atualizando o mesmo pico
+    def feed(chunk):
+        for price in chunk:
+            strategy.should_sell_fast('BTCUSDT', 100.0, price, now)
+
+    threads = [threading.Thread(target=feed, args=(prices[i::4],)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert strategy.price_peaks['BTCUSDT'] == max(prices)
@@ -0,0 +1,80 @@
+import json
+import threading
+
+from src.observability import LatencyHistogram, MetricsCollector
+
+
+def test_histogram_percentiles_use_fixed_buckets():
+    hist = LatencyHistogram(buckets=(1, 10, 100))
+    for ms in [0.5] * 50 + [5] * 45 + [50] * 4 + [400]:
+        hist.observe(ms)
+
+    assert hist.counts == [50, 45, 4, 1]
+    summary = hist.summary()
+    assert summary['p50_ms'] == 1
+    assert summary['p95_ms'] == 10
+    assert summary['p99_ms'] == 100
+    assert summary['max_ms'] == 400
+    # Bucket aberto: limitado ao máximo observado
+    assert hist.percentile(100) == 400
+
+
+def test_spans_record_per_phase_bot_and_symbol():
+    metrics = MetricsCollector()
+
+    def worker(symbol):
+        with metrics.span('symbol', bot='bot_estavel', symbol=symbol):
+            # Span interno herda bot/símbolo do externo
+            with metrics.span('indicators'):
+                pass
+
+    threads = [threading.Thread(target=worker, args=(s,)) for s in ['BTCUSDT', 'ETHUSDT'] * 50]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    with metrics.span('persist_state'):
+        pass
+
+    latency = metrics.get_summary()['latency']
+    assert latency['by_phase']['indicators']['count'] == 100
+    assert latency['by_phase']['persist_state']['count'] == 1
+    assert latency['by_bot']['bot_estavel']['symbol']['count'] == 100
+    assert latency['by_symbol']['ETHUSDT']['indicators']['count'] == 50
+    assert 'persist_state' not in latency['by_bot']['bot_estavel']
+    assert set(latency['by_phase']['symbol']) >= {'p50_ms', 'p95_ms', 'p99_ms'}
+
+
+def test_snapshots_merge_and_export_prometheus():
+    engine = MetricsCollector()
+    backend = MetricsCollector()
+    for ms in range(1, 1001):
+        engine.record_latency('fetch', ms / 10, bot='bot_estavel')
+    engine.record_restart('bot_estavel', True, 120.0)
+    backend.record_restart('bot_estavel', False, 80.0)
+    backend.record_api_request('GET /metrics', 4.0, 200)
+    backend.record_api_request('GET /metrics', 6.0, 500)
+
+    # Memória constante: histograma, não lista de durações
+    assert engine.metrics['restarts']['duration_ms'].count == 1
+
+    combined = MetricsCollector()
+    combined.merge(json.loads(json.dumps(engine.snapshot())))
+    combined.merge(backend.snapshot())
+
+    summary = combined.get_summary()
+    assert summary['restarts']['total'] == 2
+    assert summary['restarts']['avg_duration_ms'] == 100.0
+    assert summary['api_requests']['by_endpoint']['GET /metrics'] == {'count': 2, 'avg_time_ms': 5.0, 'errors': 1}
+    fetch = summary['latency']['by_phase']['fetch']
+    assert fetch['count'] == 1000
+    # Buckets log: erro relativo do percentil < 26%
+    assert 50 <= fetch['p50_ms'] <= 50 * 1.26
+    assert 99 <= fetch['p99_ms'] <= 100
+
+    text = combined.to_prometheus()
+    assert '# TYPE leonardo_cycle_phase_seconds histogram' in text
+    assert 'leonardo_cycle_phase_seconds_bucket{phase="fetch",le="+Inf"} 1000' in text
+    assert 'leonardo_bot_phase_seconds_count{bot="bot_estavel",phase="fetch"} 1000' in text
+    assert 'leonardo_restarts_total{result="failure"} 1' in text
+    assert 'leonardo_api_request_errors_total{endpoint="GET /metrics"} 1' in text
@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+from src.backtest.market_replay import MarketReplayer
+from src.core import market_recorder
+from src.core.exchange_client import ExchangeClient
+from src.core.market_recorder import MarketRecorder
+from src.core.websocket_client import BinanceWebSocket
+
+
+def kline_message(symbol, open_time, close, closed):
+    return json.dumps({
+        'e': 'kline', 'E': open_time + 1, 's': symbol,
+        'k': {'t': open_time, 's': symbol, 'i': '1m', 'o': '1', 'h': '2', 'l': '0.5',
+              'c': str(close), 'v': '10', 'n': 3, 'x': closed},
+    })
+
+
+def test_record_and_replay_ws_and_rest(tmp_path, monkeypatch):
+    recorder = MarketRecorder(tmp_path, max_segment_mb=0.0005, max_segments=0)
+    recorder.start()
+    monkeypatch.setattr(market_recorder, '_market_recorder', recorder)
+
+    # Ao vivo: mensagens WS e respostas REST passam pelo gravador
+    live_ws = BinanceWebSocket()
+    messages = [kline_message('BTCUSDT', 60_000 * i, 100 + i, i % 2 == 0) for i in range(20)]
+
+    async def feed():
+        for message in messages:
+            await live_ws._handle_message(message)
+    asyncio.run(feed())
+
+    client = ExchangeClient('binance', '', '', ohlcv_cache_size=0)
+    prices = iter([101.0, 102.5])
+    monkeypatch.setattr(client.exchange, 'fetch_ticker',
+                        lambda symbol: {'symbol': symbol, 'last': next(prices)})
+    live_tickers = [client.fetch_ticker('BTCUSDT')['last'] for _ in range(2)]
+
+    monkeypatch.setattr(market_recorder, '_market_recorder', None)
+    recorder.stop()
+    assert recorder.stats['ws'] == 20 and recorder.stats['rest'] == 2
+    assert recorder.stats['segments'] > 1   # rotação por tamanho
+
+    # Replay: mesmo parser, mesmo cache; REST na mesma ordem
+    replayer = MarketReplayer(tmp_path)
+    replay_ws = BinanceWebSocket()
+    assert asyncio.run(replayer.replay_ws(replay_ws)) == 20
+    assert replay_ws.get_candles('BTCUSDT').equals(live_ws.get_candles('BTCUSDT'))
+
+    exchange = replayer.replay_exchange(ohlcv_cache_size=0)
+    assert [exchange.fetch_ticker('BTCUSDT')['last'] for _ in range(2)] == live_tickers
+    assert exchange.fetch_ticker('BTCUSDT') is None   # gravação esgotada
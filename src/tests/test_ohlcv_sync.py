@@ -0,0 +1,89 @@
+import time
+
+from src.core.ohlcv_sync import OHLCVSync
+
+MINUTE = 60_000
+
+
+class FakeKlines:
+    """Exchange de teste: candles de 1m até o minuto atual"""
+
+    def __init__(self, now_ms, skip=()):
+        self.now_ms = now_ms
+        self.skip = set(skip)
+        self.requests = []
+
+    def series(self):
+        end = self.now_ms - self.now_ms % MINUTE
+        start = end - 5000 * MINUTE
+        return [[ts, 1.0, 2.0, 0.5, ts / MINUTE, 1.0]
+                for ts in range(start, end + MINUTE, MINUTE) if ts not in self.skip]
+
+    def __call__(self, symbol, timeframe, since, limit):
+        self.requests.append((since, limit))
+        rows = self.series()
+        if since is None:
+            return rows[-limit:]
+        return [r for r in rows if r[0] >= since][:limit]
+
+
+def test_second_call_downloads_only_new_candles(monkeypatch):
+    now = [1_700_000_000_000]
+    monkeypatch.setattr(time, 'time', lambda: now[0] / 1000)
+    exchange = FakeKlines(now[0])
+    sync = OHLCVSync(exchange, capacity=500)
+
+    first = sync.fetch('BTCUSDT', '1m', 200)
+    assert len(first) == 200
+
+    now[0] += 3 * MINUTE
+    exchange.now_ms = now[0]
+    second = sync.fetch('BTC/USDT', '1m', 200)
+
+    assert exchange.requests[-1][0] == first[-1][0]
+    assert sync.stats['candles_downloaded'] == 200 + 4
+    assert second == exchange.series()[-200:]
+
+
+def test_long_outage_paginates_and_gap_is_repaired(monkeypatch):
+    now = [1_700_000_000_000]
+    monkeypatch.setattr(time, 'time', lambda: now[0] / 1000)
+    exchange = FakeKlines(now[0])
+    sync = OHLCVSync(exchange, capacity=3000)
+    sync.fetch('ETHUSDT', '1m', 100)
+
+    # 1500 minutos depois: precisa de 2 páginas de 1000
+    now[0] += 1500 * MINUTE
+    exchange.now_ms = now[0]
+    rows = sync.fetch('ETHUSDT', '1m', 100)
+    assert rows == exchange.series()[-100:]
+    assert sync.stats['delta_fetches'] == 2
+
+    # Exchange devolve um candle a menos (buraco) -> reparo completo
+    now[0] += 5 * MINUTE
+    exchange.now_ms = now[0]
+    exchange.skip = {now[0] - now[0] % MINUTE - 2 * MINUTE}
+    sync.fetch('ETHUSDT', '1m', 100)
+    assert sync.stats['gap_repairs'] == 1
+
+    # Buraco real da exchange: não baixa a janela inteira de novo
+    sync.fetch('ETHUSDT', '1m', 100)
+    assert sync.stats['gap_repairs'] == 1
+
+
+def test_growing_limit_refetches_full_window(monkeypatch):
+    now = [1_700_000_000_000]
+    monkeypatch.setattr(time, 'time', lambda: now[0] / 1000)
+    exchange = FakeKlines(now[0])
+    sync = OHLCVSync(exchange, capacity=1000)
+
+    assert len(sync.fetch('SOLUSDT', '1m', 100)) == 100
+    assert sync.fetch('SOLUSDT', '1m', 500) == exchange.series()[-500:]
+    assert sync.stats['full_fetches'] == 2
+
+    # Histórico curto da exchange (par novo): não baixa tudo a cada chamada
+    exchange.series = lambda: FakeKlines.series(exchange)[-50:]
+    sync.reset('SOLUSDT', '1m')
+    assert len(sync.fetch('SOLUSDT', '1m', 100)) == 50
+    assert len(sync.fetch('SOLUSDT', '1m', 100)) == 50
+    assert sync.stats['full_fetches'] == 3
@@ -0,0 +1,64 @@
+from src.core import pnl_aggregates
+from src.core.pnl_aggregates import PnLAggregates, default_pnl_path, get_pnl_aggregates, load_pnl_aggregates
+from src.core.write_behind import get_write_behind
+
+
+def trade(pnl, bot='bot_estavel', when='2025-01-15T10:00:00', duration=None):
+    record = {'bot_type': bot, 'pnl_usd': pnl, 'exit_time': when}
+    if duration is not None:
+        record['duration_min'] = duration
+    return record
+
+
+def test_record_updates_totals_streak_and_buckets():
+    agg = PnLAggregates(path=None)
+    agg.record(trade(2.0, duration=10))
+    agg.record(trade(-1.0, duration=30))
+    agg.record(trade(-0.5, when='2025-01-16T09:00:00'))
+    agg.record(trade(3.0, bot='bot_meme', when='2025-02-01T00:00:01'))
+
+    summary = agg.bot_summary('bot_estavel')
+    assert summary['total_trades'] == 3
+    assert (summary['wins'], summary['losses']) == (1, 2)
+    assert summary['total_pnl'] == 0.5
+    assert (summary['best_trade'], summary['worst_trade']) == (2.0, -1.0)
+    assert summary['avg_duration'] == 20
+    assert summary['current_streak'] == -2
+
+    assert agg.daily_pnl('2025-01-15') == 1.0
+    assert agg.daily_pnl('2025-01-16', bot_type='bot_estavel') == -0.5
+    assert agg.monthly_pnl('2025-01') == 0.5
+    assert agg.monthly_by_bot('2025-02') == {'bot_meme': 3.0}
+    assert agg.recent_pnls('bot_estavel') == [2.0, -1.0, -0.5]
+    assert agg.bot_summary('unico_bot')['total_trades'] == 0
+
+
+def test_day_retention_and_persistence(tmp_path):
+    path = tmp_path / 'pnl_aggregates.json'
+    agg = PnLAggregates(path=str(path), keep_days=2)
+    trades = [trade(1.0, when=f'2025-03-0{d}T12:00:00') for d in (3, 1, 2)]
+    assert agg.rebuild(trades) == 3
+    get_write_behind().flush()
+
+    # Só os 2 dias mais recentes; o mês continua completo
+    assert sorted(agg.days) == ['2025-03-02', '2025-03-03']
+    assert agg.monthly_pnl('2025-03') == 3.0
+
+    loaded = load_pnl_aggregates(str(path))
+    assert loaded.bot_summary('bot_estavel') == agg.bot_summary('bot_estavel')
+    assert loaded.daily_by_bot('2025-03-03') == {'bot_estavel': 1.0}
+
+
+def test_store_is_shared_per_resolved_path(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(pnl_aggregates, '_pnl_aggregates', {})
+
+    # Engine passa o caminho explícito; GoalMonitor/AI Monitor usam o default
+    engine = get_pnl_aggregates(str(tmp_path / 'pnl_aggregates.json'))
+    assert get_pnl_aggregates() is engine
+    assert engine.path == default_pnl_path()
+
+    # Outro arquivo: outro store, sem trocar o do engine
+    other = get_pnl_aggregates(str(tmp_path / 'outro.json'))
+    assert other is not engine
+    assert get_pnl_aggregates() is engine
@@ -0,0 +1,100 @@
+import contextvars
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from src.backtest.sim_exchange import SimulatedExchange, SyntheticCandles
+from src.core.request_scheduler import (
+    RequestPriority, RequestScheduler, current_priority, request_priority, request_wait
+)
+
+
+def test_low_priority_is_dropped_before_orders_are_throttled():
+    scheduler = RequestScheduler(weight_per_minute=100, safety_margin=1.0)
+
+    # Consome até a reserva de analytics (50%)
+    assert scheduler.acquire(50, RequestPriority.ANALYTICS)
+    assert not scheduler.acquire(5, RequestPriority.ANALYTICS)
+
+    # Scan ainda cabe até sobrar 30%, posição até 10%
+    assert scheduler.acquire(20, RequestPriority.SCAN)
+    assert scheduler.acquire(20, RequestPriority.POSITION)
+
+    # Ordens nunca esperam nem são descartadas
+    start = time.monotonic()
+    assert scheduler.acquire(10, RequestPriority.ORDER)
+    assert scheduler.acquire(10, RequestPriority.ORDER)
+    assert time.monotonic() - start < 0.1
+
+    status = scheduler.get_status()
+    assert status['dropped']['ANALYTICS'] == 1
+    assert status['granted']['ORDER'] == 2
+
+
+def test_used_weight_header_shrinks_budget():
+    scheduler = RequestScheduler(weight_per_minute=1000, safety_margin=1.0)
+    scheduler.update_from_headers({'X-MBX-USED-WEIGHT-1M': '900'})
+
+    assert scheduler.get_status()['used_weight_1m'] == 900
+    assert not scheduler.acquire(10, RequestPriority.ANALYTICS)
+    assert scheduler.acquire(10, RequestPriority.ORDER)
+
+
+def test_rate_limit_backoff_only_lets_orders_through():
+    scheduler = RequestScheduler(weight_per_minute=6000)
+    scheduler.on_rate_limited(retry_after=60)
+
+    assert not scheduler.acquire(1, RequestPriority.POSITION)
+    assert scheduler.acquire(1, RequestPriority.ORDER)
+
+
+def test_context_priority_overrides_method_default():
+    assert current_priority(RequestPriority.SCAN) == RequestPriority.SCAN
+    with request_priority(RequestPriority.ANALYTICS):
+        assert current_priority(RequestPriority.SCAN) == RequestPriority.ANALYTICS
+    assert current_priority(RequestPriority.SCAN) == RequestPriority.SCAN
+
+
+def test_context_never_lowers_orders():
+    with request_priority(RequestPriority.ANALYTICS):
+        assert current_priority(RequestPriority.ORDER) == RequestPriority.ORDER
+        assert current_priority(RequestPriority.POSITION) == RequestPriority.ANALYTICS
+
+
+def test_caller_wait_caps_the_class_max_wait():
+    # 10 de peso/s; POSITION poderia esperar até 10s pela classe
+    scheduler = RequestScheduler(weight_per_minute=600, safety_margin=1.0,
+                                 reserves={'POSITION': 0.0}, max_wait={'POSITION': 10.0})
+    assert scheduler.acquire(600, RequestPriority.ORDER)
+
+    # Faltam ~6s de orçamento: com request_wait(0.2) desiste na hora
+    start = time.monotonic()
+    with request_wait(0.2):
+        assert not scheduler.acquire(60, RequestPriority.POSITION)
+    assert time.monotonic() - start < 0.1
+
+    # Falta ~0.1s: espera, mas nunca além do limite do chamador
+    start = time.monotonic()
+    assert scheduler.acquire(1, RequestPriority.POSITION, max_wait=0.3)
+    assert time.monotonic() - start < 0.35
+
+
+def test_trading_cycle_does_not_block_past_max_wait():
+    exchange = SimulatedExchange(SyntheticCandles(start_ms=1_700_000_000_000, days=1, seed=7),
+                                 speed=0, latency_ms=0,
+                                 rate_limit={'weight_per_minute': 6000, 'safety_margin': 1.0})
+    # 100 de peso/s: POSITION precisaria esperar ~0.5s (cabe no max_wait de 1s da classe)
+    assert exchange.scheduler.acquire(5450, RequestPriority.ORDER)
+
+    # Ciclo com pool de workers herdando o request_wait da thread de trading
+    def check_position(symbol):
+        return exchange.fetch_ticker(symbol)
+
+    start = time.monotonic()
+    with request_wait(0.25), ThreadPoolExecutor(max_workers=4) as pool:
+        context = contextvars.copy_context()
+        prices = list(pool.map(lambda s: context.copy().run(check_position, s),
+                               ['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'BNBUSDT']))
+    assert prices == [None] * 4
+    assert time.monotonic() - start < 0.3
+    assert exchange.scheduler.get_status()['dropped']['POSITION'] == 4
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from src.backtest.sim_exchange import SimulatedExchange, SyntheticCandles
+from src.core.websocket_client import BinanceWebSocket
+
+MINUTE = 60_000
+START = 1_700_000_000_000 - 1_700_000_000_000 % MINUTE
+
+
+def make_exchange(**kwargs):
+    kwargs.setdefault('speed', 0)   # relógio parado: controle manual
+    kwargs.setdefault('latency_ms', 0)
+    return SimulatedExchange(SyntheticCandles(start_ms=START, days=2, seed=7), **kwargs)
+
+
+def test_ohlcv_aggregates_one_minute_series():
+    exchange = make_exchange()
+    now = exchange.clock.now_ms()
+
+    minutes = exchange.fetch_ohlcv('BTCUSDT', '1m', limit=15)
+    hourly = exchange.fetch_ohlcv('BTCUSDT', '15m', limit=3)
+    assert len(minutes) == 15 and len(hourly) == 3
+    assert hourly[-1][0] == now - now % (15 * MINUTE)
+
+    # Mesmo seed -> mesmo mercado; candle em andamento fecha no preço atual
+    assert exchange.fetch_ohlcv('BTCUSDT', '1m', limit=15) == minutes
+    assert minutes[-1][4] == pytest.approx(exchange.fetch_ticker('BTC/USDT')['last'])
+
+    last_bucket = [m for m in minutes if m[0] >= hourly[-1][0]]
+    assert hourly[-1][1] == last_bucket[0][1]
+    assert hourly[-1][2] == pytest.approx(max(m[2] for m in last_bucket))
+    assert hourly[-1][5] == pytest.approx(sum(m[5] for m in last_bucket))
+
+
+def test_market_and_limit_orders_move_balances():
+    exchange = make_exchange(initial_balance={'USDT': 1000.0})
+    price = exchange.fetch_ticker('BTCUSDT')['last']
+
+    order = exchange.create_market_order('BTCUSDT', 'buy', 100 / price)
+    assert order['status'] == 'closed' and order['average'] > price
+    balance = exchange.fetch_balance()
+    assert balance['USDT']['free'] < 900
+    assert balance['BTC']['total'] == pytest.approx(100 / price)
+
+    # Sem saldo: ordem recusada
+    assert exchange.create_market_order('BTCUSDT', 'buy', 10_000 / price) is None
+
+    # Limit abaixo do preço fica aberta e trava o USDT
+    limit = exchange.create_limit_order('BTCUSDT', 'buy', 1 / price, price * 0.5)
+    assert exchange.fetch_open_orders('BTCUSDT')[0]['id'] == limit['id']
+    assert exchange.fetch_balance()['USDT']['used'] == pytest.approx(0.5)
+    assert exchange.cancel_order(limit['id'], 'BTCUSDT')
+    assert exchange.fetch_order_status(limit['id'], 'BTCUSDT')['status'] == 'canceled'
+    assert exchange.fetch_open_orders() == []
+
+
+def test_local_websocket_feeds_binance_websocket():
+    exchange = make_exchange(speed=6000)   # 1 minuto simulado a cada 10ms
+    exchange.fetch_ohlcv('ETHUSDT', '1m', limit=1)
+    server = exchange.start_ws_server()
+    try:
+        async def listen():
+            ws = BinanceWebSocket()
+            closed = []
+
+            async def on_kline(kline):
+                if kline['is_closed']:
+                    closed.append(kline)
+
+            await ws.subscribe_klines(['BTCUSDT', 'ETHUSDT'], '1m', on_kline)
+            async def until_closed():
+                async for message in ws.ws:
+                    await ws._handle_message(message)
+                    if len({k['symbol'] for k in closed}) == 2:
+                        return
+            await asyncio.wait_for(until_closed(), timeout=10)
+            await ws.stop()
+            return ws, closed
+
+        ws, closed = asyncio.run(listen())
+        assert ws.base_url == server.ws_url
+        assert {k['symbol'] for k in closed} == {'BTCUSDT', 'ETHUSDT'}
+        assert len(ws.get_candles('BTCUSDT')) > 0
+    finally:
+        exchange.stop_ws_server()
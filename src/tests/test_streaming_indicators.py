@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+ta = pytest.importorskip('ta')
+
+from src.indicators.streaming_indicators import IncrementalIndicatorEngine, StreamingIndicators
+
+
+def make_candles(n=300, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    high = close + rng.uniform(0, 1, n)
+    low = close - rng.uniform(0, 1, n)
+    ts = pd.date_range('2024-01-01', periods=n, freq='1min')
+    return pd.DataFrame({'timestamp': ts, 'open': close, 'high': high,
+                         'low': low, 'close': close, 'volume': 1.0})
+
+
+def reference(df):
+    close, high, low = df['close'], df['high'], df['low']
+    macd = ta.trend.MACD(close)
+    bb = ta.volatility.BollingerBands(close, window=20)
+    return {
+        'rsi': ta.momentum.RSIIndicator(close, window=14).rsi(),
+        'macd': macd.macd(),
+        'macd_signal': macd.macd_signal(),
+        'macd_hist': macd.macd_diff(),
+        'sma20': ta.trend.SMAIndicator(close, window=20).sma_indicator(),
+        'sma50': ta.trend.SMAIndicator(close, window=50).sma_indicator(),
+        'ema9': ta.trend.EMAIndicator(close, window=9).ema_indicator(),
+        'ema21': ta.trend.EMAIndicator(close, window=21).ema_indicator(),
+        'bb_upper': bb.bollinger_hband(),
+        'bb_lower': bb.bollinger_lband(),
+        'atr': ta.volatility.AverageTrueRange(high, low, close).average_true_range(),
+        'adx': ta.trend.ADXIndicator(high, low, close).adx(),
+    }
+
+
+def test_streaming_matches_ta_with_intra_candle_ticks():
+    df = make_candles()
+    expected = reference(df)
+    state = StreamingIndicators()
+    ts = df['timestamp'].astype('int64') // 10**6
+
+    for i in range(len(df)):
+        # Ticks do candle em andamento não podem contaminar o estado
+        state.update(int(ts[i]), df['high'][i] + 5, df['low'][i] - 5, df['close'][i] + 3)
+        values = state.update(int(ts[i]), df['high'][i], df['low'][i], df['close'][i])
+
+        if i >= 60:
+            for column in StreamingIndicators.COLUMNS:
+                assert values[column] == pytest.approx(expected[column][i], rel=1e-9, abs=1e-9), column
+
+
+def test_engine_apply_processes_only_new_candles():
+    full = make_candles()
+    expected = reference(full)
+    engine = IncrementalIndicatorEngine(tail_rows=3)
+
+    for end in range(100, len(full) + 1, 7):
+        window = full.iloc[max(0, end - 100):end].copy()
+        out = engine.apply('BTCUSDT', window)
+
+        assert out['rsi'].iloc[:-3].isna().all()
+        for column in ('rsi', 'macd_hist', 'atr', 'adx'):
+            assert out[column].iloc[-1] == pytest.approx(expected[column][end - 1], rel=1e-9, abs=1e-9)
+            assert out[column].iloc[-2] == pytest.approx(expected[column][end - 2], rel=1e-9, abs=1e-9)
+
+
+def test_engine_resets_on_gap():
+    full = make_candles()
+    engine = IncrementalIndicatorEngine()
+    engine.apply('ETHUSDT', full.iloc[:100].copy())
+
+    # Buraco: janela não continua o estado -> refaz do zero
+    out = engine.apply('ETHUSDT', full.iloc[200:300].copy())
+    expected = reference(full.iloc[200:300].reset_index(drop=True))
+    assert out['rsi'].iloc[-1] == pytest.approx(expected['rsi'].iloc[-1], rel=1e-9)
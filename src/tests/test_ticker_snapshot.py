@@ -0,0 +1,55 @@
+import asyncio
+import json
+
+import pytest
+
+from src.core.ticker_snapshot import TickerFeed, TickerSnapshot
+from src.core.websocket_client import BinanceWebSocket
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = 0
+
+    def fetch_tickers(self, symbols=None):
+        self.calls += 1
+        return {
+            'BTC/USDT': {'symbol': 'BTC/USDT', 'last': 50000.0},
+            'ETH/USDT': {'symbol': 'ETH/USDT', 'last': 3000.0},
+        }
+
+
+def test_snapshot_is_immutable_and_normalizes_symbols():
+    snapshot = TickerSnapshot.from_ccxt(FakeClient().fetch_tickers())
+
+    assert snapshot.price('BTCUSDT') == 50000.0
+    assert snapshot.price('ETH/USDT') == 3000.0
+    assert snapshot.price('XRPUSDT', 0) == 0
+    with pytest.raises(TypeError):
+        snapshot.get('BTCUSDT')['last'] = 1
+
+
+def test_feed_reuses_one_rest_call_per_cycle():
+    client = FakeClient()
+    feed = TickerFeed(client)
+
+    prices = [feed.snapshot(max_age=60).price(s) for s in ['BTCUSDT', 'ETHUSDT'] * 25]
+
+    assert client.calls == 1
+    assert prices[:2] == [50000.0, 3000.0]
+
+
+def test_feed_prefers_fresh_mini_ticker_stream():
+    client = FakeClient()
+    feed = TickerFeed(client)
+    ws = BinanceWebSocket()
+    ws.on_mini_tickers = feed._on_mini_tickers
+
+    msg = [{'e': '24hrMiniTicker', 'E': 1, 's': 'BTCUSDT', 'c': '51000', 'o': '50000',
+            'h': '52000', 'l': '49000', 'v': '10', 'q': '500000'}]
+    asyncio.run(ws._handle_message(json.dumps(msg)))
+
+    snapshot = feed.snapshot(max_age=0)
+    assert snapshot.source == 'ws'
+    assert snapshot.price('BTC/USDT') == 51000.0
+    assert client.calls == 0
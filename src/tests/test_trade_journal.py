@@ -0,0 +1,74 @@
+import json
+
+from src.core.trade_journal import TradeJournal, default_journal_dir, read_trades
+from src.core.utils import PROJECT_ROOT
+
+
+def trade(i, bot='bot_estavel', day='2025-01-01'):
+    return {'symbol': 'BTCUSDT', 'pnl_usd': float(i), 'bot_type': bot,
+            'timestamp': f"{day}T00:00:{i % 60:02d}.{i:06d}"}
+
+
+def test_segments_index_and_retention(tmp_path):
+    journal = TradeJournal(tmp_path, segment_records=10, max_segments=2, fsync='never')
+    for i in range(25):
+        journal.append(trade(i, bot='bot_meme' if i < 10 else 'bot_estavel',
+                             day='2025-01-01' if i < 20 else '2025-01-02'))
+    journal.close()
+
+    # 2 segmentos (o mais velho, só com bot_meme, foi apagado pela retenção)
+    segments = sorted(p.name for p in tmp_path.glob('segment_*.jsonl'))
+    assert segments == ['segment_000002.jsonl', 'segment_000003.jsonl']
+    index = [json.loads(line) for line in (tmp_path / 'index.jsonl').read_text().splitlines()]
+    assert [e['segment'] for e in index] == ['segment_000002.jsonl']
+    assert index[0]['bots'] == {'bot_estavel': 10}
+
+    trades = read_trades(base_dir=str(tmp_path))
+    assert [t['pnl_usd'] for t in trades] == [float(i) for i in range(10, 25)]
+    assert read_trades(bot_type='bot_meme', base_dir=str(tmp_path)) == []
+    assert len(read_trades(since='2025-01-02', base_dir=str(tmp_path))) == 5
+    assert [t['pnl_usd'] for t in read_trades(limit=7, base_dir=str(tmp_path))] == [float(i) for i in range(18, 25)]
+
+
+def test_torn_write_is_discarded_on_reopen(tmp_path):
+    journal = TradeJournal(tmp_path, fsync='always')
+    journal.append(trade(1))
+    journal.close()
+
+    # Queda no meio da escrita: linha incompleta no fim do segmento
+    segment = next(tmp_path.glob('segment_*.jsonl'))
+    with open(segment, 'ab') as f:
+        f.write(b'{"symbol": "ETH')
+    assert len(read_trades(base_dir=str(tmp_path))) == 1
+
+    journal = TradeJournal(tmp_path)
+    journal.append(trade(2))
+    journal.close()
+    assert [t['pnl_usd'] for t in read_trades(base_dir=str(tmp_path))] == [1.0, 2.0]
+    assert journal.stats['recovered_bytes'] == len(b'{"symbol": "ETH')
+
+
+def test_legacy_history_is_imported_once(tmp_path):
+    legacy = tmp_path / 'multibot_history.json'
+    legacy.write_text(json.dumps([trade(2), trade(1)]))
+    journal = TradeJournal(tmp_path / 'journal')
+
+    assert journal.import_legacy(legacy) == 2
+    assert journal.import_legacy(legacy) == 0
+    assert [t['pnl_usd'] for t in journal.read()] == [1.0, 2.0]
+
+
+def test_default_dir_follows_data_dir_not_cwd(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATA_DIR', str(tmp_path / 'subconta'))
+    monkeypatch.chdir(tmp_path)
+    journal = TradeJournal(fsync='never')
+    journal.append({'bot_type': 'bot_estavel', 'pnl_usd': 1.0})
+    journal.close()
+
+    assert journal.base_dir == tmp_path / 'subconta' / 'journal' / 'trades'
+    # Backend lê com o default: mesmo diretório do engine
+    assert [t['pnl_usd'] for t in read_trades()] == [1.0]
+
+    # DATA_DIR relativo é relativo à raiz do projeto, não ao cwd
+    monkeypatch.setenv('DATA_DIR', 'data')
+    assert default_journal_dir() == PROJECT_ROOT / 'data' / 'journal' / 'trades'
@@ -0,0 +1,48 @@
+import json
+import time
+
+from src.core.write_behind import WriteBehindStore
+
+
+def test_puts_coalesce_until_flush(tmp_path):
+    store = WriteBehindStore(flush_interval=60, fsync=False)
+    store.start()
+    path = tmp_path / 'positions.json'
+    try:
+        for i in range(5):
+            store.put(path, {'n': i})
+        # Nada no disco antes do flush periódico; 5 puts = 1 documento sujo
+        assert not path.exists()
+        assert store.pending() == 1
+        assert store.stats['coalesced'] == 4
+    finally:
+        store.stop()
+
+    # stop() grava o pendente, só a última versão
+    assert json.loads(path.read_text()) == {'n': 4}
+    assert store.stats['writes'] == 1
+    assert not (tmp_path / 'positions.json.tmp').exists()
+
+
+def test_urgent_put_flushes_without_waiting_interval(tmp_path):
+    store = WriteBehindStore(flush_interval=60, fsync=False)
+    store.start()
+    path = tmp_path / 'sub' / 'stats.json'
+    try:
+        store.put(path, {'total_trades': 1}, urgent=True)
+        deadline = time.monotonic() + 2
+        while not path.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert json.loads(path.read_text()) == {'total_trades': 1}
+    finally:
+        store.stop()
+
+
+def test_without_thread_put_writes_immediately(tmp_path):
+    store = WriteBehindStore()
+    path = tmp_path / 'coordinator_stats.json'
+    data = {'bots': {'bot_estavel': {'positions': {}}}}
+    store.put(path, data)
+    # Serializado no put: mutação posterior não vaza para o arquivo
+    data['bots']['bot_estavel']['positions']['BTCUSDT'] = {}
+    assert json.loads(path.read_text()) == {'bots': {'bot_estavel': {'positions': {}}}}